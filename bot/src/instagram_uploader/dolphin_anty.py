@@ -11,7 +11,7 @@ import logging
 import time
 import random
 import string
-from typing import Dict, List, Optional, Union, Any, Tuple
+from typing import Dict, List, Optional, Union, Any, Tuple, Callable
 from dotenv import load_dotenv
 import asyncio
 from playwright.async_api import async_playwright
@@ -26,6 +26,8 @@ import uuid
 import socket
 import ipaddress
 import http.client
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 
 # Импортируем Windows совместимость
 try:
@@ -140,6 +142,127 @@ class DolphinAntyAPIError(Exception):
         self.response = response
         super().__init__(self.message)
 
+# Default (connect, read) timeouts for Dolphin API calls without an explicit timeout
+DOLPHIN_HTTP_TIMEOUT = (
+    float(os.environ.get("DOLPHIN_HTTP_CONNECT_TIMEOUT", "5")),
+    float(os.environ.get("DOLPHIN_HTTP_READ_TIMEOUT", "60")),
+)
+DOLPHIN_HTTP_POOL_MAXSIZE = int(os.environ.get("DOLPHIN_HTTP_POOL_MAXSIZE", "32"))
+
+# Bulk profile provisioning (create_profiles_bulk)
+DOLPHIN_PROVISION_CONCURRENCY = int(os.environ.get("DOLPHIN_PROVISION_CONCURRENCY", "4"))
+# Remote API requests per second across all provisioning workers
+DOLPHIN_PROVISION_RATE = float(os.environ.get("DOLPHIN_PROVISION_RATE", "2"))
+DOLPHIN_PROVISION_RETRIES = int(os.environ.get("DOLPHIN_PROVISION_RETRIES", "3"))
+# Every bulk-created profile gets its own UA/WebGL fingerprint. With sharing
+# opted in, at most DOLPHIN_FINGERPRINT_POOL_SIZE are fetched and profiles
+# sample from them (several profiles end up with the same UA/WebGL).
+DOLPHIN_SHARE_FINGERPRINTS = os.environ.get("DOLPHIN_SHARE_FINGERPRINTS", "0").lower() in ("1", "true", "yes")
+DOLPHIN_FINGERPRINT_POOL_SIZE = int(os.environ.get("DOLPHIN_FINGERPRINT_POOL_SIZE", "50"))
+DOLPHIN_GEOIP_CONCURRENCY = int(os.environ.get("DOLPHIN_GEOIP_CONCURRENCY", "8"))
+GEOIP_BATCH_URL = "http://ip-api.com/batch?fields=status,query,countryCode,regionName,city,lat,lon,timezone"
+GEOIP_BATCH_SIZE = 100
+
+_shared_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+_clients: Dict[Tuple[str, str, str], "DolphinAnty"] = {}
+_clients_lock = threading.Lock()
+
+
+def get_dolphin_session() -> requests.Session:
+    """Process-wide keep-alive session for Dolphin Local/Remote API calls"""
+    global _shared_session
+    if _shared_session is None:
+        with _session_lock:
+            if _shared_session is None:
+                from requests.adapters import HTTPAdapter
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=DOLPHIN_HTTP_POOL_MAXSIZE)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _shared_session = session
+    return _shared_session
+
+
+def normalize_local_api_base(local_api_base: Optional[str] = None) -> str:
+    """DOLPHIN_API_HOST (or the given base) with the /v1.0 suffix"""
+    base = local_api_base or os.environ.get("DOLPHIN_API_HOST", "http://localhost:3001/v1.0")
+    if not base.endswith("/v1.0"):
+        base = base.rstrip("/") + "/v1.0"
+    return base
+
+
+def get_dolphin_client(
+    api_key: Optional[str] = None,
+    local_api_base: Optional[str] = None,
+    base_url: str = "https://dolphin-anty-api.com"
+) -> "DolphinAnty":
+    """
+    Shared DolphinAnty client for (token, local API, remote API).
+
+    All callers in the process reuse one instance, so the token login and
+    the pooled connections are shared across accounts.
+    """
+    api_key = api_key or os.environ.get("DOLPHIN_API_TOKEN", "")
+    key = (api_key, normalize_local_api_base(local_api_base), base_url.rstrip("/"))
+    client = _clients.get(key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                client = _clients[key] = DolphinAnty(api_key=key[0], base_url=key[2], local_api_base=key[1])
+    return client
+
+
+class _RateLimiter:
+    """Thread-safe pacing of Remote API calls; a 429 pauses every caller"""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+    def pause(self, seconds: float):
+        with self._lock:
+            self._next = max(self._next, time.monotonic() + seconds)
+
+
+@dataclass
+class ProfileRequest:
+    """One profile for create_profiles_bulk; key is the caller's id (e.g. account id)"""
+    key: Any
+    name: str
+    proxy: Dict[str, Any]
+    tags: List[str] = field(default_factory=list)
+    locale: str = "ru_BY"
+
+
+@dataclass
+class ProfileResult:
+    key: Any
+    profile_id: Optional[str] = None
+    response: Optional[Dict[str, Any]] = None
+    error: str = ""
+
+
+def extract_profile_id(response: Any) -> Optional[str]:
+    """Profile id from a create_profile response (browserProfileId or data.id)"""
+    if not isinstance(response, dict):
+        return None
+    profile_id = response.get("browserProfileId")
+    if not profile_id and isinstance(response.get("data"), dict):
+        profile_id = response["data"].get("id")
+    return str(profile_id) if profile_id else None
+
+
 class DolphinAnty:
     """
     Class for interacting with Dolphin{anty} Remote API
@@ -175,6 +298,12 @@ class DolphinAnty:
         self.sync_api_base  = os.environ.get("DOLPHIN_SYNC_API_BASE", "https://sync.dolphin-anty-api.com").rstrip("/")
         # Simple in-memory cache for geo-IP lookups per proxy host
         self._geoip_cache: Dict[str, Dict[str, Any]] = {}
+        # Pooled keep-alive connections shared by all clients in the process
+        self._session = get_dolphin_session()
+        # Token login state: valid until an API call returns 401
+        self._auth_lock = threading.Lock()
+        self._local_logged_in = False
+        self._remote_authenticated = False
 
     def _get_headers(self):
         """Get headers for API requests"""
@@ -192,6 +321,7 @@ class DolphinAnty:
         data: Any = None,
         headers: Dict[str, Any] = None,
         json_data: Any = None,
+        timeout: Any = None,
     ) -> Any:
         if endpoint.startswith("http://") or endpoint.startswith("https://"):
             url = endpoint
@@ -201,29 +331,76 @@ class DolphinAnty:
         hdrs = {"Authorization": f"Bearer {self.api_key}"}
         if headers:
             hdrs.update(headers)
+        timeout = timeout or DOLPHIN_HTTP_TIMEOUT
 
         # For PATCH requests with proxy data, use form data (urlencoded)
         if method.lower() == "patch" and data and isinstance(data, dict) and any(key.startswith("proxy[") for key in data.keys()):
             hdrs["Content-Type"] = "application/x-www-form-urlencoded"
-            resp = requests.request(method, url, params=params, data=data, headers=hdrs)
+            resp = self._session.request(method, url, params=params, data=data, headers=hdrs, timeout=timeout)
         elif headers and headers.get("Content-Type") == "application/x-www-form-urlencoded":
-            resp = requests.request(method, url, params=params, data=data, headers=hdrs)
+            resp = self._session.request(method, url, params=params, data=data, headers=hdrs, timeout=timeout)
         else:
             # Prefer explicit json_data if provided, fall back to data
             if json_data is not None:
-                resp = requests.request(method, url, params=params, json=json_data, headers=hdrs)
+                resp = self._session.request(method, url, params=params, json=json_data, headers=hdrs, timeout=timeout)
             else:
-                resp = requests.request(method, url, params=params, json=data, headers=hdrs)
+                resp = self._session.request(method, url, params=params, json=data, headers=hdrs, timeout=timeout)
 
+        if resp.status_code == 401:
+            self.invalidate_auth()
         resp.raise_for_status()
         return resp.json()
 
+    def invalidate_auth(self):
+        """Forget cached logins (after a 401); the next call logs in again"""
+        with self._auth_lock:
+            self._local_logged_in = False
+            self._remote_authenticated = False
+
+    def _local_login(self, force: bool = False) -> Optional[int]:
+        """
+        POST {local_api_base}/auth/login-with-token once per client.
+
+        The result is cached until invalidate_auth() (a 401 from the API).
+        Returns the HTTP status (200 when cached); raises RequestException
+        when the Local API is unreachable.
+        """
+        if self._local_logged_in and not force:
+            return 200
+        with self._auth_lock:
+            if self._local_logged_in and not force:
+                return 200
+            resp = self._session.post(
+                f"{self.local_api_base}/auth/login-with-token",
+                headers={"Content-Type": "application/json"},
+                json={"token": self.api_key},
+                timeout=5
+            )
+            self._local_logged_in = resp.status_code == 200
+            return resp.status_code
+
+    # Async interface: blocking calls run in worker threads, not on the event loop
+    async def authenticate_async(self) -> bool:
+        return await asyncio.to_thread(self.authenticate)
+
+    async def check_dolphin_status_async(self, force: bool = False) -> Dict[str, Any]:
+        return await asyncio.to_thread(self.check_dolphin_status, force)
+
+    async def start_profile_async(self, profile_id: Union[str, int], headless: bool = False) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        return await asyncio.to_thread(self.start_profile, profile_id, headless)
+
+    async def stop_profile_async(self, profile_id: Union[str, int]) -> bool:
+        return await asyncio.to_thread(self.stop_profile, profile_id)
+
 
     def authenticate(self):
         """Authenticate with Dolphin{anty} API and verify connection"""
+        if self._remote_authenticated:
+            return True
         try:
             # Try to get a list of profiles to verify API connection
             profiles = self.get_profiles(limit=1)
+            self._remote_authenticated = True
             return True
         except DolphinAntyAPIError as e:
             logger.error(f"Authentication error with Dolphin API: {e.message}")
@@ -338,33 +515,41 @@ class DolphinAnty:
         proxy: Dict[str, Any],
         tags: List[str],
         locale: str = "ru_RU",
-        strict_webrtc: bool = False
+        strict_webrtc: bool = False,
+        fingerprint: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """
         Create a fully randomized Dolphin Anty browser profile payload,
         with manual modes and configurable localization.
+
+        fingerprint: a UA/WebGL sample from generate_fingerprint_pool();
+        skips the two fingerprint API calls (the screen is still randomized).
         """
         # 1) Proxy is required
         if not proxy:
             return {"success": False, "error": "Proxy configuration is required"}
 
         # 2) Choose OS and browser version - only Windows
-        os_plat = self.OS_PLATFORMS[0]
-        browser_ver = random.choice(self.BROWSER_VERSIONS)
+        os_plat = (fingerprint or {}).get("platform") or self.OS_PLATFORMS[0]
+        browser_ver = (fingerprint or {}).get("browser_version") or random.choice(self.BROWSER_VERSIONS)
 
         # 2b) Geo-IP for proxy to sync locale/TZ/geo and maybe WebRTC public IP
         geoip = self._geoip_lookup(proxy)
         public_ip = (geoip or {}).get("ip")
 
-        # 3) Generate User-Agent
-        ua = self.generate_user_agent(os_plat, browser_ver)
-        if not ua:
-            return {"success": False, "error": "UA generation failed"}
+        if fingerprint:
+            ua = fingerprint["useragent"]
+            webgl = dict(fingerprint["webgl"], screen=random.choice(self.SCREEN_RESOLUTIONS))
+        else:
+            # 3) Generate User-Agent
+            ua = self.generate_user_agent(os_plat, browser_ver)
+            if not ua:
+                return {"success": False, "error": "UA generation failed"}
 
-        # 4) Generate WebGL info + platformVersion
-        webgl = self.generate_webgl_info(os_plat, browser_ver)
-        if not webgl:
-            return {"success": False, "error": "WebGL info generation failed"}
+            # 4) Generate WebGL info + platformVersion
+            webgl = self.generate_webgl_info(os_plat, browser_ver)
+            if not webgl:
+                return {"success": False, "error": "WebGL info generation failed"}
 
         # Fallback platform versions
         default_versions = {"windows": "10.0.0", "macos": "15.0.0", "linux": "0.0.0"}
@@ -824,6 +1009,195 @@ class DolphinAnty:
             logger.error(f"[FAIL] Failed to create profile for {username}")
             return None
 
+    # --- Bulk provisioning ---
+    def generate_fingerprint_pool(self, size: int, limiter: Optional[_RateLimiter] = None,
+                                  concurrency: int = DOLPHIN_PROVISION_CONCURRENCY) -> List[Dict[str, Any]]:
+        """
+        Fetch up to `size` UA/WebGL fingerprints concurrently.
+
+        The fetches go through `limiter`, so a pool as large as the batch
+        stays within the provisioning rate. Screen, CPU, memory, MAC and
+        device name are still randomized locally for every profile.
+        """
+        limiter = limiter or _RateLimiter(DOLPHIN_PROVISION_RATE)
+
+        def _fetch(_):
+            os_plat = self.OS_PLATFORMS[0]
+            browser_ver = random.choice(self.BROWSER_VERSIONS)
+            try:
+                limiter.wait()
+                ua = self.generate_user_agent(os_plat, browser_ver)
+                if not ua:
+                    return None
+                limiter.wait()
+                webgl = self.generate_webgl_info(os_plat, browser_ver)
+            except Exception as e:
+                logger.warning(f"[PROVISION] Fingerprint fetch failed: {e}")
+                return None
+            if not webgl:
+                return None
+            return {"platform": os_plat, "browser_version": browser_ver, "useragent": ua, "webgl": webgl}
+
+        size = max(0, int(size))
+        if not size:
+            return []
+        with ThreadPoolExecutor(max_workers=max(1, min(concurrency, size)), thread_name_prefix="dolphin-fp") as executor:
+            pool = [fp for fp in executor.map(_fetch, range(size)) if fp]
+        logger.info(f"[PROVISION] Fingerprint pool: {len(pool)}/{size} fetched")
+        return pool
+
+    def prefetch_geoip(self, proxies: List[Dict[str, Any]], concurrency: int = DOLPHIN_GEOIP_CONCURRENCY) -> int:
+        """
+        Warm the per-host geo-IP cache for many proxies at once.
+
+        Hosts are resolved concurrently and looked up with ip-api batch
+        requests (100 IPs each); hosts the batch could not resolve fall back
+        to the per-host _geoip_lookup. Returns the number of cached hosts.
+        """
+        hosts = list(dict.fromkeys(
+            p.get("host") for p in proxies if p and p.get("host") and p.get("host") not in self._geoip_cache
+        ))
+        if not hosts:
+            return 0
+        workers = max(1, min(concurrency, len(hosts)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="dolphin-geo") as executor:
+            hosts_by_ip: Dict[str, List[str]] = {}
+            for host, ip_str in zip(hosts, executor.map(self._resolve_host, hosts)):
+                if ip_str:
+                    hosts_by_ip.setdefault(ip_str, []).append(host)
+
+            ips = list(hosts_by_ip)
+            for start in range(0, len(ips), GEOIP_BATCH_SIZE):
+                chunk = ips[start:start + GEOIP_BATCH_SIZE]
+                try:
+                    r = self._session.post(GEOIP_BATCH_URL, json=chunk, timeout=10)
+                    items = r.json() if r.status_code == 200 else []
+                except Exception as e:
+                    logger.warning(f"[PROVISION] Geo-IP batch lookup failed: {e}")
+                    items = []
+                for item in items or []:
+                    if not isinstance(item, dict) or item.get("status") != "success":
+                        continue
+                    info = {
+                        "ip": item.get("query"),
+                        "country_code": (item.get("countryCode") or "").upper(),
+                        "region": item.get("regionName"),
+                        "city": item.get("city"),
+                        "latitude": item.get("lat"),
+                        "longitude": item.get("lon"),
+                        "timezone": item.get("timezone"),
+                    }
+                    for host in hosts_by_ip.get(item.get("query"), []):
+                        self._geoip_cache[host] = info
+
+            missing = [host for host in hosts if host not in self._geoip_cache]
+            if missing:
+                list(executor.map(lambda host: self._geoip_lookup({"host": host}), missing))
+        cached = sum(1 for host in hosts if host in self._geoip_cache)
+        logger.info(f"[PROVISION] Geo-IP: {cached}/{len(hosts)} proxy hosts resolved ({len(missing)} via per-host fallback)")
+        return cached
+
+    def create_profiles_bulk(
+        self,
+        requests_: List[ProfileRequest],
+        concurrency: int = DOLPHIN_PROVISION_CONCURRENCY,
+        rate: float = DOLPHIN_PROVISION_RATE,
+        share_fingerprints: bool = DOLPHIN_SHARE_FINGERPRINTS,
+        on_result: Optional[Callable[[ProfileResult], None]] = None,
+    ) -> List[ProfileResult]:
+        """
+        Create many profiles: geo-IP prefetched in batches, one UA/WebGL
+        fingerprint fetched per profile and handed out without replacement,
+        profile POSTs from `concurrency` workers paced at `rate` requests/sec.
+        A 429 pauses all workers for Retry-After; 429/5xx/connection errors
+        are retried DOLPHIN_PROVISION_RETRIES times.
+
+        share_fingerprints=True fetches at most DOLPHIN_FINGERPRINT_POOL_SIZE
+        fingerprints and lets profiles sample from them (faster, but profiles
+        share UA/WebGL). A profile left without a pooled fingerprint fetches
+        its own in create_profile.
+
+        on_result is called from the worker threads with each finished result
+        (progress reporting); its exceptions are logged and ignored.
+
+        Returns results in the order of `requests_`.
+        """
+        if not requests_:
+            return []
+        started = time.monotonic()
+        limiter = _RateLimiter(rate)
+        self.prefetch_geoip([r.proxy for r in requests_ if r.proxy])
+        pool_size = sum(1 for r in requests_ if r.proxy)
+        if share_fingerprints:
+            pool_size = min(pool_size, DOLPHIN_FINGERPRINT_POOL_SIZE)
+        pool = self.generate_fingerprint_pool(pool_size, limiter, concurrency)
+        if pool_size and not pool:
+            return [ProfileResult(key=r.key, error="Fingerprint generation failed") for r in requests_]
+        unused = list(pool)
+        unused_lock = threading.Lock()
+
+        def _take_fingerprint() -> Optional[Dict[str, Any]]:
+            if share_fingerprints:
+                return random.choice(pool)
+            with unused_lock:
+                return unused.pop() if unused else None
+
+        def _create(req: ProfileRequest) -> ProfileResult:
+            if not req.proxy:
+                return ProfileResult(key=req.key, error="Proxy configuration is required")
+            fingerprint = _take_fingerprint()
+            last_error = ""
+            for attempt in range(1, max(1, DOLPHIN_PROVISION_RETRIES) + 1):
+                limiter.wait()
+                try:
+                    response = self.create_profile(
+                        name=req.name, proxy=req.proxy, tags=req.tags, locale=req.locale,
+                        fingerprint=fingerprint,
+                    )
+                except requests.HTTPError as e:
+                    status = e.response.status_code if e.response is not None else None
+                    last_error = f"HTTP {status}: {e}"
+                    if status == 429:
+                        retry_after = e.response.headers.get("Retry-After", "")
+                        delay = float(retry_after) if retry_after.replace(".", "", 1).isdigit() else 5.0 * attempt
+                        logger.warning(f"[PROVISION] Rate limited by Dolphin API, pausing {delay:.0f}s")
+                        limiter.pause(delay)
+                        continue
+                    if status is not None and status >= 500:
+                        time.sleep(min(10.0, 2.0 * attempt))
+                        continue
+                    break
+                except requests.ConnectionError as e:
+                    last_error = str(e)
+                    time.sleep(min(10.0, 2.0 * attempt))
+                    continue
+                except requests.RequestException as e:
+                    # A read timeout may have created the profile already - do not retry
+                    last_error = str(e)
+                    break
+                profile_id = extract_profile_id(response)
+                if profile_id:
+                    return ProfileResult(key=req.key, profile_id=profile_id, response=response)
+                error = response.get("error", "Unknown error") if isinstance(response, dict) else "Unknown error"
+                return ProfileResult(key=req.key, response=response if isinstance(response, dict) else None,
+                                     error=error if isinstance(error, str) else json.dumps(error))
+            return ProfileResult(key=req.key, error=last_error or "Unknown error")
+
+        def _create_and_report(req: ProfileRequest) -> ProfileResult:
+            result = _create(req)
+            if on_result is not None:
+                try:
+                    on_result(result)
+                except Exception as e:
+                    logger.warning(f"[PROVISION] Progress callback failed: {e}")
+            return result
+
+        with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(requests_))), thread_name_prefix="dolphin-provision") as executor:
+            results = list(executor.map(_create_and_report, requests_))
+        created = sum(1 for r in results if r.profile_id)
+        logger.info(f"[PROVISION] Created {created}/{len(results)} profiles in {time.monotonic() - started:.1f}s")
+        return results
+
     def start_profile(
         self,
         profile_id: Union[str, int],
@@ -839,21 +1213,15 @@ class DolphinAnty:
         # Step 1: Check if Dolphin Anty local API is available
         logger.info(f"[SEARCH] [Step 1/3] Checking Dolphin Anty local API availability...")
         try:
-            # Use authentication endpoint to check API availability
-            auth_data = {"token": self.api_key}
-            status_resp = requests.post(
-                f"{self.local_api_base}/auth/login-with-token",
-                headers={"Content-Type": "application/json"},
-                json=auth_data,
-                timeout=5
-            )
-            if status_resp.status_code == 200:
+            # Use authentication endpoint to check API availability (cached after the first login)
+            status_code = self._local_login()
+            if status_code == 200:
                 logger.info(f"[OK] Dolphin Anty local API is responding and authenticated")
-            elif status_resp.status_code == 401:
+            elif status_code == 401:
                 logger.error(f"[FAIL] Dolphin Anty API authentication failed - invalid token")
                 return False, None
             else:
-                logger.error(f"[FAIL] Dolphin Anty local API error (HTTP {status_resp.status_code})")
+                logger.error(f"[FAIL] Dolphin Anty local API error (HTTP {status_code})")
                 logger.error("💡 Please make sure Dolphin Anty application is running")
                 return False, None
         except requests.exceptions.RequestException as e:
@@ -872,7 +1240,13 @@ class DolphinAnty:
         # Step 3: Start the profile directly (no Remote API validation to avoid 403 errors)
         logger.info(f"[RETRY] [Step 2/3] Sending request to start profile {profile_id}")
         try:
-            resp = requests.get(url, params=params, headers=headers, timeout=30)
+            resp = self._session.get(url, params=params, headers=headers, timeout=30)
+            if resp.status_code == 401:
+                # Cached login expired (e.g. Dolphin restarted): log in again and retry once
+                logger.warning("[WARN] Local API returned 401, re-authenticating")
+                self.invalidate_auth()
+                if self._local_login() == 200:
+                    resp = self._session.get(url, params=params, headers=headers, timeout=30)
             
             if resp.status_code == 200:
                 try:
@@ -907,6 +1281,8 @@ class DolphinAnty:
             logger.error("💡 Profile may be taking too long to start, try again later")
             return False, None
         except requests.exceptions.ConnectionError as e:
+            # Dolphin may have been restarted: check the login again next time
+            self.invalidate_auth()
             logger.error(f"[FAIL] Connection error starting profile {profile_id}: {e}")
             logger.error("💡 Make sure Dolphin Anty application is running")
             return False, None
@@ -929,7 +1305,7 @@ class DolphinAnty:
             url = f"{self.local_api_base}/browser_profiles/{profile_id}/stop"
             headers = {"Authorization": f"Bearer {self.api_key}"}
             
-            response = requests.get(url, headers=headers, timeout=10)
+            response = self._session.get(url, headers=headers, timeout=10)
             
             if response.status_code == 200:
                 try:
@@ -1048,6 +1424,9 @@ class DolphinAnty:
             logger.error("[FAIL] No API token provided for local API authentication")
             return False, "No API token provided"
             
+        if self._local_logged_in:
+            return True, None
+        
         endpoint = f"{self.local_api_base}/auth/login-with-token"
         headers = {"Content-Type": "application/json"}
         data = {"token": self.api_key}
@@ -1057,7 +1436,7 @@ class DolphinAnty:
             
             # Сначала проверяем, что сервер вообще отвечает
             try:
-                response = requests.get(
+                response = self._session.get(
                     f"{self.local_api_base}/status", 
                     timeout=5
                 )
@@ -1073,13 +1452,14 @@ class DolphinAnty:
             
             # Пробуем авторизоваться
             try:
-                response = requests.post(endpoint, json=data, headers=headers, timeout=10)
+                response = self._session.post(endpoint, json=data, headers=headers, timeout=10)
                 
                 if response.status_code == 200:
                     # Проверяем ответ на успешность
                     try:
                         resp_data = response.json()
                         if resp_data.get("success") or resp_data.get("status") == "ok":
+                            self._local_logged_in = True
                             logger.info("[OK] Successfully authenticated with local Dolphin API")
                             return True, None
                         else:
@@ -2263,10 +2643,12 @@ class DolphinAnty:
         # Этот метод больше не используется, так как логика перенесена в изолированный subprocess
         return {"success": False, "error": "This method is deprecated, use run_cookie_robot_sync instead"}
 
-    def check_dolphin_status(self) -> Dict[str, Any]:
+    def check_dolphin_status(self, force: bool = False) -> Dict[str, Any]:
         """
         Check if Dolphin Anty application is running and responsive
         Returns status information
+
+        Uses the cached token login unless force=True (live check)
         """
         status = {
             "app_running": False,
@@ -2279,26 +2661,20 @@ class DolphinAnty:
             # Check if local API is responding by trying to authenticate
             logger.info("[SEARCH] Checking Dolphin Anty application status...")
             
-            auth_data = {"token": self.api_key}
-            response = requests.post(
-                f"{self.local_api_base}/auth/login-with-token",
-                headers={"Content-Type": "application/json"},
-                json=auth_data,
-                timeout=5
-            )
+            status_code = self._local_login(force=force)
             
-            if response.status_code == 200:
+            if status_code == 200:
                 status["app_running"] = True
                 status["local_api_available"] = True
                 status["authenticated"] = True
                 logger.info("[OK] Dolphin Anty application is running and responsive")
-            elif response.status_code == 401:
+            elif status_code == 401:
                 status["app_running"] = True
                 status["local_api_available"] = True
                 status["authenticated"] = False
                 status["error"] = "Invalid API token"
                 logger.error("[FAIL] Dolphin Anty is running but API token is invalid")
-            elif response.status_code == 404:
+            elif status_code == 404:
                 status["app_running"] = True
                 status["local_api_available"] = False
                 status["error"] = "API endpoint not found - check Dolphin version"
@@ -2306,8 +2682,8 @@ class DolphinAnty:
             else:
                 status["app_running"] = True
                 status["local_api_available"] = False
-                status["error"] = f"Unexpected HTTP {response.status_code}"
-                logger.error(f"[FAIL] Dolphin Anty API returned HTTP {response.status_code}")
+                status["error"] = f"Unexpected HTTP {status_code}"
+                logger.error(f"[FAIL] Dolphin Anty API returned HTTP {status_code}")
                 
         except requests.exceptions.ConnectionError:
             status["error"] = "Connection refused - Dolphin Anty not running"
@@ -2447,6 +2823,18 @@ class DolphinAnty:
         except Exception:
             return None
 
+    @staticmethod
+    def _resolve_host(host: str) -> Optional[str]:
+        """IP of a proxy host (the host itself if it is already an IP)"""
+        try:
+            ipaddress.ip_address(host)
+            return host
+        except ValueError:
+            try:
+                return socket.gethostbyname(host)
+            except Exception:
+                return None
+
     def _geoip_lookup(self, proxy: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Resolve proxy host to public geo-IP info. Returns dict with keys:
         country_code, region, city, latitude, longitude, timezone, ip.
@@ -2460,23 +2848,14 @@ class DolphinAnty:
                 return self._geoip_cache[host]
 
             # Resolve host to IP if hostname
-            ip_str = None
-            try:
-                ipaddress.ip_address(host)
-                ip_str = host
-            except ValueError:
-                try:
-                    ip_str = socket.gethostbyname(host)
-                except Exception:
-                    ip_str = None
-
+            ip_str = self._resolve_host(host)
             if not ip_str:
                 return None
 
             # Try ipapi.co
             info = None
             try:
-                r = requests.get(f"https://ipapi.co/{ip_str}/json/", timeout=5)
+                r = self._session.get(f"https://ipapi.co/{ip_str}/json/", timeout=5)
                 if r.status_code == 200:
                     j = r.json()
                     info = {
@@ -2494,7 +2873,7 @@ class DolphinAnty:
             # Fallback ipwho.is
             if not info:
                 try:
-                    r = requests.get(f"https://ipwho.is/{ip_str}", timeout=5)
+                    r = self._session.get(f"https://ipwho.is/{ip_str}", timeout=5)
                     if r.status_code == 200:
                         j = r.json()
                         if j.get("success"):
@@ -2547,7 +2926,7 @@ class DolphinAnty:
             headers = {"Content-Type": "application/json"}
             if token:
                 headers["Authorization"] = f"Bearer {token}"
-            res = requests.request("GET", url, headers=headers, timeout=timeout_seconds)
+            res = self._session.request("GET", url, headers=headers, timeout=timeout_seconds)
             res.raise_for_status()
             payload = res.json()
             if isinstance(payload, dict) and "data" in payload:
@@ -2601,7 +2980,7 @@ class DolphinAnty:
         # Try GET first
         try:
             url = f"{self.local_api_base}/cookies/export"
-            resp = requests.get(url, headers=headers, params={"profileId": profile_id}, timeout=timeout_seconds)
+            resp = self._session.get(url, headers=headers, params={"profileId": profile_id}, timeout=timeout_seconds)
             resp.raise_for_status()
             data = resp.json()
             if isinstance(data, dict) and "data" in data:
@@ -2627,7 +3006,7 @@ class DolphinAnty:
             local_password = os.environ.get("DOLPHIN_LOCAL_PASSWORD") or os.environ.get("LOCAL_API_PASSWORD")
             if local_login and local_password:
                 body.update({"login": local_login, "password": local_password})
-            resp = requests.post(url, headers=headers_post, json=body, timeout=timeout_seconds)
+            resp = self._session.post(url, headers=headers_post, json=body, timeout=timeout_seconds)
             resp.raise_for_status()
             data = resp.json()
             if isinstance(data, dict) and "data" in data:
@@ -2673,7 +3052,7 @@ class DolphinAnty:
         }
         try:
             logger.info(f"[TOOL] Importing {len(cookies or [])} cookies to profile {profile_id} via Local API")
-            resp = requests.post(url, headers=headers, json=payload, timeout=timeout_seconds)
+            resp = self._session.post(url, headers=headers, json=payload, timeout=timeout_seconds)
             if resp.status_code == 200:
                 try:
                     data = resp.json()
@@ -2692,7 +3071,7 @@ class DolphinAnty:
             body["Authorization"] = f"Bearer {self.api_key}"
             if local_login and local_password:
                 body.update({"login": local_login, "password": local_password})
-            resp_fb = requests.post(url, headers=headers_fallback, json=body, timeout=timeout_seconds)
+            resp_fb = self._session.post(url, headers=headers_fallback, json=body, timeout=timeout_seconds)
             if resp_fb.status_code == 200:
                 try:
                     data = resp_fb.json()
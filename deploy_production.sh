@@ -286,6 +286,12 @@ start_services() {
         exit 1
     fi
     
+    # Start remote task sync loop (status/progress of tasks on TikTok servers)
+    log_info "Starting remote task sync..."
+    nohup python manage.py sync_server_tasks \
+        > "$LOG_DIR/task_sync.log" 2>&1 &
+    echo $! > "$PID_DIR/task_sync.pid"
+    
     # Start Worker services
     for ((i=1; i<=WORKERS_COUNT; i++)); do
         worker_port=$((WORKER_BASE_PORT + i - 1))
@@ -355,6 +361,16 @@ stop_services() {
         fi
     done
     
+    # Stop remote task sync
+    if [ -f "$PID_DIR/task_sync.pid" ]; then
+        pid=$(cat "$PID_DIR/task_sync.pid")
+        if kill -0 "$pid" 2>/dev/null; then
+            log_info "Stopping remote task sync (PID: $pid)..."
+            kill -TERM "$pid"
+        fi
+        rm -f "$PID_DIR/task_sync.pid"
+    fi
+    
     # Stop Web UI
     if [ -f "$PID_DIR/web_ui.pid" ]; then
         pid=$(cat "$PID_DIR/web_ui.pid")
@@ -393,6 +409,13 @@ check_status() {
         log_warn "Web UI: NOT RUNNING ✗"
     fi
     
+    # Check remote task sync
+    if [ -f "$PID_DIR/task_sync.pid" ] && kill -0 "$(cat "$PID_DIR/task_sync.pid")" 2>/dev/null; then
+        log_info "Task sync: RUNNING ✓"
+    else
+        log_warn "Task sync: NOT RUNNING ✗"
+    fi
+    
     # Check workers
     for ((i=1; i<=WORKERS_COUNT; i++)); do
         worker_port=$((WORKER_BASE_PORT + i - 1))
@@ -126,6 +126,35 @@ else:
 # Cookie Robot concurrency limit (global), default 5
 COOKIE_ROBOT_CONCURRENCY = int(os.environ.get('COOKIE_ROBOT_CONCURRENCY', '5'))
 
+# Background task execution (see uploader/job_queue.py):
+# 'thread' runs bulk/warmup/login tasks inside the web process (default),
+# 'db' queues them as BackgroundJob rows executed by `python manage.py run_task_worker`
+TASK_QUEUE_BACKEND = os.environ.get('TASK_QUEUE_BACKEND', 'thread').lower()
+TASK_QUEUE_MAX_ATTEMPTS = int(os.environ.get('TASK_QUEUE_MAX_ATTEMPTS', '1'))
+TASK_QUEUE_STALE_AFTER_SEC = int(os.environ.get('TASK_QUEUE_STALE_AFTER_SEC', '300'))
+
+# Append-only task logs (see uploader/task_log_store.py): lines are buffered and
+# written with bulk_create every TASK_LOG_BATCH_SIZE lines or TASK_LOG_FLUSH_INTERVAL_SEC
+TASK_LOG_BATCH_SIZE = int(os.environ.get('TASK_LOG_BATCH_SIZE', '50'))
+TASK_LOG_FLUSH_INTERVAL_SEC = float(os.environ.get('TASK_LOG_FLUSH_INTERVAL_SEC', '1.0'))
+TASK_LOG_RENDER_LIMIT = int(os.environ.get('TASK_LOG_RENDER_LIMIT', '2000'))
+
+# Cache
+# Live task logs and run flags are kept in the cache. Worker processes only share them
+# with the web UI through a shared backend, so set REDIS_URL when TASK_QUEUE_BACKEND=db.
+REDIS_URL = os.environ.get('REDIS_URL', '')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+
+# Live web logs (see uploader/log_sink.py): 'auto' uses Redis lists when REDIS_URL is set,
+# otherwise an in-process ring buffer; 'redis' / 'memory' force a backend
+LOG_SINK_BACKEND = os.environ.get('LOG_SINK_BACKEND', 'auto').lower()
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -23,6 +23,7 @@ from uploader.async_bulk_tasks import (
     set_async_config, get_async_config, test_async_performance,
     monitor_async_task_health, AsyncConfig
 )
+from uploader.async_impl.playwright_runtime import shutdown_playwright_runtime
 from django.utils import timezone
 
 # Load environment variables
@@ -82,6 +83,8 @@ def print_async_config():
     
     print(f"{Colors.BOLD}Current Async Configuration:{Colors.END}")
     print(f"  Max Concurrent Accounts: {Colors.colorize(str(config['max_concurrent_accounts']), Colors.CYAN)}")
+    print(f"  Adaptive Concurrency: {Colors.colorize(str(config['adaptive_concurrency']), Colors.CYAN)} "
+          f"({config['adaptive_min_accounts']}-{config['adaptive_max_accounts']} accounts)")
     print(f"  Max Concurrent Videos: {Colors.colorize(str(config['max_concurrent_videos']), Colors.CYAN)}")
     print(f"  Account Delay Min: {Colors.colorize(str(config['account_delay_min']), Colors.CYAN)}s")
     print(f"  Account Delay Max: {Colors.colorize(str(config['account_delay_max']), Colors.CYAN)}s")
@@ -293,8 +296,8 @@ async def run_async_task_with_monitoring(task_id):
     
     # Update task status
     task.status = 'RUNNING'
-    task.log += f"[{timezone.now().strftime('%Y-%m-%d %H:%M:%S')}] Task started via CLI tool (ASYNC mode)\n"
-    task.save()
+    task.save(update_fields=['status', 'updated_at'])
+    task.append_log(f"[{timezone.now().strftime('%Y-%m-%d %H:%M:%S')}] Task started via CLI tool (ASYNC mode)\n")
     
     print_separator("ASYNC EXECUTION STARTING")
     print(f"{Colors.BOLD}{Colors.YELLOW}ВАЖНО: Браузеры будут запускаться ПАРАЛЛЕЛЬНО{Colors.END}")
@@ -348,6 +351,9 @@ async def run_async_task_with_monitoring(task_id):
         print(f"{Colors.RED}Error: {str(e)}{Colors.END}")
         print(f"{Colors.BOLD}Execution Time:{Colors.END} {Colors.colorize(f'{execution_time:.2f}s', Colors.CYAN)}")
         return False
+    finally:
+        # Останавливаем общий Playwright-драйвер (один на все аккаунты) до закрытия loop
+        await shutdown_playwright_runtime()
 
 def list_clients():
     """List available clients with account counts"""
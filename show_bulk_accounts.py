@@ -12,7 +12,7 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'instagram_uploader.settings')
 django.setup()
 
 from uploader.models import BulkUploadTask, BulkUploadAccount
-from django.core.cache import cache
+from uploader.log_sink import read_log_entries
 
 def show_task_accounts(task_id):
     """Показать все аккаунты в задаче"""
@@ -49,8 +49,7 @@ def show_task_accounts(task_id):
                 print(f"    🌐 Прокси: Не назначен")
             
             # Показываем логи аккаунта
-            cache_key = f"task_logs_{task_id}_account_{account_task.id}"
-            account_logs = cache.get(cache_key, [])
+            account_logs, _ = read_log_entries(f"task_logs_{task_id}_account_{account_task.id}")
             
             if account_logs:
                 print(f"    [TEXT] Логи в кэше: {len(account_logs)} записей")
@@ -194,6 +194,10 @@ echo.
 echo %CYAN%Для остановки сервера нажмите Ctrl+C%RESET%
 echo.
 
+:: Фоновая синхронизация статусов задач на TikTok серверах (отдельное окно)
+echo %CYAN%Запуск синхронизации задач серверов...%RESET%
+start "TikTok task sync" /MIN python manage.py sync_server_tasks
+
 :: Запуск Django сервера
 python manage.py runserver 0.0.0.0:8000
 
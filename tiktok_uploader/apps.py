@@ -14,6 +14,13 @@ class TiktokUploaderConfig(AppConfig):
         """
         # Import signals if needed
         # import tiktok_uploader.signals
-        pass
+        # Снимок серверов для servers_context сбрасывается при изменении TikTokServer
+        from .services.server_snapshot import connect_servers_snapshot_invalidation
+        connect_servers_snapshot_invalidation()
+        # Удаленная ServerTask освобождает занятый слот сервера
+        from .services.server_api_client import connect_server_slot_cleanup, connect_server_session_cleanup
+        connect_server_slot_cleanup()
+        # Общая keep-alive сессия удаленного сервера закрывается
+        connect_server_session_cleanup()
 
 
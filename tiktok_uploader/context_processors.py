@@ -5,15 +5,16 @@ Context Processors for TikTok Uploader
 Глобальные контекстные процессоры для всех шаблонов.
 """
 
-from tiktok_uploader.models import TikTokServer
+from tiktok_uploader.services.server_snapshot import get_servers_snapshot
 
 
 def servers_context(request):
     """
     Добавляет список серверов в контекст всех шаблонов.
+    Список берется из снимка (см. services/server_snapshot.py), а не из БД.
     """
     if request.user.is_authenticated:
-        servers = TikTokServer.objects.filter(is_active=True).order_by('priority', 'name')
+        servers = get_servers_snapshot()
         selected_server_id = request.session.get('selected_server_id')
         
         return {
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+import signal
+import threading
+
+from tiktok_uploader.services.server_api_client import PING_ALL_DEADLINE_SEC, ServerManager
+
+
+class Command(BaseCommand):
+    help = 'Проверяет доступность всех активных TikTok серверов (однократно или периодически с --interval)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=0, help='Повторять проверку каждые N секунд (0 - один раз)')
+        parser.add_argument('--deadline', type=float, default=PING_ALL_DEADLINE_SEC, help='Общий дедлайн одной проверки в секундах')
+
+    def handle(self, *args, **options):
+        interval = max(0.0, float(options['interval']))
+        deadline = max(1.0, float(options['deadline']))
+        stop_event = threading.Event()
+        signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+
+        while not stop_event.is_set():
+            close_old_connections()
+            try:
+                results = ServerManager.ping_all_servers(deadline=deadline)
+                online = sum(1 for r in results if r['is_online'])
+                self.stdout.write(f'Pinged {len(results)} servers: {online} online, {len(results) - online} offline')
+            except Exception as e:
+                self.stderr.write(f'Ping all servers failed: {e}')
+            if not interval:
+                break
+            stop_event.wait(interval)
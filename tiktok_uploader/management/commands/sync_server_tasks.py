@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+import signal
+import threading
+
+from tiktok_uploader.services.task_sync import TASK_SYNC_FAST_SEC, TASK_SYNC_MAX_SEC, RemoteTaskSyncer
+
+
+class Command(BaseCommand):
+    help = 'Синхронизирует статус и прогресс незавершенных задач на TikTok серверах (однократно с --once)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Опросить все активные задачи один раз и выйти')
+        parser.add_argument('--fast-interval', type=float, default=TASK_SYNC_FAST_SEC, help='Интервал опроса меняющихся задач в секундах')
+        parser.add_argument('--max-interval', type=float, default=TASK_SYNC_MAX_SEC, help='Максимальный интервал опроса неизменных задач в секундах')
+
+    def handle(self, *args, **options):
+        syncer = RemoteTaskSyncer(fast_interval=options['fast_interval'], max_interval=options['max_interval'])
+
+        if options['once']:
+            stats = syncer.run_once()
+            self.stdout.write(f"Polled {stats['polled']} tasks: {stats['changed']} changed, {stats['failed']} failed")
+            return
+
+        stop_event = threading.Event()
+        signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+        try:
+            syncer.run_forever(stop_event)
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.5 on 2026-10-18 07:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tiktok_uploader', '0007_accounttag'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='servertask',
+            name='holds_slot',
+            field=models.BooleanField(default=False, help_text='Задача занимает слот сервера (учтена в TikTokServer.active_tasks)'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.5 on 2026-10-18 09:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tiktok_uploader', '0008_servertask_holds_slot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='servertask',
+            name='remote_revision',
+            field=models.CharField(blank=True, default='', help_text='Последняя известная ревизия состояния задачи на сервере', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='servertask',
+            name='remote_state',
+            field=models.JSONField(blank=True, default=dict, help_text='Последнее состояние задачи с сервера (прогресс, аккаунты, позиция в очереди)'),
+        ),
+        migrations.AddField(
+            model_name='servertask',
+            name='last_synced_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.5 on 2026-10-18 10:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tiktok_uploader', '0009_servertask_remote_sync'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='serveraccount',
+            name='lease_id',
+            field=models.CharField(blank=True, db_index=True, default='', help_text='ID аренды, выданной при резервировании', max_length=36),
+        ),
+        migrations.AddField(
+            model_name='serveraccount',
+            name='lease_expires_at',
+            field=models.DateTimeField(blank=True, db_index=True, help_text='Когда истекает аренда аккаунта сервером', null=True),
+        ),
+    ]
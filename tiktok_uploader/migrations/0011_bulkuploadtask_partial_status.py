@@ -0,0 +1,18 @@
+# Generated by Django 5.1.5 on 2026-10-18 10:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tiktok_uploader', '0010_serveraccount_lease'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='bulkuploadtask',
+            name='status',
+            field=models.CharField(choices=[('PENDING', 'Pending'), ('RUNNING', 'Running'), ('COMPLETED', 'Completed'), ('PARTIALLY_COMPLETED', 'Partially completed'), ('FAILED', 'Failed'), ('PAUSED', 'Paused')], default='PENDING', max_length=20),
+        ),
+    ]
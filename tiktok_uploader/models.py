@@ -374,8 +374,10 @@ class BulkUploadTask(models.Model):
         ('PENDING', 'Pending'),
         ('RUNNING', 'Running'),
         ('COMPLETED', 'Completed'),
+        ('PARTIALLY_COMPLETED', 'Partially completed'),  # Часть шардов на серверах не завершилась
         ('FAILED', 'Failed'),
         ('PAUSED', 'Paused'),
+        ('CANCELLED', 'Cancelled'),  # Шарды на серверах остановлены
     ]
     
     name = models.CharField(max_length=200, help_text="Название задачи")
@@ -1087,6 +1089,21 @@ class ServerAccount(models.Model):
         help_text="Когда аккаунт последний раз использовался на сервере"
     )
     
+    # Аренда (lease): после истечения аккаунт может забрать другой сервер
+    lease_id = models.CharField(
+        max_length=36,
+        blank=True,
+        default="",
+        db_index=True,
+        help_text="ID аренды, выданной при резервировании"
+    )
+    lease_expires_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        db_index=True,
+        help_text="Когда истекает аренда аккаунта сервером"
+    )
+    
     # Данные с сервера
     dolphin_profile_id_on_server = models.CharField(
         max_length=100,
@@ -1240,6 +1257,24 @@ class ServerTask(models.Model):
         blank=True,
         help_text="ID задачи на удаленном сервере"
     )
+    holds_slot = models.BooleanField(
+        default=False,
+        help_text="Задача занимает слот сервера (учтена в TikTokServer.active_tasks)"
+    )
+    
+    # Синхронизация с сервером (фоновый цикл sync_server_tasks)
+    remote_revision = models.CharField(
+        max_length=100,
+        blank=True,
+        default="",
+        help_text="Последняя известная ревизия состояния задачи на сервере"
+    )
+    remote_state = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Последнее состояние задачи с сервера (прогресс, аккаунты, позиция в очереди)"
+    )
+    last_synced_at = models.DateTimeField(null=True, blank=True)
     
     # Временные метки
     created_at = models.DateTimeField(auto_now_add=True)
@@ -1261,7 +1296,22 @@ class ServerTask(models.Model):
     
     def __str__(self):
         return f"{self.name} on {self.server.name} ({self.status})"
-    
+
+    def save(self, *args, **kwargs):
+        """Полное сохранение существующей задачи не трогает holds_slot.
+
+        Флаг меняют только reserve_slot()/release_slot() атомарным update();
+        устаревший holds_slot=True из памяти не должен перезаписать уже
+        освобожденный слот (иначе следующий release_slot() освободит его дважды).
+        """
+        if (kwargs.get('update_fields') is None and not args
+                and not self._state.adding and not kwargs.get('force_insert')):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'holds_slot'
+            ]
+        super().save(*args, **kwargs)
+
     def mark_as_started(self):
         """Отметить задачу как запущенную"""
         self.status = 'RUNNING'
@@ -1276,6 +1326,7 @@ class ServerTask(models.Model):
         if result:
             self.result = result
         self.save()
+        self.release_slot()
     
     def mark_as_failed(self, error_message):
         """Отметить задачу как неудачную"""
@@ -1283,6 +1334,27 @@ class ServerTask(models.Model):
         self.completed_at = timezone.now()
         self.error_message = error_message
         self.save()
+        self.release_slot()
+    
+    def reserve_slot(self):
+        """Занять слот на сервере задачи; False, если сервер заполнен"""
+        if self.holds_slot:
+            return True
+        from tiktok_uploader.services.server_api_client import ServerManager
+        if not ServerManager.reserve_slot(self.server_id):
+            return False
+        ServerTask.objects.filter(id=self.id).update(holds_slot=True)
+        self.holds_slot = True
+        return True
+    
+    def release_slot(self):
+        """Освободить слот сервера (ровно один раз, даже при гонке)"""
+        if not self.pk:
+            return
+        if ServerTask.objects.filter(id=self.pk, holds_slot=True).update(holds_slot=False):
+            from tiktok_uploader.services.server_api_client import ServerManager
+            ServerManager.release_slot(self.server_id)
+        self.holds_slot = False
     
     def update_progress(self, progress):
         """Обновить прогресс задачи"""
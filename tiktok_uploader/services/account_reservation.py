@@ -0,0 +1,152 @@
+"""
+Резервирование аккаунтов TikTok для серверов.
+
+Кандидаты выбираются одним упорядоченным запросом и блокируются
+``SELECT ... FOR UPDATE SKIP LOCKED``: серверы, резервирующие одновременно,
+получают непересекающиеся наборы и не ждут друг друга. Порядок выбора:
+
+1. аккаунты, уже закрепленные за этим сервером (профили Dolphin там есть);
+2. свободные аккаунты;
+3. аккаунты с других серверов, если их аренда истекла или они освобождены.
+
+Назначение записывается одним ``bulk_update`` и одним ``bulk_create``, так что
+число запросов не зависит от количества аккаунтов. Резервирование выдает
+аренду (lease) со сроком; после истечения аккаунт снова доступен остальным.
+"""
+
+import logging
+import os
+import uuid
+from datetime import timedelta
+from typing import Dict, List, Optional
+
+from django.db import transaction
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+ACCOUNT_LEASE_SEC = int(os.environ.get('TIKTOK_ACCOUNT_LEASE_SEC', '3600'))
+ACCOUNT_LEASE_MAX_SEC = int(os.environ.get('TIKTOK_ACCOUNT_LEASE_MAX_SEC', str(24 * 3600)))
+
+ASSIGNMENT_UPDATE_FIELDS = ['server', 'status', 'assigned_at', 'lease_id', 'lease_expires_at', 'updated_at']
+
+
+def _lease_duration(lease_seconds: Optional[int]) -> timedelta:
+    seconds = int(lease_seconds or ACCOUNT_LEASE_SEC)
+    return timedelta(seconds=min(max(60, seconds), ACCOUNT_LEASE_MAX_SEC))
+
+
+def reclaim_expired_leases() -> int:
+    """Освободить аккаунты с истекшей арендой; возвращает их число"""
+    from tiktok_uploader.models import ServerAccount
+    reclaimed = ServerAccount.objects.filter(lease_expires_at__lte=timezone.now()).update(
+        status='FREE', lease_id='', lease_expires_at=None, updated_at=timezone.now()
+    )
+    if reclaimed:
+        logger.info(f"Reclaimed {reclaimed} accounts with expired leases")
+    return reclaimed
+
+
+def reserve_accounts_for_server(
+    server,
+    client: str,
+    count: int,
+    tag: Optional[str] = None,
+    status_filter: str = 'ACTIVE',
+    lease_seconds: Optional[int] = None
+) -> Dict:
+    """
+    Зарезервировать до ``count`` аккаунтов клиента за сервером.
+
+    Returns:
+        Dict: {"accounts": [TikTokAccount], "assignments": {account_id: ServerAccount},
+               "lease": {"id", "expires_at"}}
+    """
+    from tiktok_uploader.models import ServerAccount, TikTokAccount
+
+    now = timezone.now()
+    lease_id = uuid.uuid4().hex
+    expires_at = now + _lease_duration(lease_seconds)
+
+    with transaction.atomic():
+        reclaim_expired_leases()
+
+        candidates = TikTokAccount.objects.filter(client__name=client, status=status_filter)
+        if tag:
+            candidates = candidates.filter(tag=tag)
+        accounts = list(
+            candidates
+            # Аккаунты под действующей арендой (любого сервера) не выдаются
+            .exclude(server_assignment__lease_expires_at__gt=now)
+            .annotate(reserve_priority=Case(
+                When(server_assignment__server=server, then=Value(0)),
+                When(Q(server_assignment__isnull=True) | Q(server_assignment__server__isnull=True), then=Value(1)),
+                default=Value(2),
+                output_field=IntegerField(),
+            ))
+            .select_related('proxy', 'current_proxy', 'client')
+            .order_by('reserve_priority', '-created_at')
+            .select_for_update(skip_locked=True, of=('self',))[:max(0, int(count))]
+        )
+
+        assignments = {
+            assignment.account_id: assignment
+            for assignment in ServerAccount.objects.filter(account_id__in=[account.id for account in accounts])
+        }
+        to_update: List = []
+        to_create: List = []
+        for account in accounts:
+            assignment = assignments.get(account.id)
+            if assignment is None:
+                assignment = assignments[account.id] = ServerAccount(account=account)
+                to_create.append(assignment)
+            else:
+                to_update.append(assignment)
+            assignment.server = server
+            assignment.status = 'ASSIGNED'
+            assignment.assigned_at = now
+            assignment.lease_id = lease_id
+            assignment.lease_expires_at = expires_at
+            assignment.updated_at = now
+
+        if to_update:
+            ServerAccount.objects.bulk_update(to_update, ASSIGNMENT_UPDATE_FIELDS, batch_size=500)
+        if to_create:
+            ServerAccount.objects.bulk_create(to_create, batch_size=500)
+
+    return {
+        'accounts': accounts,
+        'assignments': assignments,
+        'lease': {'id': lease_id, 'expires_at': expires_at},
+    }
+
+
+def renew_lease(server_id, lease_id: str, lease_seconds: Optional[int] = None) -> Dict:
+    """
+    Продлить аренду аккаунтов (для долгих задач).
+
+    Returns:
+        Dict: {"renewed": int, "expires_at": datetime}
+    """
+    from tiktok_uploader.models import ServerAccount
+
+    expires_at = timezone.now() + _lease_duration(lease_seconds)
+    renewed = ServerAccount.objects.filter(
+        server_id=server_id, lease_id=lease_id, lease_expires_at__gt=timezone.now()
+    ).update(lease_expires_at=expires_at, updated_at=timezone.now())
+    return {'renewed': renewed, 'expires_at': expires_at}
+
+
+def release_leased_accounts(server_id, usernames: Optional[List[str]] = None, lease_id: Optional[str] = None) -> int:
+    """Освободить аккаунты сервера (по username и/или по аренде); возвращает их число"""
+    from tiktok_uploader.models import ServerAccount
+
+    assignments = ServerAccount.objects.filter(server_id=server_id)
+    if usernames:
+        assignments = assignments.filter(account__username__in=usernames)
+    if lease_id:
+        assignments = assignments.filter(lease_id=lease_id)
+    now = timezone.now()
+    # Назначение на сервер сохраняется, освобождается только аренда
+    return assignments.update(status='FREE', last_used_at=now, lease_id='', lease_expires_at=None, updated_at=now)
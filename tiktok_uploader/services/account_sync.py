@@ -0,0 +1,171 @@
+"""
+Пакетная синхронизация данных аккаунтов с серверов (cookies, fingerprint,
+профиль Dolphin, статус).
+
+После прогона бустера сервер отправляет все обновления одним запросом —
+JSON массивом или NDJSON (по объекту на строку), при необходимости сжатым
+gzip. Обновления проверяются целиком, применяются ``bulk_update`` порциями в
+одной транзакции, а по каждому элементу возвращается отдельный результат.
+"""
+
+import gzip
+import io
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.db import transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+ACCOUNT_SYNC_CHUNK_SIZE = int(os.environ.get('TIKTOK_ACCOUNT_SYNC_CHUNK_SIZE', '200'))
+ACCOUNT_SYNC_MAX_BYTES = int(os.environ.get('TIKTOK_ACCOUNT_SYNC_MAX_MB', '200')) * 1024 * 1024
+
+ACCOUNT_FIELDS = ['dolphin_profile_id', 'status', 'last_used']
+ASSIGNMENT_FIELDS = ['dolphin_profile_id_on_server', 'cookies_from_server', 'fingerprint_from_server', 'last_sync_at', 'updated_at']
+
+
+def _decompress(body: bytes) -> bytes:
+    """Распаковать gzip с ограничением размера (защита от gzip-бомб)"""
+    with gzip.GzipFile(fileobj=io.BytesIO(body)) as f:
+        data = f.read(ACCOUNT_SYNC_MAX_BYTES + 1)
+    if len(data) > ACCOUNT_SYNC_MAX_BYTES:
+        raise ValueError(f'Decompressed payload exceeds {ACCOUNT_SYNC_MAX_BYTES} bytes')
+    return data
+
+
+def parse_sync_payload(body: bytes, content_type: str = '', content_encoding: str = '') -> Tuple[List[Any], Dict]:
+    """
+    Разобрать тело запроса пакетной синхронизации.
+
+    Поддерживаются JSON массив обновлений, объект {"server_id", "accounts": [...]}
+    и NDJSON (``application/x-ndjson``). Тело может быть сжато gzip.
+
+    Returns:
+        Tuple[List, Dict]: (элементы — dict или строка с ошибкой разбора строки NDJSON,
+                            общие параметры пакета)
+    """
+    if 'gzip' in (content_encoding or '').lower() or body[:2] == b'\x1f\x8b':
+        body = _decompress(body)
+    text = body.decode('utf-8')
+
+    content_type = (content_type or '').lower()
+    if 'ndjson' in content_type or 'jsonlines' in content_type or 'json-seq' in content_type:
+        items: List[Any] = []
+        for line_no, line in enumerate(text.splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                items.append(json.loads(line))
+            except ValueError as e:
+                items.append(f'Invalid JSON on line {line_no}: {e}')
+        return items, {}
+
+    data = json.loads(text)
+    if isinstance(data, list):
+        return data, {}
+    if isinstance(data, dict) and isinstance(data.get('accounts'), list):
+        return data['accounts'], {'server_id': data.get('server_id')}
+    return [data], {}
+
+
+def _validate_item(item: Any, valid_statuses) -> Optional[str]:
+    if isinstance(item, str):
+        return item
+    if not isinstance(item, dict):
+        return 'Item must be a JSON object'
+    if not item.get('username'):
+        return 'username is required'
+    if item.get('status') and item['status'] not in valid_statuses:
+        return f"Invalid status {item['status']!r}"
+    if item.get('cookies') is not None and not isinstance(item['cookies'], (list, dict)):
+        return 'cookies must be a list or an object'
+    if item.get('fingerprint') is not None and not isinstance(item['fingerprint'], dict):
+        return 'fingerprint must be an object'
+    return None
+
+
+def apply_account_updates(items: List[Any], server_id=None, chunk_size: int = ACCOUNT_SYNC_CHUNK_SIZE) -> List[Dict]:
+    """
+    Применить пакет обновлений аккаунтов.
+
+    Элементы с ошибками пропускаются, остальные записываются ``bulk_update`` в
+    одной транзакции. Повторы одного username применяются по порядку.
+
+    Returns:
+        List[Dict]: по элементу на обновление: {"index", "username", "success", "error"?, "assignment"?}
+    """
+    from tiktok_uploader.models import ServerAccount, TikTokAccount
+
+    valid_statuses = {choice for choice, _ in TikTokAccount.STATUS_CHOICES}
+    results: List[Dict] = []
+    valid: List[Tuple[int, Dict]] = []
+    for index, item in enumerate(items):
+        error = _validate_item(item, valid_statuses)
+        username = item.get('username') if isinstance(item, dict) else None
+        if error:
+            results.append({'index': index, 'username': username, 'success': False, 'error': error})
+        else:
+            results.append({'index': index, 'username': username, 'success': True})
+            valid.append((index, item))
+
+    if not valid:
+        return results
+
+    now = timezone.now()
+    usernames = list({item['username'] for _, item in valid})
+    chunk_size = max(1, chunk_size)
+
+    with transaction.atomic():
+        accounts: Dict[str, Any] = {}
+        for start in range(0, len(usernames), chunk_size):
+            chunk = usernames[start:start + chunk_size]
+            for account in TikTokAccount.objects.filter(username__in=chunk).select_for_update():
+                accounts[account.username] = account
+        assignments = {}
+        account_ids = [account.id for account in accounts.values()]
+        for start in range(0, len(account_ids), chunk_size):
+            for assignment in ServerAccount.objects.filter(account_id__in=account_ids[start:start + chunk_size]):
+                assignments[assignment.account_id] = assignment
+
+        touched_accounts: Dict[int, Any] = {}
+        touched_assignments: Dict[int, Any] = {}
+        for index, item in valid:
+            account = accounts.get(item['username'])
+            if account is None:
+                results[index].update(success=False, error=f"Account {item['username']} not found")
+                continue
+
+            if item.get('dolphin_profile_id'):
+                account.dolphin_profile_id = item['dolphin_profile_id']
+            if item.get('status'):
+                account.status = item['status']
+            account.last_used = now
+            touched_accounts[account.id] = account
+
+            assignment = assignments.get(account.id)
+            results[index]['assignment'] = assignment is not None
+            if assignment is None:
+                continue
+            if 'dolphin_profile_id' in item:
+                assignment.dolphin_profile_id_on_server = item['dolphin_profile_id']
+            if 'cookies' in item:
+                assignment.cookies_from_server = item['cookies']
+            if 'fingerprint' in item:
+                assignment.fingerprint_from_server = item['fingerprint']
+            assignment.last_sync_at = now
+            assignment.updated_at = now
+            touched_assignments[assignment.id] = assignment
+
+        if touched_accounts:
+            TikTokAccount.objects.bulk_update(list(touched_accounts.values()), ACCOUNT_FIELDS, batch_size=chunk_size)
+        if touched_assignments:
+            ServerAccount.objects.bulk_update(list(touched_assignments.values()), ASSIGNMENT_FIELDS, batch_size=chunk_size)
+
+    logger.info(
+        f"Batch synced {len(touched_accounts)} accounts ({len(touched_assignments)} server assignments) "
+        f"from server {server_id}, {sum(1 for r in results if not r['success'])} failed"
+    )
+    return results
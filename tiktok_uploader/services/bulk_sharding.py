@@ -0,0 +1,200 @@
+"""
+Разбиение одной удаленной задачи массовой загрузки на несколько серверов.
+
+Задача (BulkUploadTask) в режиме шардирования получает по одной ServerTask на
+сервер. Аккаунты распределяются сначала по серверам, где уже закреплены
+аккаунты клиента (ServerAccount, профили Dolphin там уже прогреты), остаток —
+пропорционально свободной емкости серверов. Видео делятся между шардами
+пропорционально числу аккаунтов. Статус и прогресс шардов сводятся обратно в
+родительскую задачу.
+"""
+
+import copy
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.db.models import Count
+from django.utils import timezone
+
+from tiktok_uploader.services.server_api_client import ServerManager
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_SHARD_STATUSES = ('PENDING', 'QUEUED', 'RUNNING')
+
+
+def get_account_affinity(servers, client_name: str, tag: Optional[str] = None) -> Dict[int, int]:
+    """
+    Сколько аккаунтов клиента (и тематики) уже закреплено за каждым сервером.
+
+    Returns:
+        Dict[int, int]: server_id -> количество аккаунтов
+    """
+    from tiktok_uploader.models import ServerAccount
+
+    qs = ServerAccount.objects.filter(
+        server_id__in=[s.id for s in servers],
+        status__in=['ASSIGNED', 'ACTIVE'],
+        account__client__name=client_name,
+    )
+    if tag:
+        qs = qs.filter(account__tag=tag)
+    return {row['server_id']: row['count'] for row in qs.values('server_id').annotate(count=Count('id'))}
+
+
+def plan_shards(accounts_count: int, client_name: str, tag: Optional[str] = None) -> List[Tuple[Any, int]]:
+    """
+    Распределить аккаунты задачи по доступным серверам.
+
+    Returns:
+        List[Tuple[TikTokServer, int]]: (сервер, количество аккаунтов), по убыванию доли
+    """
+    servers = list(ServerManager.get_available_servers())
+    if not servers or accounts_count <= 0:
+        return []
+
+    allocation: Dict[int, int] = {}
+    by_id = {s.id: s for s in servers}
+
+    # 1. Серверы, на которых уже есть аккаунты клиента — в пределах этих аккаунтов
+    affinity = get_account_affinity(servers, client_name, tag)
+    if affinity:
+        affine = []
+        for server_id, count in affinity.items():
+            # Копия: лимит аккаунтов на этом шаге — только закрепленные за сервером
+            server = copy.copy(by_id[server_id])
+            server.total_accounts = count
+            affine.append(server)
+        for server, count in ServerManager.allocate_by_capacity(accounts_count, affine):
+            allocation[server.id] = count
+
+    # 2. Остаток — пропорционально емкости всех серверов за вычетом уже распределенного на шаге 1
+    remaining = accounts_count - sum(allocation.values())
+    if remaining > 0:
+        rest = []
+        for server in servers:
+            taken = allocation.get(server.id, 0)
+            if taken and server.total_accounts:
+                if server.total_accounts <= taken:
+                    continue
+                server = copy.copy(server)
+                server.total_accounts -= taken
+            rest.append(server)
+        for server, count in ServerManager.allocate_by_capacity(remaining, rest):
+            allocation[server.id] = allocation.get(server.id, 0) + count
+
+    plan = [(by_id[server_id], count) for server_id, count in allocation.items() if count > 0]
+    plan.sort(key=lambda item: (-item[1], item[0].priority, item[0].name))
+    return plan
+
+
+def partition_videos(videos: List, weights: List[int]) -> List[List]:
+    """
+    Разделить видео между шардами пропорционально весам (числу аккаунтов).
+
+    Каждый шард получает хотя бы одно видео: если видео меньше, чем шардов,
+    они повторяются по кругу.
+    """
+    shards_count = len(weights)
+    if not shards_count:
+        return []
+    if not videos:
+        return [[] for _ in weights]
+    if len(videos) <= shards_count:
+        return [[videos[i % len(videos)]] for i in range(shards_count)]
+
+    total_weight = sum(max(1, w) for w in weights)
+    # Сначала по одному видео на шард, остальные — по весам (метод наибольшего остатка)
+    extra = len(videos) - shards_count
+    shares = [extra * max(1, w) / total_weight for w in weights]
+    counts = [1 + int(share) for share in shares]
+    leftover = len(videos) - sum(counts)
+    for index in sorted(range(shards_count), key=lambda i: shares[i] - int(shares[i]), reverse=True)[:leftover]:
+        counts[index] += 1
+
+    result = []
+    start = 0
+    for count in counts:
+        result.append(videos[start:start + count])
+        start += count
+    return result
+
+
+def summarize_shards(task) -> Dict:
+    """
+    Свести статус, прогресс и результаты ServerTask-шардов (только чтение).
+
+    Статус задачи: RUNNING, пока работает хоть один шард; COMPLETED, если
+    завершились все шарды; CANCELLED, если шарды только отменены или
+    завершены, но отменен хотя бы один; PARTIALLY_COMPLETED, если часть
+    шардов завершилась, а остальные упали; FAILED, если не завершился ни один.
+
+    Returns:
+        Dict: {"status", "progress", "shards", "result"}
+    """
+    shards = list(task.server_tasks.select_related('server').order_by('id'))
+    if not shards:
+        return {'status': task.status, 'progress': 0, 'shards': [], 'result': {}}
+
+    weights = [max(1, int((shard.parameters or {}).get('accounts_count') or 1)) for shard in shards]
+    progress = int(sum(shard.progress * w for shard, w in zip(shards, weights)) / sum(weights))
+
+    # Числовые поля результатов шардов суммируются
+    totals: Dict[str, Any] = {}
+    for shard in shards:
+        if isinstance(shard.result, dict):
+            for key, value in shard.result.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    totals[key] = totals.get(key, 0) + value
+
+    statuses = [shard.status for shard in shards]
+    if any(status in ('QUEUED', 'RUNNING') for status in statuses):
+        status = 'RUNNING'
+    elif all(status == 'PENDING' for status in statuses):
+        status = 'PENDING'
+    elif any(status in ACTIVE_SHARD_STATUSES for status in statuses):
+        status = 'RUNNING'
+    elif all(status == 'COMPLETED' for status in statuses):
+        status = 'COMPLETED'
+    elif all(status in ('COMPLETED', 'CANCELLED') for status in statuses):
+        status = 'CANCELLED'
+    elif 'COMPLETED' in statuses:
+        status = 'PARTIALLY_COMPLETED'
+    else:
+        status = 'FAILED'
+
+    return {
+        'status': status,
+        'progress': progress,
+        'shards': [
+            {
+                'server_task': shard,
+                'server': shard.server,
+                'accounts_count': weight,
+                'videos_count': len((shard.parameters or {}).get('video_ids') or []),
+            }
+            for shard, weight in zip(shards, weights)
+        ],
+        'result': totals,
+    }
+
+
+def aggregate_shards(task) -> Dict:
+    """
+    Записать сводку шардов в родительскую задачу.
+
+    Вызывается там, где меняются сами шарды (синхронизация статусов с серверов),
+    а не из GET-представлений: те показывают ``summarize_shards``.
+    """
+    summary = summarize_shards(task)
+    status = summary['status']
+    update_fields = []
+    if task.status != status:
+        task.status = status
+        update_fields.append('status')
+        if status in ('COMPLETED', 'PARTIALLY_COMPLETED', 'FAILED', 'CANCELLED') and not task.completed_at:
+            task.completed_at = timezone.now()
+            update_fields.append('completed_at')
+    if update_fields:
+        task.save(update_fields=update_fields + ['updated_at'])
+    return summary
@@ -0,0 +1,207 @@
+"""
+Фоновая валидация прокси TikTok.
+
+``validate_all_proxies`` проверял все прокси прямо в HTTP запросе пулом из 5
+потоков и сохранял каждый прокси отдельно. Теперь запрос только запускает
+задачу и сразу возвращается:
+
+- проверка ставится в общую очередь фоновых задач (``uploader.job_queue``,
+  вид ``tiktok_proxy_validation``) и идет общим движком
+  ``uploader.proxy_validation_engine`` (asyncio, HTTP и SOCKS5, одновременно до
+  ``PROXY_VALIDATION_CONCURRENCY`` прокси, геолокация из общего кэша);
+- результаты пишутся ``bulk_update`` порциями по ``PROXY_VALIDATION_CHUNK_SIZE``;
+- прогресс хранится в Django cache и отдается эндпоинтом
+  ``proxy_validation_status``.
+"""
+
+import asyncio
+import logging
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from uploader.proxy_validation_engine import ProxySpec, ProxyValidationEngine, parse_ip
+
+logger = logging.getLogger(__name__)
+
+PROXY_VALIDATION_CONCURRENCY = int(os.environ.get('TIKTOK_PROXY_VALIDATION_CONCURRENCY', '200'))
+PROXY_VALIDATION_TIMEOUT_SEC = float(os.environ.get('TIKTOK_PROXY_VALIDATION_TIMEOUT_SEC', '10'))
+PROXY_VALIDATION_CHUNK_SIZE = int(os.environ.get('TIKTOK_PROXY_VALIDATION_CHUNK_SIZE', '200'))
+PROXY_VALIDATION_JOB_TTL_SEC = 24 * 3600
+# Задача без обновления прогресса дольше этого считается прерванной (перезапуск процесса)
+PROXY_VALIDATION_STALE_SEC = 120
+
+JOB_CACHE_PREFIX = 'tiktok_proxy_validation'
+CURRENT_JOB_CACHE_KEY = f'{JOB_CACHE_PREFIX}:current'
+
+PROXY_RESULT_FIELDS = ['status', 'is_active', 'last_checked', 'last_verified', 'country', 'city', 'external_ip', 'updated_at']
+
+
+def _job_key(job_id: str) -> str:
+    return f'{JOB_CACHE_PREFIX}:{job_id}'
+
+
+def get_validation_job(job_id: str) -> Optional[Dict]:
+    """Состояние задачи валидации (None, если не найдена)"""
+    return cache.get(_job_key(job_id))
+
+
+def get_current_validation_job() -> Optional[Dict]:
+    """Последняя запущенная задача валидации"""
+    job_id = cache.get(CURRENT_JOB_CACHE_KEY)
+    return get_validation_job(job_id) if job_id else None
+
+
+def _save_job(job: Dict) -> None:
+    job['heartbeat'] = time.time()
+    cache.set(_job_key(job['id']), dict(job), PROXY_VALIDATION_JOB_TTL_SEC)
+
+
+def apply_validation_result(proxy, is_valid: bool, geo_info: Optional[Dict], now) -> None:
+    """Записать результат проверки в объект прокси (без сохранения)"""
+    proxy.last_checked = now
+    proxy.updated_at = now
+    proxy.status = 'active' if is_valid else 'inactive'
+    proxy.is_active = is_valid
+    if is_valid:
+        proxy.last_verified = now
+        if geo_info:
+            if geo_info.get('country'):
+                proxy.country = geo_info['country']
+            if geo_info.get('city'):
+                proxy.city = geo_info['city']
+            if parse_ip(geo_info.get('external_ip')):
+                proxy.external_ip = geo_info['external_ip']
+
+
+class ProxyValidationJob:
+    """Одна фоновая проверка набора прокси с прогрессом в кэше"""
+
+    def __init__(self, proxy_ids: Optional[List[int]] = None, concurrency: int = PROXY_VALIDATION_CONCURRENCY,
+                 timeout: float = PROXY_VALIDATION_TIMEOUT_SEC, chunk_size: int = PROXY_VALIDATION_CHUNK_SIZE,
+                 job_id: Optional[str] = None):
+        self.proxy_ids = [int(pid) for pid in proxy_ids] if proxy_ids else None
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self.chunk_size = max(1, chunk_size)
+        self.state = {
+            'id': job_id or uuid.uuid4().hex,
+            'status': 'running',
+            'total': 0,
+            'checked': 0,
+            'active': 0,
+            'inactive': 0,
+            'errors': 0,
+            'started_at': timezone.now().isoformat(),
+            'finished_at': None,
+            'error': '',
+        }
+        self._pending: List = []
+        self._last_progress_save = 0.0
+        # Все записи в БД — из одного потока (одно соединение)
+        self._db_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='proxy-validation-db')
+
+    @property
+    def id(self) -> str:
+        return self.state['id']
+
+    def start(self) -> str:
+        from uploader.job_queue import dispatch_job
+        _save_job(self.state)
+        cache.set(CURRENT_JOB_CACHE_KEY, self.id, PROXY_VALIDATION_JOB_TTL_SEC)
+        dispatch_job('tiktok_proxy_validation', job_id=self.id, proxy_ids=self.proxy_ids)
+        return self.id
+
+    def run(self) -> None:
+        from django.db import connections
+        try:
+            proxies = self._db_executor.submit(self._load_proxies).result()
+            self.state['total'] = len(proxies)
+            _save_job(self.state)
+            asyncio.run(self._validate_all(proxies))
+            batch, self._pending = self._pending, []
+            self._db_executor.submit(self._flush, batch).result()
+            self.state['status'] = 'completed'
+        except Exception as e:
+            logger.error(f"Proxy validation job {self.id} failed: {e}", exc_info=True)
+            self.state['status'] = 'failed'
+            self.state['error'] = str(e)
+        finally:
+            self.state['finished_at'] = timezone.now().isoformat()
+            _save_job(self.state)
+            self._db_executor.submit(connections.close_all).result()
+            self._db_executor.shutdown(wait=True)
+            logger.info(
+                f"Proxy validation job {self.id} {self.state['status']}: checked {self.state['checked']}/{self.state['total']}, "
+                f"active {self.state['active']}, inactive {self.state['inactive']}, errors {self.state['errors']}"
+            )
+
+    def _load_proxies(self) -> List:
+        from tiktok_uploader.models import TikTokProxy
+        proxies = TikTokProxy.objects.all()
+        if self.proxy_ids is not None:
+            proxies = proxies.filter(id__in=self.proxy_ids)
+        return list(proxies)
+
+    def _flush(self, batch: List) -> None:
+        from tiktok_uploader.models import TikTokProxy
+        if batch:
+            TikTokProxy.objects.bulk_update(batch, PROXY_RESULT_FIELDS, batch_size=self.chunk_size)
+
+    async def _validate_all(self, proxies: List) -> None:
+        loop = asyncio.get_running_loop()
+        engine = ProxyValidationEngine(concurrency=self.concurrency, timeout=self.timeout)
+
+        async def _on_result(index: int, result) -> None:
+            proxy = proxies[index]
+            if result.error:
+                logger.warning(f"Error validating proxy {proxy.host}:{proxy.port}: {result.message}")
+                self.state['errors'] += 1
+                self.state['checked'] += 1
+                return
+            apply_validation_result(proxy, result.is_valid, result.geo_info('name'), timezone.now())
+            self.state['active' if result.is_valid else 'inactive'] += 1
+            self.state['checked'] += 1
+            self._pending.append(proxy)
+            if len(self._pending) >= self.chunk_size:
+                batch, self._pending = self._pending, []
+                await loop.run_in_executor(self._db_executor, self._flush, batch)
+            if time.monotonic() - self._last_progress_save >= 0.5:
+                self._last_progress_save = time.monotonic()
+                _save_job(self.state)
+
+        await engine.validate_many([ProxySpec.from_model(proxy) for proxy in proxies], on_result=_on_result)
+        geo = engine.geo_stats
+        if geo:
+            logger.info(
+                f"Proxy validation job {self.id} geo lookups: {geo['memory'] + geo['db']} cached, "
+                f"{geo['fetched']} fetched, {geo['failed']} failed"
+            )
+
+
+def run_proxy_validation_job(job_id: str, proxy_ids: Optional[List[int]] = None) -> None:
+    """Обработчик очереди фоновых задач: выполнить задачу, созданную ``ProxyValidationJob.start``"""
+    job = ProxyValidationJob(proxy_ids, job_id=job_id)
+    queued = get_validation_job(job_id)
+    if queued and queued.get('started_at'):
+        job.state['started_at'] = queued['started_at']
+    job.run()
+
+
+def start_proxy_validation(proxy_ids: Optional[List[int]] = None) -> Tuple[str, bool]:
+    """
+    Запустить фоновую валидацию (или вернуть уже идущую).
+
+    Returns:
+        Tuple[str, bool]: (job_id, started) — started=False, если задача уже выполняется
+    """
+    current = get_current_validation_job()
+    if (current and current.get('status') == 'running'
+            and time.time() - current.get('heartbeat', 0) < PROXY_VALIDATION_STALE_SEC):
+        return current['id'], False
+    return ProxyValidationJob(proxy_ids).start(), True
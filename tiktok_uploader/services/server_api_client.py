@@ -3,15 +3,218 @@ API клиент для взаимодействия с удаленными Tik
 Обеспечивает связь между Django интерфейсом и FastAPI ботами на серверах.
 """
 
+import hashlib
+import os
 import requests
 import logging
+import threading
 import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FuturesTimeoutError, as_completed
 from typing import Dict, List, Optional, Tuple, Any
+from requests.adapters import HTTPAdapter
 from django.utils import timezone
-from datetime import datetime
+from datetime import datetime, timedelta
 
 logger = logging.getLogger(__name__)
 
+# Размер одного чанка при загрузке видео в хранилище сервера
+BLOB_CHUNK_SIZE = 8 * 1024 * 1024
+BLOB_CHUNK_RETRIES = 3
+
+# Проверка всех серверов: общий дедлайн и число параллельных запросов
+PING_ALL_DEADLINE_SEC = float(os.environ.get('TIKTOK_SERVER_PING_DEADLINE_SEC', '15'))
+PING_ALL_MAX_WORKERS = int(os.environ.get('TIKTOK_SERVER_PING_WORKERS', '32'))
+
+# Пул keep-alive соединений к серверам (общий для всех клиентов процесса)
+SESSION_POOL_MAXSIZE = int(os.environ.get('TIKTOK_SERVER_POOL_MAXSIZE', '16'))
+SESSION_KEEPALIVE_SEC = float(os.environ.get('TIKTOK_SERVER_KEEPALIVE_SEC', '30'))
+
+# Окно проверок здоровья, по которому считается средний отклик сервера при выборе
+SCHEDULER_LATENCY_WINDOW_MIN = int(os.environ.get('TIKTOK_SERVER_LATENCY_WINDOW_MIN', '30'))
+
+# (path, size, mtime_ns) / ('storage', name, size) -> sha256, чтобы не хэшировать один и тот же файл повторно
+_file_digests: Dict[Tuple, str] = {}
+_file_digests_lock = threading.Lock()
+
+
+def _is_path(source) -> bool:
+    return isinstance(source, (str, os.PathLike))
+
+
+def open_blob_source(source):
+    """Открыть источник видео на чтение: путь на диске или файл хранилища Django (FieldFile)"""
+    if _is_path(source):
+        return open(source, 'rb')
+    return source.open('rb')
+
+
+def blob_source_size(source) -> int:
+    return os.path.getsize(source) if _is_path(source) else int(source.size)
+
+
+def file_sha256(source) -> str:
+    """SHA-256 файла, читаемого потоково с диска или из хранилища (результат мемоизируется)"""
+    if _is_path(source):
+        st = os.stat(source)
+        key = (os.path.abspath(source), st.st_size, st.st_mtime_ns)
+    else:
+        key = ('storage', source.name, blob_source_size(source))
+    with _file_digests_lock:
+        digest = _file_digests.get(key)
+    if digest:
+        return digest
+    h = hashlib.sha256()
+    with open_blob_source(source) as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            h.update(chunk)
+    digest = h.hexdigest()
+    with _file_digests_lock:
+        _file_digests[key] = digest
+    return digest
+
+
+def _default_headers(server) -> Dict[str, str]:
+    """Заголовки запросов к серверу (общие для requests и aiohttp)"""
+    # Заголовки как у браузера для обхода middleware
+    headers = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+        'Accept': 'application/json, text/html, */*',
+        'Accept-Language': 'en-US,en;q=0.9',
+        'Accept-Encoding': 'gzip, deflate',
+        'Connection': 'keep-alive',
+        'Cache-Control': 'no-cache',
+    }
+    # API ключ, если есть
+    if server.api_key:
+        headers['Authorization'] = f'Bearer {server.api_key}'
+    return headers
+
+
+# server_id -> ((base_url, api_key), Session)
+_sessions: Dict[Any, Tuple[Tuple[str, str], requests.Session]] = {}
+_sessions_lock = threading.Lock()
+
+
+def get_server_session(server) -> requests.Session:
+    """
+    Общая keep-alive сессия для сервера.
+
+    Сессия живет весь процесс и переиспользует TCP соединения между запросами
+    и представлениями. При смене адреса или API ключа сервера создается новая.
+    """
+    fingerprint = (server.get_api_url(), server.api_key or '')
+    with _sessions_lock:
+        entry = _sessions.get(server.id)
+        if entry is not None and entry[0] == fingerprint:
+            return entry[1]
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=SESSION_POOL_MAXSIZE)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        session.headers.update(_default_headers(server))
+        _sessions[server.id] = (fingerprint, session)
+    if entry is not None:
+        entry[1].close()
+    return session
+
+
+def close_server_session(server_id=None, **kwargs) -> None:
+    """Закрыть общую сессию сервера (или все сессии, если server_id не указан)"""
+    instance = kwargs.get('instance')
+    if instance is not None:
+        server_id = instance.id
+    with _sessions_lock:
+        if server_id is None:
+            entries = list(_sessions.values())
+            _sessions.clear()
+        else:
+            entry = _sessions.pop(server_id, None)
+            entries = [entry] if entry else []
+    for _, session in entries:
+        session.close()
+
+
+# Общий пул запросов к серверам (проверки, счетчики): потоков не больше PING_ALL_MAX_WORKERS,
+# а сервер, чья проверка еще идет с прошлого вызова, не получает вторую
+_ping_executor: Optional[ThreadPoolExecutor] = None
+_ping_inflight: Dict[Any, Future] = {}
+_ping_lock = threading.Lock()
+
+COUNT_ENDPOINTS = (
+    ('accounts', '/get_accounts_from_db'),
+    ('videos', '/get_videos'),
+    ('profiles', '/get_dolphin_profiles'),
+)
+
+
+def _get_ping_executor() -> ThreadPoolExecutor:
+    global _ping_executor
+    with _ping_lock:
+        if _ping_executor is None:
+            _ping_executor = ThreadPoolExecutor(max_workers=max(1, PING_ALL_MAX_WORKERS), thread_name_prefix='server-ping')
+        return _ping_executor
+
+
+def _submit_probe(server, timeout: float) -> Future:
+    executor = _get_ping_executor()
+    with _ping_lock:
+        future = _ping_inflight.get(server.id)
+        if future is not None and not future.done():
+            return future
+        future = executor.submit(ServerManager._probe_server, server, timeout)
+        _ping_inflight[server.id] = future
+    future.add_done_callback(lambda done, server_id=server.id: _forget_probe(server_id, done))
+    return future
+
+
+def _forget_probe(server_id, future: Future) -> None:
+    with _ping_lock:
+        if _ping_inflight.get(server_id) is future:
+            del _ping_inflight[server_id]
+
+
+def _fetch_count(server, endpoint: str, timeout: float) -> Optional[int]:
+    try:
+        response = get_server_session(server).get(f"{server.get_api_url()}{endpoint}", timeout=timeout)
+        response.raise_for_status()
+        result = response.json()
+    except (requests.exceptions.RequestException, ValueError) as e:
+        logger.warning(f"Failed to fetch {endpoint} from server {server.name}: {e}")
+        return None
+    return result.get('count', 0) if isinstance(result, dict) else None
+
+
+def fetch_server_counts(servers, timeout: float = 30) -> Dict[Any, Dict[str, Optional[int]]]:
+    """
+    Получить количество аккаунтов, видео и профилей Dolphin со всех серверов сразу.
+
+    Запросы выполняются параллельно в общем пуле запросов к серверам через
+    keep-alive сессии серверов (``get_server_session``), без записи в БД.
+    Вызывайте один раз со всем списком серверов, а не по серверу.
+
+    Returns:
+        Dict: server_id -> {"accounts", "videos", "profiles"} (None, если запрос не удался)
+    """
+    executor = _get_ping_executor()
+    futures = {
+        server.id: [(name, executor.submit(_fetch_count, server, endpoint, timeout)) for name, endpoint in COUNT_ENDPOINTS]
+        for server in servers
+    }
+    return {
+        server_id: {name: future.result() for name, future in server_futures}
+        for server_id, server_futures in futures.items()
+    }
+
+
+def task_status_params(since_revision: Optional[str] = None, log_offset: Optional[int] = None) -> Optional[Dict]:
+    """Параметры запроса /tasks/{id} для получения только изменений"""
+    params = {}
+    if since_revision:
+        params['since_revision'] = since_revision
+    if log_offset:
+        params['log_offset'] = log_offset
+    return params or None
+
 
 class ServerAPIClient:
     """
@@ -27,23 +230,8 @@ class ServerAPIClient:
         """
         self.server = server
         self.base_url = server.get_api_url()
-        self.session = requests.Session()
-        
-        # Настраиваем заголовки как у браузера для обхода middleware
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'application/json, text/html, */*',
-            'Accept-Language': 'en-US,en;q=0.9',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive',
-            'Cache-Control': 'no-cache',
-        })
-        
-        # Добавляем API ключ в заголовки если есть
-        if server.api_key:
-            self.session.headers.update({
-                'Authorization': f'Bearer {server.api_key}'
-            })
+        # Общая keep-alive сессия сервера (не закрывается в close())
+        self.session = get_server_session(server)
         
         # Timeout для запросов
         self.timeout = 30
@@ -54,7 +242,10 @@ class ServerAPIClient:
         endpoint: str, 
         data: Optional[Dict] = None,
         files: Optional[Dict] = None,
-        timeout: Optional[int] = None
+        timeout: Optional[int] = None,
+        content: Optional[bytes] = None,
+        headers: Optional[Dict] = None,
+        optional: bool = False
     ) -> Tuple[bool, Any]:
         """
         Выполнить HTTP запрос к серверу.
@@ -65,6 +256,9 @@ class ServerAPIClient:
             data: Данные для отправки
             files: Файлы для загрузки
             timeout: Timeout для запроса
+            content: Сырое тело запроса (PUT), вместо JSON
+            headers: Дополнительные заголовки запроса
+            optional: 404 означает, что сервер не поддерживает endpoint, а не ошибку сервера
         
         Returns:
             Tuple[bool, Any]: (success, response_data)
@@ -79,14 +273,17 @@ class ServerAPIClient:
             logger.info(f"Making {method} request to {url} with headers: {dict(self.session.headers)}")
             
             if method.upper() == 'GET':
-                response = self.session.get(url, params=data, timeout=timeout)
+                response = self.session.get(url, params=data, headers=headers, timeout=timeout)
             elif method.upper() == 'POST':
                 if files:
-                    response = self.session.post(url, data=data, files=files, timeout=timeout)
+                    response = self.session.post(url, data=data, files=files, headers=headers, timeout=timeout)
                 else:
-                    response = self.session.post(url, json=data, timeout=timeout)
+                    response = self.session.post(url, json=data, headers=headers, timeout=timeout)
             elif method.upper() == 'PUT':
-                response = self.session.put(url, json=data, timeout=timeout)
+                if content is not None:
+                    response = self.session.put(url, data=content, headers=headers, timeout=timeout)
+                else:
+                    response = self.session.put(url, json=data, headers=headers, timeout=timeout)
             elif method.upper() == 'DELETE':
                 response = self.session.delete(url, timeout=timeout)
             else:
@@ -129,6 +326,9 @@ class ServerAPIClient:
             
         except requests.exceptions.HTTPError as e:
             error_msg = f"HTTP error from server {self.server.name}: {response.status_code} - {response.text}"
+            if optional and response.status_code == 404:
+                logger.info(f"Endpoint {endpoint} is not supported by server {self.server.name}")
+                return False, {"error": error_msg, "status_code": 404, "unsupported": True}
             logger.error(error_msg)
             self._update_server_error(error_msg)
             return False, {"error": error_msg, "status_code": response.status_code}
@@ -179,6 +379,46 @@ class ServerAPIClient:
         
         return success, result
     
+    def probe_health(self, timeout: float = 10) -> Dict:
+        """
+        Проверить /health без записи в БД (для параллельной проверки серверов).
+        
+        Returns:
+            Dict: {"success", "response_time_ms", "status_code", "error", "data"}
+        """
+        urls = [self.base_url]
+        if self.server.host == '0.0.0.0':
+            urls.append(f"http://localhost:{self.server.port}")
+        
+        probe = {'success': False, 'response_time_ms': None, 'status_code': None, 'error': '', 'data': None}
+        # Бюджет делится между адресами; подключение ограничено отдельно от чтения
+        per_url = timeout / len(urls)
+        request_timeout = (min(per_url, 5), per_url)
+        for base_url in urls:
+            start_time = time.time()
+            try:
+                response = self.session.get(f"{base_url}/health", timeout=request_timeout)
+                probe['response_time_ms'] = int((time.time() - start_time) * 1000)
+                probe['status_code'] = response.status_code
+                response.raise_for_status()
+                try:
+                    probe['data'] = response.json()
+                except ValueError:
+                    probe['data'] = response.text
+                probe['success'] = True
+                probe['error'] = ''
+                return probe
+            except requests.exceptions.Timeout:
+                probe['error'] = f"Timeout connecting to server {self.server.name}"
+            except requests.exceptions.ConnectionError as e:
+                probe['error'] = f"Connection error to server {self.server.name}: {str(e)}"
+            except requests.exceptions.HTTPError:
+                probe['error'] = f"HTTP error from server {self.server.name}: {response.status_code} - {response.text[:500]}"
+            except Exception as e:
+                probe['error'] = f"Unexpected error communicating with server {self.server.name}: {str(e)}"
+            probe['response_time_ms'] = int((time.time() - start_time) * 1000)
+        return probe
+    
     def get_server_info(self) -> Tuple[bool, Dict]:
         """
         Получить информацию о сервере.
@@ -339,6 +579,126 @@ class ServerAPIClient:
         success, result = self._make_request('POST', '/booster/upload_proxies', files=files)
         return success, result
     
+    # ========================================================================
+    # ХРАНИЛИЩЕ ВИДЕО (BLOBS)
+    # ========================================================================
+    
+    def check_blobs(self, hashes: List[str]) -> Tuple[bool, Dict]:
+        """
+        Узнать, каких видео (по SHA-256) еще нет на сервере.
+        
+        Args:
+            hashes: Список SHA-256
+        
+        Returns:
+            Tuple[bool, Dict]: (success, {"missing": [...]}); "unsupported" если сервер без blob API
+        """
+        return self._make_request('POST', '/blobs/check', data={'hashes': hashes}, optional=True)
+    
+    def get_blob_status(self, sha256: str) -> Tuple[bool, Dict]:
+        """
+        Состояние загрузки видео на сервере.
+        
+        Returns:
+            Tuple[bool, Dict]: (success, {"size": принятые байты, "complete": bool})
+        """
+        return self._make_request('GET', f'/blobs/{sha256}', optional=True)
+    
+    def upload_blob(self, source, sha256: Optional[str] = None) -> Tuple[bool, Dict]:
+        """
+        Загрузить файл в хранилище сервера чанками, читая его потоково.
+        
+        Загрузка докачивается: смещение берется у сервера, после ошибки чанк
+        повторяется с того места, которое сервер подтвердил. Ответ без продвижения
+        смещения считается неудачной попыткой.
+        
+        Args:
+            source: Путь к файлу или файл хранилища Django (``video.video_file``)
+            sha256: SHA-256 файла (вычисляется, если не передан)
+        
+        Returns:
+            Tuple[bool, Dict]: (success, {"sha256", "size", "bytes_sent"})
+        """
+        sha256 = sha256 or file_sha256(source)
+        total = blob_source_size(source)
+        success, status = self.get_blob_status(sha256)
+        offset = int(status.get('size') or 0) if success and isinstance(status, dict) else 0
+        if success and isinstance(status, dict) and status.get('complete'):
+            return True, {'sha256': sha256, 'size': total, 'bytes_sent': 0}
+        
+        bytes_sent = 0
+        retries = 0
+        with open_blob_source(source) as f:
+            while offset < total:
+                f.seek(offset)
+                chunk = f.read(BLOB_CHUNK_SIZE)
+                end = offset + len(chunk) - 1
+                success, result = self._make_request(
+                    'PUT', f'/blobs/{sha256}',
+                    content=chunk,
+                    headers={
+                        'Content-Type': 'application/octet-stream',
+                        'Content-Range': f'bytes {offset}-{end}/{total}',
+                    },
+                    timeout=300,
+                )
+                if success:
+                    bytes_sent += len(chunk)
+                    confirmed = result.get('size') if isinstance(result, dict) else None
+                    confirmed = int(confirmed) if confirmed is not None else end + 1
+                    if confirmed > offset:
+                        offset = confirmed
+                        retries = 0
+                        continue
+                    # Сервер принял чанк, но смещение не сдвинулось — повторы ограничены
+                    result = {'error': f'Server did not advance blob {sha256[:12]} past offset {offset}'}
+                
+                retries += 1
+                if retries > BLOB_CHUNK_RETRIES:
+                    return False, result
+                time.sleep(retries)
+                # Продолжаем с того места, которое сервер действительно принял
+                ok, status = self.get_blob_status(sha256)
+                if ok and isinstance(status, dict):
+                    offset = int(status.get('size') or 0)
+        
+        return True, {'sha256': sha256, 'size': total, 'bytes_sent': bytes_sent}
+    
+    def upload_video_blobs(self, paths: List) -> Tuple[bool, Dict]:
+        """
+        Загрузить на сервер только те видео, которых там еще нет.
+        
+        Args:
+            paths: Пути к видео файлам или файлы хранилища Django
+        
+        Returns:
+            Tuple[bool, Dict]: (success, {"hashes": {source: sha256}, "uploaded", "skipped", "bytes_sent"})
+        """
+        hashes = {path: file_sha256(path) for path in paths}
+        success, result = self.check_blobs(sorted(set(hashes.values())))
+        if not success:
+            return False, result
+        missing = set(result.get('missing', [])) if isinstance(result, dict) else set(hashes.values())
+        
+        uploaded = 0
+        bytes_sent = 0
+        for path, sha256 in hashes.items():
+            if sha256 not in missing:
+                continue
+            success, blob = self.upload_blob(path, sha256)
+            if not success:
+                return False, blob
+            missing.discard(sha256)
+            uploaded += 1
+            bytes_sent += blob.get('bytes_sent', 0)
+        
+        return True, {
+            'hashes': hashes,
+            'uploaded': uploaded,
+            'skipped': len(set(hashes.values())) - uploaded,
+            'bytes_sent': bytes_sent,
+        }
+    
     # ========================================================================
     # ЗАДАЧИ (API V2)
     # ========================================================================
@@ -365,13 +725,14 @@ class ServerAPIClient:
             videos_data: Список словарей с данными видео:
                 {
                     "filename": "video1.mp4",
-                    "file_base64": "...",
+                    "blob_sha256": "...",  # видео, загруженное через upload_video_blobs
                     "caption": "Описание",
                     "hashtags": ["tag1", "tag2"],
                     "music_name": "...",
                     "location": "...",
                     "mentions": ["@user1"]
                 }
+                Для серверов без blob API вместо "blob_sha256" передается "file_base64".
             tag: Тематика аккаунтов (опционально)
             cycle_timeout_minutes: Задержка между циклами
             delay_min_sec: Минимальная задержка между загрузками
@@ -444,17 +805,24 @@ class ServerAPIClient:
         success, result = self._make_request('POST', '/tasks/warmup', data=data, timeout=60)
         return success, result
     
-    def get_task_status(self, task_id: str) -> Tuple[bool, Dict]:
+    def get_task_status(
+        self,
+        task_id: str,
+        since_revision: Optional[str] = None,
+        log_offset: Optional[int] = None
+    ) -> Tuple[bool, Dict]:
         """
         Получить статус задачи.
         
         Args:
             task_id: ID задачи на сервере
+            since_revision: Последняя известная ревизия (сервер может ответить {"unchanged": true})
+            log_offset: Число уже полученных строк лога (сервер может вернуть только новые)
         
         Returns:
             Tuple[bool, Dict]: (success, task_status_data)
         """
-        success, result = self._make_request('GET', f'/tasks/{task_id}')
+        success, result = self._make_request('GET', f'/tasks/{task_id}', data=task_status_params(since_revision, log_offset))
         return success, result
     
     def stop_task(self, task_id: str) -> Tuple[bool, Dict]:
@@ -567,8 +935,13 @@ class ServerAPIClient:
     # ========================================================================
     
     def close(self):
-        """Закрыть сессию"""
-        self.session.close()
+        """
+        Освободить клиент.
+        
+        Сессия общая для процесса и остается открытой, чтобы следующие запросы
+        к серверу переиспользовали соединения. Закрыть ее можно через
+        ``close_server_session``.
+        """
 
 
 class ServerManager:
@@ -591,81 +964,84 @@ class ServerManager:
         return ServerAPIClient(server)
     
     @staticmethod
-    def ping_all_servers():
+    def _probe_server(server, timeout: float) -> Dict:
+        client = ServerAPIClient(server)
+        try:
+            return client.probe_health(timeout=timeout)
+        finally:
+            client.close()
+    
+    @staticmethod
+    def ping_all_servers(deadline: float = PING_ALL_DEADLINE_SEC, timeout: float = 10):
         """
         Проверить доступность всех активных серверов.
         Обновляет статусы в базе данных.
+        
+        Серверы опрашиваются параллельно в общем ограниченном пуле; общее время
+        ограничено ``deadline`` (сервер, не ответивший к дедлайну, считается
+        offline). Статусы и логи здоровья записываются пакетно.
         """
         from tiktok_uploader.models import TikTokServer, ServerHealthLog
-        from django.utils import timezone
-        import time
         
-        active_servers = TikTokServer.objects.filter(is_active=True)
-        results = []
+        servers = list(TikTokServer.objects.filter(is_active=True))
+        if not servers:
+            return []
         
-        for server in active_servers:
-            try:
-                start_time = time.time()
-                
-                client = ServerAPIClient(server)
-                success, result = client.ping()
-                client.close()
-                
-                response_time = (time.time() - start_time) * 1000
-                
-                if success:
-                    server.status = 'online'
-                    server.last_health_check = timezone.now()
-                    server.save()
-                    
-                    # Создаем запись в логах
-                    ServerHealthLog.objects.create(
-                        server=server,
-                        is_online=True,
-                        response_time_ms=int(response_time),
-                        error_message=""
-                    )
-                else:
-                    server.status = 'offline'
-                    server.save()
-                    
-                    error_msg = result.get('error') if isinstance(result, dict) else str(result)
-                    
-                    # Создаем запись в логах
-                    ServerHealthLog.objects.create(
-                        server=server,
-                        is_online=False,
-                        response_time_ms=int(response_time),
-                        error_message=error_msg
-                    )
-                
-                results.append({
-                    'server': server.name,
-                    'server_id': server.id,
-                    'is_online': success,
-                    'status': server.status,
-                    'error': result.get('error') if isinstance(result, dict) and not success else None
-                })
-            except Exception as e:
-                server.status = 'offline'
-                server.save()
-                
-                # Создаем запись в логах
-                ServerHealthLog.objects.create(
-                    server=server,
-                    is_online=False,
-                    response_time_ms=0,
-                    error_message=str(e)
-                )
-                
-                results.append({
-                    'server': server.name,
-                    'server_id': server.id,
-                    'is_online': False,
-                    'status': 'offline',
-                    'error': str(e)
-                })
+        timeout = min(timeout, deadline)
+        probes = {}
+        futures = {_submit_probe(server, timeout): server for server in servers}
+        try:
+            for future in as_completed(futures, timeout=deadline):
+                server = futures[future]
+                try:
+                    probes[server.id] = future.result()
+                except Exception as e:
+                    probes[server.id] = {'success': False, 'response_time_ms': 0, 'error': str(e)}
+        except FuturesTimeoutError:
+            # Незавершенные проверки доработают в пуле (не дольше таймаута запроса)
+            logger.warning(f"Ping all servers: {len(servers) - len(probes)} server(s) did not answer within {deadline}s")
+        
+        now = timezone.now()
+        health_logs = []
+        results = []
+        for server in servers:
+            probe = probes.get(server.id) or {
+                'success': False,
+                'response_time_ms': int(deadline * 1000),
+                'error': f"No response from server {server.name} within {deadline:.0f}s",
+            }
+            success = probe['success']
+            server.response_time_ms = probe.get('response_time_ms')
+            server.updated_at = now
+            if success:
+                server.status = 'ONLINE'
+                server.last_ping = now
+                server.last_error = ""
+            else:
+                server.status = 'OFFLINE'
+                server.last_error = probe.get('error', '')
+            
+            health_logs.append(ServerHealthLog(
+                server=server,
+                is_online=success,
+                response_time_ms=probe.get('response_time_ms') or 0,
+                status_code=probe.get('status_code'),
+                error_message="" if success else probe.get('error', '')
+            ))
+            results.append({
+                'server': server.name,
+                'server_id': server.id,
+                'is_online': success,
+                'status': server.status,
+                'error': None if success else probe.get('error')
+            })
         
+        # bulk_update не применяет auto_now
+        TikTokServer.objects.bulk_update(servers, ['status', 'last_ping', 'last_error', 'response_time_ms', 'updated_at'])
+        ServerHealthLog.objects.bulk_create(health_logs)
+        # bulk_update не шлет сигналы — обновляем снимок для servers_context сами
+        from tiktok_uploader.services.server_snapshot import refresh_servers_snapshot
+        refresh_servers_snapshot(servers)
         return results
     
     @staticmethod
@@ -678,33 +1054,171 @@ class ServerManager:
         """
         from tiktok_uploader.models import TikTokServer
         
+        # Статус сравнивается без учета регистра: старые проверки писали 'online'
         return TikTokServer.objects.filter(
             is_active=True,
-            status='ONLINE'
+            status__iexact='ONLINE'
         ).order_by('priority', 'active_tasks')
     
     @staticmethod
-    def select_best_server():
+    def get_server_latencies(server_ids) -> Dict[int, float]:
         """
-        Выбрать наилучший сервер для новой задачи.
+        Среднее время отклика серверов по последним проверкам здоровья.
         
         Returns:
-            TikTokServer or None: Лучший доступный сервер
+            Dict[int, float]: server_id -> среднее время отклика в мс
         """
-        from django.db.models import F
+        from django.db.models import Avg
+        from tiktok_uploader.models import ServerHealthLog
         
-        available_servers = ServerManager.get_available_servers()
+        since = timezone.now() - timedelta(minutes=SCHEDULER_LATENCY_WINDOW_MIN)
+        rows = ServerHealthLog.objects.filter(
+            server_id__in=list(server_ids),
+            is_online=True,
+            checked_at__gte=since,
+            response_time_ms__isnull=False
+        ).values('server_id').annotate(avg_ms=Avg('response_time_ms'))
+        return {row['server_id']: float(row['avg_ms'] or 0) for row in rows}
+    
+    @staticmethod
+    def rank_servers(servers, accounts_needed: int = 0) -> List:
+        """
+        Упорядочить серверы по взвешенной загрузке (weighted least-connections).
+        
+        Оценка = (active_tasks + 1) / max_concurrent_tasks
+                 * (1 + средний отклик в секундах) * priority.
+        Меньше — лучше. Серверы без свободных слотов и серверы, на которых
+        известно меньше аккаунтов, чем нужно, отбрасываются.
         
-        # Фильтруем серверы с доступной емкостью
-        servers_with_capacity = available_servers.filter(
+        Returns:
+            List[TikTokServer]: серверы в порядке предпочтения (с атрибутом ``score``)
+        """
+        servers = list(servers)
+        latencies = ServerManager.get_server_latencies(s.id for s in servers)
+        ranked = []
+        for server in servers:
+            capacity = max(1, server.max_concurrent_tasks)
+            if server.active_tasks >= capacity:
+                continue
+            if accounts_needed and server.total_accounts and server.total_accounts < accounts_needed:
+                continue
+            latency_ms = latencies.get(server.id, server.response_time_ms or 0)
+            server.score = (server.active_tasks + 1) / capacity * (1 + latency_ms / 1000.0) * max(1, server.priority)
+            ranked.append(server)
+        ranked.sort(key=lambda s: (s.score, s.priority, s.name))
+        return ranked
+    
+    @staticmethod
+    def reserve_slot(server_id) -> bool:
+        """
+        Атомарно занять слот задачи на сервере.
+        
+        Returns:
+            bool: True если слот занят, False если сервер заполнен
+        """
+        from django.db.models import F
+        from tiktok_uploader.models import TikTokServer
+        from tiktok_uploader.services.server_snapshot import invalidate_servers_snapshot
+        
+        reserved = bool(TikTokServer.objects.filter(
+            id=server_id,
             active_tasks__lt=F('max_concurrent_tasks')
-        )
+        ).update(active_tasks=F('active_tasks') + 1))
+        if reserved:
+            # update() не шлет post_save — снимок серверов сбрасываем сами
+            invalidate_servers_snapshot()
+        return reserved
+    
+    @staticmethod
+    def release_slot(server_id) -> None:
+        """Освободить слот задачи на сервере"""
+        from django.db.models import F
+        from tiktok_uploader.models import TikTokServer
+        from tiktok_uploader.services.server_snapshot import invalidate_servers_snapshot
+        
+        if TikTokServer.objects.filter(id=server_id, active_tasks__gt=0).update(active_tasks=F('active_tasks') - 1):
+            invalidate_servers_snapshot()
+    
+    @staticmethod
+    def select_best_server(accounts_needed: int = 0, reserve: bool = False, exclude_ids=None):
+        """
+        Выбрать наилучший сервер для новой задачи.
         
-        if servers_with_capacity.exists():
-            return servers_with_capacity.first()
+        Args:
+            accounts_needed: Сколько аккаунтов нужно задаче (0 — не проверять)
+            reserve: Сразу занять слот на выбранном сервере (атомарно, через F())
+            exclude_ids: Серверы, которые не рассматривать
+        
+        Returns:
+            TikTokServer or None: Лучший доступный сервер
+        """
+        available_servers = ServerManager.get_available_servers()
+        if exclude_ids:
+            available_servers = available_servers.exclude(id__in=list(exclude_ids))
+        
+        for server in ServerManager.rank_servers(available_servers, accounts_needed):
+            if not reserve:
+                return server
+            # Другой диспетчер мог занять последний слот — берем следующий сервер
+            if ServerManager.reserve_slot(server.id):
+                server.active_tasks += 1
+                return server
         
         return None
     
+    @staticmethod
+    def allocate_by_capacity(total: int, servers=None) -> List[Tuple[Any, int]]:
+        """
+        Распределить ``total`` единиц работы (аккаунтов) по серверам
+        пропорционально свободной емкости.
+        
+        Вес сервера = свободные слоты / (1 + средний отклик в секундах);
+        доля сервера ограничена известным числом аккаунтов на нем.
+        
+        Returns:
+            List[Tuple[TikTokServer, int]]: (сервер, количество) для серверов с ненулевой долей
+        """
+        if servers is None:
+            servers = ServerManager.get_available_servers()
+        ranked = ServerManager.rank_servers(servers)
+        if total <= 0 or not ranked:
+            return []
+        latencies = ServerManager.get_server_latencies(s.id for s in ranked)
+        weights = {}
+        for server in ranked:
+            free_slots = max(0, server.max_concurrent_tasks - server.active_tasks)
+            latency_ms = latencies.get(server.id, server.response_time_ms or 0)
+            weights[server.id] = free_slots / (1 + latency_ms / 1000.0)
+        
+        allocation = {server.id: 0 for server in ranked}
+        remaining = total
+        active = [s for s in ranked if weights[s.id] > 0]
+        # Раздаем пропорционально весам; при упоре в лимит аккаунтов остаток перераспределяется
+        while remaining > 0 and active:
+            weight_sum = sum(weights[s.id] for s in active)
+            shares = [(s, remaining * weights[s.id] / weight_sum) for s in active]
+            given = 0
+            for server, share in shares:
+                limit = server.total_accounts - allocation[server.id] if server.total_accounts else remaining
+                take = min(int(share), limit)
+                allocation[server.id] += take
+                given += take
+            # Остаток от округления — серверам с наибольшей дробной частью
+            leftovers = sorted(shares, key=lambda item: item[1] - int(item[1]), reverse=True)
+            for server, _ in leftovers:
+                if given >= remaining:
+                    break
+                if server.total_accounts and allocation[server.id] >= server.total_accounts:
+                    continue
+                allocation[server.id] += 1
+                given += 1
+            remaining -= given
+            active = [s for s in active if not s.total_accounts or allocation[s.id] < s.total_accounts]
+            if given == 0:
+                break
+        
+        return [(server, allocation[server.id]) for server in ranked if allocation[server.id] > 0]
+    
     @staticmethod
     def update_server_stats(server):
         """
@@ -713,27 +1227,40 @@ class ServerManager:
         Args:
             server: Экземпляр модели TikTokServer
         """
-        client = ServerAPIClient(server)
-        
-        # Получаем количество аккаунтов
-        success, accounts_count = client.get_accounts_count()
-        if success:
-            server.total_accounts = accounts_count
+        return ServerManager.update_all_server_stats([server])[server.id]
+    
+    @staticmethod
+    def update_all_server_stats(servers=None):
+        """
+        Обновить статистику серверов одним параллельным опросом.
         
-        # Получаем количество видео  
-        success, videos_count = client.get_videos_count()
-        if success:
-            # Можно сохранить в отдельное поле если нужно
-            pass
+        Args:
+            servers: Серверы (по умолчанию все активные в статусе ONLINE)
         
-        # Получаем количество профилей Dolphin
-        success, profiles_count = client.get_dolphin_profiles_count()
-        if success:
-            # Можно сохранить в отдельное поле если нужно
-            pass
+        Returns:
+            Dict: server_id -> {"accounts", "videos", "profiles"}
+        """
+        from tiktok_uploader.models import TikTokServer
         
-        server.save(update_fields=['total_accounts'])
-        client.close()
+        if servers is None:
+            servers = TikTokServer.objects.filter(is_active=True, status='ONLINE')
+        servers = list(servers)
+        if not servers:
+            return {}
+        
+        counts = fetch_server_counts(servers)
+        changed = []
+        for server in servers:
+            accounts = counts[server.id]['accounts']
+            if accounts is not None and accounts != server.total_accounts:
+                server.total_accounts = accounts
+                changed.append(server)
+        if changed:
+            TikTokServer.objects.bulk_update(changed, ['total_accounts'])
+            # bulk_update не шлет сигналы — обновляем снимок для servers_context сами
+            from tiktok_uploader.services.server_snapshot import invalidate_servers_snapshot
+            invalidate_servers_snapshot()
+        return counts
     
     @staticmethod
     def create_health_log(server):
@@ -751,25 +1278,12 @@ class ServerManager:
         client = ServerAPIClient(server)
         
         # Проверяем доступность
-        is_online = client.ping()
-        
-        # Получаем статистику
-        accounts_count = 0
-        videos_count = 0
-        profiles_count = 0
+        is_online, _ = client.ping()
         
+        # Получаем статистику (все счетчики параллельно)
+        counts = {}
         if is_online:
-            success, count = client.get_accounts_count()
-            if success:
-                accounts_count = count
-            
-            success, count = client.get_videos_count()
-            if success:
-                videos_count = count
-            
-            success, count = client.get_dolphin_profiles_count()
-            if success:
-                profiles_count = count
+            counts = fetch_server_counts([server])[server.id]
         
         # Создаем запись лога
         health_log = ServerHealthLog.objects.create(
@@ -777,10 +1291,28 @@ class ServerManager:
             is_online=is_online,
             response_time_ms=server.response_time_ms,
             error_message=server.last_error if not is_online else "",
-            accounts_count=accounts_count,
-            videos_count=videos_count,
-            dolphin_profiles_count=profiles_count
+            accounts_count=counts.get('accounts') or 0,
+            videos_count=counts.get('videos') or 0,
+            dolphin_profiles_count=counts.get('profiles') or 0
         )
         
         client.close()
         return health_log
+
+
+def _release_slot_on_task_delete(sender, instance, **kwargs):
+    """Удаленная задача, занимавшая слот, освобождает его"""
+    if instance.holds_slot:
+        ServerManager.release_slot(instance.server_id)
+
+
+def connect_server_slot_cleanup() -> None:
+    from django.db.models.signals import post_delete
+    from tiktok_uploader.models import ServerTask
+    post_delete.connect(_release_slot_on_task_delete, sender=ServerTask, dispatch_uid='server_task_release_slot')
+
+
+def connect_server_session_cleanup() -> None:
+    from django.db.models.signals import post_delete
+    from tiktok_uploader.models import TikTokServer
+    post_delete.connect(close_server_session, sender=TikTokServer, dispatch_uid='tiktok_server_close_session')
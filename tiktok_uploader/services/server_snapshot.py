@@ -0,0 +1,102 @@
+"""
+Снимок списка активных серверов для контекстного процессора.
+
+``servers_context`` выполнялся на каждой странице и каждый раз делал запрос
+к ``TikTokServer``. Теперь список берется из снимка:
+
+- копия в памяти процесса живет ``SNAPSHOT_LOCAL_TTL_SEC`` секунд;
+- общий снимок лежит в Django cache (Redis при ``REDIS_URL``), поэтому его видят
+  все процессы; если кэш локальный для процесса (LocMem), сброс в одном процессе
+  не виден другим, и снимок живет столько же, сколько копия в памяти;
+- снимок сбрасывается сигналами сохранения/удаления ``TikTokServer``, а
+  обновления без сигналов (``F()`` в ``reserve_slot``/``release_slot``,
+  ``bulk_update`` в ``ping_all_servers``) сбрасывают или пересобирают его явно.
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_CACHE_KEY = 'tiktok_servers_snapshot'
+SNAPSHOT_CACHE_TTL_SEC = int(os.environ.get('TIKTOK_SERVERS_SNAPSHOT_TTL_SEC', '60'))
+SNAPSHOT_LOCAL_TTL_SEC = float(os.environ.get('TIKTOK_SERVERS_SNAPSHOT_LOCAL_TTL_SEC', '5'))
+# Кэши, которые не разделяются между процессами
+_PROCESS_LOCAL_CACHES = ('locmem.LocMemCache', 'dummy.DummyCache')
+
+_local_lock = threading.Lock()
+_local_snapshot: Optional[List] = None
+_local_expires_at = 0.0
+
+
+def _load_servers() -> List:
+    from tiktok_uploader.models import TikTokServer
+    return list(TikTokServer.objects.filter(is_active=True).order_by('priority', 'name'))
+
+
+def _snapshot_ttl() -> float:
+    backend = settings.CACHES.get('default', {}).get('BACKEND', '')
+    if backend.endswith(_PROCESS_LOCAL_CACHES):
+        return max(1, int(SNAPSHOT_LOCAL_TTL_SEC))
+    return SNAPSHOT_CACHE_TTL_SEC
+
+
+def refresh_servers_snapshot(servers: Optional[List] = None) -> List:
+    """Пересобрать снимок (из переданного списка или из БД) и сохранить в кэш"""
+    global _local_snapshot, _local_expires_at
+    if servers is None:
+        servers = _load_servers()
+    else:
+        servers = sorted((s for s in servers if s.is_active), key=lambda s: (s.priority, s.name))
+    try:
+        cache.set(SNAPSHOT_CACHE_KEY, servers, _snapshot_ttl())
+    except Exception as e:
+        logger.warning(f"Failed to store servers snapshot in cache: {e}")
+    with _local_lock:
+        _local_snapshot = servers
+        _local_expires_at = time.monotonic() + SNAPSHOT_LOCAL_TTL_SEC
+    return servers
+
+
+def get_servers_snapshot() -> List:
+    """Активные серверы, отсортированные по приоритету (без запроса к БД, если снимок есть)"""
+    global _local_snapshot, _local_expires_at
+    with _local_lock:
+        if _local_snapshot is not None and time.monotonic() < _local_expires_at:
+            return _local_snapshot
+    try:
+        servers = cache.get(SNAPSHOT_CACHE_KEY)
+    except Exception as e:
+        logger.warning(f"Failed to read servers snapshot from cache: {e}")
+        servers = None
+    if servers is None:
+        return refresh_servers_snapshot()
+    with _local_lock:
+        _local_snapshot = servers
+        _local_expires_at = time.monotonic() + SNAPSHOT_LOCAL_TTL_SEC
+    return servers
+
+
+def invalidate_servers_snapshot(**kwargs) -> None:
+    """Сбросить снимок (обработчик post_save / post_delete ``TikTokServer`` и вызов после ``update()``)"""
+    global _local_snapshot, _local_expires_at
+    with _local_lock:
+        _local_snapshot = None
+        _local_expires_at = 0.0
+    try:
+        cache.delete(SNAPSHOT_CACHE_KEY)
+    except Exception as e:
+        logger.warning(f"Failed to invalidate servers snapshot: {e}")
+
+
+def connect_servers_snapshot_invalidation() -> None:
+    from django.db.models.signals import post_delete, post_save
+    from tiktok_uploader.models import TikTokServer
+    post_save.connect(invalidate_servers_snapshot, sender=TikTokServer, dispatch_uid='tiktok_servers_snapshot_save')
+    post_delete.connect(invalidate_servers_snapshot, sender=TikTokServer, dispatch_uid='tiktok_servers_snapshot_delete')
@@ -0,0 +1,323 @@
+"""
+Фоновая синхронизация прогресса задач на удаленных серверах.
+
+Раньше ``remote_task_detail`` и представления прогрева запрашивали
+``/tasks/{id}`` у сервера на каждый просмотр страницы (и каждые 3 секунды из
+открытой вкладки). Теперь статус опрашивает один цикл ``sync_server_tasks``:
+
+- опрашиваются только незавершенные ``ServerTask`` с ``remote_task_id``;
+- задача, состояние которой меняется, опрашивается часто
+  (``TASK_SYNC_FAST_SEC``), неизменная — с экспоненциальным откатом до
+  ``TASK_SYNC_MAX_SEC``;
+- в запросе передаются последняя ревизия и число известных строк лога, чтобы
+  сервер мог вернуть только изменения;
+- состояние сохраняется через ``update_fields``, представления читают только
+  локальную БД.
+
+Если цикл не запущен (или отстал), представления сами синхронизируют задачу,
+не обновлявшуюся дольше ``TASK_SYNC_STALE_SEC`` — см. ``sync_if_stale``.
+"""
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+from django.utils import timezone
+
+from tiktok_uploader.services.bulk_sharding import aggregate_shards
+from tiktok_uploader.services.server_api_client import get_server_session, task_status_params
+
+logger = logging.getLogger(__name__)
+
+TASK_SYNC_FAST_SEC = float(os.environ.get('TIKTOK_TASK_SYNC_FAST_SEC', '3'))
+TASK_SYNC_MAX_SEC = float(os.environ.get('TIKTOK_TASK_SYNC_MAX_SEC', '60'))
+TASK_SYNC_WORKERS = int(os.environ.get('TIKTOK_TASK_SYNC_WORKERS', '16'))
+TASK_SYNC_TIMEOUT_SEC = float(os.environ.get('TIKTOK_TASK_SYNC_TIMEOUT_SEC', '15'))
+# Синхронизация из представлений: порог устаревания и таймаут запроса
+TASK_SYNC_STALE_SEC = float(os.environ.get('TIKTOK_TASK_SYNC_STALE_SEC', str(TASK_SYNC_MAX_SEC * 2)))
+TASK_SYNC_INLINE_TIMEOUT_SEC = float(os.environ.get('TIKTOK_TASK_SYNC_INLINE_TIMEOUT_SEC', '5'))
+
+ACTIVE_STATUSES = ('PENDING', 'QUEUED', 'RUNNING')
+TERMINAL_STATUSES = ('COMPLETED', 'FAILED', 'CANCELLED')
+# Ключ remote_state с числом полученных строк лога (log_offset следующего запроса)
+LOG_LINES_STATE_KEY = 'log_lines'
+
+
+def get_active_server_tasks():
+    """Незавершенные задачи, уже отправленные на сервер"""
+    from tiktok_uploader.models import ServerTask
+    return (
+        ServerTask.objects
+        .filter(status__in=ACTIVE_STATUSES, remote_task_id__isnull=False)
+        .exclude(remote_task_id='')
+        .select_related('server', 'bulk_upload_task', 'warmup_task')
+    )
+
+
+def fetch_remote_status(server_task, timeout: float = TASK_SYNC_TIMEOUT_SEC) -> Tuple[bool, Dict]:
+    """
+    Запросить состояние задачи у сервера (без записи в БД, безопасно из потоков).
+
+    Returns:
+        Tuple[bool, Dict]: (success, data)
+    """
+    server = server_task.server
+    log_offset = received_log_lines(server_task)
+    try:
+        response = get_server_session(server).get(
+            f"{server.get_api_url()}/tasks/{server_task.remote_task_id}",
+            params=task_status_params(server_task.remote_revision, log_offset),
+            timeout=timeout,
+        )
+        response.raise_for_status()
+        data = response.json()
+    except (requests.exceptions.RequestException, ValueError) as e:
+        return False, {'error': f"Failed to fetch task {server_task.remote_task_id} from server {server.name}: {e}"}
+    if not isinstance(data, dict):
+        return False, {'error': f"Unexpected task status payload from server {server.name}"}
+    return True, data
+
+
+def received_log_lines(server_task) -> int:
+    """Сколько строк лога уже получено с сервера (по счетчику, а не по переводам строк)"""
+    try:
+        return max(0, int((server_task.remote_state or {}).get(LOG_LINES_STATE_KEY) or 0))
+    except (TypeError, ValueError):
+        return 0
+
+
+def _remote_progress_percent(progress, default: int) -> int:
+    """Прогресс задачи в процентах: число (загрузка) или словарь счетчиков (прогрев)"""
+    if isinstance(progress, bool):
+        return default
+    if isinstance(progress, (int, float)):
+        return min(100, max(0, int(progress)))
+    if isinstance(progress, dict):
+        total = progress.get('total_accounts') or progress.get('total') or 0
+        if total:
+            done = (progress.get('completed') or 0) + (progress.get('failed') or 0)
+            return min(100, max(0, int(done * 100 / total)))
+    return default
+
+
+def apply_remote_status(server_task, data: Dict) -> bool:
+    """
+    Записать состояние задачи с сервера в ServerTask и связанную задачу.
+
+    Returns:
+        bool: изменилось ли что-нибудь
+    """
+    from tiktok_uploader.models import ServerTask, WarmupTask
+
+    now = timezone.now()
+    revision = str(data.get('revision') or data.get('updated_at') or '')[:100]
+    if data.get('unchanged') or (revision and revision == server_task.remote_revision):
+        server_task.last_synced_at = now
+        server_task.save(update_fields=['last_synced_at'])
+        return False
+
+    update_fields = ['last_synced_at']
+    server_task.last_synced_at = now
+
+    def _set(field: str, value: Any) -> None:
+        if getattr(server_task, field) != value:
+            setattr(server_task, field, value)
+            update_fields.append(field)
+
+    # У задач прогрева статус очереди отдельно от статуса задачи
+    valid_statuses = {choice for choice, _ in ServerTask.STATUS_CHOICES}
+    status = str(data.get('queue_status') or data.get('status') or '').upper()
+    if status in valid_statuses:
+        _set('status', status)
+    _set('progress', _remote_progress_percent(data.get('progress'), server_task.progress))
+    _set('remote_revision', revision)
+
+    state = {
+        key: data[key]
+        for key in ('status', 'progress', 'accounts', 'queue_position')
+        if key in data
+    }
+
+    # Лог: сервер, поддерживающий log_offset, возвращает только новые строки.
+    # Число полученных строк хранится отдельно: строки лога сами могут содержать переводы строк
+    logs = data.get('logs')
+    if logs is not None:
+        lines = [str(line) for line in logs] if isinstance(logs, list) else str(logs).splitlines()
+        text = '\n'.join(lines)
+        received = len(lines)
+        if 'log_offset' in data and server_task.log:
+            text = f"{server_task.log}\n{text}" if text else server_task.log
+            received += received_log_lines(server_task)
+        _set('log', text)
+        state[LOG_LINES_STATE_KEY] = received
+    _set('remote_state', {**server_task.remote_state, **state})
+
+    if server_task.status == 'COMPLETED':
+        _set('progress', 100)
+        if data.get('result'):
+            _set('result', data['result'])
+    elif server_task.status == 'FAILED':
+        _set('error_message', str(data.get('errors') or data.get('error') or 'Unknown error'))
+    if server_task.status == 'RUNNING' and not server_task.started_at:
+        _set('started_at', now)
+    if server_task.status in TERMINAL_STATUSES and not server_task.completed_at:
+        _set('completed_at', now)
+
+    changed = len(update_fields) > 1
+    server_task.save(update_fields=update_fields + (['updated_at'] if changed else []))
+    if server_task.status in TERMINAL_STATUSES:
+        server_task.release_slot()
+
+    if changed and server_task.bulk_upload_task_id:
+        aggregate_shards(server_task.bulk_upload_task)
+    if server_task.warmup_task_id:
+        warmup_task = server_task.warmup_task
+        warmup_status = str(data.get('status') or '').upper()
+        if warmup_status in {choice for choice, _ in WarmupTask.STATUS_CHOICES} and warmup_task.status != warmup_status:
+            warmup_task.status = warmup_status
+            warmup_fields = ['status', 'updated_at']
+            if warmup_status == 'RUNNING' and not warmup_task.started_at:
+                warmup_task.started_at = now
+                warmup_fields.append('started_at')
+            if warmup_status in ('COMPLETED', 'FAILED') and not warmup_task.completed_at:
+                warmup_task.completed_at = now
+                warmup_fields.append('completed_at')
+            warmup_task.save(update_fields=warmup_fields)
+            changed = True
+    return changed
+
+
+def sync_server_task(server_task, timeout: float = TASK_SYNC_TIMEOUT_SEC) -> Tuple[bool, Dict]:
+    """
+    Синхронизировать одну задачу сразу (явное действие пользователя).
+
+    Returns:
+        Tuple[bool, Dict]: (success, data)
+    """
+    success, data = fetch_remote_status(server_task, timeout=timeout)
+    if success:
+        apply_remote_status(server_task, data)
+    return success, data
+
+
+def sync_if_stale(server_task, stale_after: float = TASK_SYNC_STALE_SEC) -> bool:
+    """
+    Синхронизировать задачу из представления, если фоновый цикл давно ее не обновлял.
+
+    Повторная попытка для той же задачи (в т.ч. из других процессов) — не чаще
+    раза в ``stale_after`` секунд, чтобы недоступный сервер не тормозил каждый опрос.
+
+    Returns:
+        bool: была ли выполнена успешная синхронизация
+    """
+    from django.core.cache import cache
+
+    if server_task is None or server_task.status not in ACTIVE_STATUSES or not server_task.remote_task_id:
+        return False
+    synced_at = server_task.last_synced_at
+    if synced_at and (timezone.now() - synced_at).total_seconds() < stale_after:
+        return False
+    if not cache.add(f'task_sync:inline:{server_task.id}', 1, timeout=max(1, int(stale_after))):
+        return False
+    try:
+        success, data = sync_server_task(server_task, timeout=TASK_SYNC_INLINE_TIMEOUT_SEC)
+    except Exception as e:
+        logger.warning(f"Inline task sync failed for ServerTask {server_task.id}: {e}")
+        return False
+    if not success:
+        logger.warning(f"Inline task sync failed for ServerTask {server_task.id}: {data.get('error')}")
+    return success
+
+
+class RemoteTaskSyncer:
+    """
+    Цикл опроса незавершенных задач с адаптивным интервалом.
+
+    Для каждой задачи хранится (время следующего опроса, текущий интервал):
+    изменение состояния сбрасывает интервал до быстрого, отсутствие изменений
+    или ошибка удваивают его до максимума.
+    """
+
+    def __init__(
+        self,
+        fast_interval: float = TASK_SYNC_FAST_SEC,
+        max_interval: float = TASK_SYNC_MAX_SEC,
+        workers: int = TASK_SYNC_WORKERS
+    ):
+        self.fast_interval = max(0.5, fast_interval)
+        self.max_interval = max(self.fast_interval, max_interval)
+        self.workers = max(1, workers)
+        # server_task_id -> (next_due monotonic, interval)
+        self._schedule: Dict[int, Tuple[float, float]] = {}
+
+    def _reschedule(self, task_id: int, changed: bool) -> None:
+        _, interval = self._schedule.get(task_id, (0.0, self.fast_interval))
+        interval = self.fast_interval if changed else min(self.max_interval, interval * 2)
+        self._schedule[task_id] = (time.monotonic() + interval, interval)
+
+    def due_tasks(self) -> List:
+        """Активные задачи, у которых подошло время опроса"""
+        tasks = list(get_active_server_tasks())
+        active_ids = {task.id for task in tasks}
+        for task_id in list(self._schedule):
+            if task_id not in active_ids:
+                del self._schedule[task_id]
+        now = time.monotonic()
+        return [task for task in tasks if self._schedule.get(task.id, (0.0, 0.0))[0] <= now]
+
+    def run_once(self) -> Dict[str, int]:
+        """
+        Опросить задачи, у которых подошло время.
+
+        Returns:
+            Dict: {"polled", "changed", "failed"}
+        """
+        tasks = self.due_tasks()
+        stats = {'polled': len(tasks), 'changed': 0, 'failed': 0}
+        if not tasks:
+            return stats
+
+        # Сеть — параллельно в потоках, запись в БД — в текущем потоке
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(tasks))) as pool:
+            responses = list(pool.map(fetch_remote_status, tasks))
+
+        for server_task, (success, data) in zip(tasks, responses):
+            changed = False
+            if success:
+                try:
+                    changed = apply_remote_status(server_task, data)
+                except Exception as e:
+                    success = False
+                    data = {'error': str(e)}
+            if not success:
+                stats['failed'] += 1
+                logger.warning(f"Task sync failed for ServerTask {server_task.id}: {data.get('error')}")
+            elif changed:
+                stats['changed'] += 1
+            self._reschedule(server_task.id, changed)
+        return stats
+
+    def next_wait(self) -> float:
+        """Сколько ждать до следующего опроса (новые задачи подхватываются за fast_interval)"""
+        if not self._schedule:
+            return self.fast_interval
+        wait = min(next_due for next_due, _ in self._schedule.values()) - time.monotonic()
+        return min(self.fast_interval, max(0.5, wait))
+
+    def run_forever(self, stop_event: Optional[threading.Event] = None) -> None:
+        from django.db import close_old_connections
+
+        stop_event = stop_event or threading.Event()
+        while not stop_event.is_set():
+            close_old_connections()
+            try:
+                stats = self.run_once()
+                if stats['polled']:
+                    logger.info(f"Task sync: polled {stats['polled']}, changed {stats['changed']}, failed {stats['failed']}")
+            except Exception as e:
+                logger.error(f"Task sync iteration failed: {e}")
+            stop_event.wait(self.next_wait())
@@ -0,0 +1,250 @@
+from django.test import TestCase
+
+from cabinet.models import Client
+from tiktok_uploader.models import BulkUploadTask, ServerAccount, ServerTask, TikTokAccount, TikTokServer
+from tiktok_uploader.services import bulk_sharding
+
+
+class ServerTaskSlotTests(TestCase):
+    """Учет слотов сервера: reserve_slot/release_slot и полное сохранение задачи"""
+
+    def setUp(self):
+        self.server = TikTokServer.objects.create(
+            name='srv-1', host='127.0.0.1', port=8000, max_concurrent_tasks=1,
+        )
+
+    def _task(self, name='task'):
+        return ServerTask.objects.create(server=self.server, task_type='UPLOAD', name=name)
+
+    def _active_tasks(self):
+        self.server.refresh_from_db()
+        return self.server.active_tasks
+
+    def test_reserve_respects_capacity(self):
+        first, second = self._task('a'), self._task('b')
+        self.assertTrue(first.reserve_slot())
+        self.assertFalse(second.reserve_slot())
+        self.assertEqual(self._active_tasks(), 1)
+        # Повторный reserve той же задачи слот не занимает
+        self.assertTrue(first.reserve_slot())
+        self.assertEqual(self._active_tasks(), 1)
+
+    def test_release_is_idempotent(self):
+        task = self._task()
+        task.reserve_slot()
+        task.release_slot()
+        task.release_slot()
+        self.assertEqual(self._active_tasks(), 0)
+        self.assertFalse(ServerTask.objects.get(id=task.id).holds_slot)
+
+    def test_stale_instance_save_does_not_restore_slot(self):
+        task = self._task()
+        task.reserve_slot()
+        stale = ServerTask.objects.get(id=task.id)
+        self.assertTrue(stale.holds_slot)
+
+        task.release_slot()
+        # Экземпляр с устаревшим holds_slot=True сохраняется целиком
+        stale.status = 'CANCELLED'
+        stale.save()
+        stale.release_slot()
+
+        task.refresh_from_db()
+        self.assertEqual(task.status, 'CANCELLED')
+        self.assertFalse(task.holds_slot)
+        self.assertEqual(self._active_tasks(), 0)
+
+    def test_release_does_not_free_other_tasks_slot(self):
+        task = self._task('a')
+        task.reserve_slot()
+        task.release_slot()
+        other = self._task('b')
+        self.assertTrue(other.reserve_slot())
+        # Задача, уже отдавшая слот, не освобождает чужой
+        task.mark_as_failed('boom')
+        self.assertEqual(self._active_tasks(), 1)
+
+
+class BulkShardingTests(TestCase):
+    """Разбиение задачи по серверам и сводка статусов шардов"""
+
+    def _server(self, name, total_accounts, max_tasks=1):
+        return TikTokServer.objects.create(
+            name=name, host='127.0.0.1', port=8000, status='ONLINE', is_active=True,
+            total_accounts=total_accounts, max_concurrent_tasks=max_tasks,
+        )
+
+    def test_plan_shards_respects_server_accounts_after_affinity(self):
+        first = self._server('srv-a', total_accounts=10)
+        second = self._server('srv-b', total_accounts=10)
+        client = Client.objects.create(name='client-1')
+        for i in range(8):
+            account = TikTokAccount.objects.create(username=f"acc{i}", password='x', client=client)
+            ServerAccount.objects.create(account=account, server=first, status='ASSIGNED')
+
+        plan = dict((server.id, count) for server, count in bulk_sharding.plan_shards(14, 'client-1'))
+
+        self.assertEqual(sum(plan.values()), 14)
+        self.assertLessEqual(plan[first.id], first.total_accounts)
+        self.assertEqual(plan[second.id], 4)
+
+    def test_plan_shards_without_servers(self):
+        self.assertEqual(bulk_sharding.plan_shards(5, 'nobody'), [])
+
+    def test_partition_videos_by_weight(self):
+        shards = bulk_sharding.partition_videos(list(range(10)), [3, 1])
+        self.assertEqual([len(shard) for shard in shards], [7, 3])
+        self.assertEqual(sum(shards, []), list(range(10)))
+
+    def test_partition_videos_repeats_when_short(self):
+        self.assertEqual(bulk_sharding.partition_videos(['a', 'b'], [1, 1, 1]), [['a'], ['b'], ['a']])
+        self.assertEqual(bulk_sharding.partition_videos([], [1, 2]), [[], []])
+
+    def _summary_status(self, *statuses):
+        server = self._server(f"srv-{len(statuses)}-{'-'.join(statuses)}", total_accounts=0)
+        task = BulkUploadTask.objects.create(name='bulk')
+        for status in statuses:
+            ServerTask.objects.create(
+                server=server, task_type='UPLOAD', name='shard', status=status, bulk_upload_task=task,
+                parameters={'accounts_count': 1},
+            )
+        return bulk_sharding.summarize_shards(task)['status']
+
+    def test_summarize_shards_status(self):
+        self.assertEqual(self._summary_status('COMPLETED', 'COMPLETED'), 'COMPLETED')
+        self.assertEqual(self._summary_status('COMPLETED', 'RUNNING'), 'RUNNING')
+        self.assertEqual(self._summary_status('PENDING', 'PENDING'), 'PENDING')
+        self.assertEqual(self._summary_status('COMPLETED', 'FAILED'), 'PARTIALLY_COMPLETED')
+        self.assertEqual(self._summary_status('FAILED', 'CANCELLED'), 'FAILED')
+        self.assertEqual(self._summary_status('CANCELLED', 'CANCELLED'), 'CANCELLED')
+        self.assertEqual(self._summary_status('COMPLETED', 'CANCELLED'), 'CANCELLED')
+
+
+class TaskSyncLogOffsetTests(TestCase):
+    """log_offset запроса статуса — число полученных строк, а не переводов строк в логе"""
+
+    def setUp(self):
+        server = TikTokServer.objects.create(name='srv-sync', host='127.0.0.1', port=8000)
+        self.task = ServerTask.objects.create(
+            server=server, task_type='UPLOAD', name='sync', status='RUNNING', remote_task_id='r1',
+        )
+
+    def test_incremental_logs_keep_line_count(self):
+        from tiktok_uploader.services.task_sync import apply_remote_status, received_log_lines
+
+        apply_remote_status(self.task, {'revision': '1', 'logs': ['first', 'multi\nline']})
+        self.assertEqual(received_log_lines(self.task), 2)
+
+        apply_remote_status(self.task, {'revision': '2', 'logs': ['third'], 'log_offset': 2})
+        self.assertEqual(received_log_lines(self.task), 3)
+        self.assertEqual(self.task.log, 'first\nmulti\nline\nthird')
+
+        apply_remote_status(self.task, {'revision': '3', 'logs': ['full', 'log']})
+        self.assertEqual(received_log_lines(self.task), 2)
+
+
+class AccountReservationTests(TestCase):
+    """Резервирование аккаунтов за сервером с арендой"""
+
+    def setUp(self):
+        self.client_obj = Client.objects.create(name='client-r')
+        self.server = TikTokServer.objects.create(name='srv-r1', host='127.0.0.1', port=8000)
+        self.other = TikTokServer.objects.create(name='srv-r2', host='127.0.0.2', port=8000)
+        self.accounts = [
+            TikTokAccount.objects.create(username=f"res{i}", password='x', client=self.client_obj)
+            for i in range(4)
+        ]
+
+    def _reserve(self, server, count, **kwargs):
+        from tiktok_uploader.services.account_reservation import reserve_accounts_for_server
+        return reserve_accounts_for_server(server, 'client-r', count, **kwargs)
+
+    def test_leased_accounts_are_not_handed_out_twice(self):
+        first = self._reserve(self.server, 3)
+        second = self._reserve(self.other, 3)
+        first_ids = {account.id for account in first['accounts']}
+        second_ids = {account.id for account in second['accounts']}
+        self.assertEqual(len(first_ids), 3)
+        self.assertEqual(len(second_ids), 1)
+        self.assertFalse(first_ids & second_ids)
+        self.assertEqual(
+            ServerAccount.objects.filter(lease_id=first['lease']['id'], server=self.server).count(), 3
+        )
+
+    def test_own_accounts_come_first(self):
+        own = self.accounts[0]
+        ServerAccount.objects.create(account=own, server=self.server, status='FREE')
+        reserved = self._reserve(self.server, 1)
+        self.assertEqual([account.id for account in reserved['accounts']], [own.id])
+
+    def test_release_and_expired_lease_free_accounts(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        from tiktok_uploader.services.account_reservation import release_leased_accounts, renew_lease
+
+        lease = self._reserve(self.server, 4)['lease']
+        self.assertEqual(renew_lease(self.server.id, lease['id'])['renewed'], 4)
+        self.assertEqual(release_leased_accounts(self.server.id, usernames=['res0'], lease_id=lease['id']), 1)
+        self.assertEqual(len(self._reserve(self.other, 4)['accounts']), 1)
+
+        ServerAccount.objects.filter(server=self.server).update(lease_expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(len(self._reserve(self.other, 4)['accounts']), 3)
+
+
+class AccountSyncParserTests(TestCase):
+    """Разбор и применение пакетной синхронизации аккаунтов"""
+
+    def test_parse_json_array_and_envelope(self):
+        from tiktok_uploader.services.account_sync import parse_sync_payload
+
+        items, meta = parse_sync_payload(b'[{"username": "a"}, {"username": "b"}]', 'application/json')
+        self.assertEqual([item['username'] for item in items], ['a', 'b'])
+        self.assertEqual(meta, {})
+
+        items, meta = parse_sync_payload(b'{"server_id": 7, "accounts": [{"username": "a"}]}')
+        self.assertEqual(items, [{'username': 'a'}])
+        self.assertEqual(meta, {'server_id': 7})
+
+    def test_parse_gzip_ndjson_keeps_line_errors(self):
+        import gzip
+        from tiktok_uploader.services.account_sync import parse_sync_payload
+
+        body = gzip.compress(b'{"username": "a"}\n\nnot json\n{"username": "b"}\n')
+        items, _ = parse_sync_payload(body, 'application/x-ndjson', 'gzip')
+        self.assertEqual(items[0], {'username': 'a'})
+        self.assertIsInstance(items[1], str)
+        self.assertIn('line 3', items[1])
+        self.assertEqual(items[2], {'username': 'b'})
+
+    def test_parse_rejects_oversized_gzip(self):
+        import gzip
+        from unittest.mock import patch
+        from tiktok_uploader.services import account_sync
+
+        with patch.object(account_sync, 'ACCOUNT_SYNC_MAX_BYTES', 16):
+            with self.assertRaises(ValueError):
+                account_sync.parse_sync_payload(gzip.compress(b'[' + b' ' * 64 + b']'))
+
+    def test_apply_reports_per_item_results(self):
+        from tiktok_uploader.services.account_sync import apply_account_updates
+
+        server = TikTokServer.objects.create(name='srv-s', host='127.0.0.1', port=8000)
+        account = TikTokAccount.objects.create(username='synced', password='x')
+        ServerAccount.objects.create(account=account, server=server, status='ASSIGNED')
+        TikTokAccount.objects.create(username='plain', password='x')
+
+        results = apply_account_updates([
+            {'username': 'synced', 'status': 'LIMITED', 'dolphin_profile_id': 'p1', 'cookies': [{'name': 'sid'}]},
+            {'username': 'plain', 'fingerprint': 'bad'},
+            {'username': 'missing'},
+            'Invalid JSON on line 4',
+            {'username': 'plain', 'status': 'BLOCKED'},
+        ], server_id=server.id)
+
+        self.assertEqual([r['success'] for r in results], [True, False, False, False, True])
+        self.assertTrue(results[0]['assignment'])
+        self.assertFalse(results[4]['assignment'])
+        account.refresh_from_db()
+        self.assertEqual((account.status, account.dolphin_profile_id), ('LIMITED', 'p1'))
+        self.assertEqual(account.server_assignment.cookies_from_server, [{'name': 'sid'}])
+        self.assertEqual(TikTokAccount.objects.get(username='plain').status, 'BLOCKED')
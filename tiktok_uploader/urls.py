@@ -50,6 +50,8 @@ urlpatterns = [
     path('proxies/create/', views_proxies.create_proxy, name='create_proxy'),
     path('proxies/import/', views_proxies.import_proxies, name='import_proxies'),
     path('proxies/validate-all/', views_proxies.validate_all_proxies, name='validate_all_proxies'),
+    path('proxies/validate-all/status/', views_proxies.proxy_validation_status, name='proxy_validation_status'),
+    path('proxies/validate-all/status/<str:job_id>/', views_proxies.proxy_validation_status, name='proxy_validation_job_status'),
     path('proxies/cleanup-inactive/', views_proxies.cleanup_inactive_proxies, name='cleanup_inactive_proxies'),
     path('proxies/<int:proxy_id>/edit/', views_proxies.edit_proxy, name='edit_proxy'),
     path('proxies/<int:proxy_id>/test/', views_proxies.test_proxy, name='test_proxy'),
@@ -150,7 +152,9 @@ urlpatterns = [
     # API для резервирования аккаунтов (используется серверами)
     path('api/accounts/reserve/', views_api_accounts.reserve_accounts, name='api_reserve_accounts'),
     path('api/accounts/release/', views_api_accounts.release_accounts, name='api_release_accounts'),
+    path('api/accounts/lease/renew/', views_api_accounts.renew_accounts_lease, name='api_renew_accounts_lease'),
     path('api/accounts/sync/', views_api_accounts.sync_account_data, name='api_sync_account'),
+    path('api/accounts/sync/batch/', views_api_accounts.sync_accounts_batch, name='api_sync_accounts_batch'),
     path('api/accounts/count/', views_api_accounts.get_available_accounts_count, name='api_accounts_count'),
     
     # Страницы управления серверами
@@ -14,7 +14,13 @@ from django.utils import timezone
 import json
 import logging
 
-from tiktok_uploader.models import TikTokAccount, TikTokProxy, ServerAccount, TikTokServer
+from tiktok_uploader.models import TikTokAccount, TikTokProxy, TikTokServer
+from tiktok_uploader.services.account_reservation import (
+    release_leased_accounts,
+    renew_lease,
+    reserve_accounts_for_server,
+)
+from tiktok_uploader.services.account_sync import apply_account_updates, parse_sync_payload
 
 logger = logging.getLogger(__name__)
 
@@ -37,14 +43,16 @@ def reserve_accounts(request):
             "client": str,
             "tag": str (optional),
             "count": int,
-            "status_filter": str (optional, default: "ACTIVE")
+            "status_filter": str (optional, default: "ACTIVE"),
+            "lease_seconds": int (optional, default: TIKTOK_ACCOUNT_LEASE_SEC)
         }
     
     Returns:
         {
             "success": true,
             "accounts": [...],
-            "count": int
+            "count": int,
+            "lease": {"id": str, "expires_at": str}
         }
     """
     try:
@@ -72,94 +80,55 @@ def reserve_accounts(request):
                 'error': f'Server with id {server_id} not found'
             }, status=404)
         
-        # Получаем аккаунты с учетом фильтров
-        with transaction.atomic():
-            # Базовый запрос
-            accounts_query = TikTokAccount.objects.filter(
-                client__name=client,
-                status=status_filter
-            ).select_related('proxy', 'current_proxy', 'client')
-            
-            # Фильтр по тематике
-            if tag:
-                accounts_query = accounts_query.filter(tag=tag)
-            
-            # Приоритет: аккаунты, которые уже назначены на этот сервер
-            # (чтобы не пересоздавать профили Dolphin)
-            accounts_on_server = accounts_query.filter(
-                server_assignment__server=server
-            )[:count]
-            
-            accounts_list = list(accounts_on_server)
-            remaining_count = count - len(accounts_list)
-            
-            # Если не хватает, берем свободные аккаунты
-            if remaining_count > 0:
-                free_accounts = accounts_query.filter(
-                    server_assignment__isnull=True
-                ).order_by('-created_at')[:remaining_count]
-                
-                accounts_list.extend(free_accounts)
-            
-            # Если все еще не хватает, берем с других серверов (в крайнем случае)
-            if len(accounts_list) < count:
-                remaining_count = count - len(accounts_list)
-                other_server_accounts = accounts_query.exclude(
-                    id__in=[acc.id for acc in accounts_list]
-                ).order_by('-created_at')[:remaining_count]
-                
-                accounts_list.extend(other_server_accounts)
+        # Блокируем и назначаем аккаунты (SKIP LOCKED, постоянное число запросов)
+        reservation = reserve_accounts_for_server(
+            server,
+            client=client,
+            count=count,
+            tag=tag,
+            status_filter=status_filter,
+            lease_seconds=data.get('lease_seconds'),
+        )
+        
+        # Формируем ответ
+        accounts_data = []
+        for account in reservation['accounts']:
+            acc_data = {
+                'id': account.id,
+                'username': account.username,
+                'password': account.password,
+                'email': account.email,
+                'email_password': account.email_password,
+                'phone_number': account.phone_number,
+                'dolphin_profile_id': account.dolphin_profile_id,
+                'locale': account.locale,
+                'status': account.status,
+                'tag': account.tag,
+            }
             
-            # Назначаем аккаунты на сервер
-            for account in accounts_list:
-                ServerAccount.objects.update_or_create(
-                    account=account,
-                    defaults={
-                        'server': server,
-                        'status': 'ASSIGNED',
-                        'assigned_at': timezone.now()
-                    }
-                )
+            # Прокси
+            proxy = account.current_proxy or account.proxy
+            if proxy:
+                acc_data['proxy'] = {
+                    'host': proxy.host,
+                    'port': proxy.port,
+                    'username': proxy.username,
+                    'password': proxy.password,
+                    'type': proxy.proxy_type.lower(),
+                    'ip_change_url': proxy.ip_change_url,
+                }
             
-            # Формируем ответ
-            accounts_data = []
-            for account in accounts_list:
-                acc_data = {
-                    'id': account.id,
-                    'username': account.username,
-                    'password': account.password,
-                    'email': account.email,
-                    'email_password': account.email_password,
-                    'phone_number': account.phone_number,
-                    'dolphin_profile_id': account.dolphin_profile_id,
-                    'locale': account.locale,
-                    'status': account.status,
-                    'tag': account.tag,
+            # Информация о назначении на сервер
+            server_assignment = reservation['assignments'].get(account.id)
+            if server_assignment:
+                acc_data['server_assignment'] = {
+                    'dolphin_profile_id_on_server': server_assignment.dolphin_profile_id_on_server,
+                    'last_used_at': server_assignment.last_used_at.isoformat() if server_assignment.last_used_at else None,
                 }
-                
-                # Прокси
-                proxy = account.current_proxy or account.proxy
-                if proxy:
-                    acc_data['proxy'] = {
-                        'host': proxy.host,
-                        'port': proxy.port,
-                        'username': proxy.username,
-                        'password': proxy.password,
-                        'type': proxy.proxy_type.lower(),
-                        'ip_change_url': proxy.ip_change_url,
-                    }
-                
-                # Информация о назначении на сервер
-                try:
-                    server_assignment = account.server_assignment
-                    acc_data['server_assignment'] = {
-                        'dolphin_profile_id_on_server': server_assignment.dolphin_profile_id_on_server,
-                        'last_used_at': server_assignment.last_used_at.isoformat() if server_assignment.last_used_at else None,
-                    }
-                except:
-                    acc_data['server_assignment'] = None
-                
-                accounts_data.append(acc_data)
+            else:
+                acc_data['server_assignment'] = None
+            
+            accounts_data.append(acc_data)
         
         logger.info(f"Reserved {len(accounts_data)} accounts for server {server.name} (client: {client}, tag: {tag})")
         
@@ -168,7 +137,11 @@ def reserve_accounts(request):
             'accounts': accounts_data,
             'count': len(accounts_data),
             'server_id': server_id,
-            'server_name': server.name
+            'server_name': server.name,
+            'lease': {
+                'id': reservation['lease']['id'],
+                'expires_at': reservation['lease']['expires_at'].isoformat(),
+            },
         })
         
     except json.JSONDecodeError:
@@ -193,7 +166,8 @@ def release_accounts(request):
     POST data:
         {
             "server_id": int,
-            "usernames": [str, ...]
+            "usernames": [str, ...],
+            "lease_id": str (optional, вместо или вместе с usernames)
         }
     
     Returns:
@@ -207,29 +181,16 @@ def release_accounts(request):
         
         server_id = data.get('server_id')
         usernames = data.get('usernames', [])
+        lease_id = data.get('lease_id')
         
-        if not server_id or not usernames:
+        if not server_id or not (usernames or lease_id):
             return JsonResponse({
                 'success': False,
-                'error': 'server_id and usernames are required'
+                'error': 'server_id and usernames (or lease_id) are required'
             }, status=400)
         
-        # Освобождаем аккаунты
-        with transaction.atomic():
-            accounts = TikTokAccount.objects.filter(username__in=usernames)
-            
-            released_count = 0
-            for account in accounts:
-                try:
-                    server_assignment = account.server_assignment
-                    if server_assignment and server_assignment.server_id == server_id:
-                        # Не удаляем назначение, просто обновляем статус
-                        server_assignment.status = 'FREE'
-                        server_assignment.last_used_at = timezone.now()
-                        server_assignment.save()
-                        released_count += 1
-                except:
-                    pass
+        # Освобождаем аккаунты одним UPDATE
+        released_count = release_leased_accounts(server_id, usernames=usernames, lease_id=lease_id)
         
         logger.info(f"Released {released_count} accounts from server {server_id}")
         
@@ -251,6 +212,64 @@ def release_accounts(request):
         }, status=500)
 
 
+@csrf_exempt
+@require_http_methods(["POST"])
+def renew_accounts_lease(request):
+    """
+    API: Продлить аренду зарезервированных аккаунтов (для долгих задач).
+    
+    POST data:
+        {
+            "server_id": int,
+            "lease_id": str,
+            "lease_seconds": int (optional)
+        }
+    
+    Returns:
+        {
+            "success": true,
+            "renewed_count": int,
+            "expires_at": str
+        }
+    """
+    try:
+        data = json.loads(request.body)
+        
+        server_id = data.get('server_id')
+        lease_id = data.get('lease_id')
+        
+        if not server_id or not lease_id:
+            return JsonResponse({
+                'success': False,
+                'error': 'server_id and lease_id are required'
+            }, status=400)
+        
+        result = renew_lease(server_id, lease_id, data.get('lease_seconds'))
+        if not result['renewed']:
+            return JsonResponse({
+                'success': False,
+                'error': 'Lease not found or already expired'
+            }, status=404)
+        
+        return JsonResponse({
+            'success': True,
+            'renewed_count': result['renewed'],
+            'expires_at': result['expires_at'].isoformat()
+        })
+        
+    except json.JSONDecodeError:
+        return JsonResponse({
+            'success': False,
+            'error': 'Invalid JSON'
+        }, status=400)
+    except Exception as e:
+        logger.error(f"Error renewing accounts lease: {str(e)}", exc_info=True)
+        return JsonResponse({
+            'success': False,
+            'error': str(e)
+        }, status=500)
+
+
 @csrf_exempt
 @require_http_methods(["POST"])
 def sync_account_data(request):
@@ -354,6 +373,70 @@ def sync_account_data(request):
         }, status=500)
 
 
+@csrf_exempt
+@require_http_methods(["POST"])
+def sync_accounts_batch(request):
+    """
+    API: Пакетная синхронизация данных аккаунтов с сервера (после прогона бустера).
+    
+    Тело запроса — JSON массив, объект {"server_id": int, "accounts": [...]}
+    или NDJSON (Content-Type: application/x-ndjson). Поддерживается
+    Content-Encoding: gzip. Каждый элемент — как в sync_account_data:
+        {
+            "username": str,
+            "dolphin_profile_id": str (optional),
+            "cookies": [...] (optional),
+            "fingerprint": {...} (optional),
+            "status": str (optional)
+        }
+    
+    server_id передается в query (?server_id=) или в объекте пакета.
+    
+    Returns:
+        {
+            "success": true,
+            "updated": int,
+            "failed": int,
+            "results": [{"index", "username", "success", "error"?, "assignment"?}, ...]
+        }
+    """
+    try:
+        items, batch = parse_sync_payload(
+            request.body,
+            content_type=request.content_type or '',
+            content_encoding=request.headers.get('Content-Encoding', ''),
+        )
+        server_id = request.GET.get('server_id') or batch.get('server_id')
+        
+        if not server_id:
+            return JsonResponse({
+                'success': False,
+                'error': 'server_id is required'
+            }, status=400)
+        
+        results = apply_account_updates(items, server_id=server_id)
+        failed = sum(1 for result in results if not result['success'])
+        
+        return JsonResponse({
+            'success': True,
+            'updated': len(results) - failed,
+            'failed': failed,
+            'results': results
+        })
+        
+    except (json.JSONDecodeError, UnicodeDecodeError, OSError, ValueError) as e:
+        return JsonResponse({
+            'success': False,
+            'error': f'Invalid payload: {str(e)}'
+        }, status=400)
+    except Exception as e:
+        logger.error(f"Error batch syncing account data: {str(e)}", exc_info=True)
+        return JsonResponse({
+            'success': False,
+            'error': str(e)
+        }, status=500)
+
+
 @require_http_methods(["GET"])
 def get_available_accounts_count(request):
     """
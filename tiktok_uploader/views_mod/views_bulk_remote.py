@@ -22,6 +22,8 @@ from tiktok_uploader.models import (
     TikTokServer, ServerTask, TikTokAccount
 )
 from tiktok_uploader.services.server_api_client import ServerAPIClient, ServerManager
+from tiktok_uploader.services.bulk_sharding import partition_videos, plan_shards, summarize_shards
+from tiktok_uploader.services.task_sync import sync_if_stale
 from cabinet.models import Client
 
 
@@ -46,7 +48,7 @@ def create_remote_bulk_upload(request):
         - client_id: ID клиента
         - tag: тематика (fim, memes и т.д.)
         - accounts_count: количество аккаунтов (вместо выбора конкретных!)
-        - server_id: ID сервера (или "auto" для автовыбора)
+        - server_id: ID сервера ("auto" для автовыбора, "shard" — разделить задачу между серверами)
         - cycles: количество циклов загрузки
         - cycle_timeout_minutes: задержка между циклами
         - delay_min_sec: минимальная задержка между загрузками
@@ -89,9 +91,17 @@ def create_remote_bulk_upload(request):
                 return redirect('tiktok_uploader:create_remote_bulk_upload')
             
             # Выбор сервера
-            if server_id == 'auto':
+            shard_plan = None
+            if server_id == 'shard':
+                # Аккаунты делятся между серверами: сначала туда, где они уже закреплены
+                shard_plan = plan_shards(accounts_count, client.name, tag or None)
+                if not shard_plan:
+                    messages.error(request, 'Нет доступных серверов')
+                    return redirect('tiktok_uploader:create_remote_bulk_upload')
+                server = shard_plan[0][0]
+            elif server_id == 'auto':
                 # Автоматический выбор лучшего сервера
-                server = ServerManager.select_best_server()
+                server = ServerManager.select_best_server(accounts_needed=accounts_count)
                 if not server:
                     messages.error(request, 'Нет доступных серверов')
                     return redirect('tiktok_uploader:create_remote_bulk_upload')
@@ -103,7 +113,7 @@ def create_remote_bulk_upload(request):
                     return redirect('tiktok_uploader:create_remote_bulk_upload')
             
             # Проверяем доступность сервера
-            if not server.is_available():
+            if not shard_plan and not server.is_available():
                 messages.warning(request, f'Сервер {server.name} перегружен или недоступен. Задача будет добавлена в очередь.')
             
             # Создаем локальную задачу для отслеживания
@@ -130,19 +140,31 @@ def create_remote_bulk_upload(request):
                     'cycle_timeout_minutes': cycle_timeout_minutes,
                     'delay_min_sec': delay_min_sec,
                     'delay_max_sec': delay_max_sec,
+                    # Сервер выбран автоматически: при отправке можно перейти на другой
+                    'auto_server': server_id == 'auto',
                 }
                 
-                # Создаем ServerTask для отслеживания
-                server_task = ServerTask.objects.create(
-                    server=server,
-                    task_type='UPLOAD',
-                    name=name,
-                    status='PENDING',
-                    bulk_upload_task=task,
-                    parameters=task_params
-                )
+                # Создаем ServerTask для отслеживания (по одной на шард)
+                for index, (shard_server, shard_accounts) in enumerate(shard_plan or [(server, accounts_count)]):
+                    shard_params = dict(task_params, accounts_count=shard_accounts)
+                    shard_name = name
+                    if shard_plan:
+                        shard_params.update(shard_index=index, shard_count=len(shard_plan))
+                        shard_name = f"{name} [{index + 1}/{len(shard_plan)}]"
+                    ServerTask.objects.create(
+                        server=shard_server,
+                        task_type='UPLOAD',
+                        name=shard_name,
+                        status='PENDING',
+                        bulk_upload_task=task,
+                        parameters=shard_params
+                    )
             
-            messages.success(request, f'Задача "{name}" создана! Сервер: {server.name}')
+            if shard_plan:
+                distribution = ', '.join(f'{s.name}: {n}' for s, n in shard_plan)
+                messages.success(request, f'Задача "{name}" создана и разделена на {len(shard_plan)} серверов ({distribution})')
+            else:
+                messages.success(request, f'Задача "{name}" создана! Сервер: {server.name}')
             messages.info(request, 'Теперь добавьте видео для загрузки')
             return redirect('tiktok_uploader:add_remote_bulk_videos', task_id=task.id)
             
@@ -280,6 +302,7 @@ def remote_bulk_upload_review(request, task_id):
         server_task = task.server_tasks.first()
         server = server_task.server if server_task else None
     except:
+        server_task = None
         server = None
     
     videos = task.videos.order_by('order')
@@ -296,6 +319,7 @@ def remote_bulk_upload_review(request, task_id):
         'task': task,
         'server': server,
         'server_task': server_task,
+        'shards': summarize_shards(task) if task.server_tasks.count() > 1 else None,
         'videos': videos,
         'captions': captions,
         'videos_count': videos.count(),
@@ -304,42 +328,64 @@ def remote_bulk_upload_review(request, task_id):
     return render(request, 'tiktok_uploader/bulk_upload/review_remote.html', context)
 
 
-@login_required
-@require_http_methods(["POST"])
-def start_remote_bulk_upload(request, task_id):
+def _dispatch_server_task(request, task, server_task, videos):
     """
-    Отправить задачу на удаленный сервер для выполнения.
+    Отправить одну ServerTask (всю задачу или ее шард) на сервер.
     
-    Процесс:
-    1. Собрать все видео и метаданные
-    2. Закодировать видео в base64
-    3. Отправить POST /tasks/upload на сервер
-    4. Получить remote_task_id
-    5. Обновить ServerTask
-    6. Перенаправить на страницу мониторинга
+    Args:
+        videos: Список (BulkVideo, файл видео в хранилище) для этой ServerTask
+    
+    Returns:
+        bool: True если сервер принял задачу
     """
-    task = get_object_or_404(BulkUploadTask, id=task_id)
+    server = server_task.server
+    params = server_task.parameters
     
+    # Занимаем слот сервера атомарно, чтобы параллельные отправки его не переполнили
+    if not server_task.reserve_slot():
+        alternative = None
+        if params.get('auto_server'):
+            alternative = ServerManager.select_best_server(
+                accounts_needed=params.get('accounts_count', 0), reserve=True, exclude_ids=[server.id]
+            )
+        if alternative:
+            server_task.server = alternative
+            server_task.holds_slot = True
+            server_task.save(update_fields=['server', 'holds_slot', 'updated_at'])
+            server = alternative
+            messages.info(request, f'Сервер заполнен, задача перенесена на {server.name}')
+        else:
+            # Без слота задачу не отправляем: шард остается в PENDING и уходит при следующем запуске
+            server_task.status = 'PENDING'
+            server_task.error_message = f'Ожидает свободный слот на сервере {server.name}'
+            server_task.save(update_fields=['status', 'error_message', 'updated_at'])
+            messages.warning(
+                request,
+                f'Сервер {server.name} перегружен: задача оставлена в очереди. '
+                f'Запустите отправку снова, когда освободится слот.'
+            )
+            return False
+    
+    client_api = ServerAPIClient(server)
     try:
-        server_task = task.server_tasks.first()
-        if not server_task:
-            messages.error(request, 'ServerTask не найдена')
-            return redirect('tiktok_uploader:bulk_upload_list')
-        
-        server = server_task.server
+        blobs_ok, blobs = client_api.upload_video_blobs([video_file for _, video_file in videos])
+        if not blobs_ok and not blobs.get('unsupported'):
+            error_msg = blobs.get('error', 'Unknown error')
+            messages.error(request, f'Ошибка загрузки видео на сервер {server.name}: {error_msg}')
+            server_task.status = 'FAILED'
+            server_task.error_message = error_msg
+            server_task.save(update_fields=['status', 'error_message', 'updated_at'])
+            server_task.release_slot()
+            return False
+        if blobs_ok:
+            messages.info(
+                request,
+                f"Видео на сервере {server.name}: загружено {blobs['uploaded']}, "
+                f"уже были {blobs['skipped']}"
+            )
         
-        # Подготавливаем видео для отправки
         videos_data = []
-        for video in task.videos.order_by('order'):
-            # Читаем файл и кодируем в base64
-            try:
-                with video.video_file.open('rb') as f:
-                    video_content = f.read()
-                    video_base64 = base64.b64encode(video_content).decode('utf-8')
-            except Exception as e:
-                messages.error(request, f'Ошибка чтения видео {video.video_file.name}: {str(e)}')
-                continue
-            
+        for video, video_file in videos:
             # Получаем описание для этого видео
             caption = video.caption or video.get_effective_caption()
             hashtags_text = video.hashtags or video.get_effective_hashtags()
@@ -347,17 +393,18 @@ def start_remote_bulk_upload(request, task_id):
             
             video_dict = {
                 'filename': video.video_file.name,
-                'file_base64': video_base64,
                 'caption': caption,
                 'hashtags': hashtags_list,
             }
+            if blobs_ok:
+                video_dict['blob_sha256'] = blobs['hashes'][video_file]
+            else:
+                # Сервер без blob API: старый протокол с base64 в JSON
+                with video_file.open('rb') as f:
+                    video_dict['file_base64'] = base64.b64encode(f.read()).decode('utf-8')
             
             videos_data.append(video_dict)
         
-        if not videos_data:
-            messages.error(request, 'Нет видео для отправки')
-            return redirect('tiktok_uploader:remote_bulk_upload_review', task_id=task_id)
-        
         # Подготавливаем настройки
         default_settings = {
             'allow_comments': task.allow_comments,
@@ -366,12 +413,7 @@ def start_remote_bulk_upload(request, task_id):
             'privacy': task.default_privacy,
         }
         
-        # Получаем параметры из ServerTask
-        params = server_task.parameters
-        
         # Отправляем на сервер через API
-        client_api = ServerAPIClient(server)
-        
         messages.info(request, f'Отправка задачи на сервер {server.name}...')
         
         success, result = client_api.create_upload_task(
@@ -385,35 +427,97 @@ def start_remote_bulk_upload(request, task_id):
             delay_max_sec=params.get('delay_max_sec', 60),
             default_settings=default_settings
         )
-        
+    except Exception:
+        server_task.release_slot()
+        raise
+    finally:
         client_api.close()
+    
+    if success:
+        # Обновляем ServerTask
+        server_task.remote_task_id = result.get('task_id')
+        server_task.status = result.get('status', 'QUEUED')
+        server_task.parameters = dict(params, video_ids=[video.id for video, _ in videos])
+        server_task.error_message = ''
+        server_task.mark_as_started()
         
-        if success:
-            # Обновляем ServerTask
-            server_task.remote_task_id = result.get('task_id')
-            server_task.status = result.get('status', 'QUEUED')
-            server_task.mark_as_started()
-            
-            # Обновляем локальную задачу
-            task.status = 'RUNNING'
-            task.started_at = timezone.now()
-            task.save()
-            
-            messages.success(request, f'Задача успешно отправлена на сервер {server.name}!')
-            messages.info(request, f'ID задачи на сервере: {server_task.remote_task_id}')
-            messages.info(request, f'Статус: {server_task.status}')
-            
-            return redirect('tiktok_uploader:remote_task_detail', task_id=server_task.id)
-        else:
-            error_msg = result.get('error', 'Unknown error')
-            messages.error(request, f'Ошибка отправки на сервер: {error_msg}')
-            
-            server_task.status = 'FAILED'
-            server_task.error_message = error_msg
-            server_task.save()
-            
+        messages.success(request, f'Задача успешно отправлена на сервер {server.name}!')
+        messages.info(request, f'ID задачи на сервере: {server_task.remote_task_id}')
+        messages.info(request, f'Статус: {server_task.status}')
+        return True
+    
+    error_msg = result.get('error', 'Unknown error')
+    messages.error(request, f'Ошибка отправки на сервер {server.name}: {error_msg}')
+    
+    server_task.status = 'FAILED'
+    server_task.error_message = error_msg
+    server_task.save(update_fields=['status', 'error_message', 'updated_at'])
+    server_task.release_slot()
+    return False
+
+
+@login_required
+@require_http_methods(["POST"])
+def start_remote_bulk_upload(request, task_id):
+    """
+    Отправить задачу на удаленный сервер (или серверы, в режиме шардирования).
+    
+    Процесс:
+    1. Собрать все видео и метаданные
+    2. Разделить видео между шардами пропорционально числу аккаунтов
+    3. Для каждого шарда: загрузить на сервер недостающие видео (по SHA-256,
+       чанками с диска) и отправить POST /tasks/upload со ссылками на видео по хэшу
+    4. Получить remote_task_id, обновить ServerTask
+    5. Перенаправить на страницу мониторинга
+    """
+    task = get_object_or_404(BulkUploadTask, id=task_id)
+    
+    try:
+        server_tasks = list(task.server_tasks.select_related('server').order_by('id'))
+        if not server_tasks:
+            messages.error(request, 'ServerTask не найдена')
+            return redirect('tiktok_uploader:bulk_upload_list')
+        
+        # Видео читаются потоково из хранилища; сервер получает только те, которых у него еще нет
+        videos = []
+        for video in task.videos.order_by('order'):
+            try:
+                if not video.video_file or not video.video_file.storage.exists(video.video_file.name):
+                    raise FileNotFoundError(video.video_file.name)
+            except Exception as e:
+                messages.error(request, f'Ошибка чтения видео {video.video_file.name}: {str(e)}')
+                continue
+            videos.append((video, video.video_file))
+        
+        if not videos:
+            messages.error(request, 'Нет видео для отправки')
+            return redirect('tiktok_uploader:remote_bulk_upload_review', task_id=task_id)
+        
+        shard_videos = partition_videos(
+            videos, [int(st.parameters.get('accounts_count') or 1) for st in server_tasks]
+        )
+        
+        dispatched = []
+        for server_task, assigned_videos in zip(server_tasks, shard_videos):
+            # Уже отправленные шарды при повторном запуске не трогаем
+            if server_task.remote_task_id and server_task.status in ('QUEUED', 'RUNNING', 'COMPLETED'):
+                continue
+            if _dispatch_server_task(request, task, server_task, assigned_videos):
+                dispatched.append(server_task)
+        
+        if not dispatched:
             return redirect('tiktok_uploader:remote_bulk_upload_review', task_id=task_id)
         
+        # Обновляем локальную задачу
+        task.status = 'RUNNING'
+        task.started_at = task.started_at or timezone.now()
+        task.save()
+        
+        if len(server_tasks) == 1:
+            return redirect('tiktok_uploader:remote_task_detail', task_id=dispatched[0].id)
+        messages.success(request, f'Отправлено шардов: {len(dispatched)} из {len(server_tasks)}')
+        return redirect('tiktok_uploader:remote_bulk_upload_review', task_id=task_id)
+        
     except Exception as e:
         messages.error(request, f'Ошибка: {str(e)}')
         return redirect('tiktok_uploader:remote_bulk_upload_review', task_id=task_id)
@@ -433,35 +537,9 @@ def remote_task_detail(request, task_id):
     """
     server_task = get_object_or_404(ServerTask, id=task_id)
     
-    # Обновляем статус с сервера
-    if server_task.remote_task_id and server_task.status in ['QUEUED', 'RUNNING']:
-        try:
-            client = ServerAPIClient(server_task.server)
-            success, status_data = client.get_task_status(server_task.remote_task_id)
-            client.close()
-            
-            if success:
-                server_task.status = status_data.get('status', server_task.status)
-                server_task.progress = status_data.get('progress', 0)
-                
-                # Обновляем логи
-                if 'logs' in status_data:
-                    server_task.log = '\n'.join(status_data['logs'])
-                
-                # Если завершена
-                if server_task.status == 'COMPLETED':
-                    server_task.mark_as_completed(status_data.get('result'))
-                elif server_task.status == 'FAILED':
-                    server_task.mark_as_failed(status_data.get('errors', 'Unknown error'))
-                else:
-                    server_task.save()
-                
-                # Обновляем локальную задачу
-                if server_task.bulk_upload_task:
-                    server_task.bulk_upload_task.status = server_task.status
-                    server_task.bulk_upload_task.save()
-        except Exception as e:
-            messages.warning(request, f'Не удалось обновить статус: {str(e)}')
+    # Статус и прогресс обновляет фоновая синхронизация (manage.py sync_server_tasks);
+    # если она давно не обновляла задачу — синхронизируем сами
+    sync_if_stale(server_task)
     
     context = {
         'server_task': server_task,
@@ -489,7 +567,8 @@ def stop_remote_task(request, task_id):
         
         if success:
             server_task.status = 'CANCELLED'
-            server_task.save()
+            server_task.save(update_fields=['status', 'updated_at'])
+            server_task.release_slot()
             messages.success(request, 'Задача остановлена')
         else:
             messages.error(request, f'Ошибка остановки: {result.get("error")}')
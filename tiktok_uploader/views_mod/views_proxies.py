@@ -17,6 +17,7 @@ import re
 from ..models import TikTokProxy, TikTokAccount
 from ..forms import TikTokProxyForm, BulkProxyImportForm
 from ..utils import validate_proxy, parse_proxy_string
+from ..services.proxy_validation import get_current_validation_job, get_validation_job, start_proxy_validation
 
 
 # ============================================================================
@@ -527,14 +528,14 @@ def import_proxies(request):
 @login_required
 def validate_all_proxies(request):
     """
-    Валидация всех прокси.
+    Запуск фоновой валидации всех (или выбранных) прокси.
+    
+    Проверка выполняется в фоне (services.proxy_validation), прогресс
+    доступен через proxy_validation_status.
     
     Returns:
-        redirect: на proxy_list с результатами
+        redirect: на proxy_list (JSON с job_id для AJAX запросов)
     """
-    import threading
-    from concurrent.futures import ThreadPoolExecutor, as_completed
-    
     # Получаем все прокси или выбранные
     proxy_ids = request.POST.getlist('proxy_ids[]') if request.method == 'POST' else []
     
@@ -543,85 +544,41 @@ def validate_all_proxies(request):
     else:
         proxies = TikTokProxy.objects.all()
     
-    if not proxies.exists():
+    total = proxies.count()
+    is_ajax = request.headers.get('X-Requested-With') == 'XMLHttpRequest'
+    
+    if not total:
+        if is_ajax:
+            return JsonResponse({'success': False, 'error': 'No proxies found to validate.'}, status=400)
         messages.warning(request, 'No proxies found to validate.')
         return redirect('tiktok_uploader:proxy_list')
     
-    total = proxies.count()
+    job_id, started = start_proxy_validation(proxy_ids or None)
     
-    # Статистика
-    stats = {
-        'total': total,
-        'active': 0,
-        'inactive': 0,
-        'errors': 0
-    }
-    
-    def validate_single_proxy(proxy):
-        """Валидация одного прокси."""
-        try:
-            is_valid, message, geo_info = validate_proxy(
-                host=proxy.host,
-                port=proxy.port,
-                username=proxy.username,
-                password=proxy.password,
-                timeout=15,
-                proxy_type=proxy.proxy_type
-            )
-            
-            proxy.last_checked = timezone.now()
-            
-            if is_valid:
-                proxy.status = 'active'
-                proxy.is_active = True
-                proxy.last_verified = timezone.now()
-                
-                # Обновление геоданных
-                if geo_info:
-                    if geo_info.get('country'):
-                        proxy.country = geo_info['country']
-                    if geo_info.get('city'):
-                        proxy.city = geo_info['city']
-                    if geo_info.get('external_ip'):
-                        proxy.external_ip = geo_info['external_ip']
-                
-                proxy.save()
-                return 'active'
-            else:
-                proxy.status = 'inactive'
-                proxy.is_active = False
-                proxy.save()
-                return 'inactive'
-                
-        except Exception as e:
-            return 'error'
-    
-    # Параллельная валидация (максимум 5 потоков одновременно)
-    with ThreadPoolExecutor(max_workers=5) as executor:
-        futures = {executor.submit(validate_single_proxy, proxy): proxy for proxy in proxies}
-        
-        for future in as_completed(futures):
-            result = future.result()
-            if result == 'active':
-                stats['active'] += 1
-            elif result == 'inactive':
-                stats['inactive'] += 1
-            else:
-                stats['errors'] += 1
-    
-    # Сообщение с результатами
-    messages.success(
-        request,
-        f'✅ Validation completed! '
-        f'Active: {stats["active"]}, '
-        f'Inactive: {stats["inactive"]}, '
-        f'Errors: {stats["errors"]} '
-        f'out of {stats["total"]} total.'
-    )
+    if is_ajax:
+        return JsonResponse({'success': True, 'job_id': job_id, 'started': started})
     
+    if started:
+        messages.info(request, f'Validation of {total} proxies has been started in the background.')
+    else:
+        messages.info(request, 'Proxy validation is already running.')
     return redirect('tiktok_uploader:proxy_list')
 
 
+@login_required
+def proxy_validation_status(request, job_id=None):
+    """
+    API: Прогресс фоновой валидации прокси (последней, если job_id не указан).
+    
+    Returns:
+        JsonResponse: {"success", "job": {"id", "status", "total", "checked", "active", "inactive", "errors", ...}}
+    """
+    job = get_validation_job(job_id) if job_id else get_current_validation_job()
+    if not job:
+        return JsonResponse({'success': False, 'error': 'Validation job not found'}, status=404)
+    return JsonResponse({'success': True, 'job': job})
+
+
 @login_required
 def cleanup_inactive_proxies(request):
     """
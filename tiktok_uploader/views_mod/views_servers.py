@@ -361,6 +361,8 @@ def server_ping_all(request):
     """
     try:
         results = ServerManager.ping_all_servers()
+        # Счетчики всех ответивших серверов — одним параллельным опросом
+        ServerManager.update_all_server_stats()
         
         online_count = sum(1 for r in results if r['is_online'])
         total_count = len(results)
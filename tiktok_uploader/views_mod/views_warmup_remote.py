@@ -21,6 +21,7 @@ from tiktok_uploader.models import (
 )
 from tiktok_uploader.services.server_api_client import ServerAPIClient, ServerManager
 from tiktok_uploader.services.server_logger import server_logger
+from tiktok_uploader.services.task_sync import sync_if_stale, sync_server_task
 from cabinet.models import Client
 
 logger = logging.getLogger('tiktok_uploader')
@@ -322,27 +323,11 @@ def warmup_task_detail(request, task_id):
         server = server_task.server
         has_server = True
         
-        # Получаем актуальную информацию с сервера
-        if server_task.remote_task_id:
-            client = ServerAPIClient(server)
-            success, result = client.get_task_status(server_task.remote_task_id)
-            client.close()
-            
-            if success:
-                # Обновляем статус задачи
-                remote_status = result.get('status')
-                if remote_status:
-                    task.status = remote_status
-                    task.save()
-                
-                server_task.status = result.get('queue_status', 'UNKNOWN')
-                server_task.save()
-                
-                # Получаем прогресс
-                progress = result.get('progress', {})
-            else:
-                progress = {}
-        else:
+        # Прогресс с сервера — из последней фоновой синхронизации (устаревшую обновляем сами)
+        if sync_if_stale(server_task):
+            task.refresh_from_db()
+        progress = server_task.remote_state.get('progress') or {}
+        if not isinstance(progress, dict):
             progress = {}
     except ServerTask.DoesNotExist:
         has_server = False
@@ -406,26 +391,16 @@ def warmup_task_start(request, task_id):
         server_task = get_object_or_404(ServerTask, warmup_task=task)
         server = server_task.server
         
-        # Получаем актуальный статус с сервера
-        client = ServerAPIClient(server)
-        success, result = client.get_task_status(server_task.remote_task_id)
-        client.close()
+        # Явная проверка: синхронизируем задачу сразу, не дожидаясь фонового цикла
+        success, result = sync_server_task(server_task)
         
         if success:
-            remote_status = result.get('status', 'UNKNOWN')
-            
-            # Обновляем локальный статус
-            task.status = remote_status
-            if remote_status == 'RUNNING' and not task.started_at:
-                task.started_at = timezone.now()
-            task.save()
-            
-            server_task.status = result.get('queue_status', remote_status)
-            server_task.save()
+            task.refresh_from_db()
+            remote_status = task.status
             
             if remote_status == 'RUNNING':
                 messages.success(request, f'Task is now running on server "{server.name}"')
-            elif remote_status == 'QUEUED':
+            elif server_task.status == 'QUEUED':
                 queue_pos = result.get('queue_position', 'unknown')
                 messages.info(request, f'Task is queued on server "{server.name}", position: {queue_pos}')
             else:
@@ -546,33 +521,19 @@ def warmup_task_logs(request, task_id):
     try:
         task = get_object_or_404(WarmupTask, id=task_id)
         server_task = ServerTask.objects.get(warmup_task=task)
-        server = server_task.server
         
-        # Получаем статус с сервера
+        # Логи и прогресс — из последней фоновой синхронизации; запрос к серверу, только если она устарела
         if server_task.remote_task_id:
-            client = ServerAPIClient(server)
-            success, result = client.get_task_status(server_task.remote_task_id)
-            client.close()
-            
-            if success:
-                # Обновляем статус
-                remote_status = result.get('status')
-                if remote_status:
-                    task.status = remote_status
-                    task.save()
-                
-                return JsonResponse({
-                    'success': True,
-                    'task_status': task.status,
-                    'logs': result.get('logs', ''),
-                    'progress': result.get('progress', {}),
-                    'accounts': result.get('accounts', []),
-                })
-            else:
-                return JsonResponse({
-                    'success': False,
-                    'error': result.get('error', 'Unknown error')
-                }, status=500)
+            if sync_if_stale(server_task):
+                task.refresh_from_db()
+            return JsonResponse({
+                'success': True,
+                'task_status': task.status,
+                'logs': server_task.log,
+                'progress': server_task.remote_state.get('progress', {}),
+                'accounts': server_task.remote_state.get('accounts', []),
+                'synced_at': server_task.last_synced_at.isoformat() if server_task.last_synced_at else None,
+            })
         else:
             return JsonResponse({
                 'success': False,
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Proxy, InstagramAccount, InstagramCookies, UploadTask, VideoFile, FollowCategory, FollowTarget, FollowTask, FollowTaskAccount
+from .models import Proxy, InstagramAccount, InstagramCookies, UploadTask, VideoFile, FollowCategory, FollowTarget, FollowTask, FollowTaskAccount, BackgroundJob, TaskLogEntry
 
 
 @admin.register(Proxy)
@@ -73,3 +73,18 @@ class FollowTaskAccountAdmin(admin.ModelAdmin):
     list_filter = ('status',)
     search_fields = ('task__name', 'account__username')
     readonly_fields = ('started_at', 'completed_at')
+
+
+@admin.register(BackgroundJob)
+class BackgroundJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'kind', 'status', 'attempts', 'worker_id', 'created_at', 'started_at', 'heartbeat_at', 'completed_at')
+    list_filter = ('status', 'kind')
+    search_fields = ('kind', 'worker_id', 'error')
+    readonly_fields = ('created_at', 'updated_at', 'started_at', 'heartbeat_at', 'completed_at')
+
+
+@admin.register(TaskLogEntry)
+class TaskLogEntryAdmin(admin.ModelAdmin):
+    list_display = ('id', 'task_type', 'task_id', 'account_id', 'level', 'category', 'timestamp')
+    list_filter = ('task_type', 'level')
+    search_fields = ('message',)
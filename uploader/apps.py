@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class UploaderConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'uploader'
+
+    def ready(self):
+        # Drop append-only task log lines together with their task
+        from .task_log_store import connect_task_log_cleanup
+        connect_task_log_cleanup()
@@ -20,7 +20,10 @@ from tempfile import NamedTemporaryFile
 import tempfile
 import shutil
 from typing import List, Dict, Optional, Tuple, Any
-from dataclasses import dataclass
+from collections import defaultdict
+import heapq
+import itertools
+from dataclasses import dataclass, replace
 from contextlib import asynccontextmanager
 import aiohttp
 from asgiref.sync import sync_to_async
@@ -68,6 +71,8 @@ from .task_utils import (
     handle_verification_error, handle_task_completion, handle_emergency_cleanup,
     process_browser_result, handle_account_task_error, handle_critical_task_error
 )
+from .task_log_store import append_task_log_entry, flush_task_logs
+from .log_sink import append_log_entry
 from .account_utils import (
     get_account_details, get_proxy_details, get_account_proxy,
     get_account_dolphin_profile_id, save_dolphin_profile_id
@@ -82,6 +87,8 @@ from .instagram_automation import InstagramNavigator, InstagramUploader, Instagr
 from .browser_utils import BrowserManager, PageUtils, ErrorHandler, NetworkUtils, FileUtils, DebugUtils
 from .models import BulkUploadTask, InstagramAccount, VideoFile, BulkUploadAccount, BulkVideo
 from .async_video_uniquifier import uniquify_video_for_account, cleanup_uniquifier_temp_files
+from .video_staging import get_video_staging
+from .async_impl.concurrency_config import DEFAULT_CONCURRENCY, AdaptiveLimiter, ConcurrencyGovernor
 from .logging_utils import set_async_logger
 
 # Engine flag helpers
@@ -106,8 +113,16 @@ logger = logging.getLogger(__name__)
 @dataclass
 class AsyncConfig:
     """Конфигурация для асинхронной обработки"""
-    MAX_CONCURRENT_ACCOUNTS: int = 5
+    MAX_CONCURRENT_ACCOUNTS: int = 5  # starting limit (fixed limit when ADAPTIVE_CONCURRENCY is off)
+    ADAPTIVE_CONCURRENCY: bool = True  # grow/shrink the account limit by host memory and CPU load
+    ADAPTIVE_MIN_ACCOUNTS: int = 1
+    ADAPTIVE_MAX_ACCOUNTS: int = 20
     MAX_CONCURRENT_VIDEOS: int = 1
+    ROUND_MAX_IN_FLIGHT: int = 0  # rounds mode: per-round cap of running accounts (0 = MAX_CONCURRENT_ACCOUNTS)
+    PREPARE_LOOKAHEAD: int = 0  # accounts whose videos are encoded ahead of their browser session (0 = MAX_CONCURRENT_ACCOUNTS)
+    PROFILE_WARM_LOOKAHEAD: int = 2  # Dolphin profiles pre-started for the next accounts (0 = disabled)
+    PROFILE_WARM_MB_PER_PROFILE: int = 700  # RAM reserved per pre-started profile, caps the lookahead
+    PROFILE_WARM_TTL: float = 300.0  # seconds a pre-started profile waits for its account before it is stopped
     ACCOUNT_DELAY_MIN: float = 5.0
     ACCOUNT_DELAY_MAX: float = 10.0
     RETRY_ATTEMPTS: int = 2
@@ -196,18 +211,18 @@ class AsyncTaskRepository:
     
     @staticmethod
     @sync_to_async(thread_sensitive=False)
-    def update_task_log(task: BulkUploadTask, log_message: str) -> None:
+    def update_task_log(task: BulkUploadTask, log_message: str, level: str = 'INFO', category: str = '') -> None:
         """Обновить лог задачи с авто-повтором при сбое соединения"""
         from django.db import connections
         try:
-            update_task_log(task, log_message)
+            update_task_log(task, log_message, level=level, category=category)
         except Exception as e:
             try:
                 for conn in connections.all():
                     if conn.connection is not None:
                         conn.close_if_unusable_or_obsolete()
                         conn.close()
-                update_task_log(task, log_message)
+                update_task_log(task, log_message, level=level, category=category)
             except Exception:
                 raise e
     
@@ -406,13 +421,12 @@ class AsyncFileManager:
             return await loop.run_in_executor(None, create_temp_file)
     
     async def create_temp_file_from_path_async(self, file_path: str, filename: str) -> str:
-        """Асинхронно создать временный файл из пути к файлу"""
+        """Асинхронно получить staged-копию файла (hardlink/reflink/копия ядром, общая для аккаунтов).
+        
+        Файл только для чтения; отпускается через cleanup_temp_files_async.
+        """
         def create_temp_file():
-            with NamedTemporaryFile(delete=False, suffix=f"_{filename}") as tmp:
-                with open(file_path, 'rb') as src:
-                    while chunk := src.read(self.chunk_size):
-                        tmp.write(chunk)
-                return tmp.name
+            return get_video_staging().acquire(file_path, filename)
         
         # Запускаем создание файла асинхронно
         try:
@@ -426,9 +440,13 @@ class AsyncFileManager:
     async def cleanup_temp_files_async(self, file_paths: List[str]) -> None:
         """Асинхронно очистить временные файлы"""
         def cleanup_files():
+            staging = get_video_staging()
             for file_path in file_paths:
                 try:
-                    if os.path.exists(file_path):
+                    if staging.is_staged(file_path):
+                        # Общий файл: удаляется после последнего аккаунта
+                        staging.release(file_path)
+                    elif os.path.exists(file_path):
                         os.unlink(file_path)
                 except Exception as e:
                     logger.warning(f"Could not delete temp file {file_path}: {str(e)}")
@@ -490,27 +508,13 @@ class AsyncLogger:
                 'is_critical': self._is_critical_event(level, message, category)
             }
             
-            # Сохраняем в cache для задачи
-            cache_key = f"{self.cache_ns}_{self.task_id}"
-            existing_logs = cache.get(cache_key, [])
-            existing_logs.append(log_entry)
-            
-            # Ограничиваем количество логов (последние 1000)
-            if len(existing_logs) > 1000:
-                existing_logs = existing_logs[-1000:]
+            # Добавляем запись в лог-синк задачи (RPUSH + LTRIM / кольцевой буфер):
+            # стоимость не зависит от размера буфера, параллельные аккаунты не затирают строки
+            append_log_entry(f"{self.cache_ns}_{self.task_id}", log_entry)
             
-            cache.set(cache_key, existing_logs, timeout=3600)  # 1 час
-            
-            # Если есть account_id, сохраняем также в account-specific cache
+            # Если есть account_id, сохраняем также в account-specific лог
             if self.account_id:
-                account_cache_key = f"{self.cache_ns}_{self.task_id}_account_{self.account_id}"
-                account_logs = cache.get(account_cache_key, [])
-                account_logs.append(log_entry)
-                
-                if len(account_logs) > 1000:
-                    account_logs = account_logs[-1000:]
-                
-                cache.set(account_cache_key, account_logs, timeout=3600)
+                append_log_entry(f"{self.cache_ns}_{self.task_id}_account_{self.account_id}", log_entry)
             
             # Обновляем время последнего обновления
             cache.set(f"{self.cache_ns.replace('logs','last_update')}_{self.task_id}", timestamp, timeout=3600)
@@ -518,22 +522,14 @@ class AsyncLogger:
         except Exception as e:
             print(f"[FAIL] [ASYNC_LOGGER] Error saving to cache: {str(e)}")
         
-        # Сохраняем в базу данных для критических событий (опционально)
+        # Сохраняем в базу данных для критических событий (опционально).
+        # Строка попадает в буфер append-only лога (TaskLogEntry), задача из БД не читается
         if self.persist_db and self._is_critical_event(level, message, category):
             try:
-                task = await self.task_repo.get_task(self.task_id)
-                await self.task_repo.update_task_log(task, f"[{timestamp}] {formatted_message}\n")
+                append_task_log_entry('bulkuploadtask', self.task_id, f"[{timestamp}] {formatted_message}",
+                                      level=level, category=category or '')
             except Exception as e:
-                # Attempt a one-shot connection reset and retry (non-blocking)
-                try:
-                    from django.db import connections
-                    for conn in connections.all():
-                        if conn.connection is not None:
-                            conn.close_if_unusable_or_obsolete()
-                    task = await self.task_repo.get_task(self.task_id)
-                    await self.task_repo.update_task_log(task, f"[{timestamp}] {formatted_message}\n")
-                except Exception:
-                    print(f"[FAIL] [ASYNC_LOGGER] Error saving to database: {str(e)}")
+                print(f"[FAIL] [ASYNC_LOGGER] Error saving to database: {str(e)}")
     
     def _is_critical_event(self, level: str, message: str, category: Optional[str]) -> bool:
         """Проверяет, является ли событие критическим"""
@@ -557,7 +553,23 @@ class AsyncLogger:
         }
         
         color = level_colors.get(level.upper(), '\033[0m')
-        return f"{color}[{level.upper()}]{'\033[0m'}"
+        return f"{color}[{level.upper()}]\033[0m"
+
+async def _await_in_thread_work(awaitable, on_result):
+    """Дождаться работы, идущей в потоке (staging, ffmpeg), даже если ожидающего отменили.
+
+    Поток нельзя прервать: при отмене результат все равно дожидается и передается в
+    ``on_result`` (чтобы его освободили), после чего отмена пробрасывается дальше.
+    """
+    future = asyncio.ensure_future(awaitable)
+    try:
+        return await asyncio.shield(future)
+    except asyncio.CancelledError:
+        try:
+            on_result(await future)
+        except Exception:
+            pass
+        raise
 
 # Асинхронный обработчик аккаунта
 class AsyncAccountProcessor:
@@ -577,6 +589,17 @@ class AsyncAccountProcessor:
         self.account_repo = AsyncAccountRepository()
         self.start_time = None
         self.end_time = None
+        # Подготовка видео (уникализация) может быть запущена заранее координатором
+        self._prepare_task: Optional[asyncio.Task] = None
+        self._prefetch_release = None
+        # Очередь опережающей подготовки, в которой стоит аккаунт (назначается координатором)
+        self.lookahead: Optional['VideoPrepLookahead'] = None
+        # process() завершен: заранее начинать подготовку больше нельзя
+        self._closed = False
+        # Staged-копии исходников, которые аккаунт держит до конца своей сессии
+        self._staged_files: List[str] = []
+        # Пул заранее запущенных профилей Dolphin (назначается координатором)
+        self.warm_pool: Optional['ProfileWarmPool'] = None
 
         # Create log callback that bridges to async logger
         self.log_callback = self._create_log_callback()
@@ -616,16 +639,13 @@ class AsyncAccountProcessor:
             if account.status != 'ACTIVE':
                 await self.logger.log('INFO', f"Account {account.username} has status: {account.status} - will attempt processing")
             
-            # Подготавливаем видео для аккаунта
-            videos_for_account = await self._prepare_videos_for_account()
+            # Подготавливаем видео и файлы (или забираем заранее подготовленные)
+            videos_for_account, temp_files, video_files_to_upload = await self._take_prepared()
             
             if not videos_for_account:
                 await self._handle_no_videos()
                 return 'failed', 0, 1
             
-            # Подготавливаем файлы
-            temp_files, video_files_to_upload = await self._prepare_video_files(videos_for_account)
-            
             if not video_files_to_upload:
                 await self._handle_no_files()
                 return 'failed', 0, 1
@@ -687,10 +707,66 @@ class AsyncAccountProcessor:
                 log_message=f"Error: {str(e)}\n"
             )
             return 'failed', 0, 1
+        finally:
+            self._closed = True
+            if self.lookahead is not None:
+                self.lookahead.discard(self)
+            # Заранее запущенная подготовка больше не нужна, если до нее не дошли;
+            # ждем ее остановки, чтобы созданные ею файлы попали в _staged_files
+            if self._prepare_task is not None and not self._prepare_task.done():
+                self._prepare_task.cancel()
+                try:
+                    await self._prepare_task
+                except (asyncio.CancelledError, Exception):
+                    pass
+            self._release_prefetch_slot()
+            if self.warm_pool is not None:
+                await self.warm_pool.discard(self)
+            if self._staged_files:
+                staged_files, self._staged_files = self._staged_files, []
+                await self.file_manager.cleanup_temp_files_async(staged_files)
+    
+    def start_prepare(self, on_consumed=None) -> bool:
+        """Запустить подготовку видео заранее, пока аккаунт ждет слот браузера.
+        
+        ``on_consumed`` вызывается один раз, когда process() забрал результат
+        (или завершился); если подготовка уже идет или process() завершен — сразу.
+        """
+        if self._closed or self._prepare_task is not None:
+            if on_consumed:
+                on_consumed()
+            return False
+        self._prefetch_release = on_consumed
+        self._prepare_task = asyncio.create_task(self._prepare_all())
+        return True
+    
+    async def _prepare_all(self) -> Tuple[List[VideoData], List[str], List[str]]:
+        """Назначение заголовков и уникализация файлов аккаунта"""
+        videos_for_account = await self._prepare_videos_for_account()
+        if not videos_for_account:
+            return videos_for_account, [], []
+        temp_files, video_files_to_upload = await self._prepare_video_files(videos_for_account)
+        return videos_for_account, temp_files, video_files_to_upload
+    
+    async def _take_prepared(self) -> Tuple[List[VideoData], List[str], List[str]]:
+        """Дождаться подготовленных видео (запускает подготовку, если ее не начали заранее)"""
+        if self._prepare_task is None:
+            self._prepare_task = asyncio.create_task(self._prepare_all())
+        try:
+            return await self._prepare_task
+        finally:
+            self._release_prefetch_slot()
+    
+    def _release_prefetch_slot(self) -> None:
+        release, self._prefetch_release = self._prefetch_release, None
+        if release:
+            release()
     
     async def _prepare_videos_for_account(self) -> List[VideoData]:
         """Подготавливает видео для аккаунта"""
-        videos_for_account = list(self.task_data.videos)
+        # Копии: заголовок и file_path назначаются каждому аккаунту отдельно,
+        # а подготовка нескольких аккаунтов идет одновременно
+        videos_for_account = [replace(video) for video in self.task_data.videos]
         random.shuffle(videos_for_account)
         
         # КРИТИЧЕСКОЕ ИСПРАВЛЕНИЕ: titles_for_account содержит VideoTitle объекты, а не строки
@@ -732,45 +808,55 @@ class AsyncAccountProcessor:
         
         await self.logger.log('INFO', f"[VIDEO] Starting video uniquification for account {account_username}")
         
-        for i, video in enumerate(videos_for_account):
+        async def _prepare_one(i: int, video: VideoData) -> Tuple[List[str], Optional[str]]:
             video_filename = os.path.basename(video.file_path)
             await self.logger.log('INFO', f"Preparing and uniquifying video: {video_filename}")
             
             try:
                 # Сначала создаем временный файл из исходного видео
-                original_temp_file = await self.file_manager.create_temp_file_from_path_async(
-                    video.file_path, video_filename
+                original_temp_file = await _await_in_thread_work(
+                    self.file_manager.create_temp_file_from_path_async(video.file_path, video_filename),
+                    self._staged_files.append,
                 )
-                temp_files.append(original_temp_file)
+                self._staged_files.append(original_temp_file)
                 
-                await self.logger.log('INFO', f"Created temporary file: {original_temp_file}")
+                await self.logger.log('INFO', f"Staged source file: {original_temp_file}")
                 
                 # Теперь уникализируем видео для этого аккаунта
                 try:
-                    unique_video_path = await uniquify_video_for_account(
-                        original_temp_file, 
-                        account_username, 
-                        copy_number=i+1
+                    unique_video_path = await _await_in_thread_work(
+                        uniquify_video_for_account(
+                            original_temp_file,
+                            account_username,
+                            copy_number=i+1,
+                            task_key=f"bulk_{self.account_task.bulk_task_id}"
+                        ),
+                        self._staged_files.append,
                     )
                     
                     # КРИТИЧЕСКОЕ ИСПРАВЛЕНИЕ: Обновляем file_path в VideoData
                     video.file_path = unique_video_path
                     
-                    # Добавляем уникализированное видео в список для загрузки
-                    video_files_to_upload.append(unique_video_path)
-                    temp_files.append(unique_video_path)
-                    
                     await self.logger.log('SUCCESS', f"[OK] Created unique video for {account_username}: {os.path.basename(unique_video_path)}")
+                    return [original_temp_file, unique_video_path], unique_video_path
                     
                 except Exception as uniquify_error:
                     # Если уникализация не удалась, используем оригинальный файл
                     await self.logger.log('WARNING', f"[WARN] Video uniquification failed: {str(uniquify_error)}, using original file")
-                    video_files_to_upload.append(original_temp_file)
+                    return [original_temp_file], original_temp_file
                 
             except Exception as e:
                 await self.logger.log('ERROR', f"[FAIL] Error preparing video file {video_filename}: {str(e)}")
                 # Пропускаем это видео и продолжаем с другими
-                continue
+                return [], None
+        
+        # Видео аккаунта кодируются параллельно; число одновременных ffmpeg
+        # ограничивает планировщик кодирований. Порядок файлов сохраняется.
+        prepared = await asyncio.gather(*[_prepare_one(i, video) for i, video in enumerate(videos_for_account)])
+        for video_temp_files, upload_path in prepared:
+            temp_files.extend(video_temp_files)
+            if upload_path:
+                video_files_to_upload.append(upload_path)
         
         await self.logger.log('SUCCESS', f"[TARGET] Prepared {len(video_files_to_upload)} unique videos for account {account_username}")
         return temp_files, video_files_to_upload
@@ -826,12 +912,15 @@ class AsyncAccountProcessor:
                 )
             else:
                 from .bulk_tasks_playwright_async import run_dolphin_browser_async
+                # Профиль мог быть запущен заранее, пока аккаунт ждал слот
+                warm_browser = await self.warm_pool.take(self) if self.warm_pool is not None else None
                 result = await run_dolphin_browser_async(
                     account_details,
                     videos,
                     video_files_to_upload,
                     self.task_data.id,
-                    self.account_task.id
+                    self.account_task.id,
+                    warm_browser=warm_browser
                 )
             
             return self._process_browser_result(result)
@@ -886,6 +975,258 @@ class AsyncAccountProcessor:
             log_message="No valid video files to upload\n"
         )
 
+# Планировщик режима раундов
+class RoundsScheduler:
+    """Приоритетные слоты для конвейерного режима раундов.
+
+    Аккаунт переходит к следующему видео сразу после предыдущего, без барьера между
+    раундами. Свободный слот получает ожидающий с наименьшим (раунд, позиция в
+    перемешанном порядке раунда), число одновременно работающих аккаунтов ограничено
+    глобально (max_in_flight) и внутри каждого раунда (per_round_limit).
+    """
+
+    def __init__(self, max_in_flight: int, per_round_limit: Optional[int] = None):
+        self.max_in_flight = max(1, int(max_in_flight))
+        # Без явного лимита раунда он следует за общим (в т.ч. при set_limit)
+        self._per_round_follows = not per_round_limit
+        self.per_round_limit = max(1, int(per_round_limit or self.max_in_flight))
+        self._free = self.max_in_flight
+        self._in_flight_by_round: Dict[int, int] = defaultdict(int)
+        self._waiters: List[Tuple[int, int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+
+    async def acquire(self, round_index: int, position: int) -> None:
+        """Ждать слот для аккаунта на позиции position раунда round_index."""
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (round_index, position, next(self._seq), future))
+        self._wake()
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Слот мог быть выдан одновременно с отменой - возвращаем его
+            if future.done() and not future.cancelled():
+                self.release(round_index)
+            raise
+
+    def release(self, round_index: int) -> None:
+        self._free += 1
+        self._in_flight_by_round[round_index] -= 1
+        self._wake()
+
+    def in_flight(self, round_index: int) -> int:
+        return self._in_flight_by_round[round_index]
+
+    # Интерфейс для ConcurrencyGovernor
+    @property
+    def limit(self) -> int:
+        return self.max_in_flight
+
+    @property
+    def running(self) -> int:
+        return self.max_in_flight - self._free
+
+    @property
+    def waiting(self) -> int:
+        return sum(1 for item in self._waiters if not item[3].done())
+
+    def set_limit(self, limit: int) -> None:
+        limit = max(1, int(limit))
+        self._free += limit - self.max_in_flight
+        self.max_in_flight = limit
+        if self._per_round_follows:
+            self.per_round_limit = limit
+        self._wake()
+
+    def _wake(self) -> None:
+        deferred = []
+        while self._free > 0 and self._waiters:
+            item = heapq.heappop(self._waiters)
+            round_index, _, _, future = item
+            if future.done():
+                continue
+            if self._in_flight_by_round[round_index] >= self.per_round_limit:
+                deferred.append(item)
+                continue
+            self._free -= 1
+            self._in_flight_by_round[round_index] += 1
+            future.set_result(None)
+        for item in deferred:
+            heapq.heappush(self._waiters, item)
+
+# Опережающая подготовка видео
+class VideoPrepLookahead:
+    """Ограничивает число аккаунтов, видео которых уникализируются заранее.
+
+    Пока аккаунт ждет слот браузера, его видео уже кодируются; слот опережения
+    освобождается, когда process() забирает подготовленные файлы. Свободный слот
+    получает ожидающий с наименьшим priority — тем же ключом, по которому слоты
+    браузера раздает планировщик (при равных — в порядке schedule).
+    """
+
+    def __init__(self, limit: int):
+        self.limit = max(1, int(limit))
+        self._free = self.limit
+        self._waiters: List[Tuple[Tuple, int, 'AsyncAccountProcessor']] = []
+        self._seq = itertools.count()
+
+    def schedule(self, processor: 'AsyncAccountProcessor', priority: Tuple = ()) -> None:
+        """Поставить подготовку аккаунта в очередь на слот опережения"""
+        processor.lookahead = self
+        heapq.heappush(self._waiters, (priority, next(self._seq), processor))
+        self._wake()
+
+    def discard(self, processor: 'AsyncAccountProcessor') -> None:
+        """Убрать из очереди аккаунт, process() которого уже завершился"""
+        waiters = [item for item in self._waiters if item[2] is not processor]
+        if len(waiters) != len(self._waiters):
+            heapq.heapify(waiters)
+            self._waiters = waiters
+
+    def _release(self) -> None:
+        self._free += 1
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._free > 0 and self._waiters:
+            _, _, processor = heapq.heappop(self._waiters)
+            self._free -= 1
+            processor.start_prepare(on_consumed=self._release)
+
+    def close(self) -> None:
+        """Снять с очереди не начатые подготовки (подготовки в работе не трогаются)"""
+        self._waiters.clear()
+
+# Опережающий запуск профилей Dolphin
+def _warm_profile_limit(requested: int) -> int:
+    """Число заранее запускаемых профилей, ограниченное свободной памятью хоста"""
+    if requested <= 0:
+        return 0
+    try:
+        import psutil
+        available_mb = psutil.virtual_memory().available // (1024 * 1024)
+    except Exception:
+        return requested
+    return max(0, min(requested, int(available_mb // max(1, AsyncConfig.PROFILE_WARM_MB_PER_PROFILE))))
+
+
+class ProfileWarmPool:
+    """Заранее запускает профили Dolphin следующих аккаунтов и подключается к ним по CDP.
+
+    Запуск профиля занимает десятки секунд; пока текущие аккаунты загружают видео,
+    следующие limit профилей уже запущены, и освободившийся слот сразу получает
+    подключенный браузер. Слот опережения освобождается, когда аккаунт забирает
+    браузер; не забранный за PROFILE_WARM_TTL профиль останавливается.
+    """
+
+    def __init__(self, limit: int, ttl: float):
+        self.limit = max(1, int(limit))
+        self.ttl = ttl
+        self._semaphore = asyncio.Semaphore(self.limit)
+        self._tasks: Dict[int, asyncio.Task] = {}
+        self._taken: Dict[int, asyncio.Event] = {}
+        self._started: set = set()
+        self.stats = {'warmed': 0, 'taken': 0, 'expired': 0, 'failed': 0}
+
+    def schedule(self, processor: 'AsyncAccountProcessor') -> None:
+        """Запустить профиль аккаунта заранее, когда освободится слот опережения"""
+        profile_id = getattr(processor.account_task.account, 'dolphin_profile_id', None)
+        token = os.environ.get("DOLPHIN_API_TOKEN")
+        if not profile_id or not token:
+            return
+        key = processor.account_task.id
+        self._taken[key] = asyncio.Event()
+        self._tasks[key] = asyncio.create_task(self._warm(key, str(profile_id), token, processor.logger))
+        processor.warm_pool = self
+
+    async def _warm(self, key: int, profile_id: str, token: str, logger: 'AsyncLogger'):
+        from .async_impl.dolphin import AsyncDolphinBrowser
+
+        async with self._semaphore:
+            if self._taken[key].is_set():
+                return None
+            self._started.add(key)
+            browser = AsyncDolphinBrowser(token)
+            try:
+                page = await browser.connect_to_profile_async(profile_id, headless=False)
+            except asyncio.CancelledError:
+                await browser.cleanup_async()
+                raise
+            except Exception as e:
+                self.stats['failed'] += 1
+                await logger.log('WARNING', f"[WARM] Failed to pre-start profile {profile_id}: {e}")
+                await browser.cleanup_async()
+                return None
+            if not page:
+                self.stats['failed'] += 1
+                return None
+            self.stats['warmed'] += 1
+            await logger.log('INFO', f"[WARM] Profile {profile_id} pre-started and connected")
+            try:
+                # Слот опережения занят, пока аккаунт не заберет браузер
+                await asyncio.wait_for(self._taken[key].wait(), timeout=self.ttl)
+            except asyncio.TimeoutError:
+                self.stats['expired'] += 1
+                await logger.log('INFO', f"[WARM] Profile {profile_id} was not used within {self.ttl:.0f}s, stopping it")
+                await browser.cleanup_async()
+                return None
+            except asyncio.CancelledError:
+                await browser.cleanup_async()
+                raise
+            return browser
+
+    async def take(self, processor: 'AsyncAccountProcessor'):
+        """Забрать подключенный браузер аккаунта (None, если профиль не прогрет)"""
+        key = processor.account_task.id
+        task = self._tasks.get(key)
+        event = self._taken.get(key)
+        if task is None or event is None:
+            return None
+        event.set()
+        if key not in self._started:
+            # Профиль еще ждет слота опережения — аккаунт запустит его сам
+            task.cancel()
+            return None
+        # Профиль уже запускается: дождаться его быстрее, чем запускать заново.
+        # asyncio.wait не пробрасывает исход task, так что CancelledError здесь -
+        # отмена самого аккаунта, а не прогрева
+        try:
+            await asyncio.wait({task})
+        except asyncio.CancelledError:
+            if task.done() and not task.cancelled() and task.exception() is None and task.result() is not None:
+                await task.result().cleanup_async()
+            await self.discard(processor)
+            raise
+        if task.cancelled() or task.exception() is not None:
+            return None
+        browser = task.result()
+        if browser is not None:
+            self.stats['taken'] += 1
+        return browser
+
+    async def discard(self, processor: 'AsyncAccountProcessor') -> None:
+        """Аккаунт завершился без браузера: остановить прогретый профиль"""
+        key = processor.account_task.id
+        task = self._tasks.pop(key, None)
+        self._taken.pop(key, None)
+        self._started.discard(key)
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+
+    async def close(self) -> None:
+        """Остановить все не забранные профили"""
+        for task in list(self._tasks.values()):
+            if not task.done():
+                task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+        self._tasks.clear()
+        self._taken.clear()
+        self._started.clear()
+
 # Координатор асинхронных задач
 class AsyncTaskCoordinator:
     """Координатор для асинхронного выполнения задач"""
@@ -893,7 +1234,7 @@ class AsyncTaskCoordinator:
     def __init__(self, task_id: int):
         self.task_id = task_id
         self.task_repo = AsyncTaskRepository()
-        self.account_semaphore = asyncio.Semaphore(AsyncConfig.MAX_CONCURRENT_ACCOUNTS)
+        self.account_semaphore = AdaptiveLimiter(self._initial_account_limit())
         self.start_time = None
         self.end_time = None
     
@@ -954,45 +1295,35 @@ class AsyncTaskCoordinator:
             self.extra_init_delay = extra_init_delay
 
             if use_rounds:
-                await logger.log('INFO', '[MODE] Using rounds-by-video scheduling (API)')
-                # In rounds mode: iterate videos; for each video, shuffle accounts and run per-account upload of only that video
-                # Build lightweight per-video task data clones
-                all_video_datas = list(task_data.videos)
-                total_rounds = len(all_video_datas)
-                for round_index, video_data in enumerate(all_video_datas, start=1):
-                    await logger.log('INFO', f"[ROUND] Starting round {round_index}/{total_rounds}: {os.path.basename(video_data.file_path)}")
-                    # Shuffle accounts each round
-                    accounts_order = list(account_tasks)
-                    random.shuffle(accounts_order)
-                    # Build tasks for this round
-                    round_tasks = []
-                    for account_task in accounts_order:
-                        # Clone task_data with only this one video
-                        single_video_task_data = TaskData(
-                            id=task_data.id,
-                            name=task_data.name,
-                            status=task_data.status,
-                            accounts=task_data.accounts,
-                            videos=[video_data],
-                            titles=task_data.titles,
-                        )
-                        processor = AsyncAccountProcessor(account_task, single_video_task_data, logger)
-                        coro = self._process_account_with_semaphore(processor, account_task)
-                        round_tasks.append(coro)
-                    # Run this round with concurrency control
-                    await logger.log('INFO', f"[ROUND] Dispatching {len(round_tasks)} accounts for round {round_index}")
-                    _ = await asyncio.gather(*round_tasks, return_exceptions=True)
+                await logger.log('INFO', '[MODE] Using rounds-by-video scheduling (API, pipelined)')
+                await self._run_rounds_pipelined(account_tasks, task_data, logger)
             else:
                 # Создаем задачи для всех аккаунтов (default)
                 tasks = []
+                lookahead = self._create_lookahead()
+                warm_pool = self._create_warm_pool()
                 for account_task in account_tasks:
                     processor = AsyncAccountProcessor(account_task, task_data, logger)
+                    # Видео аккаунта начинают кодироваться, пока он ждет слот браузера
+                    lookahead.schedule(processor)
+                    # Профили следующих аккаунтов запускаются в порядке очереди
+                    if warm_pool is not None:
+                        warm_pool.schedule(processor)
                     task_coroutine = self._process_account_with_semaphore(processor, account_task)
                     tasks.append(task_coroutine)
                 
                 # Запускаем все задачи параллельно
-                await logger.log('INFO', f"Starting {len(tasks)} account tasks in parallel")
-                results = await asyncio.gather(*tasks, return_exceptions=True)
+                await logger.log('INFO', f"Starting {len(tasks)} account tasks in parallel (max {self.account_semaphore.limit} at once, "
+                                         f"prepare lookahead {lookahead.limit}, profile warm lookahead {warm_pool.limit if warm_pool else 0})")
+                governor = await self._start_governor(self.account_semaphore, logger)
+                try:
+                    results = await asyncio.gather(*tasks, return_exceptions=True)
+                finally:
+                    await self._stop_governor(governor, logger)
+                    lookahead.close()
+                    if warm_pool is not None:
+                        await warm_pool.close()
+                        await logger.log('INFO', f"[WARM] Profile warm pool: {warm_pool.stats}")
             
             # Обрабатываем результаты
             try:
@@ -1087,21 +1418,144 @@ class AsyncTaskCoordinator:
             titles=all_titles
         )
     
+    async def _run_rounds_pipelined(self, account_tasks: List[BulkUploadAccount], task_data: TaskData,
+                                    logger: AsyncLogger) -> None:
+        """Режим раундов без барьеров: каждый аккаунт идет по видео (раундам) в своем темпе.
+
+        Порядок аккаунтов перемешивается для каждого раунда; ранние раунды и первые
+        позиции перемешанного порядка получают свободные слоты первыми.
+        """
+        all_video_datas = list(task_data.videos)
+        total_rounds = len(all_video_datas)
+        if not total_rounds or not account_tasks:
+            return
+
+        # Перемешанный порядок аккаунтов для каждого раунда -> позиция аккаунта в раунде
+        positions: List[Dict[int, int]] = []
+        for _ in all_video_datas:
+            accounts_order = list(account_tasks)
+            random.shuffle(accounts_order)
+            positions.append({at.id: pos for pos, at in enumerate(accounts_order)})
+
+        scheduler = RoundsScheduler(self._initial_account_limit(), AsyncConfig.ROUND_MAX_IN_FLIGHT or None)
+        remaining = [len(account_tasks)] * total_rounds
+        round_stats = [{'success': 0, 'failed': 0, 'started_at': None} for _ in all_video_datas]
+        lookahead = self._create_lookahead()
+
+        processors_by_account: Dict[int, List[AsyncAccountProcessor]] = {}
+        for account_task in account_tasks:
+            processors_by_account[account_task.id] = [
+                # Clone task_data with only this one video
+                AsyncAccountProcessor(account_task, TaskData(
+                    id=task_data.id,
+                    name=task_data.name,
+                    status=task_data.status,
+                    accounts=task_data.accounts,
+                    videos=[video_data],
+                    titles=task_data.titles,
+                ), logger)
+                for video_data in all_video_datas
+            ]
+        # Видео первого раунда кодируется, пока аккаунт ждет слот; слоты опережения
+        # раздаются в том же порядке (раунд, позиция), что и слоты браузера
+        for account_task in sorted(account_tasks, key=lambda at: positions[0][at.id]):
+            lookahead.schedule(processors_by_account[account_task.id][0], (1, positions[0][account_task.id]))
+
+        async def _run_account(account_task: BulkUploadAccount) -> None:
+            processors = processors_by_account[account_task.id]
+            for round_index, video_data in enumerate(all_video_datas, start=1):
+                stats = round_stats[round_index - 1]
+                processor = processors[round_index - 1]
+                await scheduler.acquire(round_index, positions[round_index - 1][account_task.id])
+                if round_index < total_rounds:
+                    # Следующий раунд готовится, пока идет браузерная сессия текущего
+                    lookahead.schedule(processors[round_index], (round_index + 1, positions[round_index][account_task.id]))
+                if stats['started_at'] is None:
+                    stats['started_at'] = time.time()
+                    await logger.log('INFO', f"[ROUND] Starting round {round_index}/{total_rounds}: {os.path.basename(video_data.file_path)}")
+                try:
+                    result = await self._process_account_delayed(processor)
+                except Exception as e:
+                    result = e
+                finally:
+                    scheduler.release(round_index)
+
+                if isinstance(result, tuple) and len(result) >= 3 and result[0] == 'success' and result[1] > 0:
+                    stats['success'] += 1
+                else:
+                    stats['failed'] += 1
+                remaining[round_index - 1] -= 1
+                if remaining[round_index - 1] == 0:
+                    elapsed = time.time() - (stats['started_at'] or time.time())
+                    await logger.log('INFO', f"[ROUND] Round {round_index}/{total_rounds} completed: {stats['success']} succeeded, {stats['failed']} failed in {elapsed:.1f}s")
+
+        await logger.log('INFO', f"[ROUND] Dispatching {len(account_tasks)} accounts across {total_rounds} rounds (max in flight {scheduler.max_in_flight}, per round {scheduler.per_round_limit})")
+        governor = await self._start_governor(scheduler, logger)
+        try:
+            await asyncio.gather(*[_run_account(at) for at in account_tasks], return_exceptions=True)
+        finally:
+            await self._stop_governor(governor, logger)
+            lookahead.close()
+
+    @staticmethod
+    def _initial_account_limit() -> int:
+        """Стартовый лимит аккаунтов (в границах адаптивного режима, если он включен)"""
+        limit = AsyncConfig.MAX_CONCURRENT_ACCOUNTS
+        if AsyncConfig.ADAPTIVE_CONCURRENCY:
+            limit = min(max(limit, AsyncConfig.ADAPTIVE_MIN_ACCOUNTS), AsyncConfig.ADAPTIVE_MAX_ACCOUNTS)
+        return max(1, limit)
+
+    async def _start_governor(self, target, logger: AsyncLogger) -> Optional[ConcurrencyGovernor]:
+        """Запустить подстройку лимита аккаунтов под ресурсы хоста"""
+        if not AsyncConfig.ADAPTIVE_CONCURRENCY:
+            return None
+        config = replace(
+            DEFAULT_CONCURRENCY,
+            min_parallel_accounts=max(1, AsyncConfig.ADAPTIVE_MIN_ACCOUNTS),
+            max_parallel_accounts=max(1, AsyncConfig.ADAPTIVE_MIN_ACCOUNTS, AsyncConfig.ADAPTIVE_MAX_ACCOUNTS),
+        )
+        await logger.log('INFO', f"[GOVERNOR] Adaptive concurrency: {target.limit} accounts, bounds "
+                                 f"{config.min_parallel_accounts}-{config.max_parallel_accounts}, "
+                                 f"sampling every {config.sample_interval_sec:.0f}s")
+        return ConcurrencyGovernor(target, config, log=logger.log).start()
+
+    async def _stop_governor(self, governor: Optional[ConcurrencyGovernor], logger: AsyncLogger) -> None:
+        if governor is None:
+            return
+        await governor.stop()
+        await logger.log('INFO', f"[GOVERNOR] Adaptive concurrency: {governor.stats}")
+
+    def _create_lookahead(self) -> VideoPrepLookahead:
+        return VideoPrepLookahead(AsyncConfig.PREPARE_LOOKAHEAD or AsyncConfig.MAX_CONCURRENT_ACCOUNTS)
+
+    def _create_warm_pool(self) -> Optional[ProfileWarmPool]:
+        """Пул прогрева профилей (только для Dolphin; instagrapi браузер не использует)"""
+        if str(_get_engine_for_task(self.task_id)).lower() == 'instagrapi':
+            return None
+        limit = _warm_profile_limit(AsyncConfig.PROFILE_WARM_LOOKAHEAD)
+        if limit <= 0:
+            return None
+        return ProfileWarmPool(limit, AsyncConfig.PROFILE_WARM_TTL)
+
+    async def _process_account_delayed(self, processor: AsyncAccountProcessor) -> Tuple[str, int, int]:
+        """Задержка перед стартом аккаунта и запуск обработки (слот уже захвачен)"""
+        # Добавляем случайную задержку между аккаунтами
+        delay = random.uniform(AsyncConfig.ACCOUNT_DELAY_MIN, AsyncConfig.ACCOUNT_DELAY_MAX)
+        await asyncio.sleep(delay)
+        # Дополнительная небольшая задержка перед началом (0–5s) по флагу
+        try:
+            if getattr(self, 'extra_init_delay', False):
+                await asyncio.sleep(random.uniform(0.0, 5.0))
+        except Exception:
+            pass
+        
+        return await processor.process()
+    
     async def _process_account_with_semaphore(self, processor: AsyncAccountProcessor, 
                                             account_task: BulkUploadAccount) -> Tuple[str, int, int]:
         """Обрабатывает аккаунт с ограничением параллельности"""
         async with self.account_semaphore:
-            # Добавляем случайную задержку между аккаунтами
-            delay = random.uniform(AsyncConfig.ACCOUNT_DELAY_MIN, AsyncConfig.ACCOUNT_DELAY_MAX)
-            await asyncio.sleep(delay)
-            # Дополнительная небольшая задержка перед началом (0–5s) по флагу
-            try:
-                if getattr(self, 'extra_init_delay', False):
-                    await asyncio.sleep(random.uniform(0.0, 5.0))
-            except Exception:
-                pass
-            
-            return await processor.process()
+            return await self._process_account_delayed(processor)
     
     async def _process_results(self, results: List, account_tasks: List[BulkUploadAccount], 
                              logger: AsyncLogger) -> None:
@@ -1327,9 +1781,8 @@ async def run_async_bulk_upload_task(task_id: int) -> bool:
             current_time = timezone.now()
             timestamp = current_time.strftime("%Y-%m-%d %H:%M:%S")
             
-            task.status = 'FAILED'
-            task.log += f"[{timestamp}] [WARN] Async task interrupted by signal {signum}\n"
-            task.save()
+            update_task_status(task, TaskStatus.FAILED, f"[{timestamp}] [WARN] Async task interrupted by signal {signum}\n")
+            flush_task_logs()
             
             print(f"[SIGNAL] Task '{task.name}' marked as FAILED due to signal {signum}")
             
@@ -1483,10 +1936,14 @@ def run_async_bulk_upload_task_sync(task_id: int) -> bool:
                 asyncio.set_event_loop(new_loop)
                 
                 # Запускаем async задачу
-                result = new_loop.run_until_complete(run_async_bulk_upload_task(task_id))
-                
-                # Закрываем loop
-                new_loop.close()
+                try:
+                    result = new_loop.run_until_complete(run_async_bulk_upload_task(task_id))
+                finally:
+                    # Останавливаем общий Playwright-драйвер воркера (один на все аккаунты)
+                    from .async_impl.playwright_runtime import shutdown_playwright_runtime
+                    new_loop.run_until_complete(shutdown_playwright_runtime())
+                    # Закрываем loop
+                    new_loop.close()
                 return result
             except Exception as e:
                 print(f"[FAIL] Error in thread: {str(e)}")
@@ -1513,7 +1970,12 @@ def get_async_config() -> Dict[str, Any]:
     """Получить текущую конфигурацию"""
     return {
         'max_concurrent_accounts': AsyncConfig.MAX_CONCURRENT_ACCOUNTS,
+        'adaptive_concurrency': AsyncConfig.ADAPTIVE_CONCURRENCY,
+        'adaptive_min_accounts': AsyncConfig.ADAPTIVE_MIN_ACCOUNTS,
+        'adaptive_max_accounts': AsyncConfig.ADAPTIVE_MAX_ACCOUNTS,
         'max_concurrent_videos': AsyncConfig.MAX_CONCURRENT_VIDEOS,
+        'round_max_in_flight': AsyncConfig.ROUND_MAX_IN_FLIGHT,
+        'prepare_lookahead': AsyncConfig.PREPARE_LOOKAHEAD,
         'account_delay_min': AsyncConfig.ACCOUNT_DELAY_MIN,
         'account_delay_max': AsyncConfig.ACCOUNT_DELAY_MAX,
         'retry_attempts': AsyncConfig.RETRY_ATTEMPTS,
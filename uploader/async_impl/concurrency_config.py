@@ -1,13 +1,228 @@
 """
-Concurrency config scaffold (not enforced yet).
+Адаптивная параллельность аккаунтов по ресурсам хоста.
+
+Фиксированный ``MAX_CONCURRENT_ACCOUNTS`` не подходит всем хостам: на 64 GB
+можно держать намного больше профилей Dolphin, а маленький VPS начинает
+свопиться уже на 5. ``ConcurrencyGovernor`` раз в ``sample_interval_sec``
+снимает через psutil свободную память, загрузку CPU и RSS процессов браузеров
+и меняет лимит одновременно работающих аккаунтов в пределах
+[min_parallel_accounts, max_parallel_accounts]:
+
+- свободной памяти меньше ``min_free_mb`` — лимит становится на столько
+  браузеров меньше числа работающих, сколько нужно вернуть (по наблюдаемому
+  RSS на браузер);
+- CPU выше ``cpu_high_percent`` — лимит уменьшается на 1, но только если
+  работающих не больше лимита (иначе прошлое уменьшение еще не отработало);
+- есть ожидающие аккаунты, все слоты заняты, памяти хватает еще на один
+  браузер и CPU ниже ``cpu_low_percent`` — лимит увеличивается на 1.
+
+Уменьшение не прерывает работающие аккаунты: новые просто не стартуют, пока
+их число не опустится ниже лимита. Каждое изменение пишется в лог задачи.
 """
+import asyncio
+import math
+import os
+from collections import deque
 from dataclasses import dataclass
+from typing import Awaitable, Callable, Deque, Optional, Tuple
+
+# Процессы, чей RSS считается памятью браузеров профилей
+BROWSER_PROCESS_NAMES = ('chrome', 'chromium', 'dolphin')
+
 
 @dataclass(frozen=True)
 class Concurrency:
     max_parallel_accounts: int = 4
     per_account_semaphore: int = 1
+    min_parallel_accounts: int = 1
+    sample_interval_sec: float = float(os.environ.get('CONCURRENCY_SAMPLE_INTERVAL_SEC', '15'))
+    min_free_mb: int = int(os.environ.get('CONCURRENCY_MIN_FREE_MB', '1024'))
+    # Оценка памяти на браузер, пока работающие браузеры не наблюдались
+    browser_mb: int = int(os.environ.get('CONCURRENCY_BROWSER_MB', '700'))
+    cpu_high_percent: float = float(os.environ.get('CONCURRENCY_CPU_HIGH_PERCENT', '85'))
+    cpu_low_percent: float = float(os.environ.get('CONCURRENCY_CPU_LOW_PERCENT', '65'))
+
 
 DEFAULT_CONCURRENCY = Concurrency()
 
-__all__ = ["Concurrency", "DEFAULT_CONCURRENCY"]
+
+@dataclass
+class HostSample:
+    available_mb: float
+    cpu_percent: float
+    browser_rss_mb: float
+    browser_processes: int
+
+
+def sample_host() -> Optional[HostSample]:
+    """Снимок ресурсов хоста (None, если psutil недоступен)"""
+    try:
+        import psutil
+    except ImportError:
+        return None
+    browser_rss = 0
+    browser_processes = 0
+    for proc in psutil.process_iter(['name', 'memory_info']):
+        try:
+            name = (proc.info['name'] or '').lower()
+            if proc.info['memory_info'] and any(browser in name for browser in BROWSER_PROCESS_NAMES):
+                browser_rss += proc.info['memory_info'].rss
+                browser_processes += 1
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+    return HostSample(
+        available_mb=psutil.virtual_memory().available / (1024 * 1024),
+        # Загрузка с предыдущего вызова, т.е. за интервал между снимками
+        cpu_percent=psutil.cpu_percent(interval=None),
+        browser_rss_mb=browser_rss / (1024 * 1024),
+        browser_processes=browser_processes,
+    )
+
+
+def decide_limit(config: Concurrency, sample: HostSample, limit: int, running: int, waiting: int) -> Tuple[int, str]:
+    """Новый лимит и причина решения (лимит не меняется — причина пустая)"""
+    per_browser_mb = config.browser_mb
+    if running > 0 and sample.browser_rss_mb > 0:
+        per_browser_mb = max(1.0, sample.browser_rss_mb / running)
+    headroom_mb = sample.available_mb - config.min_free_mb
+
+    if headroom_mb < 0 and limit > config.min_parallel_accounts:
+        # Считаем от работающих, а не от лимита: пока они не завершились, память не
+        # освобождается, и повторное уменьшение на каждом тике опустило бы лимит до минимума
+        step = max(1, math.ceil(-headroom_mb / per_browser_mb))
+        new_limit = max(config.min_parallel_accounts, (running or limit) - step)
+        if new_limit < limit:
+            return new_limit, f"low memory: {sample.available_mb:.0f} MB free < {config.min_free_mb} MB reserve"
+        return limit, ''
+    if (sample.cpu_percent >= config.cpu_high_percent and limit > config.min_parallel_accounts
+            and running <= limit):
+        return limit - 1, f"CPU {sample.cpu_percent:.0f}% >= {config.cpu_high_percent:.0f}%"
+    if (waiting > 0 and running >= limit and limit < config.max_parallel_accounts
+            and headroom_mb >= per_browser_mb and sample.cpu_percent < config.cpu_low_percent):
+        return limit + 1, (
+            f"{headroom_mb:.0f} MB headroom fits another browser (~{per_browser_mb:.0f} MB), "
+            f"CPU {sample.cpu_percent:.0f}%")
+    return limit, ''
+
+
+class AdaptiveLimiter:
+    """Семафор с изменяемым лимитом (FIFO); используется как ``async with``"""
+
+    def __init__(self, limit: int):
+        self.limit = max(1, int(limit))
+        self.running = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def waiting(self) -> int:
+        return sum(1 for future in self._waiters if not future.done())
+
+    async def acquire(self) -> None:
+        if self.running < self.limit and not self.waiting:
+            self.running += 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Слот мог быть выдан одновременно с отменой - возвращаем его
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def release(self) -> None:
+        self.running -= 1
+        self._wake()
+
+    def set_limit(self, limit: int) -> None:
+        self.limit = max(1, int(limit))
+        self._wake()
+
+    def _wake(self) -> None:
+        while self.running < self.limit and self._waiters:
+            future = self._waiters.popleft()
+            if future.done():
+                continue
+            self.running += 1
+            future.set_result(None)
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.release()
+
+
+class ConcurrencyGovernor:
+    """Фоновый цикл, подстраивающий лимит target под ресурсы хоста.
+
+    target — объект с ``limit``, ``running``, ``waiting`` и ``set_limit(n)``
+    (``AdaptiveLimiter`` или ``RoundsScheduler``).
+    """
+
+    def __init__(self, target, config: Concurrency = DEFAULT_CONCURRENCY,
+                 log: Optional[Callable[[str, str], Awaitable[None]]] = None):
+        self.target = target
+        self.config = config
+        self._log = log
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {'samples': 0, 'grown': 0, 'shrunk': 0, 'peak_limit': target.limit, 'min_limit': target.limit}
+
+    def start(self) -> 'ConcurrencyGovernor':
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        # Первый вызов cpu_percent(interval=None) только запоминает точку отсчета
+        await asyncio.to_thread(sample_host)
+        while True:
+            await asyncio.sleep(self.config.sample_interval_sec)
+            try:
+                await self.tick()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                await self._emit('WARNING', f"[GOVERNOR] Host sampling failed: {e}")
+
+    async def tick(self) -> None:
+        sample = await asyncio.to_thread(sample_host)
+        if sample is None:
+            return
+        self.stats['samples'] += 1
+        limit = self.target.limit
+        new_limit, reason = decide_limit(self.config, sample, limit, self.target.running, self.target.waiting)
+        if new_limit == limit:
+            return
+        self.target.set_limit(new_limit)
+        self.stats['grown' if new_limit > limit else 'shrunk'] += 1
+        self.stats['peak_limit'] = max(self.stats['peak_limit'], new_limit)
+        self.stats['min_limit'] = min(self.stats['min_limit'], new_limit)
+        await self._emit('INFO', (
+            f"[GOVERNOR] Concurrent accounts {limit} -> {new_limit} ({reason}; "
+            f"running {self.target.running}, waiting {self.target.waiting}, "
+            f"{sample.browser_processes} browser processes using {sample.browser_rss_mb:.0f} MB)"))
+
+    async def _emit(self, level: str, message: str) -> None:
+        if self._log is None:
+            return
+        try:
+            await self._log(level, message)
+        except Exception:
+            pass
+
+
+__all__ = [
+    "Concurrency", "DEFAULT_CONCURRENCY", "HostSample", "sample_host", "decide_limit",
+    "AdaptiveLimiter", "ConcurrencyGovernor",
+]
@@ -52,11 +52,16 @@ from ..email_verification_async import (
 )
 import django
 from ..models import InstagramAccount, BulkUploadAccount
+from .playwright_runtime import get_playwright_runtime
 
 
 async def run_dolphin_browser_async(account_details: Dict, videos: List, video_files_to_upload: List[str],
-                                   task_id, account_task_id):
-    """Run browser automation for Instagram - exact copy of sync version with proper error handling"""
+                                   task_id, account_task_id, warm_browser=None):
+    """Run browser automation for Instagram - exact copy of sync version with proper error handling
+
+    warm_browser: AsyncDolphinBrowser already connected to the account's profile
+    (pre-started by the coordinator while the account waited for a slot)
+    """
     dolphin = None
     dolphin_browser = None
     page = None
@@ -81,7 +86,7 @@ async def run_dolphin_browser_async(account_details: Dict, videos: List, video_f
             log_error(f"[FAIL] [ASYNC_DOLPHIN_ERROR] {error_msg}")
             return ("DOLPHIN_ERROR", 0, 1)
         
-        from bot.src.instagram_uploader.dolphin_anty import DolphinAnty
+        from bot.src.instagram_uploader.dolphin_anty import get_dolphin_client
         
         # Get Dolphin API host from environment (critical for Docker Windows deployment)
         dolphin_api_host = os.environ.get("DOLPHIN_API_HOST", "http://localhost:3001/v1.0")
@@ -90,9 +95,10 @@ async def run_dolphin_browser_async(account_details: Dict, videos: List, video_f
         
         log_info(f"🐬 [ASYNC_DOLPHIN_CONFIG] Using Dolphin API host: {dolphin_api_host}")
         
-        dolphin = DolphinAnty(api_key=dolphin_token, local_api_base=dolphin_api_host)
+        # Process-wide client: token login and pooled connections are shared by all accounts
+        dolphin = get_dolphin_client(api_key=dolphin_token, local_api_base=dolphin_api_host)
         
-        # Enhanced authentication with retry logic
+        # Enhanced authentication with retry logic (returns immediately once the client is logged in)
         log_info(f"🔐 [ASYNC_DOLPHIN_AUTH] Authenticating with Dolphin Anty API...")
         auth_attempts = 0
         max_auth_attempts = 3
@@ -121,10 +127,22 @@ async def run_dolphin_browser_async(account_details: Dict, videos: List, video_f
         
         log_info(f"🔗 [ASYNC_DOLPHIN_PROFILE] Found profile ID: {dolphin_profile_id}")
         
+        # Use the pre-started profile if it belongs to this account and is still connected
+        if warm_browser is not None:
+            if str(warm_browser.dolphin_profile_id) == str(dolphin_profile_id):
+                dolphin_browser = warm_browser
+                page = await dolphin_browser.ensure_connected_async()
+                if page:
+                    log_info(f"⚡ [ASYNC_DOLPHIN_BROWSER] Using pre-started profile: {dolphin_profile_id}")
+            if not page:
+                await warm_browser.cleanup_async()
+                dolphin_browser = None
+        
         # Connect to browser profile
-        log_info("🌐 [ASYNC_DOLPHIN_BROWSER] Connecting to browser profile...")
-        dolphin_browser = AsyncDolphinBrowser(dolphin_token)
-        page = await dolphin_browser.connect_to_profile_async(dolphin_profile_id, headless=False)
+        if not page:
+            log_info("🌐 [ASYNC_DOLPHIN_BROWSER] Connecting to browser profile...")
+            dolphin_browser = AsyncDolphinBrowser(dolphin_token)
+            page = await dolphin_browser.connect_to_profile_async(dolphin_profile_id, headless=False)
         
         if not page:
             error_msg = "Failed to connect to browser profile"
@@ -160,6 +178,12 @@ async def run_dolphin_browser_async(account_details: Dict, videos: List, video_f
         except Exception as _al_err:
             log_warning(f"[HEADERS] [ASYNC_DOLPHIN_BROWSER] Failed to set Accept-Language: {_al_err}")
         
+        # Health check of the pooled CDP connection before the long Instagram flow
+        page = await dolphin_browser.ensure_connected_async()
+        if not page:
+            log_error("[FAIL] [ASYNC_DOLPHIN_BROWSER] Lost connection to browser profile")
+            return ("BROWSER_ERROR", 0, 1)
+        
         # Perform Instagram operations
         log_debug(f"[SEARCH] [ASYNC_INSTAGRAM_PREP] Preparing Instagram operations for {len(videos)} videos")
         result = await perform_instagram_operations_async(page, account_details, videos, video_files_to_upload)
@@ -228,6 +252,12 @@ async def run_dolphin_browser_async(account_details: Dict, videos: List, video_f
             return ("BROWSER_ERROR", 0, 1)
     
     finally:
+        # A pre-started profile that was not used (early return) must not keep running
+        if warm_browser is not None and warm_browser is not dolphin_browser:
+            try:
+                await warm_browser.cleanup_async()
+            except Exception as warm_err:
+                log_warning(f"[ASYNC_CLEANUP] Failed to stop pre-started profile: {warm_err}")
         # Persist latest cookies in DB regardless of outcome
         try:
             if dolphin and dolphin_profile_id:
@@ -270,13 +300,10 @@ async def run_dolphin_browser_async(account_details: Dict, videos: List, video_f
 async def authenticate_dolphin_async(dolphin) -> bool:
     """Authenticate with Dolphin Anty API - exact copy from sync version"""
     try:
-        from asgiref.sync import sync_to_async
-        
         log_info("🔐 [ASYNC_DOLPHIN_AUTH] Authenticating with Dolphin Anty API...")
         
-        # Use sync dolphin.authenticate() method which calls get_profiles(limit=1)
-        authenticate_sync = sync_to_async(dolphin.authenticate)
-        auth_result = await authenticate_sync()
+        # dolphin.authenticate() calls get_profiles(limit=1) once per client, then is cached
+        auth_result = await dolphin.authenticate_async()
         
         if not auth_result:
             log_info("[FAIL] [ASYNC_DOLPHIN_AUTH] Failed to authenticate with Dolphin Anty API")
@@ -286,8 +313,7 @@ async def authenticate_dolphin_async(dolphin) -> bool:
         
         # Check application status - exact copy from sync
         log_info("[SEARCH] [ASYNC_DOLPHIN_AUTH] Checking Dolphin Anty application status...")
-        check_status_sync = sync_to_async(dolphin.check_dolphin_status)
-        dolphin_status = await check_status_sync()
+        dolphin_status = await dolphin.check_dolphin_status_async()
         
         if not dolphin_status["app_running"]:
             error_msg = dolphin_status.get("error", "Unknown error")
@@ -338,9 +364,7 @@ async def cleanup_browser_session_async(page, dolphin_browser, dolphin_profile_i
         # Try to stop Dolphin profile if we have dolphin instance and profile_id
         if dolphin and dolphin_profile_id:
             try:
-                from asgiref.sync import sync_to_async
-                stop_profile_sync = sync_to_async(dolphin.stop_profile)  
-                await stop_profile_sync(dolphin_profile_id)
+                await dolphin.stop_profile_async(dolphin_profile_id)
                 log_info(f"[ASYNC_CLEANUP] [OK] Stopped Dolphin profile: {dolphin_profile_id}")
             except Exception as dolphin_error:
                 log_info(f"[ASYNC_CLEANUP] [WARN] Dolphin profile stop error: {str(dolphin_error)}")
@@ -387,14 +411,15 @@ class AsyncDolphinBrowser:
         
             log_info(f"🐬 [ASYNC_DOLPHIN_INIT] Using Dolphin API host: {dolphin_api_host}")
             
-            from bot.src.instagram_uploader.dolphin_anty import DolphinAnty
-            self.dolphin = DolphinAnty(api_key=dolphin_api_token, local_api_base=dolphin_api_host)
+            from bot.src.instagram_uploader.dolphin_anty import get_dolphin_client
+            self.dolphin = get_dolphin_client(api_key=dolphin_api_token, local_api_base=dolphin_api_host)
         else:
             log_error(f"[FAIL] [ASYNC_DOLPHIN_INIT] No Dolphin API token provided - cannot initialize DolphinAnty")
             raise ValueError("Dolphin API token is required")
         
         self.playwright = None
         self.browser = None
+        self.cdp_lease = None
         self.context = None
         self.page = None
         self.dolphin_profile_id = None
@@ -403,16 +428,13 @@ class AsyncDolphinBrowser:
     async def connect_to_profile_async(self, profile_id: str, headless: bool = False):
         """Connect to an existing Dolphin Anty profile using Playwright - exact copy of sync logic"""
         try:
-            from asgiref.sync import sync_to_async
-            from playwright.async_api import async_playwright
             import os
             
             self.dolphin_profile_id = profile_id
             
             # Start the Dolphin profile using sync method
             log_info(f"[RETRY] [ASYNC_BROWSER] [Step 1/5] Starting Dolphin Anty profile: {profile_id} (headless: {headless})")
-            start_profile_sync = sync_to_async(self.dolphin.start_profile)
-            success, automation_data = await start_profile_sync(profile_id, headless=headless)
+            success, automation_data = await self.dolphin.start_profile_async(profile_id, headless=headless)
             
             if not success or not automation_data:
                 log_error(f"[FAIL] [ASYNC_BROWSER] Failed to start Dolphin profile: {profile_id}")
@@ -437,14 +459,16 @@ class AsyncDolphinBrowser:
             ws_url = f"ws://{host}:{port}{ws_endpoint}"
             log_info(f"🔗 [ASYNC_BROWSER] WebSocket URL: {ws_url}")
                             
-            # Initialize Playwright
-            log_info(f"[RETRY] [ASYNC_BROWSER] [Step 2/5] Initializing Playwright...")
-            self.playwright = await async_playwright().start()
+            # Shared Playwright driver of this worker (one Node process for all accounts)
+            log_info(f"[RETRY] [ASYNC_BROWSER] [Step 2/5] Acquiring shared Playwright runtime...")
+            runtime = get_playwright_runtime()
+            self.playwright = await runtime.playwright()
                             
             # Connect to browser
             log_info(f"[RETRY] [ASYNC_BROWSER] [Step 3/5] Connecting to Dolphin browser via WebSocket...")
             try:
-                self.browser = await self.playwright.chromium.connect_over_cdp(ws_url)
+                self.cdp_lease = await runtime.lease(ws_url)
+                self.browser = self.cdp_lease.browser
                 log_info(f"[OK] [ASYNC_BROWSER] Successfully connected to browser using CDP")
             except Exception as connect_error:
                 log_error(f"[FAIL] [ASYNC_BROWSER] Failed to connect via CDP: {connect_error}")
@@ -478,6 +502,24 @@ class AsyncDolphinBrowser:
             await self.cleanup_async()
             return None
     
+    async def ensure_connected_async(self):
+        """Health check: reconnect to the running profile if the CDP connection dropped"""
+        if not self.cdp_lease or self.cdp_lease.is_connected():
+            return self.page
+        try:
+            self.browser = await self.cdp_lease.ensure_connected()
+            self.context = self.browser.contexts[0] if self.browser.contexts else None
+            if not self.context:
+                log_error(f"[FAIL] [ASYNC_BROWSER] No browser contexts available after reconnect")
+                return None
+            self.page = self.context.pages[0] if self.context.pages else await self.context.new_page()
+            log_info(f"[OK] [ASYNC_BROWSER] Reconnected to Dolphin profile: {self.dolphin_profile_id}")
+            return self.page
+
+        except Exception as e:
+            log_error(f"[FAIL] [ASYNC_BROWSER] Error reconnecting to profile {self.dolphin_profile_id}: {str(e)}")
+            return None
+    
     async def cleanup_async(self):
         """Clean up browser resources"""
         try:
@@ -499,47 +541,36 @@ class AsyncDolphinBrowser:
                 finally:
                     self.page = None
             
-            # Close browser
-            if self.browser:
+            # Return the CDP connection to the shared pool (disconnects the profile);
+            # the Playwright driver itself is shared and stopped by the worker
+            if self.cdp_lease:
                 try:
                     # На Windows добавляем задержку перед закрытием браузера
                     if is_windows:
                         await asyncio.sleep(1.0)
-                    await self.browser.close()
-                    log_info("[OK] [ASYNC_BROWSER_CLEANUP] Browser closed")
+                    await self.cdp_lease.release(close=True)
+                    log_info("[OK] [ASYNC_BROWSER_CLEANUP] Browser connection released")
                 except Exception as e:
-                    log_warning(f"[WARN] [ASYNC_BROWSER_CLEANUP] Error closing browser: {str(e)}")
+                    log_warning(f"[WARN] [ASYNC_BROWSER_CLEANUP] Error releasing browser connection: {str(e)}")
                 finally:
+                    self.cdp_lease = None
                     self.browser = None
-            
-            # Stop playwright
-            if self.playwright:
-                try:
-                    # На Windows добавляем задержку перед остановкой Playwright
-                    if is_windows:
-                        await asyncio.sleep(0.5)
-                    await self.playwright.stop()
-                    log_info("[OK] [ASYNC_BROWSER_CLEANUP] Playwright stopped")
-                except Exception as e:
-                    log_warning(f"[WARN] [ASYNC_BROWSER_CLEANUP] Error stopping playwright: {str(e)}")
-                finally:
                     self.playwright = None
                 
             # Stop Dolphin profile if needed
             if self.dolphin and self.dolphin_profile_id:
                 try:
-                    from asgiref.sync import sync_to_async
                     # На Windows добавляем задержку перед остановкой профиля
                     if is_windows:
                         await asyncio.sleep(0.5)
-                    stop_profile_sync = sync_to_async(self.dolphin.stop_profile)
-                    await stop_profile_sync(self.dolphin_profile_id)
+                    await self.dolphin.stop_profile_async(self.dolphin_profile_id)
                     log_info("[OK] [ASYNC_BROWSER_CLEANUP] Dolphin profile stopped")
                 except Exception as e:
                     log_warning(f"[WARN] [ASYNC_BROWSER_CLEANUP] Error stopping Dolphin profile: {str(e)}")
             
             # Clear references
             self.browser = None
+            self.cdp_lease = None
             self.context = None  
             self.page = None
             self.playwright = None
@@ -0,0 +1,197 @@
+"""
+Общий Playwright runtime воркера и пул CDP-подключений к профилям Dolphin.
+
+Раньше ``AsyncDolphinBrowser.connect_to_profile_async`` запускал
+``async_playwright().start()`` для каждого аккаунта — отдельный Node-драйвер
+Playwright на каждый профиль. Теперь на event loop воркера запускается один
+драйвер, а подключения к профилям выдаются в аренду (lease):
+
+- драйвер стартует лениво при первой аренде и перезапускается, если упал;
+- подключение к одному ``wsEndpoint`` переиспользуется, пока браузер жив
+  (``browser.is_connected()``), отключившиеся удаляются из пула;
+- подключение делается с повторами (``PLAYWRIGHT_CDP_CONNECT_RETRIES``);
+- ``CDPLease.ensure_connected()`` переподключается к профилю, если соединение
+  оборвалось во время работы;
+- ``shutdown_playwright_runtime()`` закрывает подключения и драйвер в конце
+  работы воркера.
+
+Объекты Playwright привязаны к event loop, поэтому runtime — один на loop.
+"""
+
+import asyncio
+import os
+import weakref
+from typing import Dict, Optional
+
+from ..logging_utils import log_info, log_warning, log_error
+
+PLAYWRIGHT_CDP_CONNECT_RETRIES = int(os.environ.get("PLAYWRIGHT_CDP_CONNECT_RETRIES", "3"))
+PLAYWRIGHT_CDP_CONNECT_TIMEOUT_MS = int(os.environ.get("PLAYWRIGHT_CDP_CONNECT_TIMEOUT_MS", "30000"))
+
+# Признаки того, что упал сам драйвер Playwright, а не браузер профиля
+_DRIVER_DEAD_MARKERS = ("connection closed", "driver", "playwright connection", "has been closed")
+
+
+class CDPLease:
+    """Аренда CDP-подключения к профилю; освобождается через ``release()``"""
+
+    def __init__(self, runtime: "PlaywrightRuntime", ws_url: str, browser):
+        self.runtime = runtime
+        self.ws_url = ws_url
+        self.browser = browser
+        self.released = False
+
+    def is_connected(self) -> bool:
+        try:
+            return bool(self.browser) and self.browser.is_connected()
+        except Exception:
+            return False
+
+    async def ensure_connected(self):
+        """Переподключиться к профилю, если соединение потеряно; возвращает браузер"""
+        if not self.is_connected():
+            log_warning(f"[PW_RUNTIME] CDP connection lost, reconnecting: {self.ws_url}")
+            self.runtime.stats["reconnects"] += 1
+            self.browser = await self.runtime._get_browser(self.ws_url)
+        return self.browser
+
+    async def release(self, close: bool = False) -> None:
+        """
+        Вернуть подключение в пул.
+
+        close=True — отключиться от профиля, если его больше никто не арендует
+        (перед остановкой профиля в Dolphin).
+        """
+        if self.released:
+            return
+        self.released = True
+        await self.runtime._release(self.ws_url, close)
+
+
+class PlaywrightRuntime:
+    """Один драйвер Playwright и пул CDP-подключений для event loop"""
+
+    def __init__(self):
+        self._playwright = None
+        self._lock = asyncio.Lock()
+        # ws_url -> browser, ws_url -> число активных аренд
+        self._browsers: Dict[str, object] = {}
+        self._refs: Dict[str, int] = {}
+        self._connect_locks: Dict[str, asyncio.Lock] = {}
+        self.stats = {"driver_starts": 0, "connects": 0, "reused": 0, "reconnects": 0}
+
+    async def playwright(self, restart: bool = False):
+        """Запущенный драйвер Playwright (стартует при первом обращении)"""
+        async with self._lock:
+            if restart and self._playwright is not None:
+                await self._stop_driver()
+            if self._playwright is None:
+                from playwright.async_api import async_playwright
+                self._playwright = await async_playwright().start()
+                self.stats["driver_starts"] += 1
+                log_info(f"[PW_RUNTIME] Playwright driver started (start #{self.stats['driver_starts']})")
+            return self._playwright
+
+    async def lease(self, ws_url: str) -> CDPLease:
+        """Арендовать подключение к профилю по его WebSocket URL"""
+        browser = await self._get_browser(ws_url)
+        self._refs[ws_url] = self._refs.get(ws_url, 0) + 1
+        return CDPLease(self, ws_url, browser)
+
+    async def _get_browser(self, ws_url: str):
+        lock = self._connect_locks.setdefault(ws_url, asyncio.Lock())
+        async with lock:
+            browser = self._browsers.get(ws_url)
+            if browser is not None:
+                if browser.is_connected():
+                    self.stats["reused"] += 1
+                    return browser
+                self._browsers.pop(ws_url, None)
+
+            attempts = max(1, PLAYWRIGHT_CDP_CONNECT_RETRIES)
+            last_error: Optional[Exception] = None
+            for attempt in range(1, attempts + 1):
+                playwright = await self.playwright(restart=last_error is not None and self._driver_dead(last_error))
+                try:
+                    browser = await playwright.chromium.connect_over_cdp(ws_url, timeout=PLAYWRIGHT_CDP_CONNECT_TIMEOUT_MS)
+                except Exception as e:
+                    last_error = e
+                    log_warning(f"[PW_RUNTIME] CDP connect attempt {attempt}/{attempts} failed for {ws_url}: {e}")
+                    if attempt < attempts:
+                        await asyncio.sleep(min(5.0, attempt * 1.0))
+                    continue
+                self.stats["connects"] += 1
+                self._browsers[ws_url] = browser
+                browser.on("disconnected", lambda _browser, url=ws_url: self._forget(url, _browser))
+                return browser
+            raise last_error
+
+    @staticmethod
+    def _driver_dead(error: Exception) -> bool:
+        text = str(error).lower()
+        return any(marker in text for marker in _DRIVER_DEAD_MARKERS)
+
+    def _forget(self, ws_url: str, browser) -> None:
+        if self._browsers.get(ws_url) is browser:
+            self._browsers.pop(ws_url, None)
+
+    async def _release(self, ws_url: str, close: bool) -> None:
+        refs = self._refs.get(ws_url, 0) - 1
+        if refs > 0:
+            self._refs[ws_url] = refs
+            return
+        self._refs.pop(ws_url, None)
+        browser = self._browsers.pop(ws_url, None) if close else None
+        if browser is not None:
+            try:
+                # Для connect_over_cdp close() только отключается, профиль останавливает Dolphin
+                await browser.close()
+            except Exception as e:
+                log_warning(f"[PW_RUNTIME] Error disconnecting from {ws_url}: {e}")
+
+    async def _stop_driver(self) -> None:
+        playwright, self._playwright = self._playwright, None
+        self._browsers.clear()
+        if playwright is not None:
+            try:
+                await playwright.stop()
+            except Exception as e:
+                log_warning(f"[PW_RUNTIME] Error stopping Playwright driver: {e}")
+
+    async def shutdown(self) -> None:
+        """Отключиться от всех профилей и остановить драйвер"""
+        for ws_url, browser in list(self._browsers.items()):
+            try:
+                await browser.close()
+            except Exception as e:
+                log_warning(f"[PW_RUNTIME] Error disconnecting from {ws_url}: {e}")
+        self._refs.clear()
+        self._connect_locks.clear()
+        async with self._lock:
+            await self._stop_driver()
+        log_info(f"[PW_RUNTIME] Playwright runtime stopped: {self.stats}")
+
+
+_runtimes: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, PlaywrightRuntime]" = weakref.WeakKeyDictionary()
+
+
+def get_playwright_runtime() -> PlaywrightRuntime:
+    """Runtime текущего event loop (создается при первом обращении)"""
+    loop = asyncio.get_running_loop()
+    runtime = _runtimes.get(loop)
+    if runtime is None:
+        runtime = _runtimes[loop] = PlaywrightRuntime()
+    return runtime
+
+
+async def shutdown_playwright_runtime() -> None:
+    """Остановить runtime текущего event loop, если он запускался"""
+    runtime = _runtimes.pop(asyncio.get_running_loop(), None)
+    if runtime is not None:
+        try:
+            await runtime.shutdown()
+        except Exception as e:
+            log_error(f"[PW_RUNTIME] Shutdown failed: {e}")
+
+
+__all__ = ['CDPLease', 'PlaywrightRuntime', 'get_playwright_runtime', 'shutdown_playwright_runtime']
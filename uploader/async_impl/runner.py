@@ -146,35 +146,42 @@ async def process_single_account_with_semaphore_async(semaphore, account_task, t
                 log_error(f"[FAIL] [BATCH_{batch_num}] Failed to prepare videos for account {username}")
                 return ("ERROR", 0, 1)
             
-            # Process account with retries
-            for attempt in range(1, PARALLEL_CONFIG['MAX_RETRIES_PER_ACCOUNT'] + 1):
-                try:
-                    log_info(f"[RETRY] [BATCH_{batch_num}] Account {username} attempt {attempt}/{PARALLEL_CONFIG['MAX_RETRIES_PER_ACCOUNT']}")
+            try:
+                # Process account with retries
+                for attempt in range(1, PARALLEL_CONFIG['MAX_RETRIES_PER_ACCOUNT'] + 1):
+                    try:
+                        log_info(f"[RETRY] [BATCH_{batch_num}] Account {username} attempt {attempt}/{PARALLEL_CONFIG['MAX_RETRIES_PER_ACCOUNT']}")
                     
-                    result = await run_dolphin_browser_async(
-                        account_details, videos, video_files, task.id, account_task.id
-                    )
+                        result = await run_dolphin_browser_async(
+                            account_details, videos, video_files, task.id, account_task.id
+                        )
                     
-                    # If successful or permanent failure, don't retry
-                    if result[0] in ["SUCCESS", "SUSPENDED", "PHONE_VERIFICATION_REQUIRED", "HUMAN_VERIFICATION_REQUIRED"]:
-                        log_info(f"[OK] [BATCH_{batch_num}] Account {username} completed: {result[0]}")
-                        return result
+                        # If successful or permanent failure, don't retry
+                        if result[0] in ["SUCCESS", "SUSPENDED", "PHONE_VERIFICATION_REQUIRED", "HUMAN_VERIFICATION_REQUIRED"]:
+                            log_info(f"[OK] [BATCH_{batch_num}] Account {username} completed: {result[0]}")
+                            return result
                     
-                    # If temporary failure and not last attempt, retry
-                    if attempt < PARALLEL_CONFIG['MAX_RETRIES_PER_ACCOUNT']:
-                        retry_delay = random.uniform(60, 120)  # 1-2 minutes between retries
-                        log_warning(f"[WARN] [BATCH_{batch_num}] Account {username} failed, retrying in {retry_delay:.1f}s...")
-                        await asyncio.sleep(retry_delay)
+                        # If temporary failure and not last attempt, retry
+                        if attempt < PARALLEL_CONFIG['MAX_RETRIES_PER_ACCOUNT']:
+                            retry_delay = random.uniform(60, 120)  # 1-2 minutes between retries
+                            log_warning(f"[WARN] [BATCH_{batch_num}] Account {username} failed, retrying in {retry_delay:.1f}s...")
+                            await asyncio.sleep(retry_delay)
                     
-                except Exception as e:
-                    log_info(f"[EXPLODE] [BATCH_{batch_num}] Account {username} attempt {attempt} exception: {str(e)}")
-                    if attempt >= PARALLEL_CONFIG['MAX_RETRIES_PER_ACCOUNT']:
-                        return ("ERROR", 0, 1)
-                    await asyncio.sleep(random.uniform(30, 60))
+                    except Exception as e:
+                        log_info(f"[EXPLODE] [BATCH_{batch_num}] Account {username} attempt {attempt} exception: {str(e)}")
+                        if attempt >= PARALLEL_CONFIG['MAX_RETRIES_PER_ACCOUNT']:
+                            return ("ERROR", 0, 1)
+                        await asyncio.sleep(random.uniform(30, 60))
             
-            # All retries exhausted
-            log_error(f"[FAIL] [BATCH_{batch_num}] Account {username} failed after all retries")
-            return ("ERROR", 0, 1)
+                # All retries exhausted
+                log_error(f"[FAIL] [BATCH_{batch_num}] Account {username} failed after all retries")
+                return ("ERROR", 0, 1)
+            finally:
+                # Staged source files are shared across accounts; drop this account's references
+                from ..video_staging import get_video_staging
+                staging = get_video_staging()
+                for file_path in video_files:
+                    staging.release(file_path)
             
         except Exception as e:
             log_info(f"[EXPLODE] [BATCH_{batch_num}] Critical error processing account: {str(e)}")
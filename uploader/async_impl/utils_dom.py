@@ -1932,6 +1932,17 @@ async def prepare_unique_videos_async(account_task, videos):
                     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
                     username = account_task.account.username if hasattr(account_task, 'account') and account_task.account else 'unknown'
                     
+                    # Local storage: share one staged copy (hardlink/reflink) across accounts
+                    try:
+                        source_path = video.video_file.path
+                    except (AttributeError, NotImplementedError):
+                        source_path = None
+                    if source_path and os.path.exists(source_path):
+                        from ..video_staging import get_video_staging
+                        temp_path = get_video_staging().acquire(source_path, video_filename)
+                        log_info(f"[OK] [ASYNC_UNIQUIFY] Staged source file: {temp_path}")
+                        return temp_path
+                    
                     # Create temp file with unique name
                     temp_dir = tempfile.gettempdir()
                     unique_filename = f"tmp{os.getpid()}_{video_filename}_{username}_{timestamp}_v{i+1}.mp4"
@@ -18,6 +18,9 @@ from dataclasses import dataclass, field
 import time
 import logging
 
+from .video_media_cache import DEFAULT_DURATION, ffmpeg_available, get_media_cache
+from .transcode_scheduler import get_transcode_scheduler
+
 # В начале файла добавляем импорт Windows совместимости
 try:
     from .windows_compatibility import run_subprocess_windows, get_windows_temp_dir, is_windows
@@ -95,7 +98,7 @@ class AsyncVideoUniquifier:
         self.temp_files = []
     
     async def uniquify_video_async(self, input_path: str, account_username: str, 
-                                 copy_number: int = 1) -> str:
+                                 copy_number: int = 1, task_key: str = "default") -> str:
         """
         Асинхронно создать уникальную версию видео для аккаунта
         
@@ -103,6 +106,7 @@ class AsyncVideoUniquifier:
             input_path: путь к исходному видео
             account_username: имя пользователя аккаунта
             copy_number: номер копии (для случая когда одно видео используется несколько раз)
+            task_key: ключ задачи для справедливой очереди планировщика кодирований
             
         Returns:
             путь к уникализированному видео
@@ -119,18 +123,13 @@ class AsyncVideoUniquifier:
         temp_dir = tempfile.gettempdir()
         output_path = os.path.join(temp_dir, output_filename)
         
-        # Запускаем FFmpeg асинхронно
-        try:
-            # Python 3.9+
-            success = await asyncio.to_thread(
-                self._process_video_sync, input_path, output_path, unique_config, account_username
-            )
-        except AttributeError:
-            # Fallback для Python < 3.9
-            loop = asyncio.get_running_loop()
-            success = await loop.run_in_executor(
-                None, self._process_video_sync, input_path, output_path, unique_config, account_username
-            )
+        # Запускаем FFmpeg в пуле планировщика кодирований: поток ждёт слот там,
+        # не занимая пул по умолчанию цикла событий
+        loop = asyncio.get_running_loop()
+        success = await loop.run_in_executor(
+            get_transcode_scheduler().executor,
+            self._process_video_sync, input_path, output_path, unique_config, account_username, task_key
+        )
         
         if success and os.path.exists(output_path):
             self.temp_files.append(output_path)
@@ -139,8 +138,9 @@ class AsyncVideoUniquifier:
             raise Exception(f"Failed to create unique video for account {account_username}")
     
     def _process_video_sync(self, input_path: str, output_path: str, 
-                           config: UniqueVideoConfig, account_username: str) -> bool:
-        """Синхронная обработка видео с помощью FFmpeg"""
+                           config: UniqueVideoConfig, account_username: str,
+                           task_key: str = "default") -> bool:
+        """Синхронная обработка видео с помощью FFmpeg (в слоте планировщика кодирований)"""
         try:
             # Проверяем наличие входного файла
             if not os.path.exists(input_path):
@@ -149,30 +149,48 @@ class AsyncVideoUniquifier:
             
             file_size = os.path.getsize(input_path)
             print(f"[FOLDER] [UNIQUIFY] Input file: {os.path.basename(input_path)} ({file_size} bytes)")
-            
-            # Проверяем наличие FFmpeg
-            subprocess.run(["ffmpeg", "-version"], capture_output=True, check=True, timeout=5)
-        except (subprocess.CalledProcessError, FileNotFoundError, subprocess.TimeoutExpired):
+        except OSError as e:
+            print(f"[FAIL] [UNIQUIFY] Cannot read input file {input_path}: {e}")
+            return False
+        
+        # Проверяем наличие FFmpeg (один раз на процесс)
+        if not ffmpeg_available():
             print(f"[FAIL] FFmpeg not found! Please install FFmpeg and add it to PATH.")
             return False
         
+        leased_path = None
         try:
-            # Получаем длительность видео
-            duration = self._get_video_duration(input_path)
+            # Метаданные и нормализованная копия исходника берутся из кэша по SHA-256,
+            # так что ffprobe и тяжёлое масштабирование выполняются один раз на видео
+            video_w, video_h = self._get_video_dimensions(config.video_format)
+            source_path, normalized = input_path, False
+            duration = DEFAULT_DURATION
+            try:
+                media_cache = get_media_cache()
+                digest = media_cache.source_digest(input_path)
+                duration = media_cache.probe(input_path, digest).get("duration") or DEFAULT_DURATION
+                # Аренда не даёт prune удалить мезонин, пока из него кодируется вариант
+                mezzanine_path = media_cache.acquire_mezzanine(input_path, video_w, video_h, digest, task_key=task_key)
+                if mezzanine_path:
+                    leased_path = mezzanine_path
+                    source_path, normalized = mezzanine_path, True
+            except Exception as e:
+                print(f"[WARN] [UNIQUIFY] Media cache unavailable, encoding from source: {e}")
+                duration = self._get_video_duration(input_path)
             
             # Строим команду FFmpeg
-            cmd = self._build_ffmpeg_command(input_path, output_path, config, duration, account_username)
+            cmd = self._build_ffmpeg_command(source_path, output_path, config, duration, account_username,
+                                             normalized=normalized)
             
             print(f"[VIDEO] [UNIQUIFY] Processing video for {account_username}...")
             print(f"[TOOL] [UNIQUIFY] FFmpeg command: {' '.join(cmd[:8])}... (truncated)")  # Показываем только начало команды
             
-            # Выполняем команду с таймаутом
+            # Выполняем команду с таймаутом; число параллельных ffmpeg и их потоки
+            # ограничивает планировщик
             start_time = time.time()
-            result = subprocess.run(
-                cmd, 
-                check=True, 
-                capture_output=True, 
-                text=True,
+            result = get_transcode_scheduler().run(
+                cmd,
+                task_key=task_key,
                 timeout=300  # 5 минут максимум на обработку
             )
             processing_time = time.time() - start_time
@@ -195,6 +213,9 @@ class AsyncVideoUniquifier:
         except Exception as e:
             print(f"[FAIL] [UNIQUIFY] General error: {str(e)}")
             return False
+        finally:
+            if leased_path:
+                get_media_cache().release(leased_path)
     
     def _get_video_duration(self, video_path: str) -> float:
         """Получить длительность видео"""
@@ -217,9 +238,14 @@ class AsyncVideoUniquifier:
     
     def _build_ffmpeg_command(self, input_path: str, output_path: str, 
                              config: UniqueVideoConfig, duration: float, 
-                             account_username: str) -> List[str]:
-        """Построить команду FFmpeg для уникализации"""
+                             account_username: str, normalized: bool = False) -> List[str]:
+        """Построить команду FFmpeg для уникализации
+        
+        ``normalized`` — вход уже приведён к целевому размеру (мезонин из кэша):
+        масштабирование и padding нужны только после crop/zoompan.
+        """
         filters = []
+        eq_params = []
         
         # Определяем размеры видео
         video_w, video_h = self._get_video_dimensions(config.video_format)
@@ -232,8 +258,8 @@ class AsyncVideoUniquifier:
         
         if config.contrast_enabled:
             contrast_value = random.uniform(1.0, 1.2)
-            filters.append(f"eq=contrast={contrast_value}")
-            print(f"🔆 [UNIQUIFY] Added contrast filter: eq=contrast={contrast_value}")
+            eq_params.append(f"contrast={contrast_value}")
+            print(f"🔆 [UNIQUIFY] Added contrast filter: contrast={contrast_value}")
         
         if config.color_enabled:
             hue_value = random.uniform(-10, 10)
@@ -249,9 +275,13 @@ class AsyncVideoUniquifier:
         if config.brightness_enabled:
             brightness_value = random.uniform(0.01, 0.1)
             saturation_value = random.uniform(0.8, 1.2)
-            filters.append(f"eq=brightness={brightness_value}:saturation={saturation_value}")
+            eq_params.append(f"brightness={brightness_value}:saturation={saturation_value}")
             print(f"💡 [UNIQUIFY] Added brightness/saturation filter")
         
+        # Один проход eq вместо двух
+        if eq_params:
+            filters.append("eq=" + ":".join(eq_params))
+        
         if config.crop_enabled:
             crop_w = random.uniform(0.95, 0.99)
             crop_h = random.uniform(0.95, 0.99)
@@ -267,8 +297,9 @@ class AsyncVideoUniquifier:
             filters.append(f"zoompan=z='zoom+{zoom_value-1}':d={int(zoom_duration*25)}:s={video_w}x{video_h}")
             print(f"[SEARCH] [UNIQUIFY] Added zoom/pan filter: zoom={zoom_value:.3f}, duration={zoom_duration:.1f}s")
         
-        # Масштабирование и padding
-        filters.append(f"scale={video_w}:{video_h}:force_original_aspect_ratio=decrease,pad={video_w}:{video_h}:(ow-iw)/2:(oh-ih)/2:black,setsar=1")
+        # Масштабирование и padding (мезонин уже нужного размера, пока кадр не обрезан)
+        if not normalized or config.crop_enabled or config.zoompan_enabled:
+            filters.append(f"scale={video_w}:{video_h}:force_original_aspect_ratio=decrease,pad={video_w}:{video_h}:(ow-iw)/2:(oh-ih)/2:black,setsar=1")
         
         # Добавляем текст
         text_filters = []
@@ -491,7 +522,7 @@ async def get_video_uniquifier() -> AsyncVideoUniquifier:
     return _global_uniquifier
 
 async def uniquify_video_for_account(input_path: str, account_username: str, 
-                                   copy_number: int = 1) -> str:
+                                   copy_number: int = 1, task_key: str = "default") -> str:
     """
     Удобная функция для уникализации видео для конкретного аккаунта
     
@@ -499,12 +530,13 @@ async def uniquify_video_for_account(input_path: str, account_username: str,
         input_path: путь к исходному видео
         account_username: имя пользователя аккаунта
         copy_number: номер копии
+        task_key: ключ задачи для справедливой очереди планировщика кодирований
         
     Returns:
         путь к уникализированному видео
     """
     uniquifier = await get_video_uniquifier()
-    return await uniquifier.uniquify_video_async(input_path, account_username, copy_number)
+    return await uniquifier.uniquify_video_async(input_path, account_username, copy_number, task_key=task_key)
 
 async def cleanup_uniquifier_temp_files():
     """Очистить все временные файлы уникализатора"""
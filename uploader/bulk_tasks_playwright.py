@@ -49,6 +49,7 @@ from .constants import (
     VerboseFilters, InstagramSelectors, APIConstants
 )
 from .selectors_config import InstagramSelectors as SelectorConfig, SelectorUtils
+from .log_sink import append_log_entry
 from .multilingual_selector_provider import get_multilingual_selector_provider, LocaleResolver
 from .task_utils import (
     update_task_log, update_account_task, update_task_status, get_account_username,
@@ -185,21 +186,11 @@ class WebLogger:
         
         # Store in cache for real-time updates
         # Always append to the main task log collection
-        main_cache_key = f"task_logs_{self.task_id}"
-        existing_main_logs = cache.get(main_cache_key, [])
-        existing_main_logs.append(log_entry)
-        if len(existing_main_logs) > Limits.MAX_LOG_ENTRIES:
-            existing_main_logs = existing_main_logs[-Limits.MAX_LOG_ENTRIES:]
-        cache.set(main_cache_key, existing_main_logs, timeout=3600)
-        
-        # If logging for a specific account, also write to account-specific cache
+        append_log_entry(f"task_logs_{self.task_id}", log_entry)
+        
+        # If logging for a specific account, also write to account-specific log
         if self.account_id:
-            account_cache_key = f"task_logs_{self.task_id}_account_{self.account_id}"
-            existing_account_logs = cache.get(account_cache_key, [])
-            existing_account_logs.append(log_entry)
-            if len(existing_account_logs) > Limits.MAX_LOG_ENTRIES:
-                existing_account_logs = existing_account_logs[-Limits.MAX_LOG_ENTRIES:]
-            cache.set(account_cache_key, existing_account_logs, timeout=3600)
+            append_log_entry(f"task_logs_{self.task_id}_account_{self.account_id}", log_entry)
         
         # Also store summary for critical events
         if is_critical:
@@ -1599,7 +1590,7 @@ def run_dolphin_browser(account_details, videos, video_files_to_upload, result_q
             result_queue.put(("DOLPHIN_ERROR", error_msg))
             return
             
-        from bot.src.instagram_uploader.dolphin_anty import DolphinAnty
+        from bot.src.instagram_uploader.dolphin_anty import get_dolphin_client
         from bot.src.instagram_uploader.browser_dolphin import DolphinBrowser
         
         # Get Dolphin API host from environment (critical for Docker Windows deployment)
@@ -1609,7 +1600,8 @@ def run_dolphin_browser(account_details, videos, video_files_to_upload, result_q
         
         log_info(f"🐬 [DOLPHIN_CONFIG] Using Dolphin API host: {dolphin_api_host}", LogCategories.DOLPHIN)
         
-        dolphin = DolphinAnty(api_key=dolphin_token, local_api_base=dolphin_api_host)
+        # Process-wide client: token login and pooled connections are shared by all accounts
+        dolphin = get_dolphin_client(api_key=dolphin_token, local_api_base=dolphin_api_host)
         
         # Enhanced authentication with retry logic
         log_info(f"🔐 [DOLPHIN_AUTH] Authenticating with Dolphin Anty API...", LogCategories.DOLPHIN)
@@ -0,0 +1,226 @@
+"""
+Durable background job queue for long-running tasks (bulk upload, login, warmup, ...).
+
+Views hand work off via ``dispatch_job(kind, **payload)``. The execution backend is
+selected by ``settings.TASK_QUEUE_BACKEND``:
+
+- ``thread`` (default): run the handler in a daemon thread inside the web process,
+  exactly as the views used to do;
+- ``db``: persist a ``BackgroundJob`` row that a separate
+  ``python manage.py run_task_worker`` process claims with
+  ``SELECT ... FOR UPDATE SKIP LOCKED``. Scale throughput by starting more workers.
+"""
+
+import logging
+import os
+import socket
+import threading
+import time
+import traceback
+from datetime import timedelta
+from importlib import import_module
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .models import BackgroundJob
+from .task_log_store import flush_task_logs
+
+logger = logging.getLogger(__name__)
+
+# Job kind -> dotted path of a callable accepting the job payload as kwargs.
+# Paths are resolved lazily so importing this module never pulls in view modules.
+JOB_HANDLERS = {
+    'bulk_upload': 'uploader.views_mod.bulk.run_bulk_upload_job',
+    'bulk_upload_api': 'uploader.views_mod.bulk.run_bulk_upload_api_job',
+    'bulk_login': 'uploader.views_mod.bulk_login.run_bulk_login_job',
+    'warmup': 'uploader.views_warmup._warmup_task_worker',
+    'avatar': 'uploader.views_avatar._run_avatar_task_worker',
+    'bio': 'uploader.views_mod.views_bio._run_bio_task_worker',
+    'follow': 'uploader.views_follow._follow_task_worker',
+    'cookie_robot': 'uploader.views_mod.misc.run_cookie_robot_task',
+    'upload': 'uploader.tasks_playwright.run_upload_task',
+    'dolphin_provision': 'uploader.views_mod.accounts.run_dolphin_provision_job',
+    'tiktok_proxy_validation': 'tiktok_uploader.services.proxy_validation.run_proxy_validation_job',
+}
+
+HEARTBEAT_INTERVAL_SEC = 15
+
+
+def get_backend() -> str:
+    return str(getattr(settings, 'TASK_QUEUE_BACKEND', 'thread') or 'thread').lower()
+
+
+def resolve_handler(kind: str):
+    """Import and return the handler callable registered for ``kind``."""
+    try:
+        path = JOB_HANDLERS[kind]
+    except KeyError:
+        raise ValueError(f"Unknown background job kind: {kind}")
+    module_path, func_name = path.rsplit('.', 1)
+    return getattr(import_module(module_path), func_name)
+
+
+def dispatch_job(kind: str, max_attempts: int | None = None, **payload):
+    """Schedule a background job and return the created ``BackgroundJob`` or ``Thread``.
+
+    Payload values must be JSON-serializable (ids, flags, url lists) because with the
+    ``db`` backend they are stored on the job row and replayed in a worker process.
+    """
+    if kind not in JOB_HANDLERS:
+        raise ValueError(f"Unknown background job kind: {kind}")
+
+    if get_backend() == 'db':
+        job = BackgroundJob.objects.create(
+            kind=kind,
+            payload=payload,
+            max_attempts=max_attempts or int(getattr(settings, 'TASK_QUEUE_MAX_ATTEMPTS', 1) or 1),
+        )
+        logger.info(f"[JOB_QUEUE] Enqueued job {job.id} [{kind}] payload={payload}")
+        return job
+
+    handler = resolve_handler(kind)
+
+    def _run_in_thread():
+        try:
+            handler(**payload)
+        except Exception as e:
+            logger.error(f"[JOB_QUEUE] Thread job [{kind}] failed: {e}\n{traceback.format_exc()}")
+        finally:
+            flush_task_logs()
+            close_old_connections()
+
+    thread = threading.Thread(target=_run_in_thread, daemon=True, name=f"job-{kind}")
+    thread.start()
+    return thread
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def claim_next_job(worker_id: str, kinds: list[str] | None = None) -> BackgroundJob | None:
+    """Atomically claim the oldest available pending job, or return None.
+
+    Rows locked by other workers are skipped instead of waited on. The conditional
+    UPDATE keeps claiming safe on backends without row locks (SQLite).
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        qs = BackgroundJob.objects.select_for_update(skip_locked=True).filter(
+            status='PENDING', available_at__lte=now,
+        )
+        if kinds:
+            qs = qs.filter(kind__in=kinds)
+        job = qs.order_by('available_at', 'id').first()
+        if job is None:
+            return None
+        claimed = BackgroundJob.objects.filter(id=job.id, status='PENDING').update(
+            status='RUNNING',
+            worker_id=worker_id,
+            attempts=job.attempts + 1,
+            started_at=now,
+            heartbeat_at=now,
+            error='',
+        )
+        if not claimed:
+            return None
+    job.refresh_from_db()
+    return job
+
+
+def reclaim_stale_jobs(stale_after_sec: int | None = None) -> int:
+    """Return jobs of dead workers (no heartbeat) to the queue or fail them when out of attempts."""
+    stale_after_sec = stale_after_sec or int(getattr(settings, 'TASK_QUEUE_STALE_AFTER_SEC', 300) or 300)
+    cutoff = timezone.now() - timedelta(seconds=stale_after_sec)
+    stale = BackgroundJob.objects.filter(status='RUNNING', heartbeat_at__lt=cutoff)
+    reclaimed = 0
+    for job in stale:
+        if job.attempts < job.max_attempts:
+            updated = BackgroundJob.objects.filter(id=job.id, status='RUNNING', heartbeat_at__lt=cutoff).update(
+                status='PENDING', worker_id='', available_at=timezone.now(),
+                error=f"Worker {job.worker_id} lost; requeued",
+            )
+        else:
+            updated = BackgroundJob.objects.filter(id=job.id, status='RUNNING', heartbeat_at__lt=cutoff).update(
+                status='FAILED', completed_at=timezone.now(),
+                error=f"Worker {job.worker_id} lost after {job.attempts} attempt(s)",
+            )
+        if updated:
+            reclaimed += 1
+            logger.warning(f"[JOB_QUEUE] Reclaimed stale job {job.id} [{job.kind}] from {job.worker_id}")
+    return reclaimed
+
+
+def _heartbeat_loop(job_id: int, stop: threading.Event) -> None:
+    while not stop.wait(HEARTBEAT_INTERVAL_SEC):
+        try:
+            BackgroundJob.objects.filter(id=job_id, status='RUNNING').update(heartbeat_at=timezone.now())
+        except Exception as e:
+            logger.warning(f"[JOB_QUEUE] Heartbeat for job {job_id} failed: {e}")
+    close_old_connections()
+
+
+def run_job(job: BackgroundJob) -> bool:
+    """Execute a claimed job in the current process and record its outcome."""
+    stop = threading.Event()
+    heartbeat = threading.Thread(target=_heartbeat_loop, args=(job.id, stop), daemon=True)
+    heartbeat.start()
+    started = time.time()
+    try:
+        handler = resolve_handler(job.kind)
+        handler(**(job.payload or {}))
+        ok, error = True, ''
+    except Exception as e:
+        ok, error = False, f"{e}\n{traceback.format_exc()}"
+        logger.error(f"[JOB_QUEUE] Job {job.id} [{job.kind}] failed: {e}")
+    finally:
+        stop.set()
+        heartbeat.join(timeout=5)
+        flush_task_logs()
+        close_old_connections()
+
+    if ok:
+        BackgroundJob.objects.filter(id=job.id).update(status='COMPLETED', completed_at=timezone.now(), error='')
+    elif job.attempts < job.max_attempts:
+        BackgroundJob.objects.filter(id=job.id).update(status='PENDING', worker_id='', available_at=timezone.now(), error=error)
+    else:
+        BackgroundJob.objects.filter(id=job.id).update(status='FAILED', completed_at=timezone.now(), error=error)
+    logger.info(f"[JOB_QUEUE] Job {job.id} [{job.kind}] {'completed' if ok else 'failed'} in {time.time() - started:.1f}s")
+    return ok
+
+
+def run_worker(worker_id: str | None = None, kinds: list[str] | None = None, poll_interval: float = 2.0,
+               max_jobs: int | None = None, burst: bool = False,
+               stop_event: threading.Event | None = None) -> int:
+    """Claim and run jobs one at a time until stopped; returns the number of jobs processed.
+
+    ``burst`` exits as soon as the queue is empty, ``max_jobs`` after that many jobs.
+    """
+    worker_id = worker_id or default_worker_id()
+    stop_event = stop_event or threading.Event()
+    processed = 0
+    last_reclaim = 0.0
+    logger.info(f"[JOB_QUEUE] Worker {worker_id} started (kinds={kinds or 'all'})")
+    while not stop_event.is_set():
+        close_old_connections()
+        try:
+            if time.time() - last_reclaim > HEARTBEAT_INTERVAL_SEC:
+                reclaim_stale_jobs()
+                last_reclaim = time.time()
+            job = claim_next_job(worker_id, kinds)
+        except Exception as e:
+            logger.error(f"[JOB_QUEUE] Worker {worker_id} failed to claim job: {e}")
+            job = None
+        if job is None:
+            if burst:
+                break
+            stop_event.wait(poll_interval)
+            continue
+        run_job(job)
+        processed += 1
+        if max_jobs is not None and processed >= max_jobs:
+            break
+    logger.info(f"[JOB_QUEUE] Worker {worker_id} stopped after {processed} job(s)")
+    return processed
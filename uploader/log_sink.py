@@ -0,0 +1,213 @@
+"""
+Live log sinks for the web UI (task_logs_*, bulk_login_logs_*, ...).
+
+Loggers used to keep each log as one cached list and re-write it on every line
+(``cache.get`` -> append -> slice -> ``cache.set``): the cost grew with the buffer and
+concurrent accounts overwrote each other's lines. A sink appends a single entry and
+trims in O(1), and every entry gets a per-key sequence number so pollers can ask for
+"entries since seq N" only.
+
+Backends (``settings.LOG_SINK_BACKEND``):
+
+- ``redis``: a Redis list per key, appended with ``RPUSH`` + ``LTRIM`` in one Lua call,
+  shared by the web process and task workers;
+- ``memory``: an in-process ring buffer (``collections.deque``); only visible inside the
+  process that writes it;
+- ``auto`` (default): ``redis`` when ``REDIS_URL`` is set and redis-py is installed,
+  ``memory`` otherwise.
+"""
+
+import json
+import logging
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from itertools import islice
+
+from django.conf import settings
+
+from .constants import Limits
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SEC = 3600
+
+
+class LogSink(ABC):
+    """Append-only bounded log keyed by string; entries are dicts tagged with ``seq``."""
+
+    def __init__(self, max_entries: int = Limits.MAX_LOG_ENTRIES, ttl: int = DEFAULT_TTL_SEC):
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+    @abstractmethod
+    def append(self, key: str, entry: dict) -> int:
+        """Append ``entry`` to ``key`` and return its sequence number (starting at 1)."""
+
+    @abstractmethod
+    def read(self, key: str, since: int = 0, limit: int | None = None) -> tuple[list[dict], int]:
+        """Return ``(entries, last_seq)`` with entries whose seq is greater than ``since``.
+
+        ``last_seq`` is the cursor to pass as ``since`` on the next call.
+        """
+
+    @abstractmethod
+    def clear(self, key: str) -> None:
+        """Drop all entries of ``key`` and restart its sequence."""
+
+
+class RingBufferLogSink(LogSink):
+    """In-process ring buffer: one deque(maxlen) per key; least recently written keys are evicted."""
+
+    max_keys = 2000
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._lock = threading.Lock()
+        self._buffers: OrderedDict[str, tuple[deque, int]] = OrderedDict()
+
+    def append(self, key: str, entry: dict) -> int:
+        with self._lock:
+            buf, last_seq = self._buffers.pop(key, (None, 0))
+            if buf is None:
+                buf = deque(maxlen=self.max_entries)
+            seq = last_seq + 1
+            buf.append(dict(entry, seq=seq))
+            self._buffers[key] = (buf, seq)
+            while len(self._buffers) > self.max_keys:
+                self._buffers.popitem(last=False)
+        return seq
+
+    def read(self, key: str, since: int = 0, limit: int | None = None) -> tuple[list[dict], int]:
+        since = int(since or 0)
+        with self._lock:
+            buf, last_seq = self._buffers.get(key, (None, 0))
+            if since > last_seq:
+                # Sequence restarted (process restart / eviction): resend from the beginning
+                since = 0
+            if not buf or since == last_seq:
+                return [], last_seq
+            first_seq = last_seq - len(buf) + 1
+            start = max(0, since - first_seq + 1)
+            stop = None if limit is None else start + max(1, int(limit))
+            entries = list(islice(buf, start, stop))
+        return entries, (entries[-1]['seq'] if entries else last_seq)
+
+    def clear(self, key: str) -> None:
+        with self._lock:
+            self._buffers.pop(key, None)
+
+
+# KEYS[1] = list, KEYS[2] = seq counter; ARGV = payload, max_entries, ttl
+_REDIS_APPEND_SCRIPT = """
+local seq = redis.call('INCR', KEYS[2])
+redis.call('RPUSH', KEYS[1], seq .. ':' .. ARGV[1])
+redis.call('LTRIM', KEYS[1], -tonumber(ARGV[2]), -1)
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[3]))
+redis.call('EXPIRE', KEYS[2], tonumber(ARGV[3]))
+return seq
+"""
+
+
+class RedisLogSink(LogSink):
+    """Redis list per key; append is one atomic INCR + RPUSH + LTRIM script call."""
+
+    key_prefix = 'logsink'
+
+    def __init__(self, url: str, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        import redis
+        self._client = redis.Redis.from_url(url)
+        self._append = self._client.register_script(_REDIS_APPEND_SCRIPT)
+
+    def _keys(self, key: str) -> tuple[str, str]:
+        return f"{self.key_prefix}:{key}", f"{self.key_prefix}:{key}:seq"
+
+    def append(self, key: str, entry: dict) -> int:
+        list_key, seq_key = self._keys(key)
+        payload = json.dumps(entry, ensure_ascii=False, default=str)
+        return int(self._append(keys=[list_key, seq_key], args=[payload, self.max_entries, self.ttl]))
+
+    def read(self, key: str, since: int = 0, limit: int | None = None) -> tuple[list[dict], int]:
+        list_key, seq_key = self._keys(key)
+        pipe = self._client.pipeline(transaction=True)
+        pipe.get(seq_key)
+        pipe.llen(list_key)
+        raw_seq, length = pipe.execute()
+        last_seq = int(raw_seq or 0)
+        since = int(since or 0)
+        if since > last_seq:
+            # Counter expired and restarted: resend from the beginning
+            since = 0
+        if not length or since == last_seq:
+            return [], last_seq
+        # The list holds seqs (last_seq - length, last_seq]; skip what the caller already has
+        start = max(0, length - (last_seq - since))
+        stop = -1 if limit is None else start + max(1, int(limit)) - 1
+        entries = []
+        for raw in self._client.lrange(list_key, start, stop):
+            seq_part, _, body = raw.decode('utf-8').partition(':')
+            seq = int(seq_part)
+            # Entries appended between the two calls shift the window; filter by seq
+            if seq <= since:
+                continue
+            entry = json.loads(body)
+            entry['seq'] = seq
+            entries.append(entry)
+        return entries, (entries[-1]['seq'] if entries else last_seq)
+
+    def clear(self, key: str) -> None:
+        # The counter goes too: readers with an old cursor see since > last_seq and restart
+        self._client.delete(*self._keys(key))
+
+
+_sink: LogSink | None = None
+_sink_lock = threading.Lock()
+
+
+def _build_sink() -> LogSink:
+    backend = str(getattr(settings, 'LOG_SINK_BACKEND', 'auto') or 'auto').lower()
+    url = getattr(settings, 'REDIS_URL', '')
+    if backend in ('auto', 'redis') and url:
+        try:
+            return RedisLogSink(url)
+        except Exception as e:
+            logger.warning(f"[LOG_SINK] Redis log sink unavailable, using in-process ring buffer: {e}")
+    elif backend == 'redis':
+        logger.warning("[LOG_SINK] LOG_SINK_BACKEND=redis requires REDIS_URL; using in-process ring buffer")
+    return RingBufferLogSink()
+
+
+def get_log_sink() -> LogSink:
+    global _sink
+    if _sink is None:
+        with _sink_lock:
+            if _sink is None:
+                _sink = _build_sink()
+    return _sink
+
+
+def append_log_entry(key: str, entry: dict) -> int:
+    """Append a structured log entry to ``key``; returns its seq (0 if the sink failed)."""
+    try:
+        return get_log_sink().append(key, entry)
+    except Exception as e:
+        logger.warning(f"[LOG_SINK] Failed to append to {key}: {e}")
+        return 0
+
+
+def read_log_entries(key: str, since: int = 0, limit: int | None = None) -> tuple[list[dict], int]:
+    """Return ``(entries, next_since)`` for ``key``; entries carry their ``seq``."""
+    try:
+        return get_log_sink().read(key, since=since, limit=limit)
+    except Exception as e:
+        logger.warning(f"[LOG_SINK] Failed to read {key}: {e}")
+        return [], int(since or 0)
+
+
+def parse_since(value) -> int:
+    """Parse a ``since`` query parameter; invalid values mean "from the beginning"."""
+    try:
+        return max(0, int(value or 0))
+    except (TypeError, ValueError):
+        return 0
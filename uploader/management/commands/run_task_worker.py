@@ -0,0 +1,68 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+import multiprocessing
+import signal
+import threading
+
+from uploader.job_queue import JOB_HANDLERS, default_worker_id, run_worker
+
+
+def _worker_process_main(kinds, poll_interval, burst):
+    """Entry point of a child worker process (works for both fork and spawn)."""
+    import django
+    django.setup()
+    stop_event = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+    signal.signal(signal.SIGINT, lambda *_: stop_event.set())
+    run_worker(default_worker_id(), kinds=kinds, poll_interval=poll_interval, burst=burst, stop_event=stop_event)
+
+
+class Command(BaseCommand):
+    help = 'Run background job worker(s) that execute queued bulk/warmup/login/... tasks (TASK_QUEUE_BACKEND=db)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=1, help='Number of worker processes to run (default: 1)')
+        parser.add_argument('--kinds', type=str, default='', help=f'Comma-separated job kinds to handle (default: all). Known: {", ".join(JOB_HANDLERS)}')
+        parser.add_argument('--poll-interval', type=float, default=2.0, help='Seconds to wait between polls when the queue is empty')
+        parser.add_argument('--burst', action='store_true', help='Exit once the queue is empty')
+
+    def handle(self, *args, **options):
+        processes = max(1, int(options['processes']))
+        kinds = [k.strip() for k in (options['kinds'] or '').split(',') if k.strip()] or None
+        unknown = [k for k in (kinds or []) if k not in JOB_HANDLERS]
+        if unknown:
+            raise CommandError(f'Unknown job kinds: {", ".join(unknown)}')
+        poll_interval = float(options['poll_interval'])
+        burst = bool(options['burst'])
+
+        if processes == 1:
+            stop_event = threading.Event()
+            signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+            processed = run_worker(default_worker_id(), kinds=kinds, poll_interval=poll_interval, burst=burst, stop_event=stop_event)
+            self.stdout.write(self.style.SUCCESS(f'Worker stopped after {processed} job(s)'))
+            return
+
+        # Children must not inherit the parent's DB connections
+        connections.close_all()
+        children = [
+            multiprocessing.Process(target=_worker_process_main, args=(kinds, poll_interval, burst), name=f'task-worker-{i}')
+            for i in range(processes)
+        ]
+        for child in children:
+            child.start()
+        self.stdout.write(f'Started {processes} worker processes: {", ".join(str(c.pid) for c in children)}')
+
+        def _terminate(*_):
+            for child in children:
+                if child.is_alive():
+                    child.terminate()
+
+        signal.signal(signal.SIGTERM, _terminate)
+        try:
+            for child in children:
+                child.join()
+        except KeyboardInterrupt:
+            _terminate()
+            for child in children:
+                child.join()
+        self.stdout.write(self.style.SUCCESS('All worker processes stopped'))
@@ -0,0 +1,32 @@
+# Generated by Django 5.1.5 on 2026-10-18 06:57
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('uploader', '0029_backgroundjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskLogEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task_type', models.CharField(help_text='Model name of the task, e.g. bulkuploadtask', max_length=50)),
+                ('task_id', models.BigIntegerField()),
+                ('account_id', models.BigIntegerField(blank=True, help_text='Per-account task row id, empty for task-level lines', null=True)),
+                ('level', models.CharField(default='INFO', max_length=20)),
+                ('category', models.CharField(blank=True, default='', max_length=50)),
+                ('timestamp', models.DateTimeField(default=django.utils.timezone.now)),
+                ('message', models.TextField()),
+            ],
+            options={
+                'verbose_name': 'Task log entry',
+                'verbose_name_plural': 'Task log entries',
+                'indexes': [models.Index(fields=['task_type', 'task_id', 'id'], name='uploader_ta_task_ty_3fa3f6_idx'), models.Index(fields=['task_type', 'task_id', 'account_id', 'id'], name='uploader_ta_task_ty_c6baf2_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.5 on 2026-10-18 07:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('uploader', '0030_tasklogentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProxyGeoCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ip', models.GenericIPAddressField(unique=True)),
+                ('country_code', models.CharField(blank=True, default='', max_length=2)),
+                ('country_name', models.CharField(blank=True, default='', max_length=100)),
+                ('city', models.CharField(blank=True, default='', max_length=100)),
+                ('source', models.CharField(blank=True, default='', help_text='Lookup provider(s), e.g. ip-api, ripe', max_length=20)),
+                ('fetched_at', models.DateTimeField(db_index=True)),
+            ],
+            options={
+                'verbose_name': 'Proxy geo cache entry',
+                'verbose_name_plural': 'Proxy geo cache',
+            },
+        ),
+    ]
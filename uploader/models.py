@@ -5,6 +5,27 @@ import random
 import json
 
 
+class TaskLogMixin:
+    """Task log served from the append-only TaskLogEntry store (see uploader.task_log_store).
+
+    The legacy ``log`` TextField keeps only content written before the store existed.
+    """
+
+    def append_log(self, message, level='INFO', category=''):
+        from .task_log_store import append_task_log
+        append_task_log(self, message, level=level, category=category)
+
+    @property
+    def log_text(self):
+        from .task_log_store import render_task_log
+        return render_task_log(self)
+
+    def log_entries(self, after_id=0, limit=500):
+        """Return (entries, next_cursor) for log lines after ``after_id``."""
+        from .task_log_store import get_task_log_entries
+        return get_task_log_entries(self, after_id=after_id, limit=limit)
+
+
 class Proxy(models.Model):
     PROXY_TYPE_CHOICES = [
         ('HTTP', 'HTTP'),
@@ -296,7 +317,7 @@ class VideoFile(models.Model):
         return f"Video for task {self.task.id}"
 
 
-class BulkUploadTask(models.Model):
+class BulkUploadTask(TaskLogMixin, models.Model):
     STATUS_CHOICES = [
         ('PENDING', 'Pending'),
         ('RUNNING', 'Running'),
@@ -343,7 +364,7 @@ class BulkUploadTask(models.Model):
         return [mention.strip() for mention in self.default_mentions.split('\n') if mention.strip()]
 
 
-class BulkUploadAccount(models.Model):
+class BulkUploadAccount(TaskLogMixin, models.Model):
     STATUS_CHOICES = [
         ('PENDING', 'Pending'),
         ('RUNNING', 'Running'),
@@ -449,7 +470,7 @@ class VideoTitle(models.Model):
 
 
 # New: Avatar change task models
-class AvatarChangeTask(models.Model):
+class AvatarChangeTask(TaskLogMixin, models.Model):
     STRATEGY_CHOICES = [
         ('random_reuse', 'Random reuse when images < accounts'),
         ('one_to_one', 'One image per account (same order)'),
@@ -474,7 +495,7 @@ class AvatarChangeTask(models.Model):
         return f"Avatar Task {self.id} - {self.status}"
 
 
-class AvatarChangeTaskAccount(models.Model):
+class AvatarChangeTaskAccount(TaskLogMixin, models.Model):
     STATUS_CHOICES = [
         ('PENDING', 'Pending'),
         ('RUNNING', 'Running'),
@@ -541,7 +562,7 @@ class FollowTarget(models.Model):
         return f"{self.username} ({self.user_id or 'unresolved'})"
 
 
-class FollowTask(models.Model):
+class FollowTask(TaskLogMixin, models.Model):
     STATUS_CHOICES = [
         ('PENDING', 'Pending'),
         ('RUNNING', 'Running'),
@@ -565,7 +586,7 @@ class FollowTask(models.Model):
         return f"Follow Task {self.id} - {self.status}"
 
 
-class FollowTaskAccount(models.Model):
+class FollowTaskAccount(TaskLogMixin, models.Model):
     STATUS_CHOICES = [
         ('PENDING', 'Pending'),
         ('RUNNING', 'Running'),
@@ -587,7 +608,7 @@ class FollowTaskAccount(models.Model):
 
 
 # ===== Bulk Login Task Models =====
-class BulkLoginTask(models.Model):
+class BulkLoginTask(TaskLogMixin, models.Model):
     STATUS_CHOICES = [
         ('PENDING', 'Pending'),
         ('RUNNING', 'Running'),
@@ -674,7 +695,7 @@ class AccountAnalytics(models.Model):
     def __str__(self):
         return f"{self.account.username} analytics @ {self.created_at:%Y-%m-%d %H:%M}"
 
-class BulkLoginAccount(models.Model):
+class BulkLoginAccount(TaskLogMixin, models.Model):
     STATUS_CHOICES = [
         ('PENDING', 'Pending'),
         ('RUNNING', 'Running'),
@@ -698,7 +719,7 @@ class BulkLoginAccount(models.Model):
 
 
 # New: Bio link change task models
-class BioLinkChangeTask(models.Model):
+class BioLinkChangeTask(TaskLogMixin, models.Model):
     STATUS_CHOICES = [
         ('PENDING', 'Pending'),
         ('RUNNING', 'Running'),
@@ -719,7 +740,7 @@ class BioLinkChangeTask(models.Model):
         return f"Bio Task {self.id} - {self.status}"
 
 
-class BioLinkChangeTaskAccount(models.Model):
+class BioLinkChangeTaskAccount(TaskLogMixin, models.Model):
     STATUS_CHOICES = [
         ('PENDING', 'Pending'),
         ('RUNNING', 'Running'),
@@ -739,7 +760,7 @@ class BioLinkChangeTaskAccount(models.Model):
 
 
 # New: Warmup task models
-class WarmupTask(models.Model):
+class WarmupTask(TaskLogMixin, models.Model):
     STATUS_CHOICES = [
         ('PENDING', 'Pending'),
         ('RUNNING', 'Running'),
@@ -781,7 +802,7 @@ class WarmupTask(models.Model):
         return f"Warmup Task {self.id} - {self.status}"
 
 
-class WarmupTaskAccount(models.Model):
+class WarmupTaskAccount(TaskLogMixin, models.Model):
     STATUS_CHOICES = [
         ('PENDING', 'Pending'),
         ('RUNNING', 'Running'),
@@ -800,3 +821,77 @@ class WarmupTaskAccount(models.Model):
 
     def __str__(self):
         return f"{self.account.username} in Warmup Task {self.task.id}"
+
+
+# ===== Background job queue =====
+class BackgroundJob(models.Model):
+    """Durable unit of background work executed by `manage.py run_task_worker`."""
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('RUNNING', 'Running'),
+        ('COMPLETED', 'Completed'),
+        ('FAILED', 'Failed'),
+    ]
+
+    kind = models.CharField(max_length=50, db_index=True, help_text="Handler key from uploader.job_queue.JOB_HANDLERS")
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING')
+    attempts = models.IntegerField(default=0)
+    max_attempts = models.IntegerField(default=1)
+    worker_id = models.CharField(max_length=120, blank=True, default="")
+    error = models.TextField(blank=True, default="")
+    available_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'available_at']),
+        ]
+        verbose_name = "Background job"
+        verbose_name_plural = "Background jobs"
+
+    def __str__(self):
+        return f"Job {self.id} [{self.kind}] - {self.status}"
+
+
+class TaskLogEntry(models.Model):
+    """One append-only log line of a task (see uploader.task_log_store)."""
+    task_type = models.CharField(max_length=50, help_text="Model name of the task, e.g. bulkuploadtask")
+    task_id = models.BigIntegerField()
+    account_id = models.BigIntegerField(null=True, blank=True, help_text="Per-account task row id, empty for task-level lines")
+    level = models.CharField(max_length=20, default='INFO')
+    category = models.CharField(max_length=50, blank=True, default="")
+    timestamp = models.DateTimeField(default=timezone.now)
+    message = models.TextField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['task_type', 'task_id', 'id']),
+            models.Index(fields=['task_type', 'task_id', 'account_id', 'id']),
+        ]
+        verbose_name = "Task log entry"
+        verbose_name_plural = "Task log entries"
+
+    def __str__(self):
+        return f"{self.task_type}#{self.task_id} [{self.level}] {self.message[:60]}"
+
+
+class ProxyGeoCache(models.Model):
+    """Geo lookup of a proxy's external IP, shared by both apps (see uploader.proxy_validation_engine)."""
+    ip = models.GenericIPAddressField(unique=True)
+    country_code = models.CharField(max_length=2, blank=True, default="")
+    country_name = models.CharField(max_length=100, blank=True, default="")
+    city = models.CharField(max_length=100, blank=True, default="")
+    source = models.CharField(max_length=20, blank=True, default="", help_text="Lookup provider(s), e.g. ip-api, ripe")
+    fetched_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        verbose_name = "Proxy geo cache entry"
+        verbose_name_plural = "Proxy geo cache"
+
+    def __str__(self):
+        return f"{self.ip} -> {self.country_code or '?'} {self.city}".strip()
@@ -19,11 +19,19 @@ django.setup()
 
 from uploader.models import InstagramAccount, Proxy
 from uploader.utils import validate_proxy
+from uploader.proxy_validation_engine import ProxySpec, validate_proxies
 
-def diagnose_account_proxy(account_id: int) -> Dict:
-    """Диагностика прокси для конкретного аккаунта"""
+def diagnose_account_proxy(account_id: int, precomputed: Optional[Tuple[bool, str, Dict]] = None,
+                           account: Optional[InstagramAccount] = None) -> Dict:
+    """
+    Диагностика прокси для конкретного аккаунта
+
+    precomputed — уже полученный результат проверки прокси (is_valid, message, geo_info),
+    чтобы не проверять его повторно при массовой диагностике
+    """
     try:
-        account = InstagramAccount.objects.get(id=account_id)
+        if account is None:
+            account = InstagramAccount.objects.select_related('proxy').get(id=account_id)
         
         result = {
             'account_id': account_id,
@@ -51,15 +59,18 @@ def diagnose_account_proxy(account_id: int) -> Dict:
         }
         
         # Тестируем прокси
-        print(f"[SEARCH] Testing proxy for account {account.username}...")
-        is_valid, message, geo_info = validate_proxy(
-            host=proxy.host,
-            port=proxy.port,
-            username=proxy.username,
-            password=proxy.password,
-            timeout=15,
-            proxy_type=proxy.proxy_type
-        )
+        if precomputed is not None:
+            is_valid, message, geo_info = precomputed
+        else:
+            print(f"[SEARCH] Testing proxy for account {account.username}...")
+            is_valid, message, geo_info = validate_proxy(
+                host=proxy.host,
+                port=proxy.port,
+                username=proxy.username,
+                password=proxy.password,
+                timeout=15,
+                proxy_type=proxy.proxy_type
+            )
         
         result['proxy_test'] = {
             'is_valid': is_valid,
@@ -108,10 +119,10 @@ def diagnose_dolphin_profile_proxy(profile_id: str) -> Dict:
 
 def diagnose_all_accounts_with_dolphin_profiles() -> Dict:
     """Диагностика всех аккаунтов с Dolphin профилями"""
-    accounts = InstagramAccount.objects.filter(dolphin_profile_id__isnull=False)
+    accounts = list(InstagramAccount.objects.filter(dolphin_profile_id__isnull=False).select_related('proxy'))
     
     results = {
-        'total_accounts': accounts.count(),
+        'total_accounts': len(accounts),
         'accounts': [],
         'summary': {
             'with_proxy': 0,
@@ -121,9 +132,21 @@ def diagnose_all_accounts_with_dolphin_profiles() -> Dict:
         }
     }
     
+    # Каждый уникальный прокси проверяется один раз, все вместе общим asyncio-движком
+    unique_proxies = {account.proxy_id: account.proxy for account in accounts if account.proxy_id}
+    print(f"[SEARCH] Testing {len(unique_proxies)} proxies for {len(accounts)} accounts...")
+    checks = validate_proxies(
+        [ProxySpec.from_model(proxy) for proxy in unique_proxies.values()], timeout=15
+    )
+    proxy_results = {
+        proxy_id: check.as_tuple('code') for proxy_id, check in zip(unique_proxies, checks)
+    }
+    
     for account in accounts:
         print(f"Diagnosing account {account.username} (ID: {account.id})...")
-        result = diagnose_account_proxy(account.id)
+        result = diagnose_account_proxy(
+            account.id, precomputed=proxy_results.get(account.proxy_id), account=account
+        )
         results['accounts'].append(result)
         
         if result.get('proxy_assigned'):
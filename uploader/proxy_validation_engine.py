@@ -0,0 +1,700 @@
+#!/usr/bin/env python
+"""
+Общий asyncio-движок валидации прокси (Instagram и TikTok).
+
+Раньше каждое приложение проверяло прокси блокирующими ``requests`` в своем
+пуле потоков и для каждого прокси отдельно запрашивало геолокацию. Движок:
+
+- за один проход проверяет работоспособность прокси и получает его внешний IP
+  (HTTP/HTTPS через aiohttp, SOCKS5 — собственным асинхронным рукопожатием
+  с TLS поверх туннеля);
+- ограничивает число одновременных запросов общим лимитом и отдельно на
+  каждый внешний сервис (``UpstreamLimiter``), а для сервисов с лимитом в
+  минуту (ip-api) — еще и частоту запросов на весь процесс, чтобы не
+  упираться в лимиты httpbin / ipify / ip-api / RIPE;
+- определяет геолокацию внешнего IP через ``GeoResolver``: IP собираются в
+  пакеты (окно ``PROXY_GEO_BATCH_DELAY_SEC``), сначала ищутся в таблице ``ProxyGeoCache`` (TTL
+  ``PROXY_GEO_CACHE_TTL_HOURS``), недостающие запрашиваются пакетным API
+  ip-api (до 100 IP за запрос) и RIPE, результат сохраняется в таблицу.
+
+Синхронный вход — ``validate_proxies``; асинхронный — ``ProxyValidationEngine.validate_many``.
+"""
+
+import asyncio
+import ipaddress
+import logging
+import os
+import socket
+import ssl
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+PROXY_VALIDATION_CONCURRENCY = int(os.getenv("PROXY_VALIDATION_CONCURRENCY", "200"))
+PROXY_VALIDATION_UPSTREAM_LIMIT = int(os.getenv("PROXY_VALIDATION_UPSTREAM_LIMIT", "64"))
+PROXY_VALIDATION_TIMEOUT_SEC = float(os.getenv("PROXY_VALIDATION_TIMEOUT_SEC", "10"))
+PROXY_GEO_CACHE_TTL_HOURS = float(os.getenv("PROXY_GEO_CACHE_TTL_HOURS", "168"))
+PROXY_GEO_USE_RIPE = os.getenv("PROXY_GEO_USE_RIPE", "1").lower() in ("1", "true", "yes")
+# Сколько копить IP перед пакетным запросом геолокации (ip-api считает запросы, а не IP)
+PROXY_GEO_BATCH_DELAY_SEC = float(os.getenv("PROXY_GEO_BATCH_DELAY_SEC", "2"))
+
+# HTTPS endpoints, возвращающие внешний IP (достаточно одного успешного)
+TEST_ENDPOINTS = [
+    ("https://httpbin.org/ip", "json_ip"),
+    ("https://api.ipify.org?format=json", "json_ip"),
+    ("https://ifconfig.me/ip", "plain_ip"),
+]
+IP_API_BATCH_URL = "http://ip-api.com/batch?fields=status,query,country,countryCode,city"
+IP_API_BATCH_SIZE = 100
+RIPE_URL = "https://rest.db.ripe.net/search.json?query-string={ip}&type-filter=inetnum&flags=no-filtering"
+
+# Отдельные лимиты одновременных запросов для сервисов геолокации
+UPSTREAM_LIMITS = {
+    "ip-api.com": 2,
+    "rest.db.ripe.net": 8,
+}
+# Лимиты частоты (запросов в минуту на процесс): ip-api пускает 15 пакетных запросов в минуту
+UPSTREAM_RATES_PER_MINUTE = {
+    "ip-api.com": int(os.getenv("PROXY_GEO_IP_API_PER_MINUTE", "15")),
+}
+
+_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+
+@dataclass
+class ProxySpec:
+    """Параметры подключения к прокси"""
+    host: str
+    port: int
+    username: Optional[str] = None
+    password: Optional[str] = None
+    proxy_type: str = "HTTP"
+
+    @classmethod
+    def from_model(cls, proxy) -> "ProxySpec":
+        return cls(proxy.host, proxy.port, proxy.username, proxy.password, proxy.proxy_type or "HTTP")
+
+
+@dataclass
+class GeoRecord:
+    country_code: str = ""
+    country_name: str = ""
+    city: str = ""
+    source: str = ""
+
+
+@dataclass
+class ProxyCheckResult:
+    is_valid: bool
+    message: str
+    external_ip: Optional[str] = None
+    geo: Optional[GeoRecord] = None
+    username_country: Optional[str] = None
+    # Проверка не выполнена из-за внутренней ошибки (а не нерабочего прокси)
+    error: bool = False
+
+    def geo_info(self, country_style: str = "code") -> Dict:
+        """
+        Геоданные в формате ``validate_proxy``.
+
+        country_style: ``code`` — код страны (Instagram: из логина прокси, иначе RIPE/ip-api),
+        ``name`` — название страны ip-api (TikTok).
+        """
+        geo = self.geo or GeoRecord()
+        if country_style == "name":
+            country = geo.country_name or None
+        else:
+            country = self.username_country or geo.country_code or None
+        return {"country": country, "city": geo.city or None, "external_ip": self.external_ip}
+
+    def as_tuple(self, country_style: str = "code") -> Tuple[bool, str, Dict]:
+        return self.is_valid, self.message, self.geo_info(country_style)
+
+
+def parse_ip(text: Optional[str]) -> Optional[str]:
+    """Нормализованный IP из ответа сервиса или None"""
+    candidate = (text or "").split(",")[0].strip()
+    try:
+        return str(ipaddress.ip_address(candidate))
+    except ValueError:
+        return None
+
+
+def country_from_username(username: Optional[str]) -> Optional[str]:
+    """Код страны из логина прокси вида ``user-country-XY-...`` / ``XY_state_...``"""
+    if not username:
+        return None
+    if "-country-" in username:
+        code = username.split("-country-", 1)[1].split("-")[0]
+        if len(code) == 2 and code.isalpha():
+            return code.upper()
+    for separator in ("-", "_"):
+        for part in username.split(separator):
+            if len(part) == 2 and part.isalpha():
+                return part.upper()
+    return None
+
+
+def _normalize_host(host: str) -> str:
+    host = (host or "").strip()
+    return host.split("/", 1)[0] if "/" in host else host
+
+
+def _unverified_ssl_context() -> ssl.SSLContext:
+    # Как и во всем проекте (ssl_fix), сертификаты при проверке прокси не проверяются
+    context = ssl.create_default_context()
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_NONE
+    return context
+
+
+# ============================================================================
+# КЭШ ГЕОЛОКАЦИИ (синхронные функции, вызываются из потока БД)
+# ============================================================================
+
+def load_cached_geo(ips: List[str], ttl_hours: float = PROXY_GEO_CACHE_TTL_HOURS) -> Dict[str, GeoRecord]:
+    from django.utils import timezone
+    from uploader.models import ProxyGeoCache
+
+    if not ips:
+        return {}
+    fresh_after = timezone.now() - timedelta(hours=ttl_hours)
+    return {
+        row.ip: GeoRecord(row.country_code, row.country_name, row.city, row.source)
+        for row in ProxyGeoCache.objects.filter(ip__in=ips, fetched_at__gte=fresh_after)
+    }
+
+
+def store_geo(records: Dict[str, GeoRecord]) -> None:
+    from django.utils import timezone
+    from uploader.models import ProxyGeoCache
+
+    if not records:
+        return
+    now = timezone.now()
+    ProxyGeoCache.objects.bulk_create(
+        [
+            ProxyGeoCache(
+                ip=ip, country_code=geo.country_code[:2], country_name=geo.country_name[:100],
+                city=geo.city[:100], source=geo.source, fetched_at=now,
+            )
+            for ip, geo in records.items()
+        ],
+        update_conflicts=True,
+        unique_fields=["ip"],
+        update_fields=["country_code", "country_name", "city", "source", "fetched_at"],
+        batch_size=500,
+    )
+
+
+# ============================================================================
+# SOCKS5
+# ============================================================================
+
+async def _sock_recv_exactly(loop, sock: socket.socket, size: int) -> bytes:
+    data = b""
+    while len(data) < size:
+        chunk = await loop.sock_recv(sock, size - len(data))
+        if not chunk:
+            raise ConnectionError("SOCKS5 proxy closed the connection")
+        data += chunk
+    return data
+
+
+async def _socks5_connect(host, port, username, password, target_host: str, target_port: int) -> socket.socket:
+    """Открыть через SOCKS5 туннель до ``target_host:target_port`` (неблокирующий сокет)"""
+    loop = asyncio.get_running_loop()
+    infos = await loop.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    if not infos:
+        raise ConnectionError(f"Cannot resolve SOCKS5 proxy {host}")
+    family, sock_type, proto, _, address = infos[0]
+    sock = socket.socket(family, sock_type, proto)
+    sock.setblocking(False)
+    try:
+        await loop.sock_connect(sock, address)
+        use_auth = bool(username and password)
+        await loop.sock_sendall(sock, b"\x05\x02\x00\x02" if use_auth else b"\x05\x01\x00")
+        version, method = await _sock_recv_exactly(loop, sock, 2)
+        if version != 5 or method == 0xFF:
+            raise ConnectionError("SOCKS5 proxy rejected authentication methods")
+        if method == 2:
+            user, pwd = username.encode(), password.encode()
+            await loop.sock_sendall(sock, b"\x01" + bytes([len(user)]) + user + bytes([len(pwd)]) + pwd)
+            _, auth_status = await _sock_recv_exactly(loop, sock, 2)
+            if auth_status != 0:
+                raise ConnectionError("SOCKS5 authentication failed")
+
+        target = target_host.encode()
+        await loop.sock_sendall(sock, b"\x05\x01\x00\x03" + bytes([len(target)]) + target + target_port.to_bytes(2, "big"))
+        _, reply, _, address_type = await _sock_recv_exactly(loop, sock, 4)
+        if reply != 0:
+            raise ConnectionError(f"SOCKS5 connect failed (reply {reply})")
+        if address_type == 1:
+            await _sock_recv_exactly(loop, sock, 4 + 2)
+        elif address_type == 4:
+            await _sock_recv_exactly(loop, sock, 16 + 2)
+        else:
+            length = (await _sock_recv_exactly(loop, sock, 1))[0]
+            await _sock_recv_exactly(loop, sock, length + 2)
+    except BaseException:
+        sock.close()
+        raise
+    return sock
+
+
+# ============================================================================
+# ЛИМИТЫ И ГЕОЛОКАЦИЯ
+# ============================================================================
+
+class RateWindow:
+    """
+    Скользящее окно: не больше ``limit`` запросов за ``window`` секунд.
+
+    Общее для процесса (проверки Instagram и TikTok идут в разных потоках и
+    event loop'ах), поэтому время — ``time.monotonic``, а состояние — под
+    ``threading.Lock``; ожидание — ``asyncio.sleep``.
+    """
+
+    def __init__(self, limit: int, window: float = 60.0):
+        self.limit = max(1, limit)
+        self.window = window
+        self._stamps: deque = deque()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Занять слот (0) или вернуть, сколько ждать до следующей попытки"""
+        with self._lock:
+            now = time.monotonic()
+            if now < self._blocked_until:
+                return self._blocked_until - now
+            while self._stamps and now - self._stamps[0] >= self.window:
+                self._stamps.popleft()
+            if len(self._stamps) < self.limit:
+                self._stamps.append(now)
+                return 0.0
+            return self.window - (now - self._stamps[0])
+
+    async def wait(self) -> None:
+        while True:
+            delay = self._reserve()
+            if delay <= 0:
+                return
+            await asyncio.sleep(delay)
+
+    def block(self, seconds: float) -> None:
+        """Сервис сообщил, что лимит исчерпан: не слать запросы ``seconds`` секунд"""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + max(0.0, seconds))
+
+
+_rate_windows: Dict[str, RateWindow] = {}
+_rate_windows_lock = threading.Lock()
+
+
+def get_rate_window(host: str) -> Optional[RateWindow]:
+    """Окно частоты для сервиса (None — лимита частоты нет)"""
+    per_minute = UPSTREAM_RATES_PER_MINUTE.get(host)
+    if not per_minute:
+        return None
+    with _rate_windows_lock:
+        window = _rate_windows.get(host)
+        if window is None:
+            window = _rate_windows[host] = RateWindow(per_minute)
+        return window
+
+
+class _UpstreamSlot:
+    def __init__(self, semaphore: asyncio.Semaphore, rate: Optional[RateWindow]):
+        self.semaphore = semaphore
+        self.rate = rate
+
+    async def __aenter__(self):
+        await self.semaphore.acquire()
+        if self.rate is not None:
+            try:
+                await self.rate.wait()
+            except BaseException:
+                self.semaphore.release()
+                raise
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.semaphore.release()
+
+
+class UpstreamLimiter:
+    """Семафор на каждый внешний сервис (по hostname) плюс лимит частоты из ``UPSTREAM_RATES_PER_MINUTE``"""
+
+    def __init__(self, default_limit: int = PROXY_VALIDATION_UPSTREAM_LIMIT, limits: Optional[Dict[str, int]] = None):
+        self.default_limit = max(1, default_limit)
+        self.limits = dict(UPSTREAM_LIMITS, **(limits or {}))
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    def __call__(self, url: str) -> _UpstreamSlot:
+        host = urlsplit(url).hostname or url
+        semaphore = self._semaphores.get(host)
+        if semaphore is None:
+            semaphore = self._semaphores[host] = asyncio.Semaphore(self.limits.get(host, self.default_limit))
+        return _UpstreamSlot(semaphore, get_rate_window(host))
+
+
+class GeoResolver:
+    """
+    Геолокация IP с пакетной обработкой.
+
+    ``resolve`` ставит IP в очередь; очередь сбрасывается пакетом по
+    ``IP_API_BATCH_SIZE`` IP или через ``batch_delay`` секунд: один запрос к
+    кэшу в БД, один пакетный запрос к ip-api на недостающие IP, запись в кэш.
+    """
+
+    def __init__(self, session, limiter: UpstreamLimiter, db_executor: ThreadPoolExecutor,
+                 ttl_hours: float = PROXY_GEO_CACHE_TTL_HOURS, use_ripe: bool = PROXY_GEO_USE_RIPE,
+                 batch_delay: float = PROXY_GEO_BATCH_DELAY_SEC):
+        self.session = session
+        self.limiter = limiter
+        self.db_executor = db_executor
+        self.ttl_hours = ttl_hours
+        self.use_ripe = use_ripe
+        self.batch_delay = batch_delay
+        self._memory: Dict[str, Optional[GeoRecord]] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._queue: List[str] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._tasks: set = set()
+        self.stats = {"memory": 0, "db": 0, "fetched": 0, "failed": 0}
+
+    async def resolve(self, ip: str) -> Optional[GeoRecord]:
+        if ip in self._memory:
+            self.stats["memory"] += 1
+            return self._memory[ip]
+        future = self._inflight.get(ip)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self._inflight[ip] = loop.create_future()
+            self._queue.append(ip)
+            if len(self._queue) >= IP_API_BATCH_SIZE:
+                self._spawn_flush()
+            elif self._flush_handle is None:
+                self._flush_handle = loop.call_later(self.batch_delay, self._spawn_flush)
+        return await asyncio.shield(future)
+
+    def _spawn_flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._queue = self._queue, []
+        if batch:
+            task = asyncio.ensure_future(self._flush(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _flush(self, ips: List[str]) -> None:
+        loop = asyncio.get_running_loop()
+        records: Dict[str, GeoRecord] = {}
+        try:
+            records = await loop.run_in_executor(self.db_executor, load_cached_geo, ips, self.ttl_hours)
+            self.stats["db"] += len(records)
+            missing = [ip for ip in ips if ip not in records]
+            if missing:
+                fetched = await self._fetch(missing)
+                self.stats["fetched"] += len(fetched)
+                self.stats["failed"] += len(missing) - len(fetched)
+                if fetched:
+                    await loop.run_in_executor(self.db_executor, store_geo, fetched)
+                records.update(fetched)
+        except Exception as e:
+            logger.warning(f"Geo lookup batch failed: {e}")
+        for ip in ips:
+            self._memory[ip] = records.get(ip)
+            future = self._inflight.pop(ip, None)
+            if future is not None and not future.done():
+                future.set_result(records.get(ip))
+
+    async def _fetch(self, ips: List[str]) -> Dict[str, GeoRecord]:
+        fetched: Dict[str, GeoRecord] = {}
+        lookups = [self._fetch_ip_api(ips)]
+        if self.use_ripe:
+            lookups += [self._fetch_ripe(ip) for ip in ips]
+        results = await asyncio.gather(*lookups, return_exceptions=True)
+        ip_api = results[0] if isinstance(results[0], dict) else {}
+        ripe = dict(zip(ips, results[1:])) if self.use_ripe else {}
+        for ip in ips:
+            geo = ip_api.get(ip)
+            ripe_code = ripe.get(ip) if isinstance(ripe.get(ip), str) else None
+            if geo is None and not ripe_code:
+                continue
+            geo = geo or GeoRecord()
+            if ripe_code:
+                # Как и раньше в uploader.utils: код страны RIPE приоритетнее ip-api
+                geo.country_code = ripe_code
+                geo.source = "+".join(filter(None, [geo.source, "ripe"]))
+            fetched[ip] = geo
+        return fetched
+
+    async def _fetch_ip_api(self, ips: List[str]) -> Dict[str, GeoRecord]:
+        import aiohttp
+
+        records: Dict[str, GeoRecord] = {}
+        for start in range(0, len(ips), IP_API_BATCH_SIZE):
+            chunk = ips[start:start + IP_API_BATCH_SIZE]
+            try:
+                async with self.limiter(IP_API_BATCH_URL):
+                    async with self.session.post(IP_API_BATCH_URL, json=chunk, timeout=aiohttp.ClientTimeout(total=15)) as response:
+                        self._note_ip_api_limit(response)
+                        if response.status != 200:
+                            logger.warning(f"ip-api batch lookup returned status {response.status}")
+                            continue
+                        data = await response.json(content_type=None)
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                logger.warning(f"ip-api batch lookup failed: {e}")
+                continue
+            for item in data or []:
+                if isinstance(item, dict) and item.get("status") == "success" and item.get("query"):
+                    records[item["query"]] = GeoRecord(
+                        item.get("countryCode") or "", item.get("country") or "", item.get("city") or "", "ip-api",
+                    )
+        return records
+
+    @staticmethod
+    def _note_ip_api_limit(response) -> None:
+        """ip-api отдает остаток запросов (X-Rl) и секунды до сброса окна (X-Ttl)"""
+        window = get_rate_window("ip-api.com")
+        if window is None:
+            return
+        try:
+            remaining = int(response.headers.get("X-Rl", "1"))
+            ttl = float(response.headers.get("X-Ttl", "60"))
+        except ValueError:
+            return
+        if response.status == 429 or remaining <= 0:
+            logger.warning(f"ip-api rate limit reached, pausing geo lookups for {ttl:.0f}s")
+            window.block(ttl)
+
+    async def _fetch_ripe(self, ip: str) -> Optional[str]:
+        import aiohttp
+
+        url = RIPE_URL.format(ip=ip)
+        try:
+            async with self.limiter(url):
+                async with self.session.get(url, timeout=aiohttp.ClientTimeout(total=6)) as response:
+                    if response.status != 200:
+                        return None
+                    data = await response.json(content_type=None)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+            return None
+        for obj in ((data or {}).get("objects") or {}).get("object") or []:
+            for attr in obj.get("attributes", {}).get("attribute", []):
+                if attr.get("name", "").lower() == "country":
+                    value = (attr.get("value") or "").strip().upper()
+                    if len(value) == 2:
+                        return value
+        return None
+
+
+# ============================================================================
+# ДВИЖОК
+# ============================================================================
+
+class ProxyValidationEngine:
+    """Проверка множества прокси с общим и per-upstream лимитами"""
+
+    def __init__(self, concurrency: int = PROXY_VALIDATION_CONCURRENCY, timeout: float = PROXY_VALIDATION_TIMEOUT_SEC,
+                 upstream_limit: int = PROXY_VALIDATION_UPSTREAM_LIMIT, resolve_geo: bool = True):
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self.upstream_limit = upstream_limit
+        self.resolve_geo = resolve_geo
+        self.geo_stats: Dict[str, int] = {}
+
+    async def validate_many(
+        self,
+        specs: Iterable[ProxySpec],
+        on_result: Optional[Callable[[int, ProxyCheckResult], Optional[Awaitable]]] = None
+    ) -> List[ProxyCheckResult]:
+        """
+        Проверить прокси; ``on_result(index, result)`` вызывается по мере готовности.
+
+        Returns:
+            List[ProxyCheckResult]: в порядке ``specs``
+        """
+        import aiohttp
+
+        specs = list(specs)
+        results: List[Optional[ProxyCheckResult]] = [None] * len(specs)
+        if not specs:
+            return []
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        limiter = UpstreamLimiter(self.upstream_limit)
+        # Все обращения к БД — из одного потока
+        db_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="proxy-geo-db")
+        connector = aiohttp.TCPConnector(limit=self.concurrency, ssl=False)
+        try:
+            async with aiohttp.ClientSession(connector=connector, headers={"User-Agent": _USER_AGENT}) as session:
+                resolver = GeoResolver(session, limiter, db_executor) if self.resolve_geo else None
+
+                async def _run(index: int, spec: ProxySpec) -> None:
+                    async with semaphore:
+                        try:
+                            result = await self.check(session, limiter, spec)
+                        except Exception as e:
+                            result = ProxyCheckResult(False, f"Unexpected error: {e}", error=True)
+                    if result.is_valid and resolver and result.external_ip:
+                        result.geo = await resolver.resolve(result.external_ip)
+                    results[index] = result
+                    if on_result is not None:
+                        maybe_awaitable = on_result(index, result)
+                        if asyncio.iscoroutine(maybe_awaitable):
+                            await maybe_awaitable
+
+                await asyncio.gather(*[_run(index, spec) for index, spec in enumerate(specs)])
+                if resolver:
+                    self.geo_stats = dict(resolver.stats)
+        finally:
+            from django.db import connections
+            db_executor.submit(connections.close_all).result()
+            db_executor.shutdown(wait=True)
+        return results
+
+    async def check(self, session, limiter: UpstreamLimiter, spec: ProxySpec) -> ProxyCheckResult:
+        """Проверить один прокси и получить его внешний IP"""
+        host = _normalize_host(spec.host)
+        try:
+            port = int(spec.port)
+        except (ValueError, TypeError):
+            return ProxyCheckResult(False, "Invalid port number")
+
+        is_socks = (spec.proxy_type or "").upper() == "SOCKS5"
+        last_error = ""
+        for url, mode in TEST_ENDPOINTS:
+            try:
+                async with limiter(url):
+                    if is_socks:
+                        status, body = await asyncio.wait_for(
+                            self._socks5_get(host, port, spec.username, spec.password, url), self.timeout
+                        )
+                    else:
+                        status, body = await self._http_get(session, host, port, spec.username, spec.password, url)
+            except (asyncio.TimeoutError, OSError, ConnectionError, ValueError) as e:
+                last_error = str(e) or e.__class__.__name__
+                continue
+            except Exception as e:
+                # aiohttp.ClientError и прочие ошибки прокси
+                last_error = str(e) or e.__class__.__name__
+                continue
+            if status != 200:
+                last_error = f"status {status}"
+                continue
+
+            external_ip = self._parse_body_ip(body, mode)
+            label = "SOCKS5 proxy" if is_socks else "Proxy"
+            return ProxyCheckResult(
+                True, f"{label} is working correctly",
+                external_ip=external_ip, username_country=country_from_username(spec.username),
+            )
+
+        logger.debug(f"Proxy {host}:{port} failed all test URLs: {last_error}")
+        if is_socks:
+            return ProxyCheckResult(False, f"SOCKS5 proxy validation failed: {last_error}")
+        return ProxyCheckResult(False, "HTTPS check failed for all test URLs")
+
+    @staticmethod
+    def _parse_body_ip(body: str, mode: str) -> Optional[str]:
+        import json
+        if mode == "json_ip":
+            try:
+                data = json.loads(body)
+                return parse_ip(data.get("origin") or data.get("ip"))
+            except (ValueError, AttributeError):
+                return None
+        text = (body or "").strip()
+        return parse_ip(text.split()[0] if text else "")
+
+    async def _http_get(self, session, host, port, username, password, url) -> Tuple[int, str]:
+        import aiohttp
+        proxy_url = f"http://{host}:{port}"
+        if username and password:
+            proxy_url = f"http://{username}:{password}@{host}:{port}"
+        async with session.get(url, proxy=proxy_url, timeout=aiohttp.ClientTimeout(total=self.timeout)) as response:
+            return response.status, await response.text()
+
+    @staticmethod
+    async def _socks5_get(host, port, username, password, url) -> Tuple[int, str]:
+        """HTTPS GET через SOCKS5 (RFC 1928/1929) на asyncio-потоках"""
+        parts = urlsplit(url)
+        target_host = parts.hostname
+        target_port = parts.port or (443 if parts.scheme == "https" else 80)
+        path = parts.path or "/"
+        if parts.query:
+            path = f"{path}?{parts.query}"
+
+        sock = await _socks5_connect(host, port, username, password, target_host, target_port)
+        # TLS поднимается сразу при открытии потока поверх готового туннеля
+        # (StreamWriter.start_tls есть только с Python 3.11)
+        tls = {"ssl": _unverified_ssl_context(), "server_hostname": target_host} if parts.scheme == "https" else {}
+        try:
+            reader, writer = await asyncio.open_connection(sock=sock, **tls)
+        except BaseException:
+            sock.close()
+            raise
+        try:
+            # HTTP/1.0: ответ без chunked, соединение закрывается сервером
+            writer.write(
+                f"GET {path} HTTP/1.0\r\nHost: {target_host}\r\nUser-Agent: {_USER_AGENT}\r\n"
+                f"Accept: */*\r\nConnection: close\r\n\r\n".encode()
+            )
+            await writer.drain()
+            raw = await reader.read(64 * 1024)
+            while True:
+                chunk = await reader.read(64 * 1024)
+                if not chunk or len(raw) > 256 * 1024:
+                    break
+                raw += chunk
+        finally:
+            writer.close()
+
+        head, _, body = raw.partition(b"\r\n\r\n")
+        status_line = head.split(b"\r\n", 1)[0].decode("latin-1")
+        try:
+            status = int(status_line.split()[1])
+        except (IndexError, ValueError):
+            raise ValueError(f"Malformed HTTP response: {status_line[:80]!r}")
+        return status, body.decode("utf-8", "replace")
+
+
+def validate_proxies(specs: Iterable[ProxySpec], **engine_kwargs) -> List[ProxyCheckResult]:
+    """
+    Синхронно проверить прокси общим движком.
+
+    Если в текущем потоке уже работает event loop, проверка выполняется в
+    отдельном потоке.
+    """
+    specs = list(specs)
+    engine = ProxyValidationEngine(**engine_kwargs)
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(engine.validate_many(specs))
+
+    box: Dict[str, object] = {}
+
+    def _run():
+        try:
+            box["results"] = asyncio.run(engine.validate_many(specs))
+        except BaseException as e:
+            box["error"] = e
+
+    thread = threading.Thread(target=_run, name="proxy-validation-engine")
+    thread.start()
+    thread.join()
+    if "error" in box:
+        raise box["error"]
+    return box["results"]
@@ -106,6 +106,59 @@ function isVerbosePlaywrightLog(message) {
     );
 } 
 
+// Progress bar / status badge of bulk task pages (shared by the log pollers)
+function updateProgress(data) {
+    const progressBar = document.getElementById('progressBar');
+    const progressText = document.getElementById('progressText');
+
+    if (progressBar && data.completion_percentage !== undefined) {
+        progressBar.style.width = data.completion_percentage + '%';
+    }
+
+    if (progressText && data.completed_count !== undefined && data.total_count !== undefined) {
+        progressText.textContent = `${data.completed_count} of ${data.total_count} accounts completed (${data.completion_percentage}%)`;
+    }
+}
+
+function updateStatus(status) {
+    const statusBadge = document.querySelector('.status-badge');
+    if (statusBadge) {
+        // Remove all status classes
+        statusBadge.classList.remove('status-pending', 'status-running', 'status-completed', 'status-failed', 'status-partial');
+
+        // Add appropriate class and update content
+        statusBadge.classList.add('status-' + status.toLowerCase());
+
+        let icon = '';
+        let text = '';
+        switch(status) {
+            case 'PENDING':
+                icon = 'bi-clock';
+                text = 'Pending';
+                break;
+            case 'RUNNING':
+                icon = 'bi-play-circle';
+                text = 'Running';
+                break;
+            case 'COMPLETED':
+                icon = 'bi-check-circle';
+                text = 'Completed';
+                break;
+            case 'PARTIALLY_COMPLETED':
+                icon = 'bi-check-circle-fill';
+                text = 'Partially Completed';
+                statusBadge.classList.add('status-partial');
+                break;
+            case 'FAILED':
+                icon = 'bi-x-circle';
+                text = 'Failed';
+                break;
+        }
+
+        statusBadge.innerHTML = `<i class="bi ${icon}"></i> ${text}`;
+    }
+}
+
 // Enhanced log updater with better error handling and performance
 function setupLogUpdater(logUrl, intervalMs = 2000, targetElementId = 'logs') {
     const logsDiv = document.getElementById(targetElementId);
@@ -192,58 +245,6 @@ function setupLogUpdater(logUrl, intervalMs = 2000, targetElementId = 'logs') {
             });
     }
     
-    function updateProgress(data) {
-        const progressBar = document.getElementById('progressBar');
-        const progressText = document.getElementById('progressText');
-        
-        if (progressBar && data.completion_percentage !== undefined) {
-            progressBar.style.width = data.completion_percentage + '%';
-        }
-        
-        if (progressText && data.completed_count !== undefined && data.total_count !== undefined) {
-            progressText.textContent = `${data.completed_count} of ${data.total_count} accounts completed (${data.completion_percentage}%)`;
-        }
-    }
-    
-    function updateStatus(status) {
-        const statusBadge = document.querySelector('.status-badge');
-        if (statusBadge) {
-            // Remove all status classes
-            statusBadge.classList.remove('status-pending', 'status-running', 'status-completed', 'status-failed', 'status-partial');
-            
-            // Add appropriate class and update content
-            statusBadge.classList.add('status-' + status.toLowerCase());
-            
-            let icon = '';
-            let text = '';
-            switch(status) {
-                case 'PENDING':
-                    icon = 'bi-clock';
-                    text = 'Pending';
-                    break;
-                case 'RUNNING':
-                    icon = 'bi-play-circle';
-                    text = 'Running';
-                    break;
-                case 'COMPLETED':
-                    icon = 'bi-check-circle';
-                    text = 'Completed';
-                    break;
-                case 'PARTIALLY_COMPLETED':
-                    icon = 'bi-check-circle-fill';
-                    text = 'Partially Completed';
-                    statusBadge.classList.add('status-partial');
-                    break;
-                case 'FAILED':
-                    icon = 'bi-x-circle';
-                    text = 'Failed';
-                    break;
-            }
-            
-            statusBadge.innerHTML = `<i class="bi ${icon}"></i> ${text}`;
-        }
-    }
-    
     // Start the update cycle
     updateLogs();
     
@@ -263,4 +264,82 @@ document.addEventListener('DOMContentLoaded', function() {
         const hasHtml = /<[^>]+>/.test(logsDiv.textContent);
         logsDiv.innerHTML = hasHtml ? logsDiv.textContent : renderLog(logsDiv.textContent);
     }
-}); 
\ No newline at end of file
+}); 
+
+// Incremental log feed (/logs/<kind>/<id>/?since=N): fetches and appends only new entries
+function setupLogFeed(feedUrl, targetElementId, options = {}) {
+    const el = document.getElementById(targetElementId);
+    if (!el) {
+        console.error(`Log container element '${targetElementId}' not found`);
+        return;
+    }
+    const intervalMs = options.intervalMs || 2000;
+    // Bulk task pages scroll the surrounding .log-container, other pages the element itself
+    const scroller = el.closest('.log-container') || el;
+    let since = 0;
+    let firstLoad = true;
+    // Legacy (pre-store) log lines are only requested until the first response
+    let legacyDone = false;
+    let timer;
+    // Store feeds resend a few entries behind the cursor (late commits); skip the ones already shown
+    const seen = new Set();
+
+    function freshEntries(entries) {
+        return entries.filter(entry => {
+            if (entry.category === 'LEGACY') return !legacyDone;
+            if (!entry.seq) return true;
+            if (seen.has(entry.seq)) return false;
+            seen.add(entry.seq);
+            return true;
+        });
+    }
+
+    function appendEntries(entries) {
+        const atBottom = (scroller.scrollTop + scroller.clientHeight) >= (scroller.scrollHeight - 10);
+        if (options.text) {
+            el.textContent += entries.map(entry => entry.message).join('\n') + '\n';
+        } else {
+            el.insertAdjacentHTML('beforeend', renderStructuredLogs(entries));
+        }
+        if (atBottom) {
+            scroller.scrollTop = scroller.scrollHeight;
+        }
+    }
+
+    function poll() {
+        const sep = feedUrl.includes('?') ? '&' : '?';
+        fetch(`${feedUrl}${sep}since=${since}${legacyDone ? '&legacy=0' : ''}`)
+            .then(response => {
+                if (response.status === 304) return null;
+                if (!response.ok) throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+                return response.json();
+            })
+            .then(data => {
+                if (data) {
+                    const entries = freshEntries(data.entries || []);
+                    if (firstLoad && entries.length) {
+                        // Replace the server-rendered log with the feed
+                        el.textContent = '';
+                        firstLoad = false;
+                    }
+                    if (entries.length) appendEntries(entries);
+                    legacyDone = true;
+                    since = data.next_since || since;
+                    if (options.onStatus && data.status) options.onStatus(data.status);
+                    if (options.onData) options.onData(data);
+                    // Stop once the task is finished and everything has been read
+                    if (!entries.length && data.status !== 'RUNNING' && data.status !== 'PENDING') return;
+                }
+                timer = setTimeout(poll, intervalMs);
+            })
+            .catch(error => {
+                console.error('Error fetching log feed:', error);
+                timer = setTimeout(poll, intervalMs * 2);
+            });
+    }
+
+    poll();
+    return function cleanup() {
+        clearTimeout(timer);
+    };
+}
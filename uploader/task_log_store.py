@@ -0,0 +1,241 @@
+"""
+Append-only store for task logs (``TaskLogEntry``).
+
+Task rows used to carry their whole history in the ``log`` TextField and were re-saved
+on every event. Log lines are now buffered in memory and written with batched
+``bulk_create`` inserts, so the cost of one event does not depend on how long the task
+has been running. ``render_task_log`` / ``get_task_log_entries`` serve the log back as
+text (bounded tail) or as cursor-paginated entries.
+
+Lines belong to a task, identified by ``(task_type, task_id)`` where ``task_type`` is the
+model name of the task (``bulkuploadtask``, ``warmuptask``, ...). Lines written through a
+per-account row (``BulkUploadAccount``, ``WarmupTaskAccount``, ...) are stored on the parent
+task with ``account_id`` set to that row's id.
+"""
+
+import atexit
+import logging
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Per-account row model -> name of the FK to its parent task
+ACCOUNT_TASK_PARENT_FIELDS = {
+    'bulkuploadaccount': 'bulk_task',
+    'bulkloginaccount': 'bulk_task',
+    'warmuptaskaccount': 'task',
+    'followtaskaccount': 'task',
+    'avatarchangetaskaccount': 'task',
+    'biolinkchangetaskaccount': 'task',
+}
+
+BATCH_SIZE = int(getattr(settings, 'TASK_LOG_BATCH_SIZE', 50))
+FLUSH_INTERVAL_SEC = float(getattr(settings, 'TASK_LOG_FLUSH_INTERVAL_SEC', 1.0))
+RENDER_LIMIT = int(getattr(settings, 'TASK_LOG_RENDER_LIMIT', 2000))
+# Upper bound of lines kept in memory while the database rejects writes; the oldest are dropped
+MAX_PENDING = int(getattr(settings, 'TASK_LOG_MAX_PENDING', 20000))
+# Ids are allocated before commit, so a concurrent writer can commit lines with ids below a
+# reader's cursor; incremental readers re-read at most this many ids behind the cursor, only
+# lines written in the last CURSOR_OVERLAP_SEC (a late commit is never older), and dedupe by id
+CURSOR_OVERLAP_IDS = int(getattr(settings, 'TASK_LOG_CURSOR_OVERLAP_IDS', 200))
+CURSOR_OVERLAP_SEC = float(getattr(settings, 'TASK_LOG_CURSOR_OVERLAP_SEC', max(10.0, 5 * FLUSH_INTERVAL_SEC)))
+PAGE_LIMIT = 500
+
+
+def log_owner(obj) -> tuple[str, int, int | None]:
+    """Return ``(task_type, task_id, account_id)`` for a task or per-account task row."""
+    model_name = obj._meta.model_name
+    parent_field = ACCOUNT_TASK_PARENT_FIELDS.get(model_name)
+    if parent_field:
+        parent_model = obj._meta.get_field(parent_field).related_model
+        return parent_model._meta.model_name, getattr(obj, f"{parent_field}_id"), obj.pk
+    return model_name, obj.pk, None
+
+
+class _TaskLogBuffer:
+    """Process-wide buffer flushed with bulk_create by size or by a background timer."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = []
+        self._flusher = None
+        self.dropped = 0
+
+    def add(self, entry) -> None:
+        with self._lock:
+            self._pending.append(entry)
+            full = len(self._pending) >= BATCH_SIZE
+            self._ensure_flusher()
+        if full:
+            self.flush()
+
+    def flush(self) -> int:
+        from .models import TaskLogEntry
+        with self._lock:
+            batch, self._pending = self._pending, []
+        if not batch:
+            return 0
+        try:
+            TaskLogEntry.objects.bulk_create(batch, batch_size=BATCH_SIZE)
+        except Exception as e:
+            # Reconnect once and retry; never lose the batch silently
+            try:
+                close_old_connections()
+                TaskLogEntry.objects.bulk_create(batch, batch_size=BATCH_SIZE)
+            except Exception:
+                logger.error(f"[TASK_LOG] Failed to write {len(batch)} log entries: {e}")
+                self._requeue(batch)
+                return 0
+        return len(batch)
+
+    def _requeue(self, batch) -> None:
+        """Put a failed batch back in front of newer lines, keeping at most MAX_PENDING."""
+        with self._lock:
+            pending = batch + self._pending
+            overflow = len(pending) - MAX_PENDING
+            if overflow > 0:
+                pending = pending[overflow:]
+                self.dropped += overflow
+            self._pending = pending
+        if overflow > 0:
+            logger.error(f"[TASK_LOG] Log buffer full, dropped {overflow} oldest entries ({self.dropped} in total)")
+
+    def _ensure_flusher(self) -> None:
+        if self._flusher is None or not self._flusher.is_alive():
+            self._flusher = threading.Thread(target=self._flush_loop, daemon=True, name='task-log-flusher')
+            self._flusher.start()
+
+    def _flush_loop(self) -> None:
+        while True:
+            time.sleep(FLUSH_INTERVAL_SEC)
+            try:
+                self.flush()
+            except Exception as e:
+                logger.warning(f"[TASK_LOG] Background flush failed: {e}")
+
+
+_buffer = _TaskLogBuffer()
+atexit.register(lambda: _buffer.flush())
+
+
+def append_task_log_entry(task_type: str, task_id: int, message: str, account_id: int | None = None,
+                          level: str = 'INFO', category: str = '') -> None:
+    """Queue one log line for ``(task_type, task_id)`` without touching the task row."""
+    from .models import TaskLogEntry
+    text = (message or '').rstrip('\n')
+    if not text:
+        return
+    _buffer.add(TaskLogEntry(
+        task_type=task_type,
+        task_id=task_id,
+        account_id=account_id,
+        level=(level or 'INFO').upper()[:20],
+        category=(category or '')[:50],
+        timestamp=timezone.now(),
+        message=text,
+    ))
+
+
+def append_task_log(obj, message: str, level: str = 'INFO', category: str = '') -> None:
+    """Queue one log line for a task or per-account task row."""
+    task_type, task_id, account_id = log_owner(obj)
+    append_task_log_entry(task_type, task_id, message, account_id=account_id, level=level, category=category)
+
+
+def flush_task_logs() -> int:
+    """Write all buffered log lines now; returns the number of entries written."""
+    return _buffer.flush()
+
+
+def _entries_queryset(task_type: str, task_id: int, account_id: int | None = None, task_level_only: bool = False):
+    from .models import TaskLogEntry
+    qs = TaskLogEntry.objects.filter(task_type=task_type, task_id=task_id)
+    if account_id is not None:
+        qs = qs.filter(account_id=account_id)
+    elif task_level_only:
+        qs = qs.filter(account_id__isnull=True)
+    return qs
+
+
+def get_task_log_entries(obj, after_id: int = 0, limit: int = PAGE_LIMIT):
+    """Return ``(entries, next_cursor)`` for log lines of ``obj`` with id > ``after_id``.
+
+    For a task this is its task-level log, for a per-account row the lines of that account.
+    Pass ``next_cursor`` back as ``after_id`` to continue.
+    """
+    task_type, task_id, account_id = log_owner(obj)
+    return read_task_log_entries(task_type, task_id, account_id=account_id, after_id=after_id, limit=limit)
+
+
+def read_task_log_entries(task_type: str, task_id: int, account_id: int | None = None,
+                          after_id: int = 0, limit: int = PAGE_LIMIT, overlap: int = 0):
+    """Same as ``get_task_log_entries`` but addressed by ``(task_type, task_id[, account_id])``.
+
+    Buffered lines become visible after the next flush (at most ``FLUSH_INTERVAL_SEC``).
+    ``overlap`` also returns lines with ids up to that far behind ``after_id`` written within
+    the last ``CURSOR_OVERLAP_SEC``, so lines that committed after the previous read are not
+    lost; the caller drops the ones it already has by id.
+    """
+    from django.db.models import Q
+    after_id = int(after_id or 0)
+    overlap = max(0, int(overlap or 0)) if after_id else 0
+    qs = _entries_queryset(task_type, task_id, account_id, task_level_only=True)
+    window = Q(id__gt=after_id)
+    if overlap:
+        cutoff = timezone.now() - timedelta(seconds=CURSOR_OVERLAP_SEC)
+        window |= Q(id__gt=max(0, after_id - overlap), timestamp__gte=cutoff)
+    entries = list(qs.filter(window).order_by('id')[:max(1, int(limit)) + overlap])
+    next_cursor = max(after_id, entries[-1].id) if entries else after_id
+    return entries, next_cursor
+
+
+def get_task_log_tail(obj, limit: int = RENDER_LIMIT):
+    """Return the last ``limit`` log entries of ``obj`` in chronological order."""
+    task_type, task_id, account_id = log_owner(obj)
+    qs = _entries_queryset(task_type, task_id, account_id, task_level_only=True)
+    entries = list(qs.order_by('-id')[:max(1, int(limit))])
+    entries.reverse()
+    return entries
+
+
+def render_task_log(obj, limit: int = RENDER_LIMIT) -> str:
+    """Render the log of ``obj`` as text: legacy ``log`` field content plus the stored tail."""
+    legacy = getattr(obj, 'log', '') or ''
+    lines = [entry.message for entry in get_task_log_tail(obj, limit)]
+    if not lines:
+        return legacy
+    if legacy and not legacy.endswith('\n'):
+        legacy += '\n'
+    return legacy + '\n'.join(lines) + '\n'
+
+
+def delete_task_logs(obj) -> int:
+    """Delete stored log lines of ``obj`` (all accounts included for a task)."""
+    flush_task_logs()
+    task_type, task_id, account_id = log_owner(obj)
+    deleted, _ = _entries_queryset(task_type, task_id, account_id).delete()
+    return deleted
+
+
+# Task models whose stored log lines are removed together with the task
+TASK_LOG_MODELS = ('BulkUploadTask', 'BulkLoginTask', 'WarmupTask', 'FollowTask', 'AvatarChangeTask', 'BioLinkChangeTask')
+
+
+def _delete_logs_on_task_delete(sender, instance, **kwargs):
+    try:
+        delete_task_logs(instance)
+    except Exception as e:
+        logger.warning(f"[TASK_LOG] Failed to delete log entries of {sender.__name__} {instance.pk}: {e}")
+
+
+def connect_task_log_cleanup() -> None:
+    from django.db.models.signals import post_delete
+    from . import models
+    for name in TASK_LOG_MODELS:
+        post_delete.connect(_delete_logs_on_task_delete, sender=getattr(models, name), dispatch_uid=f"task_log_cleanup_{name}")
@@ -8,11 +8,20 @@ import traceback
 from django.utils import timezone
 from .constants import TaskStatus, LogCategories
 from .logging_utils import log_info, log_error, log_success, log_warning
-from .models import BulkUploadTask, InstagramAccount, BulkUploadAccount
+from .models import BulkUploadTask, InstagramAccount, BulkUploadAccount, TaskLogMixin
 
 
-def update_task_log(task, log_message):
+def _save_without_log(obj):
+    """Save all concrete fields except ``log`` (log lines live in TaskLogEntry)"""
+    fields = [f.name for f in obj._meta.concrete_fields if not f.primary_key and f.name != 'log']
+    obj.save(update_fields=fields)
+
+
+def update_task_log(task, log_message, level='INFO', category=''):
     """Update task log with new message"""
+    if isinstance(task, TaskLogMixin):
+        task.append_log(log_message, level=level, category=category)
+        return
     if hasattr(task, 'log') and task.log:
         task.log += log_message
     else:
@@ -25,7 +34,9 @@ def update_account_task(account_task, status=None, log_message=None, started_at=
     if status:
         account_task.status = status
     if log_message:
-        if hasattr(account_task, 'log') and account_task.log:
+        if isinstance(account_task, TaskLogMixin):
+            account_task.append_log(log_message)
+        elif hasattr(account_task, 'log') and account_task.log:
             account_task.log += log_message
         else:
             account_task.log = log_message
@@ -55,12 +66,20 @@ def update_account_task(account_task, status=None, log_message=None, started_at=
             setattr(update_account_task, "_extra_fields", None)
     except Exception:
         pass
-    account_task.save()
+    if isinstance(account_task, TaskLogMixin):
+        _save_without_log(account_task)
+    else:
+        account_task.save()
 
 
 def update_task_status(task, status, log_message):
     """Update main task status and log"""
     task.status = status
+    if isinstance(task, TaskLogMixin):
+        _save_without_log(task)
+        if log_message:
+            task.append_log(log_message)
+        return
     update_task_log(task, log_message)
 
 
@@ -1,3 +1,239 @@
-from django.test import TestCase
+from datetime import timedelta
+from unittest.mock import patch
 
-# Create your tests here.
+import requests
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from uploader import job_queue, task_log_store
+from uploader.async_impl.concurrency_config import AdaptiveLimiter, Concurrency, HostSample, decide_limit
+from uploader.models import BackgroundJob, TaskLogEntry
+
+
+class TaskLogCursorTests(TestCase):
+    """Cursor reads of the append-only task log store"""
+
+    def _write(self, message, **kwargs):
+        return TaskLogEntry.objects.create(task_type='bulkuploadtask', task_id=1, message=message, **kwargs)
+
+    def _read(self, after_id=0, **kwargs):
+        return task_log_store.read_task_log_entries('bulkuploadtask', 1, after_id=after_id, **kwargs)
+
+    def test_cursor_pages_through_entries(self):
+        for i in range(5):
+            self._write(f"line {i}")
+        entries, cursor = self._read(limit=3)
+        self.assertEqual([e.message for e in entries], ['line 0', 'line 1', 'line 2'])
+        entries, cursor = self._read(after_id=cursor, limit=3)
+        self.assertEqual([e.message for e in entries], ['line 3', 'line 4'])
+        entries, next_cursor = self._read(after_id=cursor)
+        self.assertEqual(entries, [])
+        self.assertEqual(next_cursor, cursor)
+
+    def test_account_lines_are_excluded_from_task_log(self):
+        self._write('task line')
+        self._write('account line', account_id=7)
+        entries, _ = self._read()
+        self.assertEqual([e.message for e in entries], ['task line'])
+
+    def test_overlap_resends_only_recent_lines_behind_cursor(self):
+        old = self._write('old', timestamp=timezone.now() - timedelta(hours=1))
+        recent = self._write('recent')
+        cursor = recent.id
+        entries, next_cursor = self._read(after_id=cursor, overlap=task_log_store.CURSOR_OVERLAP_IDS)
+        ids = [e.id for e in entries]
+        self.assertIn(recent.id, ids)
+        self.assertNotIn(old.id, ids)
+        self.assertEqual(next_cursor, cursor)
+
+    def test_buffered_lines_visible_after_flush(self):
+        task_log_store.append_task_log_entry('bulkuploadtask', 1, 'buffered\n')
+        task_log_store.flush_task_logs()
+        entries, _ = self._read()
+        self.assertEqual([e.message for e in entries], ['buffered'])
+
+
+class CreateProfilesBulkTests(TestCase):
+    """Retries and fingerprint hand-out of DolphinAnty.create_profiles_bulk"""
+
+    def setUp(self):
+        from bot.src.instagram_uploader import dolphin_anty
+        self.dolphin_anty = dolphin_anty
+        self.client = dolphin_anty.DolphinAnty(api_key='token')
+        self.client.prefetch_geoip = lambda proxies, **kwargs: 0
+        self.client.generate_fingerprint_pool = lambda size, *args, **kwargs: [{'fp': i} for i in range(size)]
+        sleep_patcher = patch.object(dolphin_anty.time, 'sleep')
+        sleep_patcher.start()
+        self.addCleanup(sleep_patcher.stop)
+
+    def _request(self, key):
+        return self.dolphin_anty.ProfileRequest(key=key, name=f"p{key}", proxy={'host': 'h', 'port': 1})
+
+    def _http_error(self, status, headers=None):
+        response = requests.Response()
+        response.status_code = status
+        response.headers.update(headers or {})
+        return requests.HTTPError(response=response)
+
+    def test_retries_rate_limit_and_server_errors(self):
+        outcomes = [self._http_error(429, {'Retry-After': '0'}), self._http_error(502), {'browserProfileId': 42}]
+        calls = []
+
+        def create_profile(**kwargs):
+            calls.append(kwargs)
+            outcome = outcomes.pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        self.client.create_profile = create_profile
+        with patch.object(self.dolphin_anty, 'DOLPHIN_PROVISION_RETRIES', 3):
+            results = self.client.create_profiles_bulk([self._request(1)], rate=0)
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(results[0].profile_id, '42')
+
+    def test_client_error_is_not_retried(self):
+        calls = []
+
+        def create_profile(**kwargs):
+            calls.append(kwargs)
+            raise self._http_error(400)
+
+        self.client.create_profile = create_profile
+        results = self.client.create_profiles_bulk([self._request(1)], rate=0)
+        self.assertEqual(len(calls), 1)
+        self.assertIsNone(results[0].profile_id)
+        self.assertIn('HTTP 400', results[0].error)
+
+    def test_fingerprints_are_not_shared_and_progress_is_reported(self):
+        fingerprints = []
+        reported = []
+
+        def create_profile(**kwargs):
+            fingerprints.append(kwargs['fingerprint']['fp'])
+            return {'browserProfileId': len(fingerprints)}
+
+        self.client.create_profile = create_profile
+        results = self.client.create_profiles_bulk(
+            [self._request(i) for i in range(4)], rate=0, share_fingerprints=False, on_result=reported.append,
+        )
+        self.assertEqual(sorted(fingerprints), [0, 1, 2, 3])
+        self.assertEqual([r.key for r in results], [0, 1, 2, 3])
+        self.assertEqual(len(reported), 4)
+
+
+class DecideLimitTests(SimpleTestCase):
+    """Host-driven changes of the concurrent accounts limit"""
+
+    config = Concurrency(
+        max_parallel_accounts=6, min_parallel_accounts=1, min_free_mb=1000, browser_mb=500,
+        cpu_high_percent=85, cpu_low_percent=65,
+    )
+
+    def _sample(self, available_mb, cpu=10, browser_rss_mb=0):
+        return HostSample(available_mb=available_mb, cpu_percent=cpu, browser_rss_mb=browser_rss_mb, browser_processes=0)
+
+    def test_low_memory_shrinks_from_running_once(self):
+        sample = self._sample(600, browser_rss_mb=2000)
+        limit, reason = decide_limit(self.config, sample, limit=4, running=4, waiting=2)
+        self.assertEqual(limit, 3)
+        self.assertIn('low memory', reason)
+        # Running accounts have not finished yet: the next tick must not shrink again
+        self.assertEqual(decide_limit(self.config, sample, limit=3, running=4, waiting=2), (3, ''))
+
+    def test_high_cpu_shrinks_only_when_previous_shrink_applied(self):
+        self.assertEqual(decide_limit(self.config, self._sample(5000, cpu=95), 4, running=4, waiting=0)[0], 3)
+        self.assertEqual(decide_limit(self.config, self._sample(5000, cpu=95), 3, running=4, waiting=0), (3, ''))
+
+    def test_grows_with_waiters_and_headroom_up_to_max(self):
+        self.assertEqual(decide_limit(self.config, self._sample(2000), 2, running=2, waiting=1)[0], 3)
+        self.assertEqual(decide_limit(self.config, self._sample(1200), 2, running=2, waiting=1), (2, ''))
+        self.assertEqual(decide_limit(self.config, self._sample(9000), 6, running=6, waiting=1), (6, ''))
+        self.assertEqual(decide_limit(self.config, self._sample(9000), 2, running=2, waiting=0), (2, ''))
+
+
+class AdaptiveLimiterTests(SimpleTestCase):
+    """FIFO semaphore with a resizable limit"""
+
+    def test_raising_limit_wakes_waiters(self):
+        import asyncio
+
+        async def scenario():
+            limiter = AdaptiveLimiter(1)
+            await limiter.acquire()
+            waiter = asyncio.create_task(limiter.acquire())
+            await asyncio.sleep(0)
+            self.assertEqual((limiter.running, limiter.waiting), (1, 1))
+            limiter.set_limit(2)
+            await asyncio.wait_for(waiter, 1)
+            self.assertEqual((limiter.running, limiter.waiting), (2, 0))
+            # Lowering the limit does not interrupt holders; release frees slots one by one
+            limiter.set_limit(1)
+            limiter.release()
+            self.assertEqual(limiter.running, 1)
+
+        asyncio.run(scenario())
+
+    def test_cancelled_waiter_does_not_leak_slot(self):
+        import asyncio
+
+        async def scenario():
+            limiter = AdaptiveLimiter(1)
+            await limiter.acquire()
+            cancelled = asyncio.create_task(limiter.acquire())
+            queued = asyncio.create_task(limiter.acquire())
+            await asyncio.sleep(0)
+            cancelled.cancel()
+            limiter.release()
+            await asyncio.wait_for(queued, 1)
+            with self.assertRaises(asyncio.CancelledError):
+                await cancelled
+            self.assertEqual(limiter.running, 1)
+            limiter.release()
+            self.assertEqual(limiter.running, 0)
+
+        asyncio.run(scenario())
+
+
+@override_settings(TASK_QUEUE_BACKEND='db')
+class JobQueueClaimTests(TestCase):
+    """Claiming, reclaiming and retrying BackgroundJob rows"""
+
+    def test_claim_takes_oldest_available_job_once(self):
+        later = job_queue.dispatch_job('warmup', task_id=2)
+        first = job_queue.dispatch_job('warmup', task_id=1)
+        BackgroundJob.objects.filter(id=first.id).update(available_at=timezone.now() - timedelta(seconds=5))
+        job_queue.dispatch_job('avatar', task_id=3)
+        BackgroundJob.objects.filter(kind='avatar').update(available_at=timezone.now() + timedelta(hours=1))
+
+        claimed = job_queue.claim_next_job('w1', kinds=['warmup'])
+        self.assertEqual((claimed.id, claimed.status, claimed.worker_id, claimed.attempts), (first.id, 'RUNNING', 'w1', 1))
+        self.assertEqual(job_queue.claim_next_job('w2').id, later.id)
+        # The avatar job is not available yet
+        self.assertIsNone(job_queue.claim_next_job('w3'))
+
+    def test_reclaim_requeues_or_fails_stale_jobs(self):
+        retry = job_queue.dispatch_job('warmup', max_attempts=2, task_id=1)
+        final = job_queue.dispatch_job('warmup', max_attempts=1, task_id=2)
+        fresh = job_queue.dispatch_job('warmup', task_id=3)
+        for job in (retry, final, fresh):
+            job_queue.claim_next_job('dead')
+        BackgroundJob.objects.exclude(id=fresh.id).update(heartbeat_at=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual(job_queue.reclaim_stale_jobs(stale_after_sec=60), 2)
+        statuses = dict(BackgroundJob.objects.values_list('id', 'status'))
+        self.assertEqual(statuses, {retry.id: 'PENDING', final.id: 'FAILED', fresh.id: 'RUNNING'})
+        self.assertEqual(job_queue.claim_next_job('w1').attempts, 2)
+
+    def test_failed_job_is_retried_until_attempts_run_out(self):
+        job_queue.dispatch_job('warmup', max_attempts=2, task_id=1)
+
+        def handler(**payload):
+            raise RuntimeError('boom')
+
+        with patch.object(job_queue, 'resolve_handler', return_value=handler):
+            self.assertEqual(job_queue.run_worker('w1', burst=True), 2)
+        job = BackgroundJob.objects.get()
+        self.assertEqual((job.status, job.attempts), ('FAILED', 2))
+        self.assertIn('boom', job.error)
@@ -0,0 +1,230 @@
+#!/usr/bin/env python
+"""
+Планировщик FFmpeg-кодирований для уникализации видео.
+
+Раньше количество одновременных ffmpeg определялось размером пула потоков
+``asyncio.to_thread`` и семафором аккаунтов, а каждый процесс без ``-threads``
+забирал все ядра — кодирования конкурировали с браузерами Dolphin за CPU.
+
+Планировщик:
+- ограничивает число одновременных кодирований бюджетом ядер
+  (``VIDEO_TRANSCODE_CORE_BUDGET`` / ``VIDEO_TRANSCODE_THREADS_PER_JOB``);
+- передаёт каждому ffmpeg ``-threads`` из этого бюджета;
+- раздаёт слоты по очереди между задачами (round-robin по ``task_key``), чтобы
+  одна большая задача не занимала все слоты;
+- собирает метрики: глубина очереди, занятые слоты, время ожидания и кодирования.
+
+Ожидание слота блокирует поток, поэтому async-код запускает кодирования в
+собственном пуле планировщика (``executor``), а не в пуле по умолчанию цикла —
+иначе ожидающие кодирования занимали бы потоки ``asyncio.to_thread``, нужные
+всему остальному. Каждый процесс (веб или ``run_task_worker``) публикует свой
+снимок метрик в кэш Django; ``collect_transcode_metrics`` сводит их по воркерам.
+"""
+
+import os
+import socket
+import subprocess
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+
+def _default_core_budget() -> int:
+    # Половина ядер — остальное остаётся браузерам
+    return max(1, (os.cpu_count() or 2) // 2)
+
+
+CORE_BUDGET = int(os.getenv("VIDEO_TRANSCODE_CORE_BUDGET", "0") or 0) or _default_core_budget()
+THREADS_PER_JOB = max(1, int(os.getenv("VIDEO_TRANSCODE_THREADS_PER_JOB", "2")))
+# Потоков в пуле кодирований: 0 — два на слот (лишние ждут слот, давая работать очереди по задачам)
+EXECUTOR_THREADS = int(os.getenv("VIDEO_TRANSCODE_EXECUTOR_THREADS", "0") or 0)
+
+METRICS_CACHE_PREFIX = "transcode_metrics"
+METRICS_PUBLISH_INTERVAL_SEC = 5
+METRICS_TTL_SEC = 120
+# Снимок каждого процесса лежит в своем слоте {prefix}:slot:N с TTL; слот занимается через
+# cache.add, общего списка процессов (и его read-modify-write) нет
+METRICS_MAX_WORKERS = max(1, int(os.getenv("VIDEO_TRANSCODE_METRICS_MAX_WORKERS", "64")))
+
+
+def _metrics_slot_key(slot: int) -> str:
+    return f"{METRICS_CACHE_PREFIX}:slot:{slot}"
+
+
+def worker_label() -> str:
+    """Метка процесса в метриках: host:pid"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class TranscodeScheduler:
+    """Ограниченный пул слотов кодирования со справедливой очередью по задачам"""
+
+    def __init__(self, core_budget: int = CORE_BUDGET, threads_per_job: int = THREADS_PER_JOB):
+        self.threads_per_job = max(1, min(threads_per_job, core_budget))
+        self.max_jobs = max(1, core_budget // self.threads_per_job)
+        self._cond = threading.Condition()
+        # task_key -> очередь ожидающих билетов; порядок ключей = порядок обслуживания
+        self._queues: "OrderedDict[str, deque]" = OrderedDict()
+        self._granted = set()
+        self._running = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self._published_at = 0.0
+        self._metrics_slot: Optional[int] = None
+        self._stats = {
+            'completed': 0,
+            'failed': 0,
+            'encode_seconds': 0.0,
+            'wait_seconds': 0.0,
+            'max_wait_seconds': 0.0,
+        }
+
+    def _dispatch(self) -> None:
+        """Выдать свободные слоты (вызывается под self._cond)"""
+        while self._running < self.max_jobs and self._queues:
+            task_key, queue = self._queues.popitem(last=False)
+            ticket = queue.popleft()
+            if queue:
+                # Задача уходит в конец — следующий слот получит другая задача
+                self._queues[task_key] = queue
+            self._granted.add(ticket)
+            self._running += 1
+        self._cond.notify_all()
+
+    def acquire(self, task_key: str = "default") -> float:
+        """Дождаться слота; возвращает время ожидания в секундах"""
+        ticket = object()
+        enqueued = time.monotonic()
+        with self._cond:
+            self._queues.setdefault(task_key or "default", deque()).append(ticket)
+            self._dispatch()
+            while ticket not in self._granted:
+                self._cond.wait()
+            self._granted.discard(ticket)
+            waited = time.monotonic() - enqueued
+            self._stats['wait_seconds'] += waited
+            self._stats['max_wait_seconds'] = max(self._stats['max_wait_seconds'], waited)
+        return waited
+
+    def release(self, encode_seconds: float = 0.0, ok: bool = True) -> None:
+        with self._cond:
+            self._running = max(0, self._running - 1)
+            self._stats['completed' if ok else 'failed'] += 1
+            self._stats['encode_seconds'] += encode_seconds
+            self._dispatch()
+        self.publish_metrics()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """Пул потоков для синхронных кодирований, вызываемых из async-кода"""
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=EXECUTOR_THREADS or self.max_jobs * 2,
+                        thread_name_prefix="transcode",
+                    )
+        return self._executor
+
+    def with_threads(self, cmd: List[str]) -> List[str]:
+        """Добавить ``-threads N`` перед выходным файлом, если он не задан"""
+        if cmd and cmd[0] == "ffmpeg" and "-threads" not in cmd:
+            return cmd[:-1] + ["-threads", str(self.threads_per_job), cmd[-1]]
+        return cmd
+
+    def run(self, cmd: List[str], task_key: str = "default", timeout: Optional[float] = 300) -> subprocess.CompletedProcess:
+        """Выполнить ffmpeg-команду в слоте планировщика (исключения subprocess пробрасываются)"""
+        waited = self.acquire(task_key)
+        if waited >= 1:
+            print(f"[WAIT] [TRANSCODE] Waited {waited:.1f}s for an encode slot ({task_key})")
+        start_time = time.monotonic()
+        ok = False
+        try:
+            result = subprocess.run(self.with_threads(cmd), check=True, capture_output=True, text=True, timeout=timeout)
+            ok = True
+            return result
+        finally:
+            self.release(time.monotonic() - start_time, ok)
+
+    def metrics(self) -> Dict:
+        """Снимок метрик: очередь, слоты, суммарное и среднее время"""
+        with self._cond:
+            queued = sum(len(q) for q in self._queues.values())
+            done = self._stats['completed'] + self._stats['failed']
+            return {
+                'worker': worker_label(),
+                'max_jobs': self.max_jobs,
+                'threads_per_job': self.threads_per_job,
+                'running': self._running,
+                'queued': queued,
+                'queued_by_task': {key: len(q) for key, q in self._queues.items()},
+                'completed': self._stats['completed'],
+                'failed': self._stats['failed'],
+                'encode_seconds_total': round(self._stats['encode_seconds'], 2),
+                'encode_seconds_avg': round(self._stats['encode_seconds'] / done, 2) if done else 0.0,
+                'wait_seconds_avg': round(self._stats['wait_seconds'] / done, 2) if done else 0.0,
+                'wait_seconds_max': round(self._stats['max_wait_seconds'], 2),
+            }
+
+    def publish_metrics(self, force: bool = False) -> None:
+        """Сохранить снимок метрик процесса в кэш Django (не чаще раза в несколько секунд)"""
+        now = time.monotonic()
+        if not force and now - self._published_at < METRICS_PUBLISH_INTERVAL_SEC:
+            return
+        self._published_at = now
+        try:
+            from django.core.cache import cache
+            snapshot = self.metrics()
+            if self._metrics_slot is not None:
+                key = _metrics_slot_key(self._metrics_slot)
+                current = cache.get(key)
+                if current is not None and current.get('worker') == snapshot['worker']:
+                    cache.set(key, snapshot, timeout=METRICS_TTL_SEC)
+                    return
+                # Слот истек или занят другим процессом — занимаем свободный заново
+                self._metrics_slot = None
+            for slot in range(METRICS_MAX_WORKERS):
+                if cache.add(_metrics_slot_key(slot), snapshot, timeout=METRICS_TTL_SEC):
+                    self._metrics_slot = slot
+                    return
+        except Exception:
+            pass
+
+
+def collect_transcode_metrics() -> Dict:
+    """Метрики всех процессов, недавно публиковавших снимок, и их сумма"""
+    local = get_transcode_scheduler().metrics()
+    workers = {local['worker']: local}
+    try:
+        from django.core.cache import cache
+        snapshots = cache.get_many([_metrics_slot_key(slot) for slot in range(METRICS_MAX_WORKERS)])
+        for snapshot in snapshots.values():
+            if isinstance(snapshot, dict) and snapshot.get('worker'):
+                workers.setdefault(snapshot['worker'], snapshot)
+    except Exception:
+        pass
+    totals = {
+        key: sum(w.get(key, 0) for w in workers.values())
+        for key in ('max_jobs', 'running', 'queued', 'completed', 'failed', 'encode_seconds_total')
+    }
+    done = totals['completed'] + totals['failed']
+    totals['encode_seconds_total'] = round(totals['encode_seconds_total'], 2)
+    totals['encode_seconds_avg'] = round(totals['encode_seconds_total'] / done, 2) if done else 0.0
+    totals['wait_seconds_max'] = max((w.get('wait_seconds_max', 0.0) for w in workers.values()), default=0.0)
+    return dict(totals, workers=workers)
+
+
+_scheduler: Optional[TranscodeScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_transcode_scheduler() -> TranscodeScheduler:
+    """Глобальный планировщик кодирований процесса"""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = TranscodeScheduler()
+    return _scheduler
@@ -7,6 +7,7 @@ from .views_mod import views_photo
 from .views_mod import misc
 from .views_mod import hashtag
 from .views_mod import proxies
+from .views_mod import task_logs
 
 urlpatterns = [
     # Dashboard
@@ -25,6 +26,7 @@ urlpatterns = [
     path('accounts/import/', views.import_accounts, name='import_accounts'),
     path('accounts/import-ua-cookies/', views.import_accounts_ua_cookies, name='import_ua_cookies'),
     path('accounts/import-bundle/', views.import_accounts_bundle, name='import_accounts_bundle'),
+    path('accounts/dolphin-provision/<str:job_id>/', views.dolphin_provision_status, name='dolphin_provision_status'),
     path('accounts/<int:account_id>/warm/', views.warm_account, name='warm_account'),
     path('accounts/<int:account_id>/edit/', views.edit_account, name='edit_account'),
     path('accounts/<int:account_id>/change-proxy/', views.change_account_proxy, name='change_account_proxy'),
@@ -92,6 +94,7 @@ urlpatterns = [
     path('tiktok/booster/prepare/', misc.tiktok_booster_prepare, name='tiktok_booster_prepare'),
     path('tiktok/booster/start/', misc.tiktok_booster_start, name='tiktok_booster_start'),
     path('tiktok/booster/logs/', misc.get_api_server_logs, name='get_api_server_logs'),
+    path('api/transcode/metrics/', misc.transcode_metrics, name='transcode_metrics'),
 
     # TikTok Video Management (separate module)
     path('tiktok/videos/', misc.tiktok_videos, name='tiktok_videos'),
@@ -173,6 +176,11 @@ urlpatterns += [
     path('warmup/<int:task_id>/logs/', __import__('uploader.views_warmup', fromlist=['warmup_task_logs']).warmup_task_logs, name='warmup_task_logs'),
 ] 
 
+urlpatterns += [
+    # Incremental log feed for all task kinds (?since=<cursor>)
+    path('logs/<str:kind>/<int:task_id>/', task_logs.task_log_feed, name='task_log_feed'),
+]
+
 urlpatterns += [
     # External worker API routes temporarily disabled
 ] 
\ No newline at end of file
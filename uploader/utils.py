@@ -96,6 +96,11 @@ def validate_proxy(host, port, username=None, password=None, timeout=10, proxy_t
                 if proxy_ip:
                     logger.info(f"Proxy {host}:{port} working, external IP: {proxy_ip}")
                     geo_info['external_ip'] = proxy_ip
+                    # Shared geo cache (filled by the async validation engine)
+                    cached_geo = _get_cached_geo(proxy_ip)
+                    if cached_geo:
+                        geo_info.update(cached_geo)
+                        break
                     # Prefer RIPE Database GEO; fallback to ip-api
                     try:
                         ripe_geo = get_geo_via_ripe(proxy_ip)
@@ -143,6 +148,22 @@ def validate_proxy(host, port, username=None, password=None, timeout=10, proxy_t
     return True, "Proxy is working correctly", geo_info
 
 
+def _get_cached_geo(ip: str) -> dict:
+    """
+    Fresh GEO for an IP from the ProxyGeoCache table, or {} (best-effort).
+    """
+    try:
+        from uploader.proxy_validation_engine import load_cached_geo, parse_ip
+        ip = parse_ip(ip)
+        geo = load_cached_geo([ip]).get(ip) if ip else None
+    except Exception as e:
+        logger.debug(f"GEO cache lookup failed for IP {ip}: {str(e)}")
+        return {}
+    if not geo or not geo.country_code:
+        return {}
+    return {"country": geo.country_code, "city": geo.city or None}
+
+
 def _validate_socks5_proxy(host, port, username=None, password=None, timeout=10):
     """
     Validate SOCKS5 proxy by attempting to connect through it
@@ -0,0 +1,276 @@
+#!/usr/bin/env python
+"""
+Контент-адресуемый кэш медиа для уникализации видео.
+
+Ключ — SHA-256 исходного файла. Для каждого источника кэшируются:
+- метаданные ffprobe (длительность, размеры, кодеки) — ``{sha}.json``;
+- нормализованная «мезонинная» копия под формат публикации (масштаб + padding,
+  yuv420p, aac) — ``{sha}_{w}x{h}.mp4``. Она кодируется один раз на исходник,
+  а варианты для аккаунтов строятся уже из неё короткой цепочкой фильтров.
+
+Параллельные запросы одного и того же мезонина ждут единственного кодирования.
+Мезонин, выданный через ``acquire_mezzanine``, не удаляется ``prune`` до
+``release``; недавно использованные файлы (в т.ч. другими процессами) тоже.
+"""
+
+import hashlib
+import json
+import os
+import subprocess
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+from .transcode_scheduler import get_transcode_scheduler
+
+MEDIA_CACHE_DIR = os.getenv("VIDEO_MEDIA_CACHE_DIR", os.path.join(tempfile.gettempdir(), "video_media_cache"))
+MEDIA_CACHE_MAX_BYTES = int(float(os.getenv("VIDEO_MEDIA_CACHE_MAX_GB", "20")) * 1024 ** 3)
+MEZZANINE_ENABLED = os.getenv("VIDEO_MEZZANINE_ENABLED", "1").lower() in ("1", "true", "yes")
+MEZZANINE_CRF = int(os.getenv("VIDEO_MEZZANINE_CRF", "18"))
+MEZZANINE_PRESET = os.getenv("VIDEO_MEZZANINE_PRESET", "veryfast")
+# Файлы, использованные за это время, prune не трогает (аренды других процессов не видны)
+PRUNE_GRACE_SEC = int(os.getenv("VIDEO_MEDIA_CACHE_PRUNE_GRACE_SEC", "900"))
+
+DEFAULT_DURATION = 12.63
+_HASH_CHUNK = 1024 * 1024
+
+_ffmpeg_available: Optional[bool] = None
+
+
+def ffmpeg_available() -> bool:
+    """Проверить наличие FFmpeg один раз на процесс"""
+    global _ffmpeg_available
+    if _ffmpeg_available is None:
+        try:
+            subprocess.run(["ffmpeg", "-version"], capture_output=True, check=True, timeout=5)
+            _ffmpeg_available = True
+        except (subprocess.CalledProcessError, FileNotFoundError, subprocess.TimeoutExpired):
+            _ffmpeg_available = False
+    return _ffmpeg_available
+
+
+class VideoMediaCache:
+    """Кэш probe-метаданных и мезонинных копий, адресуемый SHA-256 исходника"""
+
+    def __init__(self, root: str = MEDIA_CACHE_DIR, max_bytes: int = MEDIA_CACHE_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # key -> [lock, число владельцев и ожидающих]; запись удаляется, когда их не осталось
+        self._key_locks: Dict[str, List] = {}
+        # path -> число активных аренд мезонина
+        self._leases: Dict[str, int] = {}
+        # (dev, inode, size, mtime_ns) -> sha256, чтобы не хэшировать файл (и его хардлинки) повторно
+        self._digests: Dict[Tuple[int, int, int, int], str] = {}
+        self._probes: Dict[str, Dict] = {}
+        os.makedirs(self.root, exist_ok=True)
+
+    @contextmanager
+    def _key_lock(self, key: str):
+        with self._lock:
+            entry = self._key_locks.get(key)
+            if entry is None:
+                entry = self._key_locks[key] = [threading.Lock(), 0]
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._key_locks[key]
+
+    def source_digest(self, path: str) -> str:
+        """SHA-256 содержимого файла (мемоизируется по inode, размеру и mtime)"""
+        st = os.stat(path)
+        memo_key = (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+        digest = self._digests.get(memo_key)
+        if digest:
+            return digest
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+                h.update(chunk)
+        digest = h.hexdigest()
+        self._digests[memo_key] = digest
+        return digest
+
+    def probe(self, path: str, digest: Optional[str] = None) -> Dict:
+        """Метаданные видео: duration, width, height, vcodec, acodec"""
+        digest = digest or self.source_digest(path)
+        cached = self._probes.get(digest)
+        if cached:
+            return cached
+        meta_path = os.path.join(self.root, f"{digest}.json")
+        with self._key_lock(f"probe:{digest}"):
+            if os.path.exists(meta_path):
+                try:
+                    with open(meta_path, "r", encoding="utf-8") as f:
+                        meta = json.load(f)
+                    self._probes[digest] = meta
+                    return meta
+                except (OSError, ValueError):
+                    pass
+            meta = self._run_ffprobe(path)
+            if meta.get("probed"):
+                self._write_atomic(meta_path, json.dumps(meta).encode("utf-8"))
+            self._probes[digest] = meta
+            return meta
+
+    def _run_ffprobe(self, path: str) -> Dict:
+        meta = {"duration": DEFAULT_DURATION, "width": 0, "height": 0, "vcodec": "", "acodec": "", "probed": False}
+        try:
+            result = subprocess.run([
+                "ffprobe", "-v", "error", "-print_format", "json", "-show_format", "-show_streams", path,
+            ], capture_output=True, text=True, timeout=30)
+            data = json.loads(result.stdout or "{}")
+        except (subprocess.TimeoutExpired, FileNotFoundError, ValueError) as e:
+            print(f"[WARN] [MEDIA_CACHE] ffprobe failed for {os.path.basename(path)}: {e}")
+            return meta
+        try:
+            meta["duration"] = float((data.get("format") or {}).get("duration") or DEFAULT_DURATION)
+        except (TypeError, ValueError):
+            pass
+        for stream in data.get("streams") or []:
+            if stream.get("codec_type") == "video" and not meta["vcodec"]:
+                meta["vcodec"] = stream.get("codec_name", "")
+                meta["width"] = int(stream.get("width") or 0)
+                meta["height"] = int(stream.get("height") or 0)
+            elif stream.get("codec_type") == "audio" and not meta["acodec"]:
+                meta["acodec"] = stream.get("codec_name", "")
+        meta["probed"] = bool(data.get("format"))
+        return meta
+
+    def _mezzanine_path(self, digest: str, width: int, height: int) -> str:
+        return os.path.join(self.root, f"{digest}_{width}x{height}.mp4")
+
+    def acquire_mezzanine(self, path: str, width: int, height: int, digest: Optional[str] = None,
+                          task_key: str = "default") -> Optional[str]:
+        """Как ``mezzanine``, но копия арендуется до ``release(path)`` и prune её не удалит"""
+        if not MEZZANINE_ENABLED:
+            return None
+        digest = digest or self.source_digest(path)
+        out_path = self._mezzanine_path(digest, width, height)
+        with self._lock:
+            self._leases[out_path] = self._leases.get(out_path, 0) + 1
+        try:
+            result = self.mezzanine(path, width, height, digest, task_key=task_key)
+        except BaseException:
+            self.release(out_path)
+            raise
+        if result is None:
+            self.release(out_path)
+        return result
+
+    def release(self, path: str) -> None:
+        """Вернуть аренду, полученную через ``acquire_mezzanine``"""
+        with self._lock:
+            count = self._leases.get(path, 0) - 1
+            if count > 0:
+                self._leases[path] = count
+            else:
+                self._leases.pop(path, None)
+
+    def mezzanine(self, path: str, width: int, height: int, digest: Optional[str] = None,
+                  task_key: str = "default") -> Optional[str]:
+        """Путь к нормализованной копии ``width``x``height`` (кодируется один раз) или None"""
+        if not MEZZANINE_ENABLED:
+            return None
+        digest = digest or self.source_digest(path)
+        out_path = self._mezzanine_path(digest, width, height)
+        if os.path.exists(out_path):
+            self._touch(out_path)
+            return out_path
+        with self._key_lock(f"mezz:{out_path}"):
+            if os.path.exists(out_path):
+                return out_path
+            meta = self.probe(path, digest)
+            tmp_path = f"{out_path}.{os.getpid()}.{threading.get_ident()}.tmp.mp4"
+            cmd = [
+                "ffmpeg", "-y", "-i", path,
+                "-vf", f"scale={width}:{height}:force_original_aspect_ratio=decrease,"
+                       f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2:black,setsar=1",
+                "-c:v", "libx264", "-preset", MEZZANINE_PRESET, "-crf", str(MEZZANINE_CRF),
+                "-pix_fmt", "yuv420p",
+            ]
+            # Аудио AAC копируем без перекодирования
+            cmd += ["-c:a", "copy"] if meta.get("acodec") == "aac" else ["-c:a", "aac", "-b:a", "128k"]
+            cmd += ["-movflags", "+faststart", tmp_path]
+            start_time = time.time()
+            try:
+                get_transcode_scheduler().run(cmd, task_key=task_key, timeout=600)
+                os.replace(tmp_path, out_path)
+            except (subprocess.CalledProcessError, subprocess.TimeoutExpired, OSError) as e:
+                print(f"[WARN] [MEDIA_CACHE] Mezzanine encode failed for {os.path.basename(path)}: {getattr(e, 'stderr', '') or e}")
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+                return None
+            print(f"[OK] [MEDIA_CACHE] Mezzanine {width}x{height} for {os.path.basename(path)} ready in {time.time() - start_time:.1f}s")
+        self.prune()
+        return out_path
+
+    def prune(self) -> None:
+        """Удалить давно не использованные файлы, если кэш превысил лимит
+
+        Арендованные и использованные за последние ``PRUNE_GRACE_SEC`` файлы не удаляются.
+        """
+        try:
+            entries = []
+            total = 0
+            for name in os.listdir(self.root):
+                if name.endswith((".tmp", ".tmp.mp4")):
+                    continue
+                full = os.path.join(self.root, name)
+                st = os.stat(full)
+                entries.append((st.st_mtime, st.st_size, full))
+                total += st.st_size
+            if total <= self.max_bytes:
+                return
+            with self._lock:
+                leased = set(self._leases)
+            cutoff = time.time() - PRUNE_GRACE_SEC
+            for mtime, size, full in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                if full in leased or mtime >= cutoff:
+                    continue
+                try:
+                    os.unlink(full)
+                    total -= size
+                except OSError:
+                    continue
+        except OSError as e:
+            print(f"[WARN] [MEDIA_CACHE] Prune failed: {e}")
+
+    @staticmethod
+    def _touch(path: str) -> None:
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _write_atomic(path: str, data: bytes) -> None:
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+
+_media_cache: Optional[VideoMediaCache] = None
+_media_cache_lock = threading.Lock()
+
+
+def get_media_cache() -> VideoMediaCache:
+    """Глобальный кэш медиа процесса"""
+    global _media_cache
+    if _media_cache is None:
+        with _media_cache_lock:
+            if _media_cache is None:
+                _media_cache = VideoMediaCache()
+    return _media_cache
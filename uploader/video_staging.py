@@ -0,0 +1,223 @@
+#!/usr/bin/env python
+"""
+Промежуточные (staged) копии исходных видео для уникализации.
+
+Раньше каждый аккаунт копировал исходник целиком во временный файл блоками по
+8 КБ, после чего ffmpeg читал его ещё раз. Теперь на один исходник создаётся одна
+staged-копия, которую получают все аккаунты:
+
+- hardlink в каталог staging, если он на той же файловой системе;
+- reflink (``FICLONE``), если hardlink недоступен;
+- иначе копия средствами ядра (``copy_file_range`` / ``sendfile``).
+
+Staged-файлы только читаются и получают права только на чтение. Hardlink делит
+inode с исходником, поэтому его права на время staging меняются и у исходника;
+исходные права восстанавливаются вместе с удалением последней ссылки. Каждый
+``acquire`` увеличивает счётчик ссылок, ``release`` уменьшает; файл удаляется,
+когда его отпустил последний аккаунт.
+"""
+
+import errno
+import os
+import shutil
+import stat
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+
+STAGING_DIR = os.getenv("VIDEO_STAGING_DIR", os.path.join(tempfile.gettempdir(), "video_staging"))
+
+# ioctl FICLONE (linux/fs.h)
+_FICLONE = 0x40049409
+
+
+# Права staged-файла: только чтение
+_READ_ONLY_MASK = ~(stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH)
+
+
+def _unlink(path: str) -> None:
+    if os.name == 'nt':
+        # Windows не удаляет файлы с атрибутом «только чтение»
+        os.chmod(path, stat.S_IREAD | stat.S_IWRITE)
+    os.unlink(path)
+
+
+class _StagedFile:
+    __slots__ = ("path", "refs", "method", "restore_mode")
+
+    def __init__(self, path: str, method: str, restore_mode: Optional[int] = None):
+        self.path = path
+        self.refs = 0
+        self.method = method
+        # Права исходника, общие с hardlink-ом: вернуть при удалении staged-файла
+        self.restore_mode = restore_mode
+
+
+class VideoStaging:
+    """Общие staged-копии исходников со счётчиком ссылок"""
+
+    def __init__(self, root: str = STAGING_DIR):
+        self.root = root
+        self._lock = threading.Lock()
+        # Замок на исходник со счётчиком ожидающих; удаляется, когда его никто не держит
+        self._key_locks: Dict[Tuple[int, int, int, int], list] = {}
+        # (dev, inode, size, mtime_ns) исходника -> staged-файл
+        self._staged: Dict[Tuple[int, int, int, int], _StagedFile] = {}
+        self._by_path: Dict[str, Tuple[int, int, int, int]] = {}
+        self._stats = {'link': 0, 'reflink': 0, 'copy': 0, 'reused': 0, 'bytes_copied': 0}
+        os.makedirs(self.root, exist_ok=True)
+
+    @contextmanager
+    def _key_lock(self, key: Tuple[int, int, int, int]):
+        with self._lock:
+            entry = self._key_locks.get(key)
+            if entry is None:
+                entry = self._key_locks[key] = [threading.Lock(), 0]
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._key_locks[key]
+
+    def acquire(self, src_path: str, filename: Optional[str] = None) -> str:
+        """Путь к staged-копии ``src_path`` (создаётся при первом обращении)"""
+        st = os.stat(src_path)
+        key = (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+        with self._key_lock(key):
+            with self._lock:
+                staged = self._staged.get(key)
+                if staged is not None:
+                    if os.path.exists(staged.path):
+                        staged.refs += 1
+                        self._stats['reused'] += 1
+                        return staged.path
+                    # Файл удалили снаружи — создаём заново
+                    self._by_path.pop(staged.path, None)
+            name = os.path.basename(filename or src_path)
+            stage_path = os.path.join(self.root, f"stage{os.getpid()}_{st.st_dev}_{st.st_ino}_{st.st_mtime_ns}_{name}")
+            method = self._materialize(src_path, stage_path, st.st_size)
+            restore_mode = self._make_read_only(stage_path, st.st_mode, shared_inode=(method == 'link'))
+            with self._lock:
+                staged = self._staged[key] = _StagedFile(stage_path, method, restore_mode)
+                staged.refs = 1
+                self._by_path[stage_path] = key
+                self._stats[method] += 1
+                if method == 'copy':
+                    self._stats['bytes_copied'] += st.st_size
+            return stage_path
+
+    def release(self, path: str) -> None:
+        """Отпустить ссылку; файл удаляется вместе с последней (чужие пути игнорируются)"""
+        with self._lock:
+            key = self._by_path.get(path)
+        if key is None:
+            return
+        # Удаление под замком исходника: параллельный acquire не создаст файл по тому же пути раньше
+        with self._key_lock(key):
+            with self._lock:
+                if self._by_path.get(path) != key:
+                    return
+                staged = self._staged[key]
+                staged.refs -= 1
+                if staged.refs > 0:
+                    return
+                del self._staged[key]
+                del self._by_path[path]
+            try:
+                if staged.restore_mode is not None:
+                    os.chmod(path, staged.restore_mode)
+                _unlink(path)
+            except OSError:
+                pass
+
+    def is_staged(self, path: str) -> bool:
+        with self._lock:
+            return path in self._by_path
+
+    def metrics(self) -> Dict:
+        with self._lock:
+            return dict(self._stats, active=len(self._staged), refs=sum(s.refs for s in self._staged.values()))
+
+    @staticmethod
+    def _make_read_only(stage_path: str, mode: int, shared_inode: bool) -> Optional[int]:
+        """Снять права на запись; для hardlink возвращает права исходника для восстановления"""
+        try:
+            os.chmod(stage_path, stat.S_IMODE(mode) & _READ_ONLY_MASK)
+        except OSError:
+            return None
+        return stat.S_IMODE(mode) if shared_inode else None
+
+    def _materialize(self, src_path: str, stage_path: str, size: int) -> str:
+        """Создать ``stage_path``; возвращает способ: link / reflink / copy"""
+        if os.path.exists(stage_path):
+            _unlink(stage_path)
+        try:
+            os.link(src_path, stage_path)
+            return 'link'
+        except OSError as e:
+            if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP, errno.EACCES):
+                raise
+        tmp_path = f"{stage_path}.{threading.get_ident()}.tmp"
+        try:
+            method = 'reflink' if self._reflink(src_path, tmp_path) else 'copy'
+            if method == 'copy':
+                self._kernel_copy(src_path, tmp_path, size)
+            os.replace(tmp_path, stage_path)
+            return method
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    @staticmethod
+    def _reflink(src_path: str, dst_path: str) -> bool:
+        try:
+            import fcntl
+        except ImportError:
+            return False
+        with open(src_path, "rb") as src, open(dst_path, "wb") as dst:
+            try:
+                fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+                return True
+            except OSError:
+                return False
+
+    @staticmethod
+    def _kernel_copy(src_path: str, dst_path: str, size: int) -> None:
+        copy_range = getattr(os, "copy_file_range", None)
+        if copy_range is not None:
+            try:
+                with open(src_path, "rb") as src, open(dst_path, "wb") as dst:
+                    copied = 0
+                    while copied < size:
+                        n = copy_range(src.fileno(), dst.fileno(), size - copied)
+                        if n == 0:
+                            break
+                        copied += n
+                if copied == size:
+                    return
+            except OSError:
+                pass
+        # shutil.copyfile использует sendfile на Linux
+        shutil.copyfile(src_path, dst_path)
+
+
+_staging: Optional[VideoStaging] = None
+_staging_lock = threading.Lock()
+
+
+def get_video_staging() -> VideoStaging:
+    """Глобальный staging процесса"""
+    global _staging
+    if _staging is None:
+        with _staging_lock:
+            if _staging is None:
+                _staging = VideoStaging()
+    return _staging
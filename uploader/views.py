@@ -14,6 +14,7 @@ from .views_mod import (
     import_accounts,
     import_accounts_ua_cookies,
     import_accounts_bundle,
+    dolphin_provision_status,
     warm_account,
     edit_account,
     change_account_proxy,
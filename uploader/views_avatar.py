@@ -10,7 +10,6 @@ from django.core.files.storage import default_storage
 from django.db import OperationalError, connections
 from django.db import close_old_connections
 import os
-import threading
 import random
 import time
 
@@ -19,6 +18,7 @@ from .models import (
     AvatarChangeTask, AvatarChangeTaskAccount, AvatarImage, InstagramDevice
 )
 from .forms import AvatarChangeTaskForm
+from .job_queue import dispatch_job
 
 from instgrapi_func.avatar_manager import change_avatar_for_account
 from instgrapi_func.services.session_store import DjangoDeviceSessionStore
@@ -61,8 +61,7 @@ def create_avatar_task(request):
                     task=task, account=acc, proxy=(acc.current_proxy or acc.proxy)
                 )
             # initial log entry
-            task.log = (task.log or '') + f"[{timezone.now().strftime('%Y-%m-%d %H:%M:%S')}] Task created with {len(images)} images and {form.cleaned_data['selected_accounts'].count()} accounts\n"
-            task.save(update_fields=['log'])
+            task.append_log(f"[{timezone.now().strftime('%Y-%m-%d %H:%M:%S')}] Task created with {len(images)} images and {form.cleaned_data['selected_accounts'].count()} accounts\n")
 
             messages.success(request, f'Avatar task #{task.id} created')
             return redirect('avatar_task_detail', task_id=task.id)
@@ -97,12 +96,11 @@ def start_avatar_task(request, task_id):
         return redirect('avatar_task_detail', task_id=task.id)
 
     task.status = 'RUNNING'
-    task.log += f"[{timezone.now().strftime('%Y-%m-%d %H:%M:%S')}] Start task\n"
-    task.save(update_fields=['status', 'log'])
+    task.append_log(f"[{timezone.now().strftime('%Y-%m-%d %H:%M:%S')}] Start task\n")
+    task.save(update_fields=['status'])
 
-    # run background thread
-    t = threading.Thread(target=_run_avatar_task_worker, args=(task.id,), daemon=True)
-    t.start()
+    # run in background (worker process or local thread)
+    dispatch_job('avatar', task_id=task.id)
 
     messages.success(request, f'Avatar task #{task.id} started')
     return redirect('avatar_task_detail', task_id=task.id)
@@ -181,15 +179,14 @@ def _run_avatar_task_worker(task_id: int):
         accounts = list(task.accounts.select_related('account', 'proxy').all())
         if not accounts or not task.images.exists():
             task.status = 'FAILED'
-            task.log += f"[{timezone.now().strftime('%Y-%m-%d %H:%M:%S')}] No accounts or images\n"
-            task.save(update_fields=['status', 'log'])
+            task.append_log(f"[{timezone.now().strftime('%Y-%m-%d %H:%M:%S')}] No accounts or images\n")
+            task.save(update_fields=['status'])
             return
 
         def make_logger(username: str):
             def _log(line: str):
                 nonlocal task
-                task.log = (task.log or '') + f"[{timezone.now().strftime('%Y-%m-%d %H:%M:%S')}] {username} | {line}\n"
-                task.save(update_fields=['log'])
+                task.append_log(f"[{timezone.now().strftime('%Y-%m-%d %H:%M:%S')}] {username} | {line}\n")
             return _log
 
         # Sequential with human-like delays; respect concurrency=1 for now
@@ -264,30 +261,20 @@ def _run_avatar_task_worker(task_id: int):
                     ta.status = 'FAILED'
                     on_log("failed")
                 try:
-                    ta.save(update_fields=['status', 'completed_at', 'log'] if hasattr(ta, 'log') else ['status', 'completed_at'])
-                except OperationalError:
-                    close_old_connections()
-                    ta.save(update_fields=['status', 'completed_at', 'log'] if hasattr(ta, 'log') else ['status', 'completed_at'])
-                try:
-                    task.save(update_fields=['log'])
+                    ta.save(update_fields=['status', 'completed_at'])
                 except OperationalError:
                     close_old_connections()
-                    task.save(update_fields=['log'])
+                    ta.save(update_fields=['status', 'completed_at'])
             except Exception as e:
                 ta.status = 'FAILED'
-                ta.log = (ta.log or '') + f"[{timezone.now().strftime('%Y-%m-%d %H:%M:%S')}] Error: {str(e)}\n"
+                ta.append_log(f"[{timezone.now().strftime('%Y-%m-%d %H:%M:%S')}] Error: {str(e)}\n")
                 ta.completed_at = timezone.now()
                 try:
-                    ta.save(update_fields=['status', 'log', 'completed_at'])
-                except OperationalError:
-                    close_old_connections()
-                    ta.save(update_fields=['status', 'log', 'completed_at'])
-                task.log += f"[{timezone.now().strftime('%Y-%m-%d %H:%M:%S')}] {acc.username} | exception {str(e)}\n"
-                try:
-                    task.save(update_fields=['log'])
+                    ta.save(update_fields=['status', 'completed_at'])
                 except OperationalError:
                     close_old_connections()
-                    task.save(update_fields=['log'])
+                    ta.save(update_fields=['status', 'completed_at'])
+                task.append_log(f"[{timezone.now().strftime('%Y-%m-%d %H:%M:%S')}] {acc.username} | exception {str(e)}\n")
 
         task.status = 'COMPLETED'
         try:
@@ -300,12 +287,12 @@ def _run_avatar_task_worker(task_id: int):
             close_old_connections()
             task = AvatarChangeTask.objects.get(id=task_id)
             task.status = 'FAILED'
-            task.log += f"[{timezone.now().strftime('%Y-%m-%d %H:%M:%S')}] fatal error: {str(e)}\n"
+            task.append_log(f"[{timezone.now().strftime('%Y-%m-%d %H:%M:%S')}] fatal error: {str(e)}\n")
             try:
-                task.save(update_fields=['status', 'log'])
+                task.save(update_fields=['status'])
             except OperationalError:
                 close_old_connections()
-                task.save(update_fields=['status', 'log'])
+                task.save(update_fields=['status'])
         except Exception:
             logger.exception("Avatar task fatal error and failed to update task")
 
@@ -315,6 +302,6 @@ def get_avatar_task_logs(request, task_id):
     task = get_object_or_404(AvatarChangeTask, id=task_id)
     return JsonResponse({
         'status': task.status,
-        'log': task.log,
+        'log': task.log_text,
         'updated_at': task.updated_at.isoformat() if task.updated_at else None,
     }) 
\ No newline at end of file
@@ -128,8 +128,7 @@ def follow_task_create(request):
                 FollowTaskAccount.objects.create(
                     task=task, account=acc, proxy=(acc.current_proxy or acc.proxy)
                 )
-            task.log = (task.log or '') + f"[{timezone.now().strftime('%Y-%m-%d %H:%M:%S')}] Task created with {form.cleaned_data['selected_accounts'].count()} accounts\n"
-            task.save(update_fields=['log'])
+            task.append_log(f"[{timezone.now().strftime('%Y-%m-%d %H:%M:%S')}] Task created with {form.cleaned_data['selected_accounts'].count()} accounts\n")
             messages.success(request, f'Task #{task.id} created')
             return redirect('follow_task_detail', task_id=task.id)
     else:
@@ -198,12 +197,11 @@ def follow_task_start(request, task_id):
         return redirect('follow_task_detail', task_id=task.id)
 
     task.status = 'RUNNING'
-    task.log += f"[{timezone.now().strftime('%Y-%m-%d %H:%M:%S')}] Start task\n"
-    task.save(update_fields=['status', 'log'])
+    task.append_log(f"[{timezone.now().strftime('%Y-%m-%d %H:%M:%S')}] Start task\n")
+    task.save(update_fields=['status'])
 
-    import threading
-    t = threading.Thread(target=_follow_task_worker, args=(task.id,), daemon=True)
-    t.start()
+    from .job_queue import dispatch_job
+    dispatch_job('follow', task_id=task.id)
 
     messages.success(request, f'Task #{task.id} started')
     return redirect('follow_task_detail', task_id=task.id)
@@ -216,15 +214,14 @@ def _follow_task_worker(task_id: int):
         targets = list(task.category.targets.order_by('id').all())
         if not accounts or not targets:
             task.status = 'FAILED'
-            task.log += f"[{timezone.now().strftime('%Y-%m-%d %H:%M:%S')}] No accounts or targets\n"
-            task.save(update_fields=['status', 'log'])
+            task.append_log(f"[{timezone.now().strftime('%Y-%m-%d %H:%M:%S')}] No accounts or targets\n")
+            task.save(update_fields=['status'])
             return
 
         def make_logger(prefix: str):
             def _log(line: str):
                 nonlocal task
-                task.log = (task.log or '') + f"[{timezone.now().strftime('%Y-%m-%d %H:%M:%S')}] {prefix} | {line}\n"
-                task.save(update_fields=['log'])
+                task.append_log(f"[{timezone.now().strftime('%Y-%m-%d %H:%M:%S')}] {prefix} | {line}\n")
             return _log
 
         service = FollowService(auth_service=IGAuthService())
@@ -306,11 +303,10 @@ def _follow_task_worker(task_id: int):
                 ta.save(update_fields=['status', 'completed_at'])
             except Exception as e:
                 ta.status = 'FAILED'
-                ta.log = (ta.log or '') + f"[{timezone.now().strftime('%Y-%m-%d %H:%M:%S')}] Error: {str(e)}\n"
+                ta.append_log(f"[{timezone.now().strftime('%Y-%m-%d %H:%M:%S')}] Error: {str(e)}\n")
                 ta.completed_at = timezone.now()
-                ta.save(update_fields=['status', 'log', 'completed_at'])
-                task.log += f"[{timezone.now().strftime('%Y-%m-%d %H:%M:%S')}] {acc.username} | exception {str(e)}\n"
-                task.save(update_fields=['log'])
+                ta.save(update_fields=['status', 'completed_at'])
+                task.append_log(f"[{timezone.now().strftime('%Y-%m-%d %H:%M:%S')}] {acc.username} | exception {str(e)}\n")
 
         task.status = 'COMPLETED'
         task.save(update_fields=['status'])
@@ -318,8 +314,8 @@ def _follow_task_worker(task_id: int):
         try:
             task = FollowTask.objects.get(id=task_id)
             task.status = 'FAILED'
-            task.log += f"[{timezone.now().strftime('%Y-%m-%d %H:%M:%S')}] fatal error: {str(e)}\n"
-            task.save(update_fields=['status', 'log'])
+            task.append_log(f"[{timezone.now().strftime('%Y-%m-%d %H:%M:%S')}] fatal error: {str(e)}\n")
+            task.save(update_fields=['status'])
         except Exception:
             logger.exception("Follow task fatal error and failed to update task")
 
@@ -329,6 +325,6 @@ def follow_task_logs(request, task_id):
     task = get_object_or_404(FollowTask, id=task_id)
     return JsonResponse({
         'status': task.status,
-        'log': task.log,
+        'log': task.log_text,
         'updated_at': task.updated_at.isoformat() if task.updated_at else None,
     }) 
\ No newline at end of file
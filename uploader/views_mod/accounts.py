@@ -68,6 +68,7 @@ def account_list(request):
         'client_id': client_id or '',
         'client_name': client_name or '',
         'agency_id': agency_id or '',
+        'provision_job_id': request.GET.get('provision_job', ''),
         'active_tab': 'accounts'
     }
     return render(request, 'uploader/account_list.html', context)
@@ -404,6 +405,191 @@ def create_account(request):
     }
     return render(request, 'uploader/create_account.html', context)
 
+def _pick_import_proxy(free_proxies: list, proxy_selection: str, locale_country: str, country_text: str):
+    """Take a free proxy from the preloaded pool, preferring the locale's country"""
+    if proxy_selection == 'locale_only':
+        country_lower = country_text.lower()
+        for idx, proxy in enumerate(free_proxies):
+            country = (proxy.country or '').lower()
+            if country == locale_country.lower() or country_lower in country or country_lower in (proxy.city or '').lower():
+                return free_proxies.pop(idx)
+    return free_proxies.pop() if free_proxies else None
+
+
+def _provision_dolphin_profiles(dolphin, pending: list, locale: str, tags: list, log_prefix: str = '[DOLPHIN]',
+                                on_result=None):
+    """
+    Create Dolphin profiles for imported accounts in one batch.
+
+    pending: list of (account, proxy_data, desktop_cookies_or_None).
+    Profiles are created by DolphinAnty.create_profiles_bulk (concurrent, rate
+    limited), dolphin_profile_id/locale are saved with one bulk_update and
+    desktop cookies are imported into the new profiles.
+    on_result is passed to create_profiles_bulk (progress of the import job).
+    Returns (created_count, error_messages).
+    """
+    from bot.src.instagram_uploader.dolphin_anty import ProfileRequest
+    if not pending:
+        return 0, []
+    by_id = {account.id: (account, cookies) for account, _, cookies in pending}
+    profile_requests = [
+        ProfileRequest(
+            key=account.id,
+            name=f"instagram_{account.username}_" + ''.join(random.choices(string.ascii_lowercase + string.digits, k=4)),
+            proxy=proxy_data,
+            tags=list(tags),
+            locale=locale,
+        )
+        for account, proxy_data, _ in pending
+    ]
+    logger.info(f"{log_prefix} Creating {len(profile_requests)} Dolphin profiles in bulk")
+    results = dolphin.create_profiles_bulk(profile_requests, on_result=on_result)
+
+    created_accounts = []
+    errors = []
+    for result in results:
+        account, _ = by_id[result.key]
+        if result.profile_id:
+            account.dolphin_profile_id = result.profile_id
+            account.locale = locale
+            created_accounts.append(account)
+        else:
+            errors.append(f"Failed to create Dolphin profile for account {account.username}: {result.error}")
+            logger.error(f"{log_prefix}[ERROR] {errors[-1]}")
+    if created_accounts:
+        InstagramAccount.objects.bulk_update(created_accounts, ['dolphin_profile_id', 'locale'], batch_size=200)
+        logger.info(f"{log_prefix} Saved {len(created_accounts)} Dolphin profile ids")
+
+    # Cookies go into each new profile (Local API first, Remote PATCH fallback)
+    for account in created_accounts:
+        cookies = by_id[account.id][1]
+        if not cookies:
+            continue
+        try:
+            imp = dolphin.import_cookies_local(account.dolphin_profile_id, cookies)
+            if not (isinstance(imp, dict) and imp.get('success')):
+                logger.info(f"{log_prefix} Local import failed or unsupported, trying Remote PATCH for {account.username}")
+                dolphin.update_cookies(account.dolphin_profile_id, cookies)
+            logger.info(f"[COOKIES] Imported cookies into Dolphin profile {account.dolphin_profile_id} for {account.username}")
+        except Exception as ice:
+            logger.warning(f"[COOKIES] Failed to import cookies into profile {account.dolphin_profile_id} for {account.username}: {ice}")
+    return len(created_accounts), errors
+
+
+# Dolphin profiles of an import are created by a background job; its progress lives in the cache
+DOLPHIN_PROVISION_JOB_TTL_SEC = 24 * 3600
+# Last error messages kept in the job state
+DOLPHIN_PROVISION_MAX_ERRORS = 50
+
+
+def _provision_job_key(job_id: str) -> str:
+    return f"dolphin_provision_job_{job_id}"
+
+
+def get_dolphin_provision_job(job_id: str):
+    """Progress of a Dolphin provisioning job (None if unknown or expired)"""
+    return cache.get(_provision_job_key(job_id))
+
+
+def _start_dolphin_provision(pending: list, locale: str, tags: list, log_prefix: str = '[DOLPHIN]') -> str:
+    """Queue Dolphin profile creation for imported accounts; returns the job id"""
+    import uuid
+    job_id = uuid.uuid4().hex
+    cache.set(_provision_job_key(job_id), {
+        'id': job_id,
+        'status': 'queued',
+        'total': len(pending),
+        'done': 0,
+        'created': 0,
+        'failed': 0,
+        'errors': [],
+        'error': '',
+        'started_at': timezone.now().isoformat(),
+        'finished_at': None,
+    }, DOLPHIN_PROVISION_JOB_TTL_SEC)
+    dispatch_job(
+        'dolphin_provision',
+        job_id=job_id,
+        pending=[[account.id, proxy_data, cookies] for account, proxy_data, cookies in pending],
+        locale=locale,
+        tags=list(tags),
+        log_prefix=log_prefix,
+    )
+    logger.info(f"{log_prefix} Queued Dolphin provisioning job {job_id} for {len(pending)} accounts")
+    return job_id
+
+
+def run_dolphin_provision_job(job_id: str, pending: list, locale: str, tags: list, log_prefix: str = '[DOLPHIN]'):
+    """Job queue handler: create the profiles queued by _start_dolphin_provision"""
+    from bot.src.instagram_uploader.dolphin_anty import get_dolphin_client
+    state = get_dolphin_provision_job(job_id) or {
+        'id': job_id, 'total': len(pending), 'errors': [], 'error': '',
+        'started_at': timezone.now().isoformat(), 'finished_at': None,
+    }
+    state.update(status='running', done=0, created=0, failed=0)
+    state_lock = threading.Lock()
+
+    def _save_state():
+        cache.set(_provision_job_key(job_id), state, DOLPHIN_PROVISION_JOB_TTL_SEC)
+
+    def _on_result(result):
+        with state_lock:
+            state['done'] += 1
+            if result.profile_id:
+                state['created'] += 1
+            else:
+                state['failed'] += 1
+            _save_state()
+
+    _save_state()
+    try:
+        dolphin = get_dolphin_client()
+        if not dolphin.authenticate():
+            raise RuntimeError("Failed to authenticate with Dolphin Anty API")
+        accounts = InstagramAccount.objects.in_bulk([account_id for account_id, _, _ in pending])
+        items = [
+            (accounts[account_id], proxy_data, cookies)
+            for account_id, proxy_data, cookies in pending
+            if account_id in accounts
+        ]
+        created, errors = _provision_dolphin_profiles(dolphin, items, locale, tags, log_prefix, on_result=_on_result)
+        with state_lock:
+            state.update(
+                status='completed',
+                done=len(pending),
+                created=created,
+                failed=len(pending) - created,
+                errors=errors[-DOLPHIN_PROVISION_MAX_ERRORS:],
+            )
+    except Exception as e:
+        logger.error(f"{log_prefix}[ERROR] Dolphin provisioning job {job_id} failed: {e}", exc_info=True)
+        with state_lock:
+            state.update(status='failed', error=str(e))
+    finally:
+        with state_lock:
+            state['finished_at'] = timezone.now().isoformat()
+            _save_state()
+    logger.info(
+        f"{log_prefix}[SUMMARY] Provisioning job {job_id} {state['status']}: "
+        f"created {state['created']}/{state['total']}, failed {state['failed']}"
+    )
+
+
+def _redirect_to_account_list(provision_job_id=None):
+    """Account list, showing the progress of the import's Dolphin job if one was started"""
+    if not provision_job_id:
+        return redirect('account_list')
+    return redirect(f"{reverse('account_list')}?provision_job={provision_job_id}")
+
+
+def dolphin_provision_status(request, job_id):
+    """JSON progress of a Dolphin provisioning job started by an account import"""
+    state = get_dolphin_provision_job(job_id)
+    if state is None:
+        return JsonResponse({'error': 'Job not found'}, status=404)
+    return JsonResponse(state)
+
+
 def import_accounts(request):
     """
     Import Instagram accounts from a text file, create Dolphin profiles,
@@ -511,7 +697,6 @@ def import_accounts(request):
         created_count = 0
         updated_count = 0
         error_count = 0
-        dolphin_created_count = 0
         dolphin_error_count = 0
         
         # Initialize Dolphin Anty API client
@@ -596,6 +781,13 @@ def import_accounts(request):
             messages.error(request, error_message)
             return redirect('import_accounts')
          
+        # Free proxies are loaded once and handed out from memory; proxy bindings and
+        # Dolphin profiles are written in batches after the loop
+        free_proxies = list(Proxy.objects.filter(is_active=True, assigned_account__isnull=True))
+        random.shuffle(free_proxies)
+        proxies_to_bind = []
+        pending_profiles = []
+
         # Process accounts
         logger.info("[STEP 3/5] Processing accounts")
         for line_num, line in enumerate(lines, 1):
@@ -789,19 +981,14 @@ def import_accounts(request):
                         assigned_proxy = existing_acc.current_proxy or existing_acc.proxy
                         logger.info(f"[INFO] Reusing existing proxy for {username}: {assigned_proxy}")
                     else:
-                        # Get an unused active proxy from filtered set
-                        available_proxies = Proxy.objects.filter(is_active=True, assigned_account__isnull=True)
-                        if proxy_selection == 'locale_only':
-                            country_proxies = available_proxies.filter(
-                                Q(country__iexact=locale_country) | Q(country__icontains=country_text) | Q(city__icontains=country_text)
-                            )
-                            available_proxies = country_proxies if country_proxies.exists() else available_proxies
-                        if not available_proxies.exists():
+                        # Get an unused active proxy, preferring the locale's country
+                        assigned_proxy = _pick_import_proxy(free_proxies, proxy_selection, locale_country, country_text)
+                        if assigned_proxy is None:
                             error_message = f"No available proxies left for account {username}. Please add more proxies."
                             logger.error(f"[ERROR] {error_message}")
                             messages.error(request, error_message)
-                            return redirect('import_accounts')
-                        assigned_proxy = available_proxies.order_by('?').first()
+                            # Accounts imported so far still get their proxies and profiles below
+                            break
                         logger.info(f"[SUCCESS] Assigned new proxy {assigned_proxy} to account {username}")
                 except Exception as e:
                     error_message = f"Error assigning proxy to account {username}: {str(e)}"
@@ -906,119 +1093,57 @@ def import_accounts(request):
                 # Update proxy assignment only if we assigned a new proxy from pool
                 if assigned_proxy and (not existing_map.get(username) or not (existing_map[username].proxy or existing_map[username].current_proxy)):
                     assigned_proxy.assigned_account = account
-                    assigned_proxy.save()
-                    logger.info(f"[INFO] Updated proxy assignment for account {username}")
+                    proxies_to_bind.append(assigned_proxy)
                  
-                # Create Dolphin profile if API is available and profile_mode requires it
+                # Queue Dolphin profile creation if API is available and profile_mode requires it
                 if profile_mode == 'create_profiles' and dolphin_available and (created or not account.dolphin_profile_id):
-                    try:
-                        # Create profile name with account username and random suffix
-                        random_suffix = ''.join(random.choices(string.ascii_lowercase + string.digits, k=4))
-                        profile_name = f"instagram_{username}_{random_suffix}"
-                        logger.info(f"[DOLPHIN] Creating Dolphin profile for account {username}")
-                         
-                        # Prepare proxy data if available
-                        proxy_data = None
-                        if assigned_proxy:
-                            proxy_data = assigned_proxy.to_dict()
-                            logger.info(f"[DOLPHIN] Using proxy for profile: {assigned_proxy.host}:{assigned_proxy.port}")
-                        else:
-                            logger.warning(f"[DOLPHIN] No proxy available for profile creation")
-                            # This should never happen as we check for proxy availability earlier
-                            continue
-                         
-                        # Add a significant delay between creating each profile to prevent rate limiting
-                        # This is especially important since we're generating unique fingerprints
-                        if dolphin_created_count > 0:
-                            delay_time = random.uniform(4.0, 7.0)  # Random delay between 4-7 seconds
-                            logger.info(f"[DOLPHIN] Adding a {delay_time:.1f}-second delay before creating the next profile")
-                            time.sleep(delay_time)
-                         
-                        # Create Dolphin profile with proper fingerprint generation
-                        response = dolphin.create_profile(
-                            name=profile_name,
-                            proxy=proxy_data,
-                            tags=["instagram", "auto-created"],
-                            locale=selected_locale
-                        )
-                         
-                        # Extract profile ID from response
-                        profile_id = None
-                        if response and isinstance(response, dict):
-                            profile_id = response.get("browserProfileId")
-                            if not profile_id and isinstance(response.get("data"), dict):
-                                profile_id = response["data"].get("id")
-                             
-                        if profile_id:
-                            account.dolphin_profile_id = profile_id
-                            account.locale = selected_locale
-                            account.save(update_fields=['dolphin_profile_id', 'locale'])
-                            dolphin_created_count += 1
-                            logger.info(f"[SUCCESS] Created Dolphin profile {profile_id} for account {username}")
+                    if assigned_proxy:
+                        # Desktop cookies are imported into the profile once it is created
+                        desktop_cookies = parsed_cookies_list if (parsed_cookies_list and not is_mobile_cookies) else None
+                        if parsed_cookies_list and is_mobile_cookies:
+                            logger.info(f"[COOKIES] Skipped importing mobile cookies into Dolphin (desktop) profile for {username}")
+                        pending_profiles.append((account, assigned_proxy.to_dict(), desktop_cookies))
+                    else:
+                        # This should never happen as we check for proxy availability earlier
+                        logger.warning(f"[DOLPHIN] No proxy available for profile creation for {username}")
 
-                            # Import cookies into the newly created profile if we have DESKTOP cookies
-                            try:
-                                if parsed_cookies_list and not is_mobile_cookies:
-                                    # Prefer Local API import; if not available (free plan), fall back to Remote PATCH
-                                    imp = dolphin.import_cookies_local(profile_id, parsed_cookies_list)
-                                    if not (isinstance(imp, dict) and imp.get('success')):
-                                        logger.info(f"[DOLPHIN] Local import failed or unsupported, trying Remote PATCH for {username}")
-                                        dolphin.update_cookies(profile_id, parsed_cookies_list)
-                                    logger.info(f"[COOKIES] Imported cookies into Dolphin profile {profile_id} for {username}")
-                                elif parsed_cookies_list and is_mobile_cookies:
-                                    logger.info(f"[COOKIES] Skipped importing mobile cookies into Dolphin (desktop) profile for {username}")
-                            except Exception as ice:
-                                logger.warning(f"[COOKIES] Failed to import cookies into profile {profile_id} for {username}: {ice}")
-                        else:
-                            error_message = response.get("error", "Unknown error")
-                            detailed_error = ""
-                             
-                            # Extract detailed validation errors
-                            if isinstance(error_message, dict):
-                                if "fields" in error_message:
-                                    validation_errors = []
-                                    for field_error in error_message.get("fields", []):
-                                        field = field_error.get("field", "unknown")
-                                        error = field_error.get("error", "unknown error")
-                                        values = field_error.get("values", [])
-                                        validation_errors.append(f"{field}: {error} (expected: {', '.join(map(str, values))})")
-                                     
-                                    detailed_error = " | ".join(validation_errors)
-                                else:
-                                    detailed_error = str(error_message)
-                            else:
-                                detailed_error = str(error_message)
-                             
-                            full_error = f"Failed to create Dolphin profile for account {username}: {detailed_error}"
-                            logger.error(f"[ERROR] {full_error}")
-                            messages.error(request, full_error)
-                            dolphin_error_count += 1
-                    except Exception as e:
-                        dolphin_error_count += 1
-                        error_message = f"Error creating Dolphin profile for account {username}: {str(e)}"
-                        logger.error(f"[ERROR] {error_message}")
-                        messages.error(request, error_message)
-                 
             except Exception as e:
                 error_message = f"Error importing account at line {line_num}: {str(e)}"
                 logger.error(f"[ERROR] {error_message}")
                 messages.error(request, error_message)
                 error_count += 1
+
+        if proxies_to_bind:
+            Proxy.objects.bulk_update(proxies_to_bind, ['assigned_account'], batch_size=200)
+            logger.info(f"[INFO] Bound {len(proxies_to_bind)} proxies to imported accounts")
+
+        provision_job_id = None
+        if pending_profiles:
+            try:
+                provision_job_id = _start_dolphin_provision(
+                    pending_profiles, selected_locale, ["instagram", "auto-created"]
+                )
+                messages.info(request, f'Creating {len(pending_profiles)} Dolphin profiles in the background...')
+            except Exception as e:
+                dolphin_error_count += len(pending_profiles)
+                error_message = f"Error starting Dolphin profile creation: {str(e)}"
+                logger.error(f"[ERROR] {error_message}")
+                messages.error(request, error_message)
          
         # Show summary message
         logger.info(f"[SUMMARY] Import completed - Created: {created_count}, Updated: {updated_count}, Errors: {error_count}")
         if dolphin_available:
-            logger.info(f"[SUMMARY] Dolphin profiles - Created: {dolphin_created_count}, Errors: {dolphin_error_count}")
+            logger.info(f"[SUMMARY] Dolphin profiles - Queued: {len(pending_profiles)}, Errors: {dolphin_error_count}")
              
         if created_count > 0 or updated_count > 0:
             success_msg = f'Import completed! Created: {created_count}, Updated: {updated_count}, Errors: {error_count}'
-            if dolphin_available:
-                success_msg += f', Dolphin profiles created: {dolphin_created_count}, Dolphin errors: {dolphin_error_count}'
+            if dolphin_error_count:
+                success_msg += f', Dolphin errors: {dolphin_error_count}'
             messages.success(request, success_msg)
         else:
             messages.warning(request, f'No accounts were imported. Errors: {error_count}')
          
-        return redirect('account_list')
+        return _redirect_to_account_list(provision_job_id)
      
     clients = CabinetClient.objects.select_related('agency').all()
     context = {
@@ -1254,7 +1379,6 @@ def import_accounts_ua_cookies(request):
 		created_count = 0
 		updated_count = 0
 		error_count = 0
-		dolphin_created_count = 0
 		dolphin_error_count = 0
 
 		# Initialize Dolphin Anty API client
@@ -1330,6 +1454,12 @@ def import_accounts_ua_cookies(request):
 			messages.error(request, error_message)
 			return redirect('import_ua_cookies')
 
+		# Free proxies are loaded once; proxy bindings and Dolphin profiles are written in batches after the loop
+		free_proxies = list(Proxy.objects.filter(is_active=True, assigned_account__isnull=True))
+		random.shuffle(free_proxies)
+		proxies_to_bind = []
+		pending_profiles = []
+
 		# Process accounts
 		logger.info("[UA+COOKIES][STEP 3/5] Processing accounts")
 		for line_num, raw in enumerate(lines, 1):
@@ -1403,19 +1533,14 @@ def import_accounts_ua_cookies(request):
 						assigned_proxy = existing_acc.current_proxy or existing_acc.proxy
 						logger.info(f"[UA+COOKIES][INFO] Reusing existing proxy for {username}: {assigned_proxy}")
 					else:
-						avail = Proxy.objects.filter(is_active=True, assigned_account__isnull=True)
-						if proxy_selection == 'locale_only':
-							country_text = 'Belarus' if locale_country == 'BY' else 'India'
-							country_proxies = avail.filter(
-								Q(country__iexact=locale_country) | Q(country__icontains=country_text) | Q(city__icontains=country_text)
-							)
-							avail = country_proxies if country_proxies.exists() else avail
-						if not avail.exists():
+						country_text = 'Belarus' if locale_country == 'BY' else 'India'
+						assigned_proxy = _pick_import_proxy(free_proxies, proxy_selection, locale_country, country_text)
+						if assigned_proxy is None:
 							error_message = f"No available proxies left for account {username}. Please add more proxies."
 							logger.error(f"[UA+COOKIES][ERROR] {error_message}")
 							messages.error(request, error_message)
-							return redirect('import_ua_cookies')
-						assigned_proxy = avail.order_by('?').first()
+							# Accounts imported so far still get their proxies and profiles below
+							break
 						logger.info(f"[UA+COOKIES][SUCCESS] Assigned new proxy {assigned_proxy} to account {username}")
 				except Exception as e:
 					error_message = f"Error assigning proxy to account {username}: {str(e)}"
@@ -1496,64 +1621,16 @@ def import_accounts_ua_cookies(request):
 				# Update proxy assignment linkage
 				if assigned_proxy and (not existing_map.get(username) or not (existing_map[username].proxy or existing_map[username].current_proxy)):
 					assigned_proxy.assigned_account = account
-					assigned_proxy.save()
+					proxies_to_bind.append(assigned_proxy)
 
-				# Create Dolphin profile and import cookies (always as WEB cookies) if requested
+				# Queue Dolphin profile creation; cookies (always as WEB cookies) are imported once it is created
 				if profile_mode == 'create_profiles' and dolphin_available and (created or not account.dolphin_profile_id):
-					try:
-						# Throttle between profile creations
-						if dolphin_created_count > 0:
-							delay_time = random.uniform(1, 2)
-							logger.info(f"[UA+COOKIES][DOLPHIN] Delay {delay_time:.1f}s before creating next profile")
-							time.sleep(delay_time)
-
-						profile_name = f"instagram_{username}_" + ''.join(random.choices(string.ascii_lowercase + string.digits, k=4))
-						logger.info(f"[UA+COOKIES][DOLPHIN] Creating Dolphin profile for account {username}")
-						proxy_data = assigned_proxy.to_dict() if assigned_proxy else None
-						response = dolphin.create_profile(
-							name=profile_name,
-							proxy=proxy_data,
-							tags=["instagram", "ua-cookies"],
-							locale=selected_locale
-						)
-						profile_id = None
-						if response and isinstance(response, dict):
-							profile_id = response.get("browserProfileId")
-							if not profile_id and isinstance(response.get("data"), dict):
-								profile_id = response["data"].get("id")
-						if profile_id:
-							account.dolphin_profile_id = profile_id
-							try:
-								if account.locale != selected_locale:
-									account.locale = selected_locale
-									account.save(update_fields=['dolphin_profile_id', 'locale'])
-								else:
-									account.save(update_fields=['dolphin_profile_id'])
-							except Exception:
-								account.save(update_fields=['dolphin_profile_id'])
-							dolphin_created_count += 1
-							logger.info(f"[UA+COOKIES][SUCCESS] Created Dolphin profile {profile_id} for account {username}")
-							# Import cookies to Dolphin (prefer Local API)
-							try:
-								if parsed_cookies_list:
-									imp = dolphin.import_cookies_local(profile_id, parsed_cookies_list)
-									if not (isinstance(imp, dict) and imp.get('success')):
-										logger.info(f"[UA+COOKIES][DOLPHIN] Local import failed/unsupported, trying Remote PATCH for {username}")
-										dolphin.update_cookies(profile_id, parsed_cookies_list)
-									logger.info(f"[UA+COOKIES][COOKIES] Imported cookies into Dolphin profile {profile_id} for {username}")
-								else:
-									logger.info(f"[UA+COOKIES][COOKIES] No cookies parsed for {username}, skipping import")
-							except Exception as ice:
-								logger.warning(f"[UA+COOKIES][COOKIES] Failed to import cookies into profile {profile_id} for {username}: {ice}")
-						else:
-							error_message = response.get("error", "Unknown error") if isinstance(response, dict) else "Unknown error"
-							logger.error(f"[UA+COOKIES][ERROR] Failed to create Dolphin profile for account {username}: {error_message}")
-							messages.error(request, f"Failed to create Dolphin profile for account {username}: {error_message}")
-							dolphin_error_count += 1
-					except Exception as e:
+					if assigned_proxy:
+						pending_profiles.append((account, assigned_proxy.to_dict(), parsed_cookies_list or None))
+					else:
 						dolphin_error_count += 1
-						logger.error(f"[UA+COOKIES][ERROR] Error creating Dolphin profile for account {username}: {str(e)}")
-						messages.error(request, f"Error creating Dolphin profile for account {username}: {str(e)}")
+						logger.error(f"[UA+COOKIES][ERROR] Failed to create Dolphin profile for account {username}: Proxy configuration is required")
+						messages.error(request, f"Failed to create Dolphin profile for account {username}: Proxy configuration is required")
 
 				# Persist cookies in DB for reference
 				try:
@@ -1573,18 +1650,33 @@ def import_accounts_ua_cookies(request):
 				messages.error(request, error_message)
 				error_count += 1
 
+		if proxies_to_bind:
+			Proxy.objects.bulk_update(proxies_to_bind, ['assigned_account'], batch_size=200)
+
+		provision_job_id = None
+		if pending_profiles:
+			try:
+				provision_job_id = _start_dolphin_provision(
+					pending_profiles, selected_locale, ["instagram", "ua-cookies"], log_prefix='[UA+COOKIES][DOLPHIN]'
+				)
+				messages.info(request, f'Creating {len(pending_profiles)} Dolphin profiles in the background...')
+			except Exception as e:
+				dolphin_error_count += len(pending_profiles)
+				logger.error(f"[UA+COOKIES][ERROR] Error starting Dolphin profile creation: {str(e)}")
+				messages.error(request, f"Error starting Dolphin profile creation: {str(e)}")
+
 		# Summary
 		logger.info(f"[UA+COOKIES][SUMMARY] Import completed - Created: {created_count}, Updated: {updated_count}, Errors: {error_count}")
 		if dolphin_available:
-			logger.info(f"[UA+COOKIES][SUMMARY] Dolphin profiles - Created: {dolphin_created_count}, Errors: {dolphin_error_count}")
+			logger.info(f"[UA+COOKIES][SUMMARY] Dolphin profiles - Queued: {len(pending_profiles)}, Errors: {dolphin_error_count}")
 		if created_count > 0 or updated_count > 0:
 			msg = f'Import completed! Created: {created_count}, Updated: {updated_count}, Errors: {error_count}'
-			if dolphin_available:
-				msg += f', Dolphin profiles created: {dolphin_created_count}, Dolphin errors: {dolphin_error_count}'
+			if dolphin_error_count:
+				msg += f', Dolphin errors: {dolphin_error_count}'
 			messages.success(request, msg)
 		else:
 			messages.warning(request, f'No accounts were imported. Errors: {error_count}')
-		return redirect('account_list')
+		return _redirect_to_account_list(provision_job_id)
 
 	# GET: render page
 	clients = CabinetClient.objects.select_related('agency').all()
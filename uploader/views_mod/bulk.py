@@ -251,32 +251,15 @@ def start_bulk_upload(request, task_id):
         assign_videos_to_accounts(task)
         print(f"[TASK] Assigning videos to accounts for task {task.id}: {task.name}")
     
-    # Use async version - run in background thread
+    # Hand the task off to the background job queue (worker process or local thread)
     try:
-        from uploader.async_bulk_tasks import run_async_bulk_upload_task_sync
-        import threading
+        from uploader.job_queue import dispatch_job
         print(f"[TASK] Starting async task in background for task {task.id}: {task.name}")
         
         # Update task status to RUNNING
         update_task_status(task, TaskStatus.RUNNING, "Async task started")
         
-        # Run async task in background thread
-        def run_async_task():
-            try:
-                result = run_async_bulk_upload_task_sync(task_id)
-                print(f"[TASK] Async task completed for task {task_id}: {result}")
-                # Coordinator already set the final status; preserve it here
-                if result:
-                    update_task_status(task, task.status, "Async task finished (status preserved)")
-                else:
-                    update_task_status(task, task.status, "Async task finished with errors (status preserved)")
-            except Exception as e:
-                print(f"[TASK] Async task failed for task {task_id}: {str(e)}")
-                update_task_status(task, TaskStatus.FAILED, f"Async task failed: {str(e)}")
-        
-        # Start task in background thread
-        thread = threading.Thread(target=run_async_task, daemon=True)
-        thread.start()
+        dispatch_job('bulk_upload', task_id=task.id)
         
         # Immediately redirect to logs page
         messages.success(request, f'Async bulk upload task "{task.name}" started successfully! You can monitor progress on this page.')
@@ -289,6 +272,26 @@ def start_bulk_upload(request, task_id):
         return redirect('bulk_upload_detail', task_id=task.id)
 
 
+def run_bulk_upload_job(task_id):
+    """Background job: run the async bulk upload for a task (see uploader.job_queue)."""
+    from uploader.async_bulk_tasks import run_async_bulk_upload_task_sync
+    try:
+        result = run_async_bulk_upload_task_sync(task_id)
+        print(f"[TASK] Async task completed for task {task_id}: {result}")
+        # Coordinator already set the final status; preserve it here
+        task = BulkUploadTask.objects.get(id=task_id)
+        if result:
+            update_task_status(task, task.status, "Async task finished (status preserved)")
+        else:
+            update_task_status(task, task.status, "Async task finished with errors (status preserved)")
+    except Exception as e:
+        print(f"[TASK] Async task failed for task {task_id}: {str(e)}")
+        task = BulkUploadTask.objects.filter(id=task_id).first()
+        if task:
+            update_task_status(task, TaskStatus.FAILED, f"Async task failed: {str(e)}")
+        raise
+
+
 def start_bulk_upload_api(request, task_id):
     """Start a bulk upload task using instagrapi runner (API-based)."""
     task = get_object_or_404(BulkUploadTask, id=task_id)
@@ -307,27 +310,10 @@ def start_bulk_upload_api(request, task_id):
         messages.error(request, 'No accounts assigned to this task!')
         return redirect('bulk_upload_detail', task_id=task.id)
     
-    # Mark engine for this run
-    try:
-        cache.set(f"bulk_engine_{task.id}", "instagrapi", timeout=3600)
-    except Exception:
-        pass
-    
-    # Read feature toggles from query and store to cache (API mode only)
-    try:
-        rounds = request.GET.get('rounds') == '1'
-        init_delay = request.GET.get('init_delay') == '1'
-        cache.set(f"bulk_rounds_{task.id}", bool(rounds), timeout=3600)
-        cache.set(f"bulk_init_delay_{task.id}", bool(init_delay), timeout=3600)
-    except Exception:
-        pass
-    
-    # Initialize WebLogger for this task so background logs are visible immediately
-    try:
-        from uploader.bulk_tasks_playwright import init_web_logger
-        init_web_logger(task.id)
-    except Exception:
-        pass
+    # Read feature toggles from query (API mode only); the job stores them in the
+    # cache of the process that actually runs the task
+    rounds = request.GET.get('rounds') == '1'
+    init_delay = request.GET.get('init_delay') == '1'
     
     # Use async mode - same as default starter
     update_task_status(task, TaskStatus.RUNNING, "Task started in ASYNC mode (API)")
@@ -339,33 +325,10 @@ def start_bulk_upload_api(request, task_id):
         print(f"[TASK] Assigning videos to accounts for task {task.id}: {task.name}")
     
     try:
-        from uploader.async_bulk_tasks import run_async_bulk_upload_task_sync
-        import threading
+        from uploader.job_queue import dispatch_job
         print(f"[TASK] Starting async API task in background for task {task.id}: {task.name}")
         
-        def run_async_task():
-            try:
-                result = run_async_bulk_upload_task_sync(task_id)
-                print(f"[TASK] Async API task completed for task {task_id}: {result}")
-                # Do not overwrite final status; append a finishing log entry only
-                try:
-                    from django.utils import timezone
-                    ts = timezone.now().strftime("%Y-%m-%d %H:%M:%S")
-                    msg = f"[{ts}] [FINISH] Async API task {'completed successfully' if result else 'finished with errors'}\n"
-                except Exception:
-                    msg = "[FINISH] Async API task finished\n"
-                try:
-                    # Append log without touching status
-                    from uploader.task_utils import update_task_log as _utl
-                    _utl(task, msg)
-                except Exception:
-                    pass
-            except Exception as e:
-                print(f"[TASK] Async API task failed for task {task_id}: {str(e)}")
-                update_task_status(task, TaskStatus.FAILED, f"Async API task failed: {str(e)}")
-        
-        thread = threading.Thread(target=run_async_task, daemon=True)
-        thread.start()
+        dispatch_job('bulk_upload_api', task_id=task.id, rounds=rounds, init_delay=init_delay)
         
         messages.success(request, f'Async API bulk upload task "{task.name}" started successfully! You can monitor progress on this page.')
         return redirect('bulk_upload_detail', task_id=task.id)
@@ -377,6 +340,49 @@ def start_bulk_upload_api(request, task_id):
         return redirect('bulk_upload_detail', task_id=task.id)
 
 
+def run_bulk_upload_api_job(task_id, rounds=False, init_delay=False):
+    """Background job: run the async bulk upload for a task with the instagrapi engine."""
+    from uploader.async_bulk_tasks import run_async_bulk_upload_task_sync
+    
+    # Mark engine and feature toggles for this run
+    try:
+        cache.set(f"bulk_engine_{task_id}", "instagrapi", timeout=3600)
+        cache.set(f"bulk_rounds_{task_id}", bool(rounds), timeout=3600)
+        cache.set(f"bulk_init_delay_{task_id}", bool(init_delay), timeout=3600)
+    except Exception:
+        pass
+    
+    # Initialize WebLogger for this task so background logs are visible immediately
+    try:
+        from uploader.bulk_tasks_playwright import init_web_logger
+        init_web_logger(task_id)
+    except Exception:
+        pass
+    
+    try:
+        result = run_async_bulk_upload_task_sync(task_id)
+        print(f"[TASK] Async API task completed for task {task_id}: {result}")
+        # Do not overwrite final status; append a finishing log entry only
+        try:
+            from django.utils import timezone
+            ts = timezone.now().strftime("%Y-%m-%d %H:%M:%S")
+            msg = f"[{ts}] [FINISH] Async API task {'completed successfully' if result else 'finished with errors'}\n"
+        except Exception:
+            msg = "[FINISH] Async API task finished\n"
+        try:
+            # Append log without touching status
+            from uploader.task_utils import update_task_log as _utl
+            _utl(BulkUploadTask.objects.get(id=task_id), msg)
+        except Exception:
+            pass
+    except Exception as e:
+        print(f"[TASK] Async API task failed for task {task_id}: {str(e)}")
+        task = BulkUploadTask.objects.filter(id=task_id).first()
+        if task:
+            update_task_status(task, TaskStatus.FAILED, f"Async API task failed: {str(e)}")
+        raise
+
+
 def get_bulk_task_logs(request, task_id):
     """Get logs for a bulk upload task as JSON with real-time updates"""
     from django.core.cache import cache
@@ -387,13 +393,13 @@ def get_bulk_task_logs(request, task_id):
     # Get account ID if specified for account-specific logs
     account_id = request.GET.get('account_id')
     
-    # Get logs from cache (real-time) or fallback to database
-    cache_key = f"task_logs_{task_id}"
+    # Get logs from the live log sink (real-time) or fallback to database
+    log_key = f"task_logs_{task_id}"
     if account_id:
-        cache_key += f"_account_{account_id}"
+        log_key += f"_account_{account_id}"
     
-    # Get real-time logs from cache
-    cached_logs = cache.get(cache_key, [])
+    # Full retained log; incremental polling goes through /logs/bulk_upload/<id>/
+    cached_logs, _ = read_log_entries(log_key)
     
     # Format logs for web display
     formatted_logs = []
@@ -401,6 +407,7 @@ def get_bulk_task_logs(request, task_id):
         if isinstance(log_entry, dict):
             # New format from WebLogger
             formatted_logs.append({
+                'seq': log_entry.get('seq'),
                 'timestamp': log_entry.get('timestamp', ''),
                 'level': log_entry.get('level', 'INFO'),
                 'message': log_entry.get('message', ''),
@@ -415,16 +422,16 @@ def get_bulk_task_logs(request, task_id):
                 'category': 'LEGACY'
             })
     
-    # If no cached logs, get from database as fallback
+    # If no live logs, get from database as fallback
     if not formatted_logs:
         if account_id:
             try:
                 account_task = task.accounts.get(id=account_id)
-                db_log = account_task.log or ""
+                db_log = account_task.log_text or ""
             except:
                 db_log = ""
         else:
-            db_log = task.log or ""
+            db_log = task.log_text or ""
         
         if db_log:
             # Parse database log into structured format
@@ -66,19 +66,8 @@ def start_bulk_login(request, task_id):
     update_task_status(task, TaskStatus.RUNNING, "Task started in ASYNC mode")
 
     try:
-        from .bulk_login_runner import run_async_bulk_login_task_sync
-        import threading
-        def run_async_task():
-            try:
-                result = run_async_bulk_login_task_sync(task_id)
-                if result:
-                    update_task_status(task, task.status, "Async login task finished (status preserved)")
-                else:
-                    update_task_status(task, task.status, "Async login task finished with errors (status preserved)")
-            except Exception as e:
-                update_task_status(task, TaskStatus.FAILED, f"Async login task failed: {str(e)}")
-        thread = threading.Thread(target=run_async_task, daemon=True)
-        thread.start()
+        from uploader.job_queue import dispatch_job
+        dispatch_job('bulk_login', task_id=task.id)
         messages.success(request, f'Async bulk login task "{task.name}" started. Monitor progress below.')
         return redirect('bulk_login_detail', task_id=task.id)
     except Exception as e:
@@ -86,19 +75,36 @@ def start_bulk_login(request, task_id):
         update_task_status(task, TaskStatus.FAILED, f"Failed to start async task: {str(e)}")
         return redirect('bulk_login_detail', task_id=task.id)
 
+def run_bulk_login_job(task_id):
+    """Background job: run the async bulk login for a task (see uploader.job_queue)."""
+    from .bulk_login_runner import run_async_bulk_login_task_sync
+    try:
+        result = run_async_bulk_login_task_sync(task_id)
+        task = BulkLoginTask.objects.get(id=task_id)
+        if result:
+            update_task_status(task, task.status, "Async login task finished (status preserved)")
+        else:
+            update_task_status(task, task.status, "Async login task finished with errors (status preserved)")
+    except Exception as e:
+        task = BulkLoginTask.objects.filter(id=task_id).first()
+        if task:
+            update_task_status(task, TaskStatus.FAILED, f"Async login task failed: {str(e)}")
+        raise
+
 @login_required
 def get_bulk_login_logs(request, task_id):
     from django.core.cache import cache
     task = get_object_or_404(BulkLoginTask, id=task_id)
     account_id = request.GET.get('account_id')
-    cache_key = f"bulk_login_logs_{task_id}"
+    log_key = f"bulk_login_logs_{task_id}"
     if account_id:
-        cache_key += f"_account_{account_id}"
-    cached_logs = cache.get(cache_key, [])
+        log_key += f"_account_{account_id}"
+    cached_logs, _ = read_log_entries(log_key)
     formatted_logs = []
     for log_entry in cached_logs:
         if isinstance(log_entry, dict):
             formatted_logs.append({
+                'seq': log_entry.get('seq'),
                 'timestamp': log_entry.get('timestamp', ''),
                 'level': log_entry.get('level', 'INFO'),
                 'message': log_entry.get('message', ''),
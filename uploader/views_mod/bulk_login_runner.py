@@ -18,6 +18,7 @@ from ..async_bulk_tasks import AsyncLogger
 from ..account_utils import get_account_details
 from ..async_impl.dolphin import AsyncDolphinBrowser, authenticate_dolphin_async
 from ..async_impl.login import handle_login_flow_async
+from ..async_impl.playwright_runtime import shutdown_playwright_runtime
 from ..utils import validate_proxy
 
 
@@ -249,12 +250,12 @@ class AsyncBulkLoginCoordinator:
 
     def _update_account_status(self, account_task: BulkLoginAccount, status: str, message: str):
         account_task.status = status
-        account_task.log = (account_task.log or "") + f"[{timezone.now().strftime('%Y-%m-%d %H:%M:%S')}] {message}\n"
+        account_task.append_log(f"[{timezone.now().strftime('%Y-%m-%d %H:%M:%S')}] {message}\n")
         if status in (TaskStatus.COMPLETED, TaskStatus.FAILED, 'SUSPENDED', 'PHONE_VERIFICATION_REQUIRED', 'HUMAN_VERIFICATION_REQUIRED'):
             account_task.completed_at = timezone.now()
         if status == TaskStatus.RUNNING:
             account_task.started_at = timezone.now()
-        account_task.save(update_fields=['status','log','started_at','completed_at'])
+        account_task.save(update_fields=['status','started_at','completed_at'])
 
     # Validate proxy and persist status based on result
     def _validate_and_update_proxy_status(self, proxy: Proxy) -> None:
@@ -292,18 +293,18 @@ class AsyncBulkLoginCoordinator:
     # New helpers to safely persist task status/log from async context
     def _mark_task_started(self, task: BulkLoginTask):
         task.status = TaskStatus.RUNNING
-        task.log += f"[{timezone.now().strftime('%Y-%m-%d %H:%M:%S')}] Task started via Web (ASYNC mode)\n"
-        task.save(update_fields=['status','log'])
+        task.append_log(f"[{timezone.now().strftime('%Y-%m-%d %H:%M:%S')}] Task started via Web (ASYNC mode)\n")
+        task.save(update_fields=['status'])
 
     def _mark_task_failed(self, task: BulkLoginTask, reason: str):
         task.status = TaskStatus.FAILED
-        task.log += f"[{timezone.now().strftime('%Y-%m-%d %H:%M:%S')}] {reason}\n"
-        task.save(update_fields=['status','log'])
+        task.append_log(f"[{timezone.now().strftime('%Y-%m-%d %H:%M:%S')}] {reason}\n")
+        task.save(update_fields=['status'])
 
     def _finalize_task(self, task: BulkLoginTask, final_status: str, completed: int, failed: int):
         task.status = final_status
-        task.log += f"[{timezone.now().strftime('%Y-%m-%d %H:%M:%S')}] Finished: {completed} ok / {failed} failed\n"
-        task.save(update_fields=['status','log'])
+        task.append_log(f"[{timezone.now().strftime('%Y-%m-%d %H:%M:%S')}] Finished: {completed} ok / {failed} failed\n")
+        task.save(update_fields=['status'])
 
 
 async def run_async_bulk_login_task(task_id: int) -> bool:
@@ -321,8 +322,12 @@ def run_async_bulk_login_task_sync(task_id: int) -> bool:
     try:
         new_loop = asyncio.new_event_loop()
         asyncio.set_event_loop(new_loop)
-        result = new_loop.run_until_complete(run_async_bulk_login_task(task_id))
-        new_loop.close()
+        try:
+            result = new_loop.run_until_complete(run_async_bulk_login_task(task_id))
+        finally:
+            # Останавливаем общий Playwright-драйвер воркера (один на все аккаунты)
+            new_loop.run_until_complete(shutdown_playwright_runtime())
+            new_loop.close()
         return bool(result)
     except Exception:
         return False 
\ No newline at end of file
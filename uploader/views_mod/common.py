@@ -43,6 +43,8 @@ from ..forms import (
 )
 from bot.src.instagram_uploader.dolphin_anty import DolphinAnty
 from ..tasks_playwright import run_upload_task
+from ..job_queue import dispatch_job
+from ..log_sink import read_log_entries, parse_since
 import logging
 import io
 import asyncio
@@ -265,10 +265,8 @@ def start_cookie_task(request, task_id):
     headless = 'Headless: True' in task.log
     imageless = 'Imageless: True' in task.log
     
-    # Start task in background thread
-    thread = threading.Thread(target=run_cookie_robot_task, args=(task.id, urls, headless, imageless))
-    thread.daemon = True
-    thread.start()
+    # Start task in background (worker process or local thread)
+    dispatch_job('cookie_robot', task_id=task.id, urls=urls, headless=headless, imageless=imageless)
     
     messages.success(request, f'Cookie Robot task {task.id} started!')
     return redirect('cookie_task_detail', task_id=task.id)
@@ -752,9 +750,7 @@ def bulk_cookie_robot(request):
             
             # Start tasks in background
             for task in created_tasks:
-                thread = threading.Thread(target=run_cookie_robot_task, args=(task.id, urls, headless, imageless))
-                thread.daemon = True
-                thread.start()
+                dispatch_job('cookie_robot', task_id=task.id, urls=urls, headless=headless, imageless=imageless)
                 logger.info(f"Started Cookie Robot task {task.id} for account {task.account.username}")
                 
             return redirect('cookie_task_list')
@@ -2474,9 +2470,8 @@ def bulk_upload_logs(request, task_id):
     try:
         task = get_object_or_404(BulkUploadTask, id=task_id)
         
-        # Get logs from cache or file
-        logs_key = f"bulk_upload_logs_{task_id}"
-        logs = cache.get(logs_key, [])
+        # Get logs from the live log sink
+        logs, _ = read_log_entries(f"bulk_upload_logs_{task_id}")
         
         return JsonResponse({
             'logs': logs,
@@ -3897,3 +3892,13 @@ def tiktok_proxy_replace_with_uploaded(request):
         return _json_response(data, status=resp.status_code)
     except requests.exceptions.RequestException as e:
         return _json_response({'detail': f'Upstream error: {str(e)}'}, status=502)
+
+
+@login_required
+def transcode_metrics(request):
+    """Queue depth and encode-time metrics of the ffmpeg schedulers, summed and per worker process"""
+    from ..transcode_scheduler import collect_transcode_metrics
+    from ..video_staging import get_video_staging
+    metrics = collect_transcode_metrics()
+    metrics['staging'] = get_video_staging().metrics()
+    return JsonResponse(metrics)
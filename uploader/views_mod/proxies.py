@@ -354,6 +354,10 @@ def import_proxies(request):
     return render(request, 'uploader/import_proxies.html', context)
 
 
+PROXY_VALIDATION_CHUNK_SIZE = int(os.environ.get('PROXY_VALIDATION_CHUNK_SIZE', '200'))
+PROXY_RESULT_FIELDS = ['last_verified', 'last_checked', 'status', 'is_active', 'country', 'city', 'external_ip']
+
+
 def validate_all_proxies(request):
     """Validate all proxies in the system (both active and inactive)"""
     proxies = Proxy.objects.all()
@@ -410,9 +414,9 @@ def _validate_proxies_background(proxies, user_id):
     valid_count = 0
     invalid_count = 0
     
-    # Use multiple threads to validate proxies in parallel (configurable)
+    # Concurrency of the shared async validation engine (configurable)
     try:
-        # URL param takes precedence; otherwise env; default 20
+        # URL param takes precedence; otherwise env; default from the engine
         req_workers = int(request.GET.get('workers', 0) or 0)
     except Exception:
         req_workers = 0
@@ -423,59 +427,85 @@ def _validate_proxies_background(proxies, user_id):
     except Exception:
         env_workers = 0
     configured = req_workers or env_workers
-    thread_count = configured if configured > 0 else 20
-    thread_count = min(thread_count, max(1, proxies.count()))
     
-    if thread_count <= 0:
+    from concurrent.futures import ThreadPoolExecutor
+    from ..proxy_validation_engine import (
+        PROXY_VALIDATION_CONCURRENCY, ProxySpec, ProxyValidationEngine, parse_ip
+    )
+    
+    # Evaluate queryset once; all proxies are checked in one event loop
+    proxy_list = list(proxies)
+    if not proxy_list:
         return
     
-    from concurrent.futures import ThreadPoolExecutor
+    chunk_size = max(1, PROXY_VALIDATION_CHUNK_SIZE)
+    error_count = 0
+    pending = []
+    # All DB writes go through one thread (one connection)
+    db_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='proxy-validation-db')
     
-    def validate_proxy_worker(proxy):
-        is_valid, _, geo_info = validate_proxy(
-            host=proxy.host,
-            port=proxy.port,
-            username=proxy.username,
-            password=proxy.password,
-            timeout=10,
-            proxy_type=proxy.proxy_type
-        )
-        
-        # Update proxy verification timestamp and location data
-        proxy.last_verified = timezone.now()
-        proxy.last_checked = timezone.now()
-        
-        # Update status based on validation result
-        proxy.status = 'active' if is_valid else 'inactive'
-        proxy.is_active = is_valid
-        
-        # Update country, city, and external IP information if available
-        if geo_info and is_valid:
-            if geo_info.get('country'):
-                proxy.country = geo_info.get('country')
-            if geo_info.get('city'):
-                proxy.city = geo_info.get('city')
-            if geo_info.get('external_ip'):
-                proxy.external_ip = geo_info.get('external_ip')
+    def _flush(batch):
+        # One bulk UPDATE per chunk instead of a save() per proxy
+        if batch:
+            Proxy.objects.bulk_update(batch, PROXY_RESULT_FIELDS, batch_size=chunk_size)
+    
+    async def _validate_all():
+        loop = asyncio.get_running_loop()
+        engine = ProxyValidationEngine(concurrency=configured if configured > 0 else PROXY_VALIDATION_CONCURRENCY)
         
-        proxy.save()
+        async def _on_result(index, result):
+            nonlocal valid_count, invalid_count, error_count, pending
+            proxy = proxy_list[index]
+            if result.error:
+                # The engine failed, not the proxy - keep its previous status
+                logger.warning(f"Error validating proxy {proxy.host}:{proxy.port}: {result.message}")
+                error_count += 1
+                return
+            is_valid, _, geo_info = result.as_tuple('code')
+            now = timezone.now()
+            
+            # Update proxy verification timestamp and location data
+            proxy.last_verified = now
+            proxy.last_checked = now
+            
+            # Update status based on validation result
+            proxy.status = 'active' if is_valid else 'inactive'
+            proxy.is_active = is_valid
+            
+            # Update country, city, and external IP information if available
+            if geo_info and is_valid:
+                if geo_info.get('country'):
+                    proxy.country = geo_info.get('country')
+                if geo_info.get('city'):
+                    proxy.city = geo_info.get('city')
+                if parse_ip(geo_info.get('external_ip')):
+                    proxy.external_ip = geo_info.get('external_ip')
+            
+            if is_valid:
+                valid_count += 1
+            else:
+                invalid_count += 1
+            # Persist in chunks as results arrive, so progress survives a crash
+            pending.append(proxy)
+            if len(pending) >= chunk_size:
+                batch, pending = pending, []
+                await loop.run_in_executor(db_executor, _flush, batch)
         
-        return is_valid
+        await engine.validate_many([ProxySpec.from_model(proxy) for proxy in proxy_list], on_result=_on_result)
     
-    # Execute validation in parallel
-    with ThreadPoolExecutor(max_workers=thread_count) as executor:
-        # Evaluate queryset to list in main thread to avoid DB usage across threads during iteration
-        proxy_list = list(proxies)
-        results = list(executor.map(validate_proxy_worker, proxy_list))
-        
-    valid_count = sum(1 for r in results if r)
-    invalid_count = sum(1 for r in results if not r)
+    try:
+        asyncio.run(_validate_all())
+        batch, pending = pending, []
+        db_executor.submit(_flush, batch).result()
+    finally:
+        db_executor.submit(connections.close_all).result()
+        db_executor.shutdown(wait=True)
     
     # Add message to the fake request
     # This will be seen on the next page load
     request._messages.add(
         message_constants.SUCCESS,
-        f'Proxy validation complete. Valid: {valid_count}, Invalid: {invalid_count}'
+        f'Proxy validation complete. Valid: {valid_count}, Invalid: {invalid_count}, Errors: {error_count}'
     )
     
     # Gently close DB connections opened by this background thread
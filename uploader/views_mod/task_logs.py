@@ -0,0 +1,135 @@
+"""Unified incremental log feed for all task types.
+
+``GET /logs/<kind>/<task_id>/?since=<cursor>[&account_id=<id>]`` returns only
+the entries after ``since`` plus ``next_since`` to send on the next poll:
+
+- ``bulk_upload`` / ``bulk_login``: live log sink, cursor = entry seq;
+- ``warmup`` / ``follow`` / ``avatar`` / ``bio``: append-only TaskLogEntry store, cursor = entry id
+  (the legacy ``log`` field is sent with ``since=0`` until the client passes ``legacy=0``; the
+  cursor cannot mark it as read when the store is empty); entries a little behind the cursor
+  are sent again in case they committed late, clients skip seqs they already have;
+- ``cookie``: the task's ``log`` text, cursor = character offset.
+
+The response carries an ETag; a poll with a matching ``If-None-Match`` gets ``304``.
+Bulk kinds also report account progress so their pages need no second poller.
+"""
+from .common import *
+from django.http import HttpResponseNotModified
+from ..models import WarmupTask, FollowTask, AvatarChangeTask, BioLinkChangeTask, BulkLoginTask
+from ..task_log_store import read_task_log_entries, CURSOR_OVERLAP_IDS
+
+LOG_FEED_PAGE_LIMIT = 500
+
+# kind -> (task model, source, live log sink namespace)
+LOG_FEED_SOURCES = {
+    'bulk_upload': (BulkUploadTask, 'sink', 'task_logs'),
+    'bulk_login': (BulkLoginTask, 'sink', 'bulk_login_logs'),
+    'warmup': (WarmupTask, 'store', None),
+    'follow': (FollowTask, 'store', None),
+    'avatar': (AvatarChangeTask, 'store', None),
+    'bio': (BioLinkChangeTask, 'store', None),
+    'cookie': (UploadTask, 'text', None),
+}
+
+
+def _read_sink(namespace, task, account_id, since):
+    key = f"{namespace}_{task.id}"
+    if account_id:
+        key += f"_account_{account_id}"
+    entries, next_since = read_log_entries(key, since=since, limit=LOG_FEED_PAGE_LIMIT)
+    return [
+        {
+            'seq': entry.get('seq'),
+            'timestamp': entry.get('timestamp', ''),
+            'level': entry.get('level', 'INFO'),
+            'message': entry.get('message', ''),
+            'category': entry.get('category', 'GENERAL'),
+        }
+        for entry in entries
+    ], next_since
+
+
+def _read_store(task, account_id, since, include_legacy=True):
+    entries, next_since = read_task_log_entries(
+        task._meta.model_name, task.id, account_id=account_id, after_id=since, limit=LOG_FEED_PAGE_LIMIT,
+        overlap=CURSOR_OVERLAP_IDS,
+    )
+    result = []
+    if include_legacy and not since and not account_id and task.log:
+        # Content written before the append-only store existed
+        result.extend(
+            {'seq': 0, 'timestamp': '', 'level': 'INFO', 'message': line, 'category': 'LEGACY'}
+            for line in task.log.splitlines() if line.strip()
+        )
+    result.extend(
+        {
+            'seq': entry.id,
+            'timestamp': entry.timestamp.strftime('%Y-%m-%d %H:%M:%S'),
+            'level': entry.level,
+            'message': entry.message,
+            'category': entry.category or 'GENERAL',
+        }
+        for entry in entries
+    )
+    return result, next_since
+
+
+def _read_text(task, since):
+    text = task.log or ''
+    if since > len(text):
+        # Log was reset; resend it from the beginning
+        since = 0
+    return [
+        {'seq': None, 'timestamp': '', 'level': 'INFO', 'message': line, 'category': 'GENERAL'}
+        for line in text[since:].splitlines() if line.strip()
+    ], len(text)
+
+
+def _read_feed(kind, task, account_id, since, include_legacy=True):
+    _, source, namespace = LOG_FEED_SOURCES[kind]
+    if source == 'sink':
+        return _read_sink(namespace, task, account_id, since)
+    if source == 'store':
+        return _read_store(task, account_id, since, include_legacy)
+    return _read_text(task, since)
+
+
+@login_required
+def task_log_feed(request, kind, task_id):
+    """Incremental log entries of a task after ``?since=<cursor>``."""
+    if kind not in LOG_FEED_SOURCES:
+        return JsonResponse({'error': f'Unknown task kind: {kind}'}, status=404)
+    model = LOG_FEED_SOURCES[kind][0]
+    task = get_object_or_404(model, id=task_id)
+
+    since = parse_since(request.GET.get('since'))
+    account_id = parse_since(request.GET.get('account_id')) or None
+    include_legacy = request.GET.get('legacy') != '0'
+    entries, next_since = _read_feed(kind, task, account_id, since, include_legacy)
+
+    data = {
+        'status': task.status,
+        'entries': entries,
+        'since': since,
+        'next_since': next_since,
+        'updated_at': task.updated_at.isoformat() if getattr(task, 'updated_at', None) else None,
+    }
+    if hasattr(task, 'get_completion_percentage') and not account_id:
+        data.update({
+            'completion_percentage': task.get_completion_percentage(),
+            'completed_count': task.get_completed_count(),
+            'total_count': task.get_total_count(),
+        })
+
+    # Entry count covers store feeds, whose overlap window repeats entries on every poll
+    etag = (f'"{kind}-{task.id}-{account_id or 0}-{int(include_legacy)}-{since}-{next_since}-{len(entries)}-{task.status}'
+            f'-{data.get("completed_count", 0)}-{data.get("total_count", 0)}"')
+    if request.headers.get('If-None-Match') == etag:
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        return response
+
+    response = JsonResponse(data)
+    response['ETag'] = etag
+    response['Cache-Control'] = 'no-cache'
+    return response
@@ -62,9 +62,7 @@ def create_task(request):
             
             # Start task in background thread
             if form.cleaned_data.get('start_immediately', False):
-                thread = threading.Thread(target=run_upload_task, args=(task.id,))
-                thread.daemon = True
-                thread.start()
+                dispatch_job('upload', task_id=task.id)
                 messages.info(request, 'Task started in background.')
             
             return redirect('task_detail', task_id=task.id)
@@ -88,9 +86,7 @@ def start_task(request, task_id):
         messages.error(request, 'Only pending tasks can be started.')
         return redirect('task_detail', task_id=task.id)
     
-    thread = threading.Thread(target=run_upload_task, args=(task.id,))
-    thread.daemon = True
-    thread.start()
+    dispatch_job('upload', task_id=task.id)
     
     messages.success(request, f'Task {task.id} started!')
     return redirect('task_detail', task_id=task.id)
@@ -3,7 +3,6 @@ from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.http import JsonResponse
 from django.utils import timezone
-import threading
 import random
 import time
 
@@ -12,6 +11,7 @@ from ..models import (
     BioLinkChangeTask, BioLinkChangeTaskAccount,
 )
 from ..forms import BioLinkChangeTaskForm
+from ..job_queue import dispatch_job
 
 from instgrapi_func.bio_manager import change_bio_link_for_account
 from instgrapi_func.services.session_store import DjangoDeviceSessionStore
@@ -48,8 +48,7 @@ def create_bio_task(request):
                     task=task, account=acc, proxy=(acc.current_proxy or acc.proxy)
                 )
             # initial log entry
-            task.log = (task.log or '') + f"[{timezone.now().strftime('%Y-%m-%d %H:%M:%S')}] Task created with {form.cleaned_data['selected_accounts'].count()} accounts\n"
-            task.save(update_fields=['log'])
+            task.append_log(f"[{timezone.now().strftime('%Y-%m-%d %H:%M:%S')}] Task created with {form.cleaned_data['selected_accounts'].count()} accounts\n")
 
             messages.success(request, f'Bio task #{task.id} created')
             return redirect('bio_task_detail', task_id=task.id)
@@ -82,12 +81,11 @@ def start_bio_task(request, task_id):
         return redirect('bio_task_detail', task_id=task.id)
 
     task.status = 'RUNNING'
-    task.log += f"[{timezone.now().strftime('%Y-%m-%d %H:%M:%S')}] Start task\n"
-    task.save(update_fields=['status', 'log'])
+    task.append_log(f"[{timezone.now().strftime('%Y-%m-%d %H:%M:%S')}] Start task\n")
+    task.save(update_fields=['status'])
 
-    # run background thread
-    t = threading.Thread(target=_run_bio_task_worker, args=(task.id,), daemon=True)
-    t.start()
+    # run in background (worker process or local thread)
+    dispatch_job('bio', task_id=task.id)
 
     messages.success(request, f'Bio task #{task.id} started')
     return redirect('bio_task_detail', task_id=task.id)
@@ -135,15 +133,14 @@ def _run_bio_task_worker(task_id: int):
         accounts = list(task.accounts.select_related('account', 'proxy').all())
         if not accounts:
             task.status = 'FAILED'
-            task.log += f"[{timezone.now().strftime('%Y-%m-%d %H:%M:%S')}] No accounts\n"
-            task.save(update_fields=['status', 'log'])
+            task.append_log(f"[{timezone.now().strftime('%Y-%m-%d %H:%M:%S')}] No accounts\n")
+            task.save(update_fields=['status'])
             return
 
         def make_logger(username: str):
             def _log(line: str):
                 nonlocal task
-                task.log = (task.log or '') + f"[{timezone.now().strftime('%Y-%m-%d %H:%M:%S')}] {username} | {line}\n"
-                task.save(update_fields=['log'])
+                task.append_log(f"[{timezone.now().strftime('%Y-%m-%d %H:%M:%S')}] {username} | {line}\n")
             return _log
 
         # Sequential with human-like delays; respect concurrency=1 for now
@@ -212,15 +209,13 @@ def _run_bio_task_worker(task_id: int):
                 else:
                     ta.status = 'FAILED'
                     on_log("failed")
-                ta.save(update_fields=['status', 'completed_at', 'log'] if hasattr(ta, 'log') else ['status', 'completed_at'])
-                task.save(update_fields=['log'])
+                ta.save(update_fields=['status', 'completed_at'])
             except Exception as e:
                 ta.status = 'FAILED'
-                ta.log = (ta.log or '') + f"[{timezone.now().strftime('%Y-%m-%d %H:%M:%S')}] Error: {str(e)}\n"
+                ta.append_log(f"[{timezone.now().strftime('%Y-%m-%d %H:%M:%S')}] Error: {str(e)}\n")
                 ta.completed_at = timezone.now()
-                ta.save(update_fields=['status', 'log', 'completed_at'])
-                task.log += f"[{timezone.now().strftime('%Y-%m-%d %H:%M:%S')}] {acc.username} | exception {str(e)}\n"
-                task.save(update_fields=['log'])
+                ta.save(update_fields=['status', 'completed_at'])
+                task.append_log(f"[{timezone.now().strftime('%Y-%m-%d %H:%M:%S')}] {acc.username} | exception {str(e)}\n")
 
         task.status = 'COMPLETED'
         task.save(update_fields=['status'])
@@ -228,8 +223,8 @@ def _run_bio_task_worker(task_id: int):
         try:
             task = BioLinkChangeTask.objects.get(id=task_id)
             task.status = 'FAILED'
-            task.log += f"[{timezone.now().strftime('%Y-%m-%d %H:%M:%S')}] fatal error: {str(e)}\n"
-            task.save(update_fields=['status', 'log'])
+            task.append_log(f"[{timezone.now().strftime('%Y-%m-%d %H:%M:%S')}] fatal error: {str(e)}\n")
+            task.save(update_fields=['status'])
         except Exception:
             logger.exception("Bio task fatal error and failed to update task")
 
@@ -239,6 +234,6 @@ def get_bio_task_logs(request, task_id):
     task = get_object_or_404(BioLinkChangeTask, id=task_id)
     return JsonResponse({
         'status': task.status,
-        'log': task.log,
+        'log': task.log_text,
         'updated_at': task.updated_at.isoformat() if task.updated_at else None,
     }) 
\ No newline at end of file
@@ -6,7 +6,6 @@ from django.utils import timezone
 
 import random
 import time
-import threading
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from .models import (
@@ -19,6 +18,7 @@ from .models import (
     FollowTarget,
 )
 from .forms import WarmupTaskForm
+from .job_queue import dispatch_job
 
 from instgrapi_func.services.warmup_service import WarmupService
 from instgrapi_func.services.auth_service import IGAuthService
@@ -95,8 +95,7 @@ def warmup_task_create(request):
                 WarmupTaskAccount.objects.create(
                     task=task, account=acc, proxy=(acc.current_proxy or acc.proxy)
                 )
-            task.log = (task.log or '') + f"[{timezone.now().strftime('%Y-%m-%d %H:%M:%S')}] Task created with {form.cleaned_data['selected_accounts'].count()} accounts\n"
-            task.save(update_fields=['log'])
+            task.append_log(f"[{timezone.now().strftime('%Y-%m-%d %H:%M:%S')}] Task created with {form.cleaned_data['selected_accounts'].count()} accounts\n")
             messages.success(request, f'Warmup task #{task.id} created')
             return redirect('warmup_task_detail', task_id=task.id)
         else:
@@ -128,11 +127,10 @@ def warmup_task_start(request, task_id):
         return redirect('warmup_task_detail', task_id=task.id)
 
     task.status = 'RUNNING'
-    task.log += f"[{timezone.now().strftime('%Y-%m-%d %H:%M:%S')}] Start task\n"
-    task.save(update_fields=['status', 'log'])
+    task.append_log(f"[{timezone.now().strftime('%Y-%m-%d %H:%M:%S')}] Start task\n")
+    task.save(update_fields=['status'])
 
-    t = threading.Thread(target=_warmup_task_worker, args=(task.id,), daemon=True)
-    t.start()
+    dispatch_job('warmup', task_id=task.id)
 
     messages.success(request, f'Warmup task #{task.id} started')
     return redirect('warmup_task_detail', task_id=task.id)
@@ -141,8 +139,7 @@ def warmup_task_start(request, task_id):
 def _make_logger(task: WarmupTask, prefix: str):
     def _log(line: str):
         nonlocal task
-        task.log = (task.log or '') + f"[{timezone.now().strftime('%Y-%m-%d %H:%M:%S')}] {prefix} | {line}\n"
-        task.save(update_fields=['log'])
+        task.append_log(f"[{timezone.now().strftime('%Y-%m-%d %H:%M:%S')}] {prefix} | {line}\n")
     return _log
 
 
@@ -167,8 +164,8 @@ def _warmup_task_worker(task_id: int):
         accounts = list(task.accounts.select_related('account', 'proxy').all())
         if not accounts:
             task.status = 'FAILED'
-            task.log += f"[{timezone.now().strftime('%Y-%m-%d %H:%M:%S')}] No accounts\n"
-            task.save(update_fields=['status', 'log'])
+            task.append_log(f"[{timezone.now().strftime('%Y-%m-%d %H:%M:%S')}] No accounts\n")
+            task.save(update_fields=['status'])
             return
 
         service = WarmupService(auth_service=IGAuthService())
@@ -255,14 +252,13 @@ def _warmup_task_worker(task_id: int):
                 else:
                     ta.status = 'FAILED'
                     on_log("warmup failed")
-                ta.save(update_fields=['status', 'completed_at', 'log'] if hasattr(ta, 'log') else ['status', 'completed_at'])
+                ta.save(update_fields=['status', 'completed_at'])
             except Exception as e:
                 ta.status = 'FAILED'
-                ta.log = (ta.log or '') + f"[{timezone.now().strftime('%Y-%m-%d %H:%M:%S')}] Error: {str(e)}\n"
+                ta.append_log(f"[{timezone.now().strftime('%Y-%m-%d %H:%M:%S')}] Error: {str(e)}\n")
                 ta.completed_at = timezone.now()
-                ta.save(update_fields=['status', 'log', 'completed_at'])
-                task.log += f"[{timezone.now().strftime('%Y-%m-%d %H:%M:%S')}] {acc.username} | exception {str(e)}\n"
-                task.save(update_fields=['log'])
+                ta.save(update_fields=['status', 'completed_at'])
+                task.append_log(f"[{timezone.now().strftime('%Y-%m-%d %H:%M:%S')}] {acc.username} | exception {str(e)}\n")
 
         # Run accounts with limited concurrency
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
@@ -276,8 +272,8 @@ def _warmup_task_worker(task_id: int):
         try:
             task = WarmupTask.objects.get(id=task_id)
             task.status = 'FAILED'
-            task.log += f"[{timezone.now().strftime('%Y-%m-%d %H:%M:%S')}] fatal error: {str(e)}\n"
-            task.save(update_fields=['status', 'log'])
+            task.append_log(f"[{timezone.now().strftime('%Y-%m-%d %H:%M:%S')}] fatal error: {str(e)}\n")
+            task.save(update_fields=['status'])
         except Exception:
             pass
 
@@ -287,6 +283,6 @@ def warmup_task_logs(request, task_id):
     task = get_object_or_404(WarmupTask, id=task_id)
     return JsonResponse({
         'status': task.status,
-        'log': task.log,
+        'log': task.log_text,
         'updated_at': task.updated_at.isoformat() if task.updated_at else None,
     })